@@ -111,30 +111,46 @@ def create_app(test_config=None):
     import time
     from pathlib import Path
 
+    from .common.static_assets import init_static_assets
+
     # Gerar versão única por deploy (timestamp de início da aplicação)
     APP_VERSION = str(int(time.time()))
 
+    # Assets com hash + variantes .br/.gz (quando o manifest do build existe)
+    static_manifest = init_static_assets(app)
+
+    # Versões por mtime (sem manifest); memorizadas fora de DEBUG para evitar stat() por render
+    _static_versions: dict[str, str] = {}
+
     # Função para obter versão do arquivo (mtime) ou fallback para APP_VERSION
     def get_static_version(filename: str) -> str:
         """Retorna a versão do arquivo estático para cache-busting."""
+        cached = _static_versions.get(filename)
+        if cached is not None:
+            return cached
+
+        version = APP_VERSION
         try:
-            if not app.static_folder:
-                return APP_VERSION
-                
-            static_folder = Path(app.static_folder)
-            file_path = static_folder / filename
-            if file_path.exists():
-                return str(int(file_path.stat().st_mtime))
+            if app.static_folder:
+                file_path = Path(app.static_folder) / filename
+                if file_path.exists():
+                    version = str(int(file_path.stat().st_mtime))
         except Exception as exc:
             logger.exception("Unhandled exception", exc_info=True)
             pass
-        return APP_VERSION
+        if not app.config.get("DEBUG", False):
+            _static_versions[filename] = version
+        return version
 
     # Filtro Jinja para adicionar versão ao URL de arquivos estáticos
     def static_versioned(filename):
         """Retorna URL do arquivo estático com parâmetro de versão para cache-busting."""
         from flask import url_for
 
+        if static_manifest is not None and static_manifest.hashed(filename):
+            # O hash já está no nome do arquivo
+            return url_for("static", filename=filename)
+
         version = get_static_version(filename)
         return url_for("static", filename=filename) + f"?v={version}"
 
@@ -149,7 +165,6 @@ def create_app(test_config=None):
 
     init_r2(app)
     schema.init_app(app)
-    init_db_session(app)
 
     try:
         from .config.sentry_config import init_sentry
@@ -177,11 +192,22 @@ def create_app(test_config=None):
 
     performance_monitor.init_app(app)
 
+    from .monitoring.metrics import init_metrics
+
+    init_metrics(app)
+
+    from .monitoring.n_plus_one import init_n_plus_one_detection
+
+    init_n_plus_one_detection(app)
+
     from .database import close_db_connection, init_connection_pool
 
     # Inicializar pool de conexões (com retry logic para conexões instáveis)
     db_initialized = init_connection_pool(app)
 
+    # ORM no mesmo pool dos helpers psycopg2
+    init_db_session(app)
+
     if not db_initialized:
         app.logger.warning(
             "⚠️  Aplicação iniciando SEM conexão com banco de dados. "
@@ -200,19 +226,6 @@ def create_app(test_config=None):
 
     setup_logging(app)
 
-    # ================================================
-    # SANITIZAÇÃO DE LOGS (proteger dados sensíveis)
-    # ================================================
-    try:
-        from .config.log_sanitizer import SensitiveDataFilter
-
-        sanitize_filter = SensitiveDataFilter()
-        for handler in app.logger.handlers:
-            handler.addFilter(sanitize_filter)
-        app.logger.info("🔒 Sanitização de logs ativada")
-    except Exception as e:
-        app.logger.warning(f"Sanitização de logs não ativada: {e}", exc_info=True)
-
     init_security(app)
 
     from .config.cache_config import init_cache
@@ -314,6 +327,14 @@ def create_app(test_config=None):
 
     register_blueprints(app, csrf)
 
+    # Manutenção agendada (correções de dados fora das requisições GET)
+    try:
+        from .tasks.scheduler import init_scheduler
+
+        init_scheduler(app)
+    except Exception as e:
+        app.logger.warning(f"Falha ao iniciar scheduler de manutenção: {e}", exc_info=True)
+
     @app.after_request
     def _force_utf8(resp):
         try:
@@ -337,12 +358,41 @@ def create_app(test_config=None):
             click.echo(f"Erro ao executar backup: {e}")
             raise
 
+    @app.cli.command("reconcile-comment-rollups")
+    @click.option("--dias", type=int, default=None, help="janela em dias (padrão ROLLUP_RECONCILE_DAYS; 0 = tudo)")
+    def reconcile_comment_rollups_command(dias):
+        """Reconstrói o rollup diário de tags de comentários (agendar diariamente)."""
+        from .modules.analytics.infra.comment_rollups import reconciliar_rollup_comentarios
+
+        result = reconciliar_rollup_comentarios(dias)
+        click.echo(
+            f"Rollup desde {result['desde']}: {result['linhas']} linhas, "
+            f"{result['comentarios_reatribuidos']} comentários reatribuídos em {result['duration_ms']}ms"
+        )
+
+    @app.cli.command("run-maintenance")
+    @click.option("--tarefa", "tarefas", multiple=True, help="executa só esta tarefa (pode repetir)")
+    @click.option("--forcar", is_flag=True, help="ignora o intervalo desde a última execução")
+    def run_maintenance_command(tarefas, forcar):
+        """Executa as tarefas de manutenção vencidas (mesmo lock do scheduler em processo)."""
+        from .tasks.scheduler import scheduler
+
+        outcome = scheduler.run_due(force=forcar, only=list(tarefas) or None)
+        if not outcome["leader"]:
+            click.echo("Outro processo está executando a manutenção; nada feito.")
+            return
+        if not outcome["results"]:
+            click.echo("Nenhuma tarefa vencida.")
+        for name, result in outcome["results"].items():
+            click.echo(f"{name}: {result['status']} em {result['duration_ms']}ms {result['result'] or result['error'] or ''}")
+
     @app.before_request
     def load_logged_in_user():
-        # Ignorar rotas estáticas, API health e favicon
+        # Ignorar rotas estáticas, API health, métricas e favicon
         if (
             request.path.startswith("/static/")
             or request.path.startswith("/api/health")
+            or request.path == "/metrics"
             or request.path == "/favicon.ico"
         ):
             return
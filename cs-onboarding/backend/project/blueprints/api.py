@@ -292,6 +292,75 @@ def gerar_resumo_implantacao(impl_id: int):
 
         perfil_acesso = g.perfil.get("perfil_acesso") if g.get("perfil") else None
 
+        payload = request.get_json(silent=True) or {}
+
+        force = bool(payload.get("force"))
+
+
+
+        # Modo assincrono: enfileira a geracao e devolve o id do job para polling
+
+        if payload.get("async") or request.args.get("mode") == "async":
+
+            from ..modules.implantacao.application.summary_service import buscar_resumo_salvo
+            from ..tasks.job_queue import JobRejectedError, summary_jobs
+
+
+
+            if not force:
+
+                saved = buscar_resumo_salvo(impl_id)
+
+                if saved:
+
+                    return jsonify({"ok": True, "status": "done", **saved})
+
+
+
+            try:
+
+                job = summary_jobs.submit(
+
+                    "resumo_implantacao",
+
+                    gerar_resumo_implantacao_service,
+
+                    impl_id=impl_id,
+
+                    user_email=g.user_email,
+
+                    perfil_acesso=perfil_acesso,
+
+                    force=force,
+
+                    owner=g.user_email,
+
+                    dedupe_key=f"resumo:{impl_id}",
+
+                    meta={"implantacao_id": impl_id},
+
+                )
+
+            except JobRejectedError as e:
+
+                return jsonify({"ok": False, "error": str(e)}), 429
+
+
+
+            return jsonify({
+
+                "ok": True,
+
+                "status": job.status,
+
+                "job_id": job.id,
+
+                "poll_url": f"/api/implantacao/{impl_id}/resumo/jobs/{job.id}",
+
+            }), 202
+
+
+
         result = gerar_resumo_implantacao_service(
 
             impl_id=impl_id,
@@ -300,6 +369,8 @@ def gerar_resumo_implantacao(impl_id: int):
 
             perfil_acesso=perfil_acesso,
 
+            force=force,
+
         )
 
         return jsonify({"ok": True, **result})
@@ -318,6 +389,50 @@ def gerar_resumo_implantacao(impl_id: int):
 
 
 
+@api_bp.route("/implantacao/<int:impl_id>/resumo/jobs/<job_id>", methods=["GET"])
+
+@login_required
+
+@validate_api_origin
+
+@validate_context_access(id_param="impl_id", entity_type="implantacao")
+
+@limiter.limit("120 per minute", key_func=lambda: g.user_email or get_remote_address())
+
+def status_resumo_implantacao(impl_id: int, job_id: str):
+
+    """Status de um job de resumo (polling). Resultado incluso quando status = done."""
+
+    from ..tasks.job_queue import DONE, FAILED, summary_jobs
+
+
+
+    job = summary_jobs.get(job_id)
+
+    if not job or (job.get("meta") or {}).get("implantacao_id") != impl_id:
+
+        return jsonify({"ok": False, "error": "Job nao encontrado ou expirado"}), 404
+
+
+
+    response = {"ok": True, "job_id": job_id, "status": job.get("status"), "stage": job.get("stage")}
+
+    if job.get("status") == DONE:
+
+        response.update(job.get("result") or {})
+
+    elif job.get("status") == FAILED:
+
+        api_logger.warning(f"Job de resumo {job_id} da implantacao {impl_id} falhou: {job.get('error')}")
+
+        return jsonify({"ok": False, "status": FAILED, "error": "Erro interno ao gerar resumo"}), 500
+
+    return jsonify(response)
+
+
+
+
+
 @api_bp.route("/consultar_empresa", methods=["GET"])
 
 @login_required
@@ -3,7 +3,9 @@ API Blueprint para Checklist Hierárquico Infinito
 Endpoints REST para gerenciar checklist com propagação de status e comentários
 """
 
-from flask import Blueprint, g, jsonify, request
+from datetime import UTC, datetime
+
+from flask import Blueprint, current_app, g, jsonify, request
 from flask_limiter.util import get_remote_address
 
 from ..blueprints.auth import login_required
@@ -14,9 +16,13 @@ from ..modules.checklist.application.checklist_service import (
     add_comment_to_item,
     atualizar_prazo_item,
     build_nested_tree,
+    build_sync_token,
+    build_tree_delta,
     delete_checklist_item,
     excluir_comentario_service,
+    get_checklist_revision,
     get_checklist_tree,
+    get_deleted_items_since,
     get_item_progress_stats,
     listar_comentarios_implantacao,
     listar_comentarios_item,
@@ -26,6 +32,7 @@ from ..modules.checklist.application.checklist_service import (
     obter_historico_prazos,
     obter_historico_responsavel,
     obter_progresso_global_service,
+    parse_sync_token,
     set_item_dispensa,
     toggle_item_status,
     update_comment_service,
@@ -560,11 +567,17 @@ def dispense_item(item_id: int):
 def get_tree():
     """
     Retorna a árvore completa do checklist.
+
+    Com `implantacao_id`, a resposta leva um ETag forte derivado da revisão do
+    checklist (304 em If-None-Match) e o `sync_token` da resposta; com
+    `since=<sync_token>` devolve só os itens alterados e os ids removidos
+    depois dele (format "delta"). Token de outro dia → árvore completa.
     """
     try:
         implantacao_id_val = request.args.get("implantacao_id", type=int)
         root_item_id_val = request.args.get("root_item_id", type=int)
         format_type = request.args.get("format", "flat").lower()
+        since_token = request.args.get("since")
 
         plano_id_val = request.args.get("plano_id", type=int)
         
@@ -575,6 +588,24 @@ def get_tree():
         if format_type not in ["flat", "nested"]:
             return jsonify({"ok": False, "error": 'format deve ser "flat" ou "nested"'}), 400
 
+        revision = None
+        since = None
+        etag = None
+        if implantacao_id and not root_item_id:
+            revision = get_checklist_revision(implantacao_id)
+            # "atrasada" muda na virada do dia sem escrita: a data entra no ETag e no token
+            today = f"{datetime.now(UTC):%Y%m%d}"
+            since = parse_sync_token(since_token, today)
+            # Revisão futura (ex.: banco restaurado): o cliente recebe a árvore completa
+            if since is not None and since > revision:
+                since = None
+            etag = f"ck{implantacao_id}-r{revision}-{format_type}-s{'' if since is None else since}-{today}"
+            # Flask-Compress acrescenta ":gzip"/":br" ao ETag das respostas comprimidas
+            if any(tag.split(":", 1)[0] == etag for tag in request.if_none_match.as_set()):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
         flat_items = get_checklist_tree(
             implantacao_id=implantacao_id, root_item_id=root_item_id, plano_id=plano_id, include_progress=True
         )
@@ -583,11 +614,30 @@ def get_tree():
         if implantacao_id:
             global_progress = obter_progresso_global_service(implantacao_id)
 
-        if format_type == "nested":
+        if revision is not None and since is not None:
+            delta = build_tree_delta(flat_items, since, get_deleted_items_since(implantacao_id, since))
+            payload = {
+                "ok": True,
+                "format": "delta",
+                "since": since,
+                "revision": revision,
+                "changed": delta["changed"],
+                "deleted": delta["deleted"],
+                "global_progress": global_progress,
+            }
+        elif format_type == "nested":
             nested_tree = build_nested_tree(flat_items)
-            return jsonify({"ok": True, "format": "nested", "items": nested_tree, "global_progress": global_progress})
+            payload = {"ok": True, "format": "nested", "items": nested_tree, "global_progress": global_progress}
         else:
-            return jsonify({"ok": True, "format": "flat", "items": flat_items, "global_progress": global_progress})
+            payload = {"ok": True, "format": "flat", "items": flat_items, "global_progress": global_progress}
+
+        if revision is not None:
+            payload["revision"] = revision
+            payload["sync_token"] = build_sync_token(revision, today)
+        response = jsonify(payload)
+        if etag:
+            response.set_etag(etag)
+        return response
 
     except ValidationError as e:
         return jsonify({"ok": False, "error": str(e)}), 400
@@ -11,7 +11,7 @@ Endpoints:
 - /health/ready - Readiness check (is the app ready to serve traffic?)
 - /health/live - Liveness check (is the app alive?)
 - /health/db - Database-specific check
-- /health/metrics - Performance metrics (query profiler, cache)
+- /health/metrics - Performance metrics (query profiler, cache, external integrations, AI summaries)
 - /health/cache/refresh - Refresh config cache on-demand
 """
 
@@ -301,6 +301,80 @@ def metrics_endpoint() -> tuple[Any, int]:
         logger.exception("Unhandled exception", exc_info=True)
         metrics["events"] = {"status": "unavailable"}
 
+    # Integrações HTTP externas (latência, circuit breaker)
+    try:
+        from ..core.http_client import get_http_stats
+
+        metrics["integrations"] = get_http_stats()
+    except Exception:
+        logger.exception("Unhandled exception", exc_info=True)
+        metrics["integrations"] = {"status": "unavailable"}
+
+    # Resumos de IA (hit rate do cache por fingerprint, latência do Gemini)
+    try:
+        from ..modules.implantacao.infra.summary_store import get_summary_cache_stats
+        from ..tasks.job_queue import summary_jobs
+
+        metrics["summaries"] = get_summary_cache_stats()
+        metrics["summaries"]["jobs"] = summary_jobs.get_stats()
+    except Exception:
+        logger.exception("Unhandled exception", exc_info=True)
+        metrics["summaries"] = {"status": "unavailable"}
+
+    # Fila de manutenção (exclusões em lote)
+    try:
+        from ..tasks.job_queue import maintenance_jobs
+
+        metrics["maintenance_jobs"] = maintenance_jobs.get_stats()
+    except Exception:
+        logger.exception("Unhandled exception", exc_info=True)
+        metrics["maintenance_jobs"] = {"status": "unavailable"}
+
+    # Scheduler de manutenção (tarefas periódicas, líder por advisory lock)
+    try:
+        from ..tasks.scheduler import scheduler
+
+        metrics["scheduler"] = scheduler.get_stats()
+    except Exception:
+        logger.exception("Unhandled exception", exc_info=True)
+        metrics["scheduler"] = {"status": "unavailable"}
+
+    # Cache das partes da página de detalhes da implantação (hit rate por parte)
+    try:
+        from ..modules.implantacao.infra.detail_cache import get_detail_cache_stats
+
+        metrics["detail_cache"] = get_detail_cache_stats()
+    except Exception:
+        logger.exception("Unhandled exception", exc_info=True)
+        metrics["detail_cache"] = {"status": "unavailable"}
+
+    # Leituras em paralelo (detalhes da implantação, dashboard)
+    try:
+        from ..database.parallel import get_parallel_stats
+
+        metrics["parallel_queries"] = get_parallel_stats()
+    except Exception:
+        logger.exception("Unhandled exception", exc_info=True)
+        metrics["parallel_queries"] = {"status": "unavailable"}
+
+    # Unit of work (timeline/auditoria gravadas em lote)
+    try:
+        from ..database.unit_of_work import get_unit_of_work_stats
+
+        metrics["unit_of_work"] = get_unit_of_work_stats()
+    except Exception:
+        logger.exception("Unhandled exception", exc_info=True)
+        metrics["unit_of_work"] = {"status": "unavailable"}
+
+    # Detector de N+1 (relatório por endpoint; vazio com a detecção desligada)
+    try:
+        from ..monitoring.n_plus_one import get_n_plus_one_report
+
+        metrics["n_plus_one"] = get_n_plus_one_report()
+    except Exception:
+        logger.exception("Unhandled exception", exc_info=True)
+        metrics["n_plus_one"] = {"status": "unavailable"}
+
     return jsonify(metrics), 200
 
 
@@ -372,7 +372,21 @@ def delete_user():
 
 
 
-        flash(f"Usuário e {result['implantacoes_excluidas']} implantações vinculadas excluídos.", "success")
+        if result.get("job_id"):
+
+            flash(
+
+                f"Usuário excluído. As {result['implantacoes_excluidas']} implantações vinculadas "
+
+                "estão sendo removidas em segundo plano.",
+
+                "success",
+
+            )
+
+        else:
+
+            flash(f"Usuário e {result['implantacoes_excluidas']} implantações vinculadas excluídos.", "success")
 
         if request.headers.get("HX-Request") == "true":
 
@@ -1,5 +1,17 @@
 """
 Endpoint de upload de anexos para comentarios.
+
+Fluxos suportados:
+- Upload direto (R2_DIRECT_UPLOAD=true): o navegador pede uma URL pre-assinada
+  (/presign), envia o arquivo direto ao R2/S3 e confirma (/confirm). O worker do
+  gunicorn nao recebe os bytes do arquivo.
+- Fallback via servidor (/comment-attachment): multipart enviado em streaming
+  ao storage (sem file.read() do arquivo inteiro) ou imagem colada em base64.
+
+O upload direto exige CORS no bucket liberando PUT a partir da origem da app.
+A chave emitida pelo /presign vem acompanhada de um `upload_token` assinado
+(chave + e-mail do usuario); o /confirm so aceita a chave com o token do
+proprio usuario, dentro do prazo.
 """
 
 import base64
@@ -7,8 +19,10 @@ import os
 import uuid
 from io import BytesIO
 
+from boto3.s3.transfer import TransferConfig
 from flask import Blueprint, current_app, g, jsonify, request
 from flask_limiter.util import get_remote_address
+from itsdangerous import BadSignature, URLSafeTimedSerializer
 from werkzeug.utils import secure_filename
 
 from ..blueprints.auth import login_required
@@ -21,6 +35,19 @@ upload_bp = Blueprint("upload", __name__, url_prefix="/api/upload")
 ALLOWED_ATTACHMENT_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp", "pdf", "doc", "docx"}
 MAX_FILE_UPLOAD_BYTES = 10 * 1024 * 1024   # 10 MB
 MAX_BASE64_UPLOAD_BYTES = 5 * 1024 * 1024  # 5 MB
+PRESIGNED_URL_EXPIRES_SECONDS = 300
+# Prazo para confirmar: a URL vale 5 min, mas o envio de 10 MB pode terminar depois
+UPLOAD_TOKEN_MAX_AGE_SECONDS = 30 * 60
+UPLOAD_TOKEN_SALT = "comment-attachment-upload"
+UPLOAD_KEY_PREFIX = "comentarios/"
+
+# Envio em partes de 8 MB, sem threads extras por requisicao
+STREAMING_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=2,
+    use_threads=False,
+)
 ALLOWED_ATTACHMENT_MIME = {
     "png": "image/png",
     "jpg": "image/jpeg",
@@ -46,7 +73,12 @@ def _get_storage_config():
 
 
 def _parse_multipart_upload():
-    """Lê e valida arquivo de formulário multipart. Retorna (binary_data, filename, None) ou (None, None, error)."""
+    """
+    Valida arquivo de formulário multipart. Retorna (fileobj, filename, None) ou (None, None, error).
+
+    O fileobj e o stream do werkzeug (arquivo temporario em disco acima de 500 KB),
+    repassado ao storage sem carregar o arquivo inteiro em memoria.
+    """
     file = request.files.get("file") or request.files.get("image")
     if not file or not file.filename:
         return None, None, (jsonify({"ok": False, "error": "Nenhum arquivo selecionado"}), 400)
@@ -62,11 +94,11 @@ def _parse_multipart_upload():
     if file_size > MAX_FILE_UPLOAD_BYTES:
         return None, None, (jsonify({"ok": False, "error": "Arquivo muito grande. Maximo 10MB"}), 400)
 
-    return file.read(), secure_filename(filename_str), None
+    return file.stream, secure_filename(filename_str), None
 
 
 def _parse_base64_upload():
-    """Decodifica imagem base64 do JSON. Retorna (binary_data, filename, None) ou (None, None, error)."""
+    """Decodifica imagem base64 do JSON. Retorna (fileobj, filename, None) ou (None, None, error)."""
     data = request.get_json() or {}
     base64_data = data.get("image_base64")
     if not base64_data:
@@ -75,6 +107,10 @@ def _parse_base64_upload():
     if "," in base64_data:
         base64_data = base64_data.split(",", 1)[1]
 
+    # Rejeita antes de decodificar: base64 ocupa ~4/3 do tamanho binario
+    if len(base64_data) * 3 // 4 > MAX_BASE64_UPLOAD_BYTES + 3:
+        return None, None, (jsonify({"ok": False, "error": "Imagem muito grande. Maximo 5MB"}), 400)
+
     try:
         binary_data = base64.b64decode(base64_data)
     except Exception as exc:
@@ -84,7 +120,44 @@ def _parse_base64_upload():
     if len(binary_data) > MAX_BASE64_UPLOAD_BYTES:
         return None, None, (jsonify({"ok": False, "error": "Imagem muito grande. Maximo 5MB"}), 400)
 
-    return binary_data, f"pasted-image-{uuid.uuid4().hex[:8]}.png", None
+    return BytesIO(binary_data), f"pasted-image-{uuid.uuid4().hex[:8]}.png", None
+
+
+def _upload_token_serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt=UPLOAD_TOKEN_SALT)
+
+
+def _issue_upload_token(key):
+    """Token assinado que amarra a chave emitida ao usuario logado."""
+    return _upload_token_serializer().dumps({"key": key, "user": g.user_email})
+
+
+def _upload_token_matches(token, key):
+    """True se o token foi emitido para esta chave e para o usuario logado, dentro do prazo."""
+    if not token:
+        return False
+    try:
+        payload = _upload_token_serializer().loads(token, max_age=UPLOAD_TOKEN_MAX_AGE_SECONDS)
+    except BadSignature:
+        return False
+    return isinstance(payload, dict) and payload.get("key") == key and payload.get("user") == g.user_email
+
+
+def _content_type_for(filename):
+    ext = filename.rsplit(".", 1)[1].lower() if "." in filename else ""
+    return ALLOWED_ATTACHMENT_MIME.get(ext, "application/octet-stream")
+
+
+def _attachment_response(public_url_base, key, filename, content_type):
+    attachment_url = f"{public_url_base}/{key}"
+    return jsonify({
+        "ok": True,
+        "attachment_url": attachment_url,
+        "image_url": attachment_url,  # compat legado
+        "filename": filename,
+        "content_type": content_type,
+        "is_image": content_type.startswith("image/"),
+    })
 
 
 def _upload_comment_attachment_impl():
@@ -97,41 +170,141 @@ def _upload_comment_attachment_impl():
         return err
 
     if "file" in request.files or "image" in request.files:
-        binary_data, filename, err = _parse_multipart_upload()
+        fileobj, filename, err = _parse_multipart_upload()
     elif request.is_json:
-        binary_data, filename, err = _parse_base64_upload()
+        fileobj, filename, err = _parse_base64_upload()
     else:
         return jsonify({"ok": False, "error": "Formato de requisicao invalido"}), 400
 
     if err:
         return err
 
-    unique_filename = f"comentarios/{uuid.uuid4().hex}-{filename}"
-    ext = filename.rsplit(".", 1)[1].lower() if "." in filename else ""
-    content_type = ALLOWED_ATTACHMENT_MIME.get(ext, "application/octet-stream")
+    unique_filename = f"{UPLOAD_KEY_PREFIX}{uuid.uuid4().hex}-{filename}"
+    content_type = _content_type_for(filename)
 
     try:
         r2_client.upload_fileobj(
-            BytesIO(binary_data),
+            fileobj,
             bucket_name,
             unique_filename,
             ExtraArgs={"ContentType": content_type},
+            Config=STREAMING_TRANSFER_CONFIG,
         )
     except Exception as e:
         api_logger.error(f"Erro ao fazer upload para R2: {e}", exc_info=True)
         return jsonify({"ok": False, "error": "Erro ao fazer upload do arquivo"}), 500
 
-    attachment_url = f"{public_url_base}/{unique_filename}"
+    return _attachment_response(public_url_base, unique_filename, filename, content_type)
+
+
+def _presign_comment_attachment_impl():
+    """
+    Emite URL pre-assinada para o navegador enviar o anexo direto ao storage.
+
+    Body JSON: {"filename": str, "size": int, "method": "PUT" | "POST"}
+    - PUT (padrao, suportado pelo R2): Content-Type e Content-Length entram na assinatura
+    - POST (S3): policy com content-length-range e Content-Type fixo
+    """
+    if not current_app.config.get("R2_DIRECT_UPLOAD", False):
+        return jsonify({"ok": False, "direct_upload": False, "error": "Upload direto desabilitado"}), 409
+
+    bucket_name, public_url_base, err = _get_storage_config()
+    if err:
+        return err
+
+    data = request.get_json(silent=True) or {}
+    filename_str = str(data.get("filename") or "")
+    ext = filename_str.rsplit(".", 1)[1].lower() if "." in filename_str else ""
+    if ext not in ALLOWED_ATTACHMENT_EXTENSIONS:
+        return jsonify({"ok": False, "error": "Formato nao suportado. Use imagem, PDF ou Word (.doc/.docx)."}), 400
+
+    try:
+        size = int(data.get("size") or 0)
+    except (TypeError, ValueError):
+        size = 0
+    if size <= 0:
+        return jsonify({"ok": False, "error": "Tamanho do arquivo invalido"}), 400
+    if size > MAX_FILE_UPLOAD_BYTES:
+        return jsonify({"ok": False, "error": "Arquivo muito grande. Maximo 10MB"}), 400
+
+    filename = secure_filename(filename_str) or f"anexo.{ext}"
+    key = f"{UPLOAD_KEY_PREFIX}{uuid.uuid4().hex}-{filename}"
+    content_type = _content_type_for(filename)
+    method = str(data.get("method") or "PUT").upper()
+
+    try:
+        if method == "POST":
+            presigned = r2_client.generate_presigned_post(
+                bucket_name,
+                key,
+                Fields={"Content-Type": content_type},
+                Conditions=[
+                    {"Content-Type": content_type},
+                    ["content-length-range", 1, MAX_FILE_UPLOAD_BYTES],
+                ],
+                ExpiresIn=PRESIGNED_URL_EXPIRES_SECONDS,
+            )
+            upload = {"method": "POST", "url": presigned["url"], "fields": presigned["fields"]}
+        else:
+            url = r2_client.generate_presigned_url(
+                "put_object",
+                Params={"Bucket": bucket_name, "Key": key, "ContentType": content_type, "ContentLength": size},
+                ExpiresIn=PRESIGNED_URL_EXPIRES_SECONDS,
+            )
+            upload = {"method": "PUT", "url": url, "headers": {"Content-Type": content_type}}
+    except Exception as e:
+        api_logger.error(f"Erro ao gerar URL pre-assinada: {e}", exc_info=True)
+        return jsonify({"ok": False, "error": "Erro ao preparar upload"}), 500
+
     return jsonify({
         "ok": True,
-        "attachment_url": attachment_url,
-        "image_url": attachment_url,  # compat legado
+        "upload": upload,
+        "key": key,
+        "upload_token": _issue_upload_token(key),
         "filename": filename,
         "content_type": content_type,
-        "is_image": content_type.startswith("image/"),
+        "expires_in": PRESIGNED_URL_EXPIRES_SECONDS,
+        "attachment_url": f"{public_url_base}/{key}",
     })
 
 
+def _confirm_comment_attachment_impl():
+    """
+    Confirma um upload direto: verifica no storage que o objeto existe e respeita os limites.
+    Retorna o mesmo payload do upload via servidor.
+
+    Body JSON: {"key": str, "upload_token": str} (ambos devolvidos pelo /presign)
+    """
+    bucket_name, public_url_base, err = _get_storage_config()
+    if err:
+        return err
+
+    data = request.get_json(silent=True) or {}
+    key = str(data.get("key") or "")
+    if not key.startswith(UPLOAD_KEY_PREFIX) or ".." in key or "/" in key[len(UPLOAD_KEY_PREFIX):]:
+        return jsonify({"ok": False, "error": "Chave de upload invalida"}), 400
+    if not _upload_token_matches(data.get("upload_token"), key):
+        api_logger.warning(f"Confirmacao de upload recusada para {g.user_email}: token ausente ou invalido ({key})")
+        return jsonify({"ok": False, "error": "Upload nao autorizado ou expirado"}), 403
+
+    try:
+        head = r2_client.head_object(Bucket=bucket_name, Key=key)
+    except Exception as e:
+        api_logger.warning(f"Upload direto nao encontrado no storage ({key}): {e}")
+        return jsonify({"ok": False, "error": "Arquivo nao encontrado no storage"}), 404
+
+    filename = key[len(UPLOAD_KEY_PREFIX):].split("-", 1)[-1]
+    content_type = _content_type_for(filename)
+    if head.get("ContentLength", 0) > MAX_FILE_UPLOAD_BYTES or head.get("ContentType") != content_type:
+        try:
+            r2_client.delete_object(Bucket=bucket_name, Key=key)
+        except Exception as e:
+            api_logger.error(f"Erro ao remover upload invalido {key}: {e}", exc_info=True)
+        return jsonify({"ok": False, "error": "Arquivo enviado nao respeita os limites de upload"}), 400
+
+    return _attachment_response(public_url_base, key, filename, content_type)
+
+
 @upload_bp.route("/comment-attachment", methods=["POST"])
 @login_required
 @validate_api_origin
@@ -144,6 +317,30 @@ def upload_comment_attachment():
         return jsonify({"ok": False, "error": "Erro interno ao processar arquivo"}), 500
 
 
+@upload_bp.route("/comment-attachment/presign", methods=["POST"])
+@login_required
+@validate_api_origin
+@limiter.limit("30 per minute", key_func=lambda: g.user_email or get_remote_address() or "unknown")
+def presign_comment_attachment():
+    try:
+        return _presign_comment_attachment_impl()
+    except Exception as e:
+        api_logger.error(f"Erro ao preparar upload direto: {e}", exc_info=True)
+        return jsonify({"ok": False, "error": "Erro interno ao preparar upload"}), 500
+
+
+@upload_bp.route("/comment-attachment/confirm", methods=["POST"])
+@login_required
+@validate_api_origin
+@limiter.limit("30 per minute", key_func=lambda: g.user_email or get_remote_address() or "unknown")
+def confirm_comment_attachment():
+    try:
+        return _confirm_comment_attachment_impl()
+    except Exception as e:
+        api_logger.error(f"Erro ao confirmar upload direto: {e}", exc_info=True)
+        return jsonify({"ok": False, "error": "Erro interno ao confirmar upload"}), 500
+
+
 @upload_bp.route("/comment-image", methods=["POST"])
 @login_required
 @validate_api_origin
@@ -13,10 +13,12 @@ _logger = logging.getLogger(__name__)
 from ..modules.audit.application.audit_service import log_action
 
 
-def audit(action: str, target_type: str):
+def audit(action: str, target_type: str, background: bool = False):
     """
     Decorator para registrar auditoria automaticamente em endpoints.
 
+    `background=True` grava o log fora da requisição (fire-and-forget).
+
     Uso:
     @audit(action='UPDATE_IMPLANTACAO', target_type='implantacao')
     def update_implantacao(id):
@@ -61,6 +63,7 @@ def audit(action: str, target_type: str):
                         target_type=target_type,
                         target_id=str(target_id),
                         user_email=getattr(g, "user_email", None),
+                        background=background,
                     )
             except Exception as e:
                 # Auditoria não deve quebrar a requisição
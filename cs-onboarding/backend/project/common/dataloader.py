@@ -10,6 +10,14 @@ Agrupa múltiplas queries em uma única, reduzindo dramaticamente o número de r
 
 
 
+Loaders por implantação (árvore do checklist, comentários) e um loader genérico
+
+por chave com escopo de requisição (`BatchLoader`/`get_loader`), usado para
+
+lookups comuns: perfis de usuário, planos de sucesso, links Jira.
+
+
+
 Uso:
 
     from backend.project.common.dataloader import ChecklistDataLoader
@@ -47,7 +55,11 @@ import logging
 
 from collections import OrderedDict
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+
+
+from flask import g, has_app_context
 
 
 
@@ -55,6 +67,12 @@ from ..db import query_db
 
 
 
+if TYPE_CHECKING:
+
+    from collections.abc import Callable, Iterable
+
+
+
 logger = logging.getLogger("database")
 
 
@@ -593,3 +611,260 @@ class ImplantacaoDataLoader:
             "todos_modulos": list(tarefas_agrupadas.keys()),
 
         }
+
+
+
+
+
+# ──────────────────────────────────────────────
+
+# Loader genérico por chave (escopo da requisição)
+
+# ──────────────────────────────────────────────
+
+
+
+
+
+class BatchLoader:
+
+    """
+
+    Loader por chave com memoização: cada chave é buscada no máximo uma vez.
+
+
+
+    `batch_fn(keys)` recebe a lista de chaves ainda não carregadas e devolve
+
+    {chave: valor} em UMA query (`= ANY(%s)`); chaves sem resultado ficam com
+
+    `default`. `prime(keys)` só anota chaves: o próximo `load`/`load_many`
+
+    busca todas as anotadas juntas, o que junta lookups espalhados em uma query.
+
+
+
+    Uso:
+
+        perfis = user_profiles()
+
+        perfis.prime(emails_da_pagina)
+
+        nome = (perfis.load(email) or {}).get("nome")  # 1 query para todos os emails
+
+    """
+
+
+
+    def __init__(self, batch_fn: Callable[[list[Any]], dict[Any, Any]], default: Any = None, name: str = ""):
+
+        self.batch_fn = batch_fn
+
+        self.default = default
+
+        self.name = name or getattr(batch_fn, "__name__", "loader")
+
+        self._cache: dict[Any, Any] = {}
+
+        self._pending: set[Any] = set()
+
+        self.batches = 0
+
+
+
+    def prime(self, keys: Iterable[Any]) -> None:
+
+        """Anota chaves para a próxima busca em lote."""
+
+        self._pending.update(k for k in keys if k is not None and k not in self._cache)
+
+
+
+    def _dispatch(self) -> None:
+
+        keys = [k for k in self._pending if k not in self._cache]
+
+        self._pending.clear()
+
+        if not keys:
+
+            return
+
+        self.batches += 1
+
+        found = self.batch_fn(keys) or {}
+
+        for key in keys:
+
+            self._cache[key] = found.get(key, self.default)
+
+
+
+    def load(self, key: Any) -> Any:
+
+        """Valor de uma chave (busca junto as chaves anotadas com `prime`)."""
+
+        if key is None:
+
+            return self.default
+
+        if key not in self._cache:
+
+            self._pending.add(key)
+
+            self._dispatch()
+
+        return self._cache[key]
+
+
+
+    def load_many(self, keys: Iterable[Any]) -> dict[Any, Any]:
+
+        """{chave: valor} das chaves pedidas, em no máximo uma query."""
+
+        keys = [k for k in keys if k is not None]
+
+        self.prime(keys)
+
+        self._dispatch()
+
+        return {k: self._cache[k] for k in keys}
+
+
+
+    def clear(self, key: Any = None) -> None:
+
+        """Esquece uma chave (ou todas), ex.: depois de uma escrita na mesma requisição."""
+
+        if key is None:
+
+            self._cache.clear()
+
+        else:
+
+            self._cache.pop(key, None)
+
+
+
+
+
+def get_loader(name: str, batch_fn: Callable[[list[Any]], dict[Any, Any]], default: Any = None) -> BatchLoader:
+
+    """
+
+    Loader `name` da requisição atual (guardado em `g`, descartado no fim da requisição).
+
+
+
+    Fora de app context devolve um loader novo, sem memoização entre chamadas.
+
+    As threads de database/parallel.py têm `g` próprio e, portanto, loaders próprios.
+
+    """
+
+    if not has_app_context():
+
+        return BatchLoader(batch_fn, default, name)
+
+    loaders = g.get("_dataloaders")
+
+    if loaders is None:
+
+        loaders = g._dataloaders = {}
+
+    loader = loaders.get(name)
+
+    if loader is None:
+
+        loader = loaders[name] = BatchLoader(batch_fn, default, name)
+
+    return loader
+
+
+
+
+
+def clear_loader(name: str, key: Any = None) -> None:
+
+    """Invalida uma chave (ou o loader inteiro) na requisição atual."""
+
+    if not has_app_context():
+
+        return
+
+    loader = (g.get("_dataloaders") or {}).get(name)
+
+    if loader is not None:
+
+        loader.clear(key)
+
+
+
+
+
+def _load_perfis(emails: list[str]) -> dict[str, dict]:
+
+    rows = query_db(
+
+        "SELECT usuario, nome, foto_url FROM perfil_usuario WHERE usuario = ANY(%s)",
+
+        (list(emails),),
+
+        raise_on_error=True,
+
+    ) or []
+
+    return {r["usuario"]: r for r in rows}
+
+
+
+
+
+def _load_planos(plano_ids: list[int]) -> dict[int, dict]:
+
+    rows = query_db("SELECT * FROM planos_sucesso WHERE id = ANY(%s)", (list(plano_ids),), raise_on_error=True) or []
+
+    return {r["id"]: r for r in rows}
+
+
+
+
+
+def user_profiles() -> BatchLoader:
+
+    """e-mail → {usuario, nome, foto_url} de `perfil_usuario` (None se não existir)."""
+
+    return get_loader("perfis", _load_perfis)
+
+
+
+
+
+def user_display_names(emails: Iterable[str]) -> dict[str, str]:
+
+    """e-mail → nome de exibição (o próprio e-mail quando não há perfil/nome ou a busca falha)."""
+
+    emails = list(emails)
+
+    try:
+
+        perfis = user_profiles().load_many(emails)
+
+    except Exception as e:
+
+        logger.warning(f"Erro ao carregar nomes de usuários: {e}", exc_info=True)
+
+        return {email: email for email in emails}
+
+    return {email: (perfil or {}).get("nome") or email for email, perfil in perfis.items()}
+
+
+
+
+
+def planos_sucesso() -> BatchLoader:
+
+    """id → linha de `planos_sucesso` (None se não existir). Não altere o dict devolvido: copie."""
+
+    return get_loader("planos_sucesso", _load_planos)
+
@@ -46,6 +46,8 @@ import logging
 
 import time
 
+from collections import deque
+
 from contextlib import contextmanager
 
 from dataclasses import dataclass, field
@@ -126,10 +128,10 @@ class QueryProfiler:
 
 
 
-    _stats_history: ClassVar[list[QueryStats]] = []
-
     _max_history: ClassVar[int] = 1000
 
+    _stats_history: ClassVar[deque[QueryStats]] = deque(maxlen=1000)
+
 
 
     def __init__(
@@ -206,14 +208,10 @@ class QueryProfiler:
 
 
 
-        # Armazenar no histórico
+        # Armazenar no histórico (deque limitado descarta os mais antigos)
 
         QueryProfiler._stats_history.append(stats)
 
-        if len(QueryProfiler._stats_history) > QueryProfiler._max_history:
-
-            QueryProfiler._stats_history = QueryProfiler._stats_history[-QueryProfiler._max_history :]
-
 
 
         # Logar se necessário
@@ -0,0 +1,247 @@
+"""
+Assets estáticos com fingerprint e pré-compressão (.br/.gz).
+
+O build (`build_static_assets`) percorre frontend/static, grava em
+`STATIC_BUILD_DIR` uma cópia de cada arquivo com o hash do conteúdo no nome
+(`js/checklist_renderer.js` → `js/checklist_renderer.3f2a1b9c0d4e.js`), as
+variantes .br/.gz dos tipos comprimíveis e um manifest.json. A estrutura de
+pastas é preservada, então `url(...)`/`@import` relativos do CSS continuam
+resolvendo para /static/.
+
+Com o manifest carregado (fora de DEBUG):
+- `url_for("static", ...)` e o filtro `static_versioned` apontam para o nome
+  com hash (sem stat() por render);
+- a rota /static/ entrega a variante pré-comprimida aceita pelo cliente
+  (Content-Encoding definido → Flask-Compress não recomprime), com
+  `Cache-Control: immutable` nos nomes com hash.
+
+Sem manifest (desenvolvimento), tudo funciona como antes: arquivo original,
+versão por mtime e compressão dinâmica.
+
+Uso:
+    # Build (automático no start do gunicorn, ver gunicorn.conf.py)
+    flask --app run build-static
+
+    # App: init_static_assets(app) no create_app
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from flask import request, send_from_directory
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+STATIC_SOURCE_DIR = _PROJECT_ROOT / "frontend" / "static"
+STATIC_BUILD_DIR = Path(os.environ.get("STATIC_BUILD_DIR", str(_PROJECT_ROOT / "frontend" / "static_build")))
+MANIFEST_NAME = "manifest.json"
+
+HASH_LENGTH = 12
+# Abaixo disso a compressão não compensa (mesmo limite do COMPRESS_MIN_SIZE)
+MIN_COMPRESS_SIZE = 500
+COMPRESSIBLE_EXTENSIONS = {".js", ".mjs", ".css", ".svg", ".json", ".map", ".html", ".txt", ".xml", ".ico"}
+# Diretórios de conteúdo gerado pelo usuário / builds de terceiros
+EXCLUDED_DIRS = {"uploads", "dist"}
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+# ──────────────────────────────────────────────
+# Build
+# ──────────────────────────────────────────────
+
+
+def _fingerprinted_name(relative: Path, digest: str) -> str:
+    return relative.with_name(f"{relative.stem}.{digest[:HASH_LENGTH]}{relative.suffix}").as_posix()
+
+
+def _write_variant(target: Path, data: bytes, encoding: str) -> int | None:
+    """Grava a variante comprimida se ela for menor que o original; devolve o tamanho."""
+    variant = target.with_name(target.name + (".br" if encoding == "br" else ".gz"))
+    if variant.exists():
+        return variant.stat().st_size
+
+    if encoding == "br":
+        compressed = brotli.compress(data, quality=11)
+    else:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) >= len(data):
+        return None
+    variant.write_bytes(compressed)
+    return len(compressed)
+
+
+def build_static_assets(source: Path = STATIC_SOURCE_DIR, output: Path = STATIC_BUILD_DIR) -> dict[str, Any]:
+    """
+    Gera cópias com hash, variantes .br/.gz e o manifest em `output`.
+
+    Incremental: arquivos cujo hash já existe no destino não são recomprimidos;
+    saídas que não pertencem ao novo manifest são removidas.
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    assets: dict[str, dict[str, Any]] = {}
+    encodings = ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+
+    for path in sorted(source.rglob("*")):
+        relative = path.relative_to(source)
+        if not path.is_file() or path.name.startswith(".") or relative.parts[0] in EXCLUDED_DIRS:
+            continue
+
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        hashed = _fingerprinted_name(relative, digest)
+        target = output / hashed
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+
+        variants: dict[str, int] = {}
+        if path.suffix.lower() in COMPRESSIBLE_EXTENSIONS and len(data) >= MIN_COMPRESS_SIZE:
+            for encoding in encodings:
+                size = _write_variant(target, data, encoding)
+                if size is not None:
+                    variants[encoding] = size
+
+        assets[relative.as_posix()] = {
+            "file": hashed,
+            "hash": digest[:HASH_LENGTH],
+            "size": len(data),
+            "mimetype": mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+            "encodings": variants,
+        }
+
+    # Remove saídas de builds anteriores
+    keep = {output / MANIFEST_NAME}
+    for entry in assets.values():
+        target = output / entry["file"]
+        keep.add(target)
+        keep.update(target.with_name(target.name + suffix) for suffix in (".br", ".gz"))
+    for existing in output.rglob("*"):
+        if existing.is_file() and existing not in keep:
+            existing.unlink()
+
+    manifest = {"version": 1, "assets": assets}
+    tmp = output / f"{MANIFEST_NAME}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(output / MANIFEST_NAME)
+    return manifest
+
+
+# ──────────────────────────────────────────────
+# Manifest
+# ──────────────────────────────────────────────
+
+
+class StaticManifest:
+    """Índice do manifest: nome lógico → entrada e nome com hash → nome lógico."""
+
+    def __init__(self, build_dir: Path, assets: dict[str, dict[str, Any]]):
+        self.build_dir = build_dir
+        self.assets = assets
+        self.by_hashed = {entry["file"]: logical for logical, entry in assets.items()}
+
+    @classmethod
+    def load(cls, build_dir: Path = STATIC_BUILD_DIR) -> StaticManifest | None:
+        try:
+            data = json.loads((build_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifest de assets ilegível em {build_dir}: {e}")
+            return None
+        return cls(build_dir, data.get("assets", {}))
+
+    def hashed(self, filename: str) -> str | None:
+        entry = self.assets.get(filename)
+        return entry["file"] if entry else None
+
+
+def _choose_encoding(available: dict[str, int]) -> str | None:
+    """Melhor variante aceita pelo cliente (br > gzip), respeitando q=0."""
+    accepted = request.accept_encodings
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def _send_asset(manifest: StaticManifest, logical: str, immutable: bool):
+    entry = manifest.assets[logical]
+    encoding = _choose_encoding(entry["encodings"])
+    suffix = {"br": ".br", "gzip": ".gz"}.get(encoding, "")
+    response = send_from_directory(manifest.build_dir, entry["file"] + suffix, mimetype=entry["mimetype"])
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    if immutable:
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+# ──────────────────────────────────────────────
+# Integração com a app
+# ──────────────────────────────────────────────
+
+
+def init_static_assets(app: Flask) -> StaticManifest | None:
+    """Ativa o manifest (fora de DEBUG) e registra o comando `flask build-static`."""
+
+    @app.cli.command("build-static")
+    def build_static_command():
+        """Gera assets com hash e variantes .br/.gz em STATIC_BUILD_DIR."""
+        import click
+
+        manifest = build_static_assets(Path(app.static_folder), STATIC_BUILD_DIR)
+        compressed = sum(1 for entry in manifest["assets"].values() if entry["encodings"])
+        click.echo(f"{len(manifest['assets'])} assets ({compressed} pré-comprimidos) em {STATIC_BUILD_DIR}")
+
+    if app.config.get("DEBUG", False):
+        return None
+
+    manifest = StaticManifest.load(STATIC_BUILD_DIR)
+    if manifest is None:
+        app.logger.info("Manifest de assets ausente; /static/ servido sem fingerprint (rode `flask build-static`)")
+        return None
+    app.extensions["static_manifest"] = manifest
+
+    @app.url_defaults
+    def _fingerprint_static_urls(endpoint, values):
+        if endpoint == "static":
+            hashed = manifest.hashed(values.get("filename", ""))
+            if hashed:
+                values["filename"] = hashed
+
+    original_static = app.view_functions["static"]
+
+    def serve_static(filename):
+        logical = manifest.by_hashed.get(filename)
+        if logical is not None:
+            return _send_asset(manifest, logical, immutable=True)
+        if filename in manifest.assets:
+            return _send_asset(manifest, filename, immutable=False)
+        return original_static(filename=filename)
+
+    app.view_functions["static"] = serve_static
+    app.logger.info(f"Assets estáticos com fingerprint: {len(manifest.assets)} arquivos (brotli={BROTLI_AVAILABLE})")
+    return manifest
@@ -95,6 +95,18 @@ def clear_implantacao_cache(implantacao_id):
         cache.delete(f"progresso_impl_{implantacao_id}")
 
 
+def clear_cs_directory_cache():
+    """
+    Limpa a lista de CS por contexto da página de detalhes da implantação.
+    Chamado quando perfis de acesso mudam (usuário entra/sai de um contexto).
+    """
+    if cache:
+        from ..common.context_profiles import VALID_CONTEXTS
+
+        for ctx in VALID_CONTEXTS:
+            cache.delete(f"implantacao_cs_directory_{ctx}")
+
+
 def clear_dashboard_cache():
     """
     Limpa todo o cache de dashboard.
@@ -24,6 +24,8 @@ import functools
 import logging
 from typing import TYPE_CHECKING, Any
 
+from ..monitoring.performance_monitoring import track_cache_hit, track_cache_miss
+
 if TYPE_CHECKING:
     from collections.abc import Callable
 
@@ -138,8 +140,10 @@ class CacheManager:
 
         if value is not None:
             self._hits += 1
+            track_cache_hit(resource_type)
         else:
             self._misses += 1
+            track_cache_miss(resource_type)
 
         return value
 
@@ -28,17 +28,18 @@ Recursos pré-carregados:
 
 - Regras de gamificação
 
-"""
 
 
+As configurações (tags, status, níveis, eventos, motivos) são carregadas no
 
-from __future__ import annotations
+registro em memória (config_registry), que os leitores de config_service usam.
 
-import logging
-logger = logging.getLogger(__name__)
+"""
 
 
 
+from __future__ import annotations
+
 import logging
 
 import time
@@ -47,6 +48,10 @@ from typing import TYPE_CHECKING, Any
 
 
 
+from .config_registry import get_config_registry
+
+
+
 if TYPE_CHECKING:
 
     from flask import Flask
@@ -309,6 +314,24 @@ def warm_cache(app: Flask, cache_manager: CacheManager | None = None) -> dict[st
 
 
 
+    # Uma carga do banco popula o registro; os fetches abaixo leem do snapshot
+
+    try:
+
+        snapshot = get_config_registry().reload()
+
+        if snapshot.failed:
+
+            errors.append(f"config_registry: falha em {', '.join(snapshot.failed)}")
+
+    except Exception as e:
+
+        errors.append(f"config_registry: {e}")
+
+        logger.warning(f"Cache warming: registro de configurações não carregado: {e}", exc_info=True)
+
+
+
     for resource in WARM_RESOURCES:
 
         name = resource["name"]
@@ -439,6 +462,26 @@ def refresh_config_cache(cache_manager: CacheManager | None = None) -> dict[str,
 
 
 
+    # Recarrega o snapshot local e sinaliza a versão nova aos outros workers
+
+    try:
+
+        snapshot = get_config_registry().reload(bump=True)
+
+        results["config_registry"] = f"v{snapshot.version}"
+
+        if snapshot.failed:
+
+            results["config_registry"] += f" (falha em {', '.join(snapshot.failed)})"
+
+    except Exception as e:
+
+        logger.exception("Unhandled exception", exc_info=True)
+
+        results["config_registry"] = f"error: {e}"
+
+
+
     for resource in WARM_RESOURCES:
 
         name = resource["name"]
@@ -58,6 +58,8 @@ class Config:
     R2_CONFIGURADO = all(
         [R2_ENDPOINT_URL, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY, CLOUDFLARE_BUCKET_NAME, CLOUDFLARE_PUBLIC_URL]
     )
+    # Upload direto navegador -> R2 via URL pre-assinada (requer CORS no bucket)
+    R2_DIRECT_UPLOAD = R2_CONFIGURADO and os.environ.get("R2_DIRECT_UPLOAD", "false").lower() in ("1", "true", "yes")
 
     PERMANENT_SESSION_LIFETIME = 60 * 60 * 24 * 7
 
@@ -117,6 +119,10 @@ class Config:
 
     CORS_ALLOWED_ORIGINS = os.environ.get("CORS_ALLOWED_ORIGINS", "")
 
+    # Detector de N+1 por requisição: off | log | raise (monitoring/n_plus_one.py)
+    N_PLUS_ONE_DETECTION = os.environ.get("N_PLUS_ONE_DETECTION", "off").lower()
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", "5"))
+
     # Perfis de acesso disponíveis no sistema
     # Importar aqui para evitar dependência circular
     try:
@@ -129,12 +135,14 @@ class Config:
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    N_PLUS_ONE_DETECTION = os.environ.get("N_PLUS_ONE_DETECTION", "log").lower()
     SESSION_COOKIE_SECURE = False
     PREFERRED_URL_SCHEME = "http"
 
 
 class TestingConfig(Config):
     TESTING = True
+    N_PLUS_ONE_DETECTION = os.environ.get("N_PLUS_ONE_DETECTION", "raise").lower()
     SESSION_COOKIE_SECURE = False
     PREFERRED_URL_SCHEME = "http"
 
@@ -0,0 +1,206 @@
+"""
+Registro read-through das configurações do sistema.
+
+Tags, status, níveis, tipos de evento e motivos mudam raramente e são lidos
+em quase todo request (formulários, validações, analytics). Em vez de ir ao
+banco a cada chamada, os leitores de `config_service` consultam um snapshot
+imutável em memória do processo:
+
+- carregado no startup pelo cache warming (ou no primeiro acesso);
+- versionado por um carimbo no cache compartilhado (Redis em produção), no
+  mesmo padrão de `bump_dashboard_cache_version`: `refresh_config_cache`
+  recarrega o snapshot local e incrementa a versão, e os demais workers
+  recarregam quando percebem a versão nova (checagem a cada
+  CONFIG_REGISTRY_CHECK_INTERVAL segundos);
+- recarregado também após CONFIG_REGISTRY_MAX_AGE, cobrindo alterações
+  feitas direto no banco sem refresh.
+
+Cada recurso é carregado de forma independente: se a consulta de um deles
+falhar (tabela ausente, banco indisponível), ele mantém as linhas do snapshot
+anterior (ou fica vazio na primeira carga), os demais carregam normalmente e
+o snapshot é marcado como incompleto, para nova tentativa na próxima checagem.
+
+Uso:
+    from project.config.config_registry import get_config_registry
+
+    tags = get_config_registry().rows("tags")   # lista de dicts (cópias)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+logger = logging.getLogger("app")
+
+CONFIG_REGISTRY_CHECK_INTERVAL = float(os.environ.get("CONFIG_REGISTRY_CHECK_INTERVAL", "5"))
+CONFIG_REGISTRY_MAX_AGE = float(os.environ.get("CONFIG_REGISTRY_MAX_AGE", "3600"))
+
+_VERSION_KEY = "config_registry_version"
+_VERSION_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _loaders() -> dict[str, Callable[[], list[dict]]]:
+    """Consultas ao banco de cada recurso do registro (import tardio: o serviço lê do registro)."""
+    from ..modules.config.application import config_service as svc
+
+    return {
+        "tags": svc._consultar_tags,
+        "status_implantacao": svc._consultar_status_implantacao,
+        "niveis_atendimento": svc._consultar_niveis_atendimento,
+        "tipos_evento": svc._consultar_tipos_evento,
+        "motivos_parada": svc._consultar_motivos_parada,
+        "motivos_cancelamento": svc._consultar_motivos_cancelamento,
+    }
+
+
+# ──────────────────────────────────────────────
+# Versão compartilhada entre processos
+# ──────────────────────────────────────────────
+
+
+def get_config_registry_version() -> int:
+    from . import cache_config
+
+    if not cache_config.cache:
+        return 0
+    try:
+        version = cache_config.cache.get(_VERSION_KEY)
+        return int(version) if version is not None else 0
+    except Exception:
+        logger.exception("Falha ao ler versão do registro de configurações", exc_info=True)
+        return 0
+
+
+def bump_config_registry_version() -> int:
+    from . import cache_config
+
+    if not cache_config.cache:
+        return 0
+    try:
+        # INCR atômico no backend quando disponível (Redis): dois refresh simultâneos não perdem versão
+        inc = getattr(cache_config.cache.cache, "inc", None)
+        if inc is not None:
+            version = inc(_VERSION_KEY)
+            if version is not None:
+                return int(version)
+        version = get_config_registry_version() + 1
+        cache_config.cache.set(_VERSION_KEY, version, timeout=_VERSION_TIMEOUT)
+        return version
+    except Exception:
+        logger.exception("Falha ao incrementar versão do registro de configurações", exc_info=True)
+        return 0
+
+
+# ──────────────────────────────────────────────
+# Snapshot e registro
+# ──────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    version: int
+    loaded_at: float
+    data: Mapping[str, tuple[Mapping[str, Any], ...]]
+    # Recursos cuja consulta falhou nesta carga (mantêm as linhas anteriores)
+    failed: tuple[str, ...] = ()
+
+
+class ConfigRegistry:
+    """Snapshot imutável por processo, trocado atomicamente a cada recarga."""
+
+    def __init__(self):
+        self._snapshot: ConfigSnapshot | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> ConfigSnapshot:
+        snap = self._snapshot
+        if snap is not None and time.monotonic() - self._checked_at < CONFIG_REGISTRY_CHECK_INTERVAL:
+            return snap
+        return self._revalidate()
+
+    def get(self, name: str) -> tuple[Mapping[str, Any], ...]:
+        """Linhas do recurso como mapeamentos somente leitura."""
+        return self.snapshot().data[name]
+
+    def rows(self, name: str) -> list[dict[str, Any]]:
+        """Linhas do recurso como dicts novos (o chamador pode alterá-los)."""
+        return [dict(row) for row in self.get(name)]
+
+    def reload(self, bump: bool = False) -> ConfigSnapshot:
+        """Recarrega do banco; com `bump`, sinaliza a versão nova aos outros processos."""
+        with self._lock:
+            version = bump_config_registry_version() if bump else get_config_registry_version()
+            return self._load(version)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    def _revalidate(self) -> ConfigSnapshot:
+        with self._lock:
+            snap = self._snapshot
+            now = time.monotonic()
+            if snap is not None and now - self._checked_at < CONFIG_REGISTRY_CHECK_INTERVAL:
+                return snap
+
+            version = get_config_registry_version()
+            stale = (
+                snap is None
+                or bool(snap.failed)
+                or snap.version != version
+                or now - snap.loaded_at >= CONFIG_REGISTRY_MAX_AGE
+            )
+            if not stale:
+                self._checked_at = now
+                return snap
+            try:
+                return self._load(version)
+            except Exception:
+                if snap is None:
+                    raise
+                # Mantém o snapshot anterior e tenta de novo na próxima checagem
+                logger.warning("Falha ao recarregar registro de configurações; usando snapshot anterior", exc_info=True)
+                self._checked_at = now
+                return snap
+
+    def _load(self, version: int) -> ConfigSnapshot:
+        started = time.perf_counter()
+        previous = self._snapshot.data if self._snapshot is not None else {}
+        data: dict[str, tuple[Mapping[str, Any], ...]] = {}
+        failed: list[str] = []
+        for name, loader in _loaders().items():
+            try:
+                data[name] = tuple(MappingProxyType(dict(row)) for row in loader())
+            except Exception:
+                failed.append(name)
+                data[name] = previous.get(name, ())
+                logger.warning(
+                    f"Falha ao carregar '{name}' no registro de configurações; mantendo as linhas anteriores",
+                    exc_info=True,
+                )
+        snap = ConfigSnapshot(
+            version=version, loaded_at=time.monotonic(), data=MappingProxyType(data), failed=tuple(failed)
+        )
+        self._snapshot = snap
+        self._checked_at = snap.loaded_at
+        logger.debug(
+            f"Registro de configurações v{version} carregado em {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return snap
+
+
+_registry = ConfigRegistry()
+
+
+def get_config_registry() -> ConfigRegistry:
+    return _registry
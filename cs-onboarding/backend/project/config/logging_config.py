@@ -1,10 +1,20 @@
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 logger = logging.getLogger(__name__)
 
 from flask import g
 
+# Pipeline assíncrono: as threads de requisição só enfileiram; sanitização,
+# formatação e escrita em arquivo/console rodam na thread do QueueListener.
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "true").lower() in ("1", "true", "yes")
+
+_queue_handler: QueueHandler | None = None
+_queue_listener: QueueListener | None = None
+_fork_hook_registered = False
+
 
 class ContextFilter(logging.Filter):
     """Filtro para adicionar contexto do Flask aos logs.
@@ -12,6 +22,9 @@ class ContextFilter(logging.Filter):
     """
 
     def filter(self, record):
+        # Já preenchido na thread de origem (ex.: antes de entrar na fila)
+        if hasattr(record, "user_email"):
+            return True
         try:
             user_email = getattr(g, "user_email", None)
             perfil = getattr(g, "perfil", None)
@@ -80,12 +93,22 @@ def setup_logging(app):
     console_handler.setFormatter(formatter)
     console_handler.addFilter(ContextFilter())
 
+    # Sanitização nos handlers finais (no modo assíncrono, roda na thread do listener)
+    from .log_sanitizer import SensitiveDataFilter
+
+    sanitize_filter = SensitiveDataFilter()
+    output_handlers = [file_handler, error_handler, console_handler]
+    for handler in output_handlers:
+        handler.addFilter(sanitize_filter)
+
     root_logger = logging.getLogger()
     root_logger.handlers.clear()
     root_logger.setLevel(log_level)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(error_handler)
-    root_logger.addHandler(console_handler)
+    if app.config.get("LOG_ASYNC", LOG_ASYNC):
+        root_logger.addHandler(_start_queue_logging(output_handlers))
+    else:
+        for handler in output_handlers:
+            root_logger.addHandler(handler)
 
     app.logger.setLevel(log_level)
     app.logger.handlers.clear()
@@ -110,10 +133,67 @@ def setup_logging(app):
         named_logger.propagate = True
         named_logger.addFilter(ContextFilter())
 
-    app.logger.info("Sistema de logging configurado com sucesso")
+    app.logger.info(
+        "Sistema de logging configurado com sucesso (%s, sanitização ativa)",
+        "assíncrono" if _queue_listener is not None else "síncrono",
+    )
     app.config["_LOGGING_CONFIGURED"] = True
 
 
+def _start_queue_logging(handlers: list[logging.Handler]) -> QueueHandler:
+    """
+    Cria o QueueHandler (usado pelas threads da aplicação) e inicia o QueueListener
+    que repassa os registros aos handlers reais.
+    """
+    global _queue_handler, _queue_listener, _fork_hook_registered
+
+    stop_queue_logging()
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    # Contexto do usuário (g) só existe na thread da requisição
+    _queue_handler.addFilter(ContextFilter())
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+    if not _fork_hook_registered:
+        atexit.register(stop_queue_logging)
+        # gunicorn --preload: a thread do listener não sobrevive ao fork dos workers.
+        # Parada antes do fork para que nenhuma escrita fique pela metade nos buffers copiados.
+        os.register_at_fork(
+            before=_pause_queue_listener,
+            after_in_parent=_resume_queue_listener,
+            after_in_child=lambda: _resume_queue_listener(new_queue=True),
+        )
+        _fork_hook_registered = True
+
+    return _queue_handler
+
+
+def _pause_queue_listener() -> None:
+    if _queue_listener is not None and _queue_listener._thread is not None:
+        _queue_listener.stop()
+
+
+def _resume_queue_listener(new_queue: bool = False) -> None:
+    if _queue_handler is None or _queue_listener is None or _queue_listener._thread is not None:
+        return
+    if new_queue:
+        # No filho, registros ainda na fila pertencem ao processo pai
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler.queue = log_queue
+        _queue_listener.queue = log_queue
+    _queue_listener.start()
+
+
+def stop_queue_logging() -> None:
+    """Esvazia a fila e encerra o listener (chamado no atexit)."""
+    global _queue_listener
+    if _queue_listener is not None and _queue_listener._thread is not None:
+        _queue_listener.stop()
+    _queue_listener = None
+
+
 def get_logger(name):
     """Obtém um logger com o nome especificado"""
     return logging.getLogger(name)
@@ -31,6 +31,7 @@ if TYPE_CHECKING:
         ImplantacaoFinalizada,
         ImplantacaoIniciada,
         ImplantacaoTransferida,
+        PerfilAtualizado,
         PlanoAtribuido,
         UsuarioLogado,
     )
@@ -184,6 +185,17 @@ def handle_cache_implantacao_transferida(event: ImplantacaoTransferida) -> None:
         logger.warning(f"Cache handler falhou (ImplantacaoTransferida): {e}", exc_info=True)
 
 
+def handle_cache_perfil_atualizado(event: PerfilAtualizado) -> None:
+    """Invalida a lista de CS da página de detalhes quando um perfil muda."""
+    try:
+        from ..config.cache_config import clear_cs_directory_cache
+
+        clear_cs_directory_cache()
+        logger.debug(f"🗑️ Cache invalidado: perfil de {event.email} atualizado")
+    except Exception as e:
+        logger.warning(f"Cache handler falhou (PerfilAtualizado): {e}", exc_info=True)
+
+
 # ──────────────────────────────────────────────
 # Gamification Handlers — Atualiza métricas
 # ──────────────────────────────────────────────
@@ -244,6 +256,7 @@ def register_event_handlers(event_bus) -> None:
         ImplantacaoFinalizada,
         ImplantacaoIniciada,
         ImplantacaoTransferida,
+        PerfilAtualizado,
         PlanoAtribuido,
         UsuarioLogado,
     )
@@ -260,6 +273,7 @@ def register_event_handlers(event_bus) -> None:
     event_bus.register(ChecklistComentarioAdicionado, handle_cache_comentario_adicionado)
     event_bus.register(PlanoAtribuido, handle_cache_plano_atribuido)
     event_bus.register(ImplantacaoTransferida, handle_cache_implantacao_transferida)
+    event_bus.register(PerfilAtualizado, handle_cache_perfil_atualizado)
 
     # Gamification handlers
     event_bus.register(ImplantacaoFinalizada, handle_gamification_finalizada)
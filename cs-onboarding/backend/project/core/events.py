@@ -243,13 +243,20 @@ class EventBus:
             logger.debug(f"📢 Evento emitido sem handlers: {event_name}")
             return
 
-        logger.info(f"📢 Evento emitido: {event_name} → {len(handlers)} handler(s)")
+        logger.debug(f"📢 Evento emitido: {event_name} → {len(handlers)} handler(s)")
+
+        from ..monitoring.metrics import observe_event_handler
 
         for handler in handlers:
+            started = time.perf_counter()
+            failed = False
             try:
                 handler(event)
             except Exception as e:
+                failed = True
                 logger.error(f"❌ Erro no handler {handler.__name__} para {event_name}: {e}\n{traceback.format_exc()}", exc_info=True)
+            finally:
+                observe_event_handler(event_name, handler.__name__, time.perf_counter() - started, failed=failed)
 
     def emit_after_commit(self, event: DomainEvent) -> None:
         """
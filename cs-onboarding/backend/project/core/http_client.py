@@ -0,0 +1,375 @@
+"""
+HTTP Client gerenciado para integrações externas.
+
+Substitui as chamadas `requests.get/post` de módulo (um handshake TCP+TLS por
+chamada) por uma `requests.Session` por integração, com pool de conexões
+keep-alive por host, retry com backoff, circuit breaker e histograma de latência.
+
+Integrações registradas: jira, gemini, google_calendar, google_certs, sendgrid.
+
+Uso:
+    from backend.project.core.http_client import get_http_client
+
+    jira = get_http_client("jira")
+    response = jira.post(url, json=payload, auth=auth, timeout=15)
+
+Erros:
+    CircuitOpenError herda de requests.RequestException, então handlers
+    existentes (`except requests.RequestException`) continuam funcionando.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger("app")
+
+
+class CircuitOpenError(requests.RequestException):
+    """Levantada quando o circuito da integração está aberto (fail-fast)."""
+
+
+# ──────────────────────────────────────────────
+# Políticas
+# ──────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Política de retry com backoff exponencial.
+
+    Erros de conexão são sempre retentados (a requisição não chegou ao servidor).
+    Respostas em `status_forcelist` só são retentadas para `allowed_methods`.
+    """
+
+    total: int = 2
+    backoff_factor: float = 0.3
+    status_forcelist: tuple[int, ...] = (429, 502, 503, 504)
+    allowed_methods: frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def to_urllib3(self) -> Retry:
+        return Retry(
+            total=self.total,
+            connect=self.total,
+            read=self.total,
+            status=self.total,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.status_forcelist,
+            allowed_methods=self.allowed_methods,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+
+
+@dataclass(frozen=True)
+class IntegrationConfig:
+    """Configuração de uma integração externa."""
+
+    name: str
+    timeout: float = 10
+    pool_connections: int = 4
+    pool_maxsize: int = 10
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    failure_threshold: int = 5
+    recovery_timeout: float = 30
+
+
+# ──────────────────────────────────────────────
+# Circuit breaker
+# ──────────────────────────────────────────────
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples (closed → open → half-open).
+
+    - closed: requisições passam; falhas consecutivas são contadas
+    - open: requisições falham imediatamente até `recovery_timeout`
+    - half-open: uma requisição de teste; sucesso fecha, falha reabre
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            with self._lock:
+                if not self._trial_in_flight:
+                    self._trial_in_flight = True
+                    return True
+        return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Libera a requisição de teste do half-open sem registrar resultado."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self._times_opened,
+        }
+
+
+# ──────────────────────────────────────────────
+# Histograma de latência
+# ──────────────────────────────────────────────
+
+# Limites superiores dos buckets, em milissegundos
+DEFAULT_LATENCY_BUCKETS_MS: tuple[float, ...] = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class LatencyHistogram:
+    """Histograma de buckets fixos (memória constante, thread-safe)."""
+
+    def __init__(self, buckets_ms: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._counts = [0] * (len(buckets_ms) + 1)  # último = +Inf
+        self._sum_ms = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        idx = bisect.bisect_left(self.buckets_ms, ms)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum_ms += ms
+            self._count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Estimativa do quantil pelo limite superior do bucket."""
+        with self._lock:
+            if not self._count:
+                return None
+            target = q * self._count
+            cumulative = 0
+            for idx, count in enumerate(self._counts):
+                cumulative += count
+                if cumulative >= target:
+                    return self.buckets_ms[min(idx, len(self.buckets_ms) - 1)]
+        return None
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            sum_ms = self._sum_ms
+        labels = [f"le_{int(b)}" for b in self.buckets_ms] + ["le_inf"]
+        return {
+            "count": total,
+            "avg_ms": round(sum_ms / total, 2) if total else 0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "buckets": dict(zip(labels, counts, strict=True)),
+        }
+
+
+# ──────────────────────────────────────────────
+# Client por integração
+# ──────────────────────────────────────────────
+
+
+class IntegrationClient:
+    """
+    Wrapper de `requests.Session` para uma integração externa.
+
+    Mantém conexões keep-alive por host, aplica retry/backoff, circuit breaker
+    e registra a latência de cada chamada.
+    """
+
+    def __init__(self, config: IntegrationConfig):
+        self.config = config
+        self.name = config.name
+        self.breaker = CircuitBreaker(config.failure_threshold, config.recovery_timeout)
+        self.latency = LatencyHistogram()
+        self._session: requests.Session | None = None
+        self._session_pid: int | None = None
+        self._session_lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._rejected = 0
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            max_retries=self.config.retry.to_urllib3(),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """Sessão do processo atual (recriada após fork do gunicorn)."""
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._session_lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._build_session()
+                    self._session_pid = pid
+        return self._session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Executa a requisição pela sessão gerenciada.
+
+        Falhas de rede e respostas 5xx contam para o circuit breaker;
+        respostas 4xx são erros do chamador e não abrem o circuito.
+        """
+        if not self.breaker.allow_request():
+            self._rejected += 1
+            raise CircuitOpenError(f"Integração '{self.name}' temporariamente indisponível (circuit breaker aberto)")
+
+        kwargs.setdefault("timeout", self.config.timeout)
+        self._requests += 1
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self._errors += 1
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Erro que não é da integração (ex.: argumento inválido): não conta como
+            # falha, mas não pode deixar o half-open preso com o teste "em andamento"
+            self.breaker.release_trial()
+            raise
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+
+        if response.status_code >= 500:
+            self._errors += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "requests": self._requests,
+            "errors": self._errors,
+            "rejected_by_breaker": self._rejected,
+            "circuit": self.breaker.get_stats(),
+            "latency": self.latency.snapshot(),
+        }
+
+
+# ──────────────────────────────────────────────
+# Registro de integrações
+# ──────────────────────────────────────────────
+
+# POST não é retentado por status (criação de tickets não é idempotente);
+# apenas erros de conexão, que nunca chegaram ao servidor. A exceção é o Gemini:
+# generateContent é um POST sem efeito colateral, então 429/503 são retentados.
+INTEGRATIONS: dict[str, IntegrationConfig] = {
+    "jira": IntegrationConfig(name="jira", timeout=15),
+    "gemini": IntegrationConfig(
+        name="gemini",
+        timeout=45,
+        retry=RetryPolicy(
+            total=2,
+            backoff_factor=1.0,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset({"GET", "POST"}),
+        ),
+        failure_threshold=3,
+        recovery_timeout=60,
+    ),
+    "google_calendar": IntegrationConfig(name="google_calendar", timeout=10),
+    "google_certs": IntegrationConfig(name="google_certs", timeout=10, pool_maxsize=2),
+    "sendgrid": IntegrationConfig(name="sendgrid", timeout=10, pool_maxsize=4),
+}
+
+_clients: dict[str, IntegrationClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(name: str) -> IntegrationClient:
+    """Retorna (criando sob demanda) o client da integração."""
+    client = _clients.get(name)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            config = INTEGRATIONS.get(name) or IntegrationConfig(name=name)
+            client = IntegrationClient(config)
+            _clients[name] = client
+    return client
+
+
+def get_http_stats() -> dict[str, Any]:
+    """Estatísticas por integração (para /health/metrics)."""
+    return {name: client.get_stats() for name, client in _clients.items()}
+
+
+def close_all_http_clients() -> None:
+    """Fecha todas as sessões (shutdown)."""
+    for client in list(_clients.values()):
+        client.close()
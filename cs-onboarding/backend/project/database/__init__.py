@@ -2,6 +2,7 @@ from .db_pool import (
     close_all_connections,
     close_db_connection,
     get_db_connection,
+    get_engine,
     get_pool_stats,
     init_connection_pool,
     is_pool_initialized,
@@ -13,6 +14,7 @@ __all__ = [
     "close_all_connections",
     "close_db_connection",
     "get_db_connection",
+    "get_engine",
     "get_page_args",
     "get_pool_stats",
     "init_connection_pool",
@@ -0,0 +1,200 @@
+"""
+Exclusão em massa em lotes ordenados por id, com transações curtas.
+
+Excluir um usuário com centenas de implantações fazia um DELETE por
+implantação; cada um apagava em cascata (e disparava os triggers de
+revisão, tombstone e rollup de comentários) milhares de linhas de
+`checklist_items`, `comentarios_h` e `timeline_log` numa única transação,
+segurando locks nessas tabelas durante todo o trabalho.
+
+Aqui a exclusão é feita dos filhos para os pais, em lotes de até
+BULK_DELETE_CHUNK_SIZE ids (`DELETE ... WHERE id = ANY(%s)`), cada lote na
+sua própria transação com `lock_timeout` (BULK_DELETE_LOCK_TIMEOUT_MS):
+quando a implantação finalmente é removida, a cascata já não tem quase nada
+para apagar. O processo é idempotente: se falhar no meio, basta executar de
+novo que ele continua do que restou.
+
+Uso:
+    from ..database.bulk_delete import delete_implantacoes, delete_in_chunks
+
+    delete_implantacoes(ids, progress=lambda stage: ...)
+    delete_in_chunks("comentarios_h", "data_criacao < %s", (limite,))
+
+Em background, via `maintenance_jobs` (tasks/job_queue), a função recebe o
+`progress` da fila e o estágio ("implantacoes 40/300") aparece no status do job.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any
+
+from ..db import db_transaction_with_lock
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+logger = logging.getLogger("app")
+
+BULK_DELETE_CHUNK_SIZE = int(os.environ.get("BULK_DELETE_CHUNK_SIZE", "1000"))
+# Implantações removidas por rodada (os filhos delas são apagados antes, em lotes)
+BULK_DELETE_IMPL_BATCH = int(os.environ.get("BULK_DELETE_IMPL_BATCH", "20"))
+BULK_DELETE_LOCK_TIMEOUT_MS = int(os.environ.get("BULK_DELETE_LOCK_TIMEOUT_MS", "5000"))
+# Pausa entre lotes para não monopolizar I/O e replicação (0 = sem pausa)
+BULK_DELETE_PAUSE_MS = int(os.environ.get("BULK_DELETE_PAUSE_MS", "0"))
+# Acima deste número de implantações a exclusão de usuário vai para a fila de manutenção
+BULK_DELETE_SYNC_LIMIT = int(os.environ.get("BULK_DELETE_SYNC_LIMIT", "20"))
+
+# Tabelas que podem ser alvo de exclusão em lote (o nome entra no SQL)
+DELETABLE_TABLES = frozenset(
+    {
+        "implantacoes",
+        "checklist_items",
+        "comentarios_h",
+        "timeline_log",
+        "checklist_item_tombstones",
+        "checklist_revisions",
+        "perfil_usuario",
+        "gamificacao_metricas_mensais",
+        "gamificacao_regras",
+        "smtp_settings",
+        "planos_sucesso",
+        "usuario",
+        "audit_logs",
+    }
+)
+
+
+# Chave usada no keyset e no `= ANY(%s)` (perfil_usuario/usuario não têm `id`)
+_KEY_COLUMNS = {"perfil_usuario": "usuario", "usuario": "usuario"}
+
+
+def _validate_table(table: str) -> str:
+    if table not in DELETABLE_TABLES:
+        raise ValueError(f"Tabela não permitida para exclusão em lote: {table}")
+    return table
+
+
+def delete_in_chunks(
+    table: str,
+    where: str,
+    params: Sequence[Any] = (),
+    chunk_size: int | None = None,
+    descending: bool = False,
+    progress: Callable[[str], None] | None = None,
+    label: str | None = None,
+) -> int:
+    """
+    Remove as linhas de `table` que satisfazem `where`, em lotes ordenados por id.
+
+    Cada lote seleciona os próximos ids (keyset, sem OFFSET) e os apaga com
+    `id = ANY(%s)` na mesma transação curta (tabelas sem `id` usam a chave
+    primária, ver _KEY_COLUMNS). `where` é SQL do chamador (nunca
+    entrada do usuário) com placeholders para `params`. `descending` apaga
+    dos ids maiores para os menores: em `checklist_items` os filhos costumam
+    ter ids maiores que os pais, então a cascata de `parent_id` fica pequena.
+
+    Returns:
+        Número de linhas removidas
+    """
+    table = _validate_table(table)
+    chunk_size = chunk_size or BULK_DELETE_CHUNK_SIZE
+    label = label or table
+    key = _KEY_COLUMNS.get(table, "id")
+    op, order = ("<", "DESC") if descending else (">", "ASC")
+    first_sql = f"SELECT {key} FROM {table} WHERE ({where}) ORDER BY {key} {order} LIMIT %s"  # nosec B608
+    next_sql = f"SELECT {key} FROM {table} WHERE ({where}) AND {key} {op} %s ORDER BY {key} {order} LIMIT %s"  # nosec B608
+    delete_sql = f"DELETE FROM {table} WHERE {key} = ANY(%s)"  # nosec B608
+
+    total = 0
+    last_key = None
+    while True:
+        with db_transaction_with_lock() as (_conn, cursor, _db_type):
+            cursor.execute(f"SET LOCAL lock_timeout = {int(BULK_DELETE_LOCK_TIMEOUT_MS)}")
+            if last_key is None:
+                cursor.execute(first_sql, (*params, chunk_size))
+            else:
+                cursor.execute(next_sql, (*params, last_key, chunk_size))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            cursor.execute(delete_sql, (ids,))
+            total += max(cursor.rowcount or 0, 0)
+
+        last_key = ids[-1]
+        if progress:
+            progress(f"{label} {total}")
+        if len(ids) < chunk_size:
+            break
+        if BULK_DELETE_PAUSE_MS > 0:
+            time.sleep(BULK_DELETE_PAUSE_MS / 1000)
+
+    return total
+
+
+def delete_implantacoes(
+    implantacao_ids: Sequence[int],
+    chunk_size: int | None = None,
+    progress: Callable[[str], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Exclui implantações e seus dependentes em lotes.
+
+    Para cada rodada de BULK_DELETE_IMPL_BATCH implantações: comentários,
+    itens do checklist (folhas primeiro), timeline, e só então as
+    implantações (o resto da cascata é pequeno). Os tombstones e revisões de
+    checklist gerados pela própria exclusão são descartados no fim da rodada.
+
+    Returns:
+        dict com o total removido por tabela e a duração
+    """
+    ids = sorted({int(i) for i in implantacao_ids})
+    started = time.perf_counter()
+    counts = {"implantacoes": 0, "checklist_items": 0, "comentarios_h": 0, "timeline_log": 0}
+
+    for start in range(0, len(ids), BULK_DELETE_IMPL_BATCH):
+        batch = ids[start : start + BULK_DELETE_IMPL_BATCH]
+        done = f"{start}/{len(ids)}"
+
+        counts["comentarios_h"] += delete_in_chunks(
+            "comentarios_h",
+            "implantacao_id = ANY(%s) OR checklist_item_id IN "
+            "(SELECT ci.id FROM checklist_items ci WHERE ci.implantacao_id = ANY(%s))",
+            (batch, batch),
+            chunk_size=chunk_size,
+            progress=progress,
+            label=f"implantacoes {done}: comentarios",
+        )
+        counts["checklist_items"] += delete_in_chunks(
+            "checklist_items",
+            "implantacao_id = ANY(%s)",
+            (batch,),
+            chunk_size=chunk_size,
+            descending=True,
+            progress=progress,
+            label=f"implantacoes {done}: itens",
+        )
+        counts["timeline_log"] += delete_in_chunks(
+            "timeline_log",
+            "implantacao_id = ANY(%s)",
+            (batch,),
+            chunk_size=chunk_size,
+            progress=progress,
+            label=f"implantacoes {done}: timeline",
+        )
+
+        with db_transaction_with_lock() as (_conn, cursor, _db_type):
+            cursor.execute(f"SET LOCAL lock_timeout = {int(BULK_DELETE_LOCK_TIMEOUT_MS)}")
+            cursor.execute("DELETE FROM implantacoes WHERE id = ANY(%s)", (batch,))
+            counts["implantacoes"] += max(cursor.rowcount or 0, 0)
+            cursor.execute("DELETE FROM checklist_item_tombstones WHERE implantacao_id = ANY(%s)", (batch,))
+            cursor.execute("DELETE FROM checklist_revisions WHERE implantacao_id = ANY(%s)", (batch,))
+
+        if progress:
+            progress(f"implantacoes {min(start + len(batch), len(ids))}/{len(ids)}")
+
+    result = {**counts, "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+    logger.info(f"Exclusão em lote de {len(ids)} implantações concluída: {result}")
+    return result
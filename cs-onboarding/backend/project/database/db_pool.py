@@ -2,53 +2,220 @@
 Módulo de Connection Pooling para PostgreSQL.
 Melhora performance e evita esgotamento de conexões.
 
+Um único pool por processo (QueuePool do SQLAlchemy) atende os dois caminhos
+de acesso: os helpers psycopg2 (`query_db`, `execute_db`,
+`db_transaction_with_lock`, via `get_db_connection`) fazem checkout da
+conexão DBAPI crua, e a `Session` do ORM (db.py) usa o mesmo engine. A
+capacidade é compartilhada: no máximo DB_POOL_MAX + DB_POOL_OVERFLOW
+conexões por worker.
+
 Inclui:
 - Retry logic para conexões instáveis (Railway, Render, etc.)
 - Configurações conservadoras para planos com limites
-- Timeouts configuráveis
+- Timeouts configuráveis (conexão e espera por checkout)
+- Estatísticas reais do pool (em uso, ociosas, espera, timeouts)
+- Modo PgBouncer (DB_POOL_MODE=transaction)
 - Fallback gracioso em caso de falha
+
+Modo transaction (PgBouncer em pool_mode=transaction): cada transação pode
+cair em outra conexão do servidor, então o parâmetro de startup `options`
+(não suportado pelo PgBouncer) não é enviado e nada de estado de sessão deve
+ser usado: `SET` sem LOCAL, advisory locks de sessão (use
+`pg_advisory_xact_lock`), LISTEN/NOTIFY e cursores WITH HOLD.
 """
 
 from __future__ import annotations
 
 import logging
-logger = logging.getLogger(__name__)
-
 import os
 import time
 from threading import Lock
 from typing import TYPE_CHECKING, Any
 
 from flask import current_app, g
+from sqlalchemy import create_engine, event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import QueuePool
 
 if TYPE_CHECKING:
     from flask import Flask
 
 # Imports condicionais para PostgreSQL
 try:
-    from psycopg2 import (
-        OperationalError as PgOperationalError,
-        pool,
-    )
+    from psycopg2 import OperationalError as PgOperationalError
     from psycopg2.extras import DictCursor
 
     PSYCOPG2_AVAILABLE = True
 except ImportError:
-    pool = None  # type: ignore
     PgOperationalError = Exception  # type: ignore
     DictCursor = None  # type: ignore
     PSYCOPG2_AVAILABLE = False
 
-_pg_pool: Any | None = None
+logger = logging.getLogger(__name__)
+
+if PSYCOPG2_AVAILABLE:
+
+    class NPlusOneTrackingCursor(DictCursor):
+        """DictCursor que registra cada statement no detector de N+1 (só com a detecção ligada)."""
+
+        def execute(self, query, vars=None):
+            from ..monitoring.n_plus_one import record_statement
+
+            record_statement(query)
+            return super().execute(query, vars)
+
+
+_engine: Any | None = None
+_cursor_factory: Any | None = None
 _pool_lock = Lock()
 
 # Configurações do pool (podem ser sobrescritas via env vars)
-POOL_MIN_CONN = int(os.environ.get("DB_POOL_MIN", "2"))  # Reduzido de 10 para 2
-POOL_MAX_CONN = int(os.environ.get("DB_POOL_MAX", "10"))  # Reduzido de 50 para 10
+POOL_MIN_CONN = int(os.environ.get("DB_POOL_MIN", "2"))  # Conexões abertas já no start
+POOL_MAX_CONN = int(os.environ.get("DB_POOL_MAX", "10"))  # Conexões mantidas no pool
+POOL_OVERFLOW = int(os.environ.get("DB_POOL_OVERFLOW", "0"))  # Extras temporárias além de DB_POOL_MAX
+POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))  # Espera máxima por uma conexão livre (s)
+POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))  # Reabre conexões mais velhas que isso (s)
 POOL_RETRY_ATTEMPTS = int(os.environ.get("DB_POOL_RETRIES", "3"))
 POOL_RETRY_DELAY = float(os.environ.get("DB_POOL_RETRY_DELAY", "2.0"))
 CONNECTION_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "10"))
 
+# session (padrão, Postgres direto) | transaction (PgBouncer em pool_mode=transaction)
+POOL_MODE = os.environ.get("DB_POOL_MODE", "session").lower()
+
+# Esperas abaixo disso contam como checkout imediato
+_WAIT_THRESHOLD = 0.001
+
+
+# ──────────────────────────────────────────────
+# Estatísticas
+# ──────────────────────────────────────────────
+
+
+class _PoolStats:
+    """Contadores de checkout do pool (por processo)."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.invalidated = 0
+
+    def record_checkout(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if seconds >= _WAIT_THRESHOLD:
+                self.waits += 1
+                self.wait_total += seconds
+                self.wait_max = max(self.wait_max, seconds)
+
+        from ..monitoring.metrics import observe_pool_checkout
+
+        observe_pool_checkout(seconds, timed_out)
+
+    def record_invalidated(self) -> None:
+        with self._lock:
+            self.invalidated += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "waited_checkouts": self.waits,
+                "wait_ms_total": round(self.wait_total * 1000, 1),
+                "wait_ms_avg": round(self.wait_total * 1000 / self.waits, 2) if self.waits else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 2),
+                "checkout_timeouts": self.timeouts,
+                "invalidated": self.invalidated,
+            }
+
+
+_stats = _PoolStats()
+
+
+class _InstrumentedQueuePool(QueuePool):
+    """QueuePool que mede a espera de cada checkout (inclui abrir conexão nova) e os timeouts."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            _stats.record_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        _stats.record_checkout(time.perf_counter() - started)
+        return connection
+
+
+def _on_checkin(dbapi_connection, connection_record) -> None:
+    # O cursor de dicionário é só dos helpers psycopg2; o ORM recebe a conexão limpa
+    if dbapi_connection is not None:
+        dbapi_connection.cursor_factory = None
+
+
+def _on_invalidate(dbapi_connection, connection_record, exception) -> None:
+    _stats.record_invalidated()
+
+
+# ──────────────────────────────────────────────
+# Inicialização
+# ──────────────────────────────────────────────
+
+
+def _engine_url(database_url: str) -> str:
+    # Heroku/Render ainda entregam o esquema legado "postgres://"
+    if database_url.startswith("postgres://"):
+        return "postgresql://" + database_url[len("postgres://") :]
+    return database_url
+
+
+def _create_engine(database_url: str):
+    connect_args: dict[str, Any] = {}
+    if "connect_timeout" not in database_url:
+        connect_args["connect_timeout"] = CONNECTION_TIMEOUT
+    if POOL_MODE != "transaction":
+        # PgBouncer recusa o parâmetro de startup "options"
+        connect_args["options"] = "-c search_path=public"
+
+    engine = create_engine(
+        _engine_url(database_url),
+        poolclass=_InstrumentedQueuePool,
+        pool_size=POOL_MAX_CONN,
+        max_overflow=POOL_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+    event.listen(engine, "checkin", _on_checkin)
+    event.listen(engine, "invalidate", _on_invalidate)
+    return engine
+
+
+def _warm_up(engine) -> None:
+    """Abre DB_POOL_MIN conexões (valida o acesso ao banco já no start)."""
+    connections = [engine.raw_connection() for _ in range(max(1, min(POOL_MIN_CONN, POOL_MAX_CONN)))]
+    for connection in connections:
+        connection.close()
+
+
+def _reset_after_fork() -> None:
+    # Workers do gunicorn (--preload) não podem reutilizar os sockets abertos no master
+    if _engine is not None:
+        _engine.dispose(close=False)
+    _stats.reset()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
 
 def init_connection_pool(app: Flask) -> bool:
     """
@@ -58,7 +225,7 @@ def init_connection_pool(app: Flask) -> bool:
     Returns:
         bool: True se inicializado com sucesso, False caso contrário
     """
-    global _pg_pool
+    global _engine, _cursor_factory
 
     if not PSYCOPG2_AVAILABLE:
         app.logger.warning("⚠️  psycopg2 não disponível - usando fallback")
@@ -69,37 +236,39 @@ def init_connection_pool(app: Flask) -> bool:
         app.logger.warning("⚠️  DATABASE_URL não configurado")
         return False
 
-    # Adicionar parâmetros de conexão para robustez
-    if "?" not in database_url:
-        database_url += f"?connect_timeout={CONNECTION_TIMEOUT}"
-    elif "connect_timeout" not in database_url:
-        database_url += f"&connect_timeout={CONNECTION_TIMEOUT}"
+    if POOL_MODE not in ("session", "transaction"):
+        app.logger.warning(f"DB_POOL_MODE inválido ({POOL_MODE!r}); usando session")
+
+    from ..monitoring.n_plus_one import detection_enabled
+
+    _cursor_factory = NPlusOneTrackingCursor if detection_enabled(app) else DictCursor
 
     for attempt in range(1, POOL_RETRY_ATTEMPTS + 1):
         try:
             with _pool_lock:
-                if _pg_pool is None:
+                if _engine is None:
                     app.logger.info(
                         f"🔄 Tentando inicializar pool de conexões (tentativa {attempt}/{POOL_RETRY_ATTEMPTS})..."
                     )
 
-                    _pg_pool = pool.ThreadedConnectionPool(
-                        minconn=POOL_MIN_CONN,
-                        maxconn=POOL_MAX_CONN,
-                        dsn=database_url,
-                        options="-c search_path=public",
-                        cursor_factory=DictCursor,
-                    )
+                    engine = _create_engine(database_url)
+                    try:
+                        _warm_up(engine)
+                    except Exception:
+                        engine.dispose()
+                        raise
+                    _engine = engine
 
                     app.logger.info(
-                        f"✅ Pool de conexões PostgreSQL inicializado ({POOL_MIN_CONN}-{POOL_MAX_CONN} conexões)"
+                        f"✅ Pool de conexões PostgreSQL inicializado "
+                        f"({POOL_MAX_CONN}+{POOL_OVERFLOW} conexões, modo {POOL_MODE})"
                     )
                     return True
                 else:
                     # Pool já inicializado
                     return True
 
-        except PgOperationalError as e:
+        except (PgOperationalError, sa_exc.OperationalError) as e:
             error_msg = str(e)
             app.logger.warning(f"⚠️  Tentativa {attempt}/{POOL_RETRY_ATTEMPTS} falhou: {error_msg}", exc_info=True)
 
@@ -124,26 +293,42 @@ def init_connection_pool(app: Flask) -> bool:
     return False
 
 
+def get_engine() -> Any | None:
+    """Engine do pool compartilhado (None sem banco); usado pela Session do ORM."""
+    return _engine
+
+
+# ──────────────────────────────────────────────
+# Conexão por requisição (helpers psycopg2)
+# ──────────────────────────────────────────────
+
+
 def get_db_connection() -> tuple[Any, str]:
     """
     Retorna uma conexão do pool PostgreSQL.
-    A conexão é armazenada em g.db e reutilizada durante a requisição.
+    A conexão é armazenada em g.db_conn e reutilizada durante a requisição.
 
     Returns:
         tuple: (connection, db_type) onde db_type é 'postgres'
 
     Raises:
-        RuntimeError: Se o pool não estiver inicializado
+        RuntimeError: Se o pool não estiver inicializado ou esgotado
     """
     return _get_postgres_connection()
 
 
-
+def _checkout() -> None:
+    proxy = _engine.raw_connection()
+    connection = proxy.dbapi_connection
+    connection.cursor_factory = _cursor_factory
+    g.db_conn_proxy = proxy
+    g.db_conn = connection
+    g.db_type = "postgres"
 
 
 def _get_postgres_connection() -> tuple[Any, str]:
     """Obtém conexão PostgreSQL do pool."""
-    if _pg_pool is None:
+    if _engine is None:
         raise RuntimeError(
             "Connection pool not initialized. "
             "Verifique se o banco de dados está online e DATABASE_URL está configurado."
@@ -151,22 +336,24 @@ def _get_postgres_connection() -> tuple[Any, str]:
 
     try:
         if "db_conn" not in g:
-            g.db_conn = _pg_pool.getconn()
-            g.db_type = "postgres"
+            _checkout()
         else:
             # Verificar se a conexão ainda está válida
             try:
                 if getattr(g.db_conn, "closed", 1) != 0:
-                    # Conexão fechada, obter nova
-                    g.db_conn = _pg_pool.getconn()
-                    g.db_type = "postgres"
+                    # Conexão fechada, descartar e obter nova
+                    close_db_connection()
+                    _checkout()
             except Exception as exc:
                 logger.exception("Unhandled exception", exc_info=True)
                 # Erro ao verificar, obter nova conexão
-                g.db_conn = _pg_pool.getconn()
-                g.db_type = "postgres"
+                close_db_connection()
+                _checkout()
 
-    except PgOperationalError as e:
+    except sa_exc.TimeoutError as e:
+        current_app.logger.error(f"Pool de conexões esgotado após {POOL_TIMEOUT}s de espera: {e}")
+        raise RuntimeError(f"Database connection pool exhausted: {e}") from e
+    except (PgOperationalError, sa_exc.OperationalError) as e:
         current_app.logger.error(f"Failed to get connection from pool: {e}", exc_info=True)
         raise RuntimeError(f"Database connection error: {e}") from e
     except Exception as e:
@@ -178,26 +365,28 @@ def _get_postgres_connection() -> tuple[Any, str]:
 
 def close_db_connection(error: Exception | None = None) -> None:
     """
-    Retorna a conexão ao pool (PostgreSQL) ou fecha (SQLite).
+    Devolve a conexão da requisição ao pool (rollback do que não foi commitado).
     Deve ser chamado no teardown da requisição.
     """
     db_conn = g.pop("db_conn", None)
-    db_type = g.pop("db_type", None)
+    proxy = g.pop("db_conn_proxy", None)
+    g.pop("db_type", None)
 
-    if db_conn is None:
+    if proxy is None:
         return
 
-    if db_type == "postgres" and _pg_pool is not None:
+    try:
+        if getattr(db_conn, "closed", 1) != 0:
+            # Conexão morta não volta para o pool
+            proxy.invalidate()
+        proxy.close()
+    except Exception as e:
+        # Log mas não falhe - a conexão pode já estar inválida
         try:
-            is_closed = getattr(db_conn, "closed", 1) != 0
-            _pg_pool.putconn(db_conn, close=is_closed)
+            current_app.logger.debug(f"Error returning connection to pool: {e}")
+            proxy.invalidate()
         except Exception as e:
-            # Log mas não falhe - a conexão pode já estar inválida
-            try:
-                current_app.logger.debug(f"Error returning connection to pool: {e}")
-                db_conn.close()
-            except Exception as e:
-                current_app.logger.warning(f"Falha ao fechar conexão após erro no pool: {e}", exc_info=True)
+            current_app.logger.warning(f"Falha ao descartar conexão após erro no pool: {e}", exc_info=True)
 
 
 def close_all_connections() -> None:
@@ -205,41 +394,48 @@ def close_all_connections() -> None:
     Fecha todas as conexões do pool.
     Deve ser chamado no shutdown da aplicação.
     """
-    global _pg_pool
+    global _engine
 
-    if _pg_pool is not None:
+    if _engine is not None:
         with _pool_lock:
             try:
-                _pg_pool.closeall()
+                _engine.dispose()
             except Exception as e:
-                logger.exception("Unhandled exception", exc_info=True)
-                import logging
-                logging.getLogger(__name__).warning(f"Falha ao fechar todas as conexões do pool: {e}", exc_info=True)
+                logger.warning(f"Falha ao fechar todas as conexões do pool: {e}", exc_info=True)
             finally:
-                _pg_pool = None
+                _engine = None
 
 
 def is_pool_initialized() -> bool:
     """Verifica se o pool está inicializado."""
-    return _pg_pool is not None
+    return _engine is not None
 
 
 def get_pool_stats() -> dict[str, Any]:
     """
-    Retorna estatísticas do pool de conexões.
+    Retorna estatísticas do pool de conexões (deste processo).
     Útil para monitoramento e debugging.
     """
-    if _pg_pool is None:
+    if _engine is None:
         return {"initialized": False}
 
     try:
+        engine_pool = _engine.pool
+        # overflow() começa em -pool_size e sobe a cada conexão aberta
+        opened = engine_pool.size() + engine_pool.overflow()
         return {
             "initialized": True,
+            "mode": POOL_MODE,
             "min_connections": POOL_MIN_CONN,
-            "max_connections": POOL_MAX_CONN,
-            # ThreadedConnectionPool não expõe estatísticas detalhadas
-            # mas podemos adicionar contadores customizados se necessário
+            "max_connections": POOL_MAX_CONN + POOL_OVERFLOW,
+            "pool_size": engine_pool.size(),
+            "max_overflow": POOL_OVERFLOW,
+            "checkout_timeout_seconds": POOL_TIMEOUT,
+            "open": max(opened, 0),
+            "in_use": engine_pool.checkedout(),
+            "idle": engine_pool.checkedin(),
+            **_stats.snapshot(),
         }
     except Exception as exc:
         logger.exception("Unhandled exception", exc_info=True)
-        return {"initialized": True, "error": "Could not get stats"}
\ No newline at end of file
+        return {"initialized": True, "error": "Could not get stats"}
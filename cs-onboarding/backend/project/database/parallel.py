@@ -0,0 +1,184 @@
+"""
+Execução paralela de leituras independentes em conexões separadas do pool.
+
+Páginas como os detalhes da implantação e o dashboard fazem várias queries
+que não dependem umas das outras; em série, na conexão da requisição, o tempo
+total é a soma de todas. `run_parallel` roda cada leitura em uma thread de um
+pool limitado (PARALLEL_QUERY_WORKERS por processo), cada uma dentro do seu
+próprio app context — e portanto com a sua própria conexão do pool
+(`g.db_conn`), devolvida no teardown do contexto. A primeira tarefa roda na
+própria thread da requisição, com a conexão que ela já tem.
+
+O que é propagado para as threads: os atributos públicos de `g` (user_email,
+perfil, modulo_atual, ...). Conexão (`db_*`) e estado interno (`_uow_buffer`,
+fila de eventos etc.) ficam na requisição. Só use para LEITURAS: escritas em
+paralelo não participam da transação nem do unit of work da requisição.
+
+Sem app context, com PARALLEL_QUERY_WORKERS <= 1, com uma só tarefa ou quando
+chamado de dentro de uma tarefa paralela, executa em série.
+
+Uso:
+    resultados = run_parallel(
+        {
+            "tags": lambda: get_tags_metrics(inicio, fim, email),
+            "dashboard": lambda: get_dashboard_data(email),
+        },
+        return_exceptions=True,
+    )
+    tags = unwrap(resultados["tags"])  # relança a falha desta tarefa
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from flask import current_app, g, has_app_context
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger("app")
+
+# Threads (e portanto conexões extras do pool) por processo
+PARALLEL_QUERY_WORKERS = int(os.environ.get("PARALLEL_QUERY_WORKERS", "4"))
+# Tempo máximo de espera pelo conjunto de tarefas
+PARALLEL_QUERY_TIMEOUT = float(os.environ.get("PARALLEL_QUERY_TIMEOUT", "30"))
+
+# Atributos de g que pertencem à requisição (conexão, transação, eventos)
+_G_EXCLUDED_PREFIXES = ("_", "db_")
+
+_local = threading.local()
+
+
+class ParallelQueryStats:
+    """Contadores para /health/metrics."""
+
+    def __init__(self):
+        self.parallel_runs = 0
+        self.serial_runs = 0
+        self.tasks = 0
+        self.failed = 0
+        self.saved_ms = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "workers": PARALLEL_QUERY_WORKERS,
+            "parallel_runs": self.parallel_runs,
+            "serial_runs": self.serial_runs,
+            "tasks": self.tasks,
+            "failed": self.failed,
+            # Soma dos tempos individuais menos o tempo de parede (estimativa do ganho)
+            "saved_ms": round(self.saved_ms, 1),
+        }
+
+
+_stats = ParallelQueryStats()
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+_executor_lock = threading.Lock()
+
+
+def get_parallel_stats() -> dict[str, Any]:
+    return _stats.snapshot()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool por processo (recriado após o fork do gunicorn)."""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(max_workers=PARALLEL_QUERY_WORKERS, thread_name_prefix="parallel-query")
+                _executor_pid = pid
+    return _executor
+
+
+def _timed(func: Callable[[], Any]) -> tuple[Any, BaseException | None, float]:
+    started = time.perf_counter()
+    try:
+        return func(), None, time.perf_counter() - started
+    except Exception as e:
+        return None, e, time.perf_counter() - started
+
+
+def _run_in_context(app, g_values: dict[str, Any], func: Callable[[], Any]) -> tuple[Any, BaseException | None, float]:
+    _local.active = True
+    try:
+        with app.app_context():
+            for name, value in g_values.items():
+                setattr(g, name, value)
+            return _timed(func)
+    finally:
+        _local.active = False
+
+
+def run_parallel(
+    tasks: dict[str, Callable[[], Any]],
+    return_exceptions: bool = False,
+    timeout: float | None = None,
+) -> dict[str, Any]:
+    """
+    Executa as funções (sem argumentos) em paralelo e devolve {nome: resultado}.
+
+    Args:
+        tasks: {nome: função}; a ordem define qual roda na thread da requisição (a primeira)
+        return_exceptions: devolve a exceção como resultado da tarefa em vez de relançar
+        timeout: espera máxima em segundos (padrão PARALLEL_QUERY_TIMEOUT)
+
+    Raises:
+        A primeira exceção (na ordem de `tasks`) quando return_exceptions=False,
+        depois de todas as tarefas terminarem.
+    """
+    names = list(tasks)
+    serial = len(names) < 2 or PARALLEL_QUERY_WORKERS <= 1 or not has_app_context() or getattr(_local, "active", False)
+
+    started = time.perf_counter()
+    outcomes: dict[str, tuple[Any, BaseException | None, float]] = {}
+    if serial:
+        _stats.serial_runs += 1
+        for name in names:
+            outcomes[name] = _timed(tasks[name])
+    else:
+        _stats.parallel_runs += 1
+        app = current_app._get_current_object()
+        g_values = {k: v for k, v in vars(g).items() if not k.startswith(_G_EXCLUDED_PREFIXES)}
+        executor = _get_executor()
+        futures = {name: executor.submit(_run_in_context, app, g_values, tasks[name]) for name in names[1:]}
+        outcomes[names[0]] = _timed(tasks[names[0]])
+        limit = PARALLEL_QUERY_TIMEOUT if timeout is None else timeout
+        for name, future in futures.items():
+            remaining = max(limit - (time.perf_counter() - started), 0)
+            try:
+                outcomes[name] = future.result(timeout=remaining)
+            except Exception as e:
+                # TimeoutError: a thread segue até terminar, mas a requisição não espera mais
+                outcomes[name] = (None, e, 0.0)
+
+        wall = time.perf_counter() - started
+        _stats.saved_ms += max(sum(o[2] for o in outcomes.values()) - wall, 0) * 1000
+
+    _stats.tasks += len(names)
+    results: dict[str, Any] = {}
+    for name in names:
+        value, error, _elapsed = outcomes[name]
+        if error is not None:
+            _stats.failed += 1
+            if not return_exceptions:
+                raise error
+            logger.debug(f"Tarefa paralela {name} falhou: {error}")
+            value = error
+        results[name] = value
+    return results
+
+
+def unwrap(value: Any) -> Any:
+    """Relança a exceção devolvida por `run_parallel(..., return_exceptions=True)`; senão devolve o valor."""
+    if isinstance(value, Exception):
+        raise value
+    return value
@@ -8,6 +8,8 @@ from flask import current_app
 
 from ..db import execute_db, query_db
 
+from .bulk_delete import delete_in_chunks
+
 
 
 ALLOWED_TABLES = [
@@ -444,9 +446,9 @@ def cleanup_old_deleted_records(table: str, days: int = 30) -> int:
 
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
 
-        query = f"DELETE FROM {table} WHERE deleted_at IS NOT NULL AND deleted_at < %s"
+        # Em lotes por id, cada um na sua transação (sem lock longo na tabela)
 
-        rows_affected = execute_db(query, (cutoff_date,))
+        rows_affected = delete_in_chunks(table, "deleted_at IS NOT NULL AND deleted_at < %s", (cutoff_date,))
 
         if rows_affected and rows_affected > 0:
 
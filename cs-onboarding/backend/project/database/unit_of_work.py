@@ -0,0 +1,256 @@
+"""
+Unit of work para as escritas de timeline e auditoria.
+
+`logar_timeline` e `log_action` faziam um INSERT + commit cada; uma única
+mudança de status (ex.: finalizar implantação) resultava em vários commits
+pequenos, e o commit da auditoria na conexão compartilhada da requisição
+podia confirmar antes da hora o trabalho em andamento de quem chamou.
+
+Dentro de `unit_of_work()` essas linhas ficam em um buffer no `g` e são
+gravadas no fim do bloco com UM INSERT multi-linha por tabela. As escritas
+de estado do bloco (`execute_db`, `db_transaction_with_lock`) rodam na
+conexão da requisição SEM commit: estado, timeline e auditoria entram na
+mesma transação, confirmada por um único commit no fim do bloco. Se o bloco
+levantar exceção, ou se esse commit final falhar, tudo é desfeito e a
+exceção sobe (a operação não aconteceu). Um rollback no meio do bloco (erro
+de query tratado por quem chamou) descarta as linhas enfileiradas até ali,
+que descreviam escritas desfeitas.
+
+Efeitos que só podem acontecer com a transação confirmada (limpar cache,
+emitir eventos de domínio) são registrados com `after_commit` e rodam depois
+do commit final; se o bloco for desfeito, são descartados. Limpar o cache
+antes do commit deixava uma leitura concorrente recolocar o estado antigo no
+cache, e os handlers viam escritas ainda não confirmadas.
+
+Uso:
+    from ..database.unit_of_work import unit_of_work
+
+    @unit_of_work()
+    def finalizar_implantacao_service(...):
+        execute_db("UPDATE implantacoes ...")
+        logar_timeline(...)    # enfileirado
+        log_action(...)        # enfileirado
+        after_commit(clear_implantacao_cache, implantacao_id)  # depois do commit
+
+Fora de um unit of work, as funções continuam gravando na hora.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from flask import g, has_app_context
+
+from .db_pool import get_db_connection
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Colunas por tabela bufferizável (ordem das tuplas enfileiradas)
+BUFFERED_TABLES: dict[str, tuple[str, ...]] = {
+    "timeline_log": ("implantacao_id", "usuario_cs", "tipo_evento", "detalhes", "data_criacao"),
+    "audit_logs": ("user_email", "action", "target_type", "target_id", "changes", "metadata", "ip_address"),
+}
+
+
+@dataclass
+class _Buffer:
+    rows: dict[str, list[tuple[Any, ...]]] = field(default_factory=dict)
+    # Há escritas de estado sem commit na conexão da requisição
+    dirty: bool = False
+    # Efeitos a executar depois do commit final (cache, eventos)
+    callbacks: list[tuple[Callable[..., Any], tuple[Any, ...], dict[str, Any]]] = field(default_factory=list)
+
+    def pending(self) -> int:
+        return sum(len(r) for r in self.rows.values())
+
+
+class _UnitOfWorkStats:
+    """Contadores para /health/metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.units = 0
+        self.flushes = 0
+        self.rows = 0
+        self.discarded = 0
+        self.errors = 0
+
+    def record_flush(self, rows: int) -> None:
+        with self._lock:
+            self.flushes += 1
+            self.rows += rows
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "units": self.units,
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "rows_per_flush": round(self.rows / self.flushes, 2) if self.flushes else 0,
+            "discarded": self.discarded,
+            "errors": self.errors,
+        }
+
+
+uow_stats = _UnitOfWorkStats()
+
+
+def _current() -> _Buffer | None:
+    if not has_app_context():
+        return None
+    return g.get("_uow_buffer")
+
+
+def buffer_row(table: str, row: tuple[Any, ...]) -> bool:
+    """Enfileira a linha se houver unit of work ativo. Retorna False para gravar na hora."""
+    buf = _current()
+    if buf is None:
+        return False
+    buf.rows.setdefault(table, []).append(row)
+    return True
+
+
+def defer_commit() -> bool:
+    """
+    Chamado por quem faria commit na conexão da requisição.
+
+    Retorna True (não faça commit) dentro de um unit of work: o commit fica
+    para o fim do bloco, junto com a timeline/auditoria.
+    """
+    buf = _current()
+    if buf is None:
+        return False
+    buf.dirty = True
+    return True
+
+
+def after_commit(callback: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """
+    Executa `callback(*args, **kwargs)` depois do commit do unit of work ativo.
+
+    Fora de um unit of work executa na hora (a escrita já foi confirmada).
+    Erros do callback são logados e não afetam a operação já confirmada.
+    """
+    buf = _current()
+    if buf is None:
+        _run_callback(callback, args, kwargs)
+        return
+    buf.callbacks.append((callback, args, kwargs))
+
+
+def _run_callback(callback: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+    try:
+        callback(*args, **kwargs)
+    except Exception as e:
+        logger.warning(f"Unit of work: falha no callback pós-commit {getattr(callback, '__name__', callback)}: {e}")
+
+
+def discard_pending(reason: str = "rollback") -> None:
+    """
+    Descarta as linhas enfileiradas e os callbacks pós-commit registrados até aqui
+    (a transação que eles descreviam foi desfeita).
+    """
+    buf = _current()
+    if buf is None:
+        return
+    buf.callbacks = []
+    if not buf.rows:
+        return
+    pending = buf.pending()
+    buf.rows = {}
+    uow_stats.discarded += pending
+    logger.warning(f"Unit of work: {pending} linha(s) de timeline/auditoria descartada(s) ({reason})")
+
+
+def flush_pending(cursor: Any) -> int:
+    """
+    Grava as linhas pendentes com o cursor informado, SEM commit (quem chama confirma).
+    Retorna a quantidade de linhas gravadas.
+    """
+    from psycopg2.extras import execute_values
+
+    buf = _current()
+    if buf is None or not buf.rows:
+        return 0
+
+    pending, buf.rows = buf.rows, {}
+    total = 0
+    for table, rows in pending.items():
+        columns = ", ".join(BUFFERED_TABLES[table])
+        execute_values(cursor, f"INSERT INTO {table} ({columns}) VALUES %s", rows, page_size=500)
+        total += len(rows)
+    uow_stats.record_flush(total)
+    return total
+
+
+def _flush_and_commit(buf: _Buffer) -> None:
+    """Grava o buffer e confirma a transação do bloco; em falha, desfaz tudo e propaga."""
+    if not buf.rows and not buf.dirty:
+        return
+    conn = None
+    try:
+        conn = get_db_connection()[0]
+        flush_pending(conn.cursor())
+        conn.commit()
+    except Exception as e:
+        uow_stats.errors += 1
+        logger.error(f"Falha ao confirmar o unit of work (estado + timeline/auditoria): {e}", exc_info=True)
+        if conn is not None:
+            conn.rollback()
+        raise
+
+
+def _rollback(buf: _Buffer) -> None:
+    uow_stats.discarded += buf.pending()
+    buf.rows = {}
+    buf.callbacks = []
+    if not buf.dirty:
+        return
+    try:
+        get_db_connection()[0].rollback()
+    except Exception as e:
+        logger.error(f"Falha ao desfazer o unit of work: {e}", exc_info=True)
+
+
+@contextmanager
+def unit_of_work() -> Iterator[None]:
+    """
+    Transação única para o bloco: escritas de estado sem commit e timeline/auditoria
+    bufferizadas, confirmadas juntas no fim (também usável como decorator).
+    Blocos aninhados reaproveitam o buffer (e a transação) do mais externo.
+    Os callbacks de `after_commit` rodam depois do commit, já fora do bloco.
+    """
+    if not has_app_context():
+        yield
+        return
+
+    if g.get("_uow_buffer") is not None:
+        yield
+        return
+
+    buf = _Buffer()
+    g._uow_buffer = buf
+    uow_stats.units += 1
+    try:
+        yield
+    except BaseException:
+        g.pop("_uow_buffer", None)
+        _rollback(buf)
+        raise
+    try:
+        _flush_and_commit(buf)
+    finally:
+        g.pop("_uow_buffer", None)
+    # Fora do bloco: escritas feitas pelos callbacks (ex.: handlers de eventos) confirmam normalmente
+    for callback, args, kwargs in buf.callbacks:
+        _run_callback(callback, args, kwargs)
+
+
+def get_unit_of_work_stats() -> dict[str, Any]:
+    return uow_stats.snapshot()
@@ -1,17 +1,20 @@
 from contextlib import contextmanager, suppress
 from datetime import datetime, timezone
 import logging
-logger = logging.getLogger(__name__)
+import time
 
 from flask import current_app
 
 from .common.exceptions import DatabaseError
 from .database import get_db_connection as get_pooled_connection
+from .database.unit_of_work import buffer_row, defer_commit, discard_pending, flush_pending
+from .monitoring.metrics import observe_query
 
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
 
+logger = logging.getLogger(__name__)
+
 def get_db_connection():
     """
     Retorna uma conexão com o banco de dados (PostgreSQL).
@@ -38,25 +41,24 @@ def _db_error(prefix: str, query: str, err: Exception, conn=None, raise_on_error
     current_app.logger.debug(f"Query: {query[:100]}...")
     if conn:
         conn.rollback()
+        discard_pending()
     if raise_on_error:
         raise DatabaseError(f"Erro ao executar query: {err}", {"query": query[:100], "args": args}) from err
 
 def init_db_session(app):
-    """Inicializa o engine e a sessão do SQLAlchemy."""
-    database_url = app.config.get("DATABASE_URL")
-    if not database_url:
+    """
+    Vincula a sessão do SQLAlchemy ao engine do pool compartilhado (database/db_pool).
+    Deve ser chamado depois de `init_connection_pool`.
+    """
+    from .database.db_pool import get_engine
+
+    engine = get_engine()
+    if engine is None:
+        app.logger.warning("⚠️  SQLAlchemy Session sem engine: pool de conexões não inicializado")
         return
-    
-    # Criar engine com pool compatível com o existente
-    engine = create_engine(
-        database_url,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True
-    )
-    
+
     Session.configure(bind=engine)
-    app.logger.info("✅ SQLAlchemy Scoped Session inicializada")
+    app.logger.info("✅ SQLAlchemy Scoped Session inicializada (pool compartilhado)")
 
 
 @contextmanager
@@ -74,6 +76,7 @@ def db_connection():
         logger.exception("Unhandled exception", exc_info=True)
         if conn:
             conn.rollback()
+            discard_pending()
         raise
 
 
@@ -89,13 +92,16 @@ def query_db(query, args=(), one=False, raise_on_error=False):
         conn = get_db_connection()[0]
         cursor = conn.cursor()
 
+        started = time.perf_counter()
         cursor.execute(query, args)
 
         if one:
             result = cursor.fetchone()
+            observe_query(query, time.perf_counter() - started)
             return dict(result) if result else None
         else:
             results = cursor.fetchall()
+            observe_query(query, time.perf_counter() - started)
             return [dict(row) for row in results] if results else []
 
     except Exception as e:
@@ -116,6 +122,7 @@ def execute_db(query, args=(), raise_on_error=False):
         conn = get_db_connection()[0]
         cursor = conn.cursor()
 
+        started = time.perf_counter()
         cursor.execute(query, args)
 
         returned_value = None
@@ -125,7 +132,10 @@ def execute_db(query, args=(), raise_on_error=False):
             if row:
                 returned_value = row[0]
 
-        conn.commit()
+        # Dentro de um unit of work o commit é feito no fim do bloco
+        if not defer_commit():
+            conn.commit()
+        observe_query(query, time.perf_counter() - started)
 
         if returned_value is not None:
             return returned_value
@@ -156,24 +166,33 @@ def db_transaction_with_lock():
         yield conn, cursor, "postgres"
 
         if conn:
-            with suppress(Exception):
-                conn.commit()
+            # Timeline/auditoria enfileiradas entram na mesma transação;
+            # dentro de um unit of work o commit fica para o fim do bloco
+            flush_pending(cursor)
+            if not defer_commit():
+                with suppress(Exception):
+                    conn.commit()
 
     except Exception as exc:
         logger.exception("Unhandled exception", exc_info=True)
         if conn:
             with suppress(Exception):
                 conn.rollback()
+            discard_pending()
         raise
 
 
 def logar_timeline(implantacao_id, usuario_cs, tipo_evento, detalhe):
+    """Registra um evento na timeline (enfileirado se houver unit of work ativo)."""
+    row = (implantacao_id, usuario_cs, tipo_evento, detalhe, datetime.now(timezone.utc))
+    if buffer_row("timeline_log", row):
+        return
     sql = """
         INSERT INTO timeline_log
             (implantacao_id, usuario_cs, tipo_evento, detalhes, data_criacao)
         VALUES (%s, %s, %s, %s, %s)
     """
-    execute_db(sql, (implantacao_id, usuario_cs, tipo_evento, detalhe, datetime.now(timezone.utc)))
+    execute_db(sql, row)
 
 
 # Schema initialization logic has been moved to backend/project/database/schema.py
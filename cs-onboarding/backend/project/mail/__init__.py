@@ -1,9 +1,14 @@
 from .email_utils import (
     load_smtp_settings,
+    send_email_batch,
     send_email_global,
 )
+from .smtp_pool import SMTPConnectionPool, smtp_pool
 
 __all__ = [
+    "SMTPConnectionPool",
     "load_smtp_settings",
+    "send_email_batch",
     "send_email_global",
+    "smtp_pool",
 ]
@@ -4,8 +4,6 @@ import smtplib
 
 import socket
 
-import ssl
-
 from email.mime.multipart import MIMEMultipart
 
 from email.mime.text import MIMEText
@@ -24,8 +22,12 @@ from werkzeug.security import check_password_hash, generate_password_hash
 
 from ..config.logging_config import app_logger, security_logger
 
+from ..core.http_client import get_http_client
+
 from ..db import execute_db, query_db
 
+from .smtp_pool import smtp_pool
+
 
 
 
@@ -52,6 +54,36 @@ def _hash_password(password):
 
 
 
+def _build_message(subject, from_header, to_header, reply_to=None, body_text=None, body_html=None):
+
+    """Monta a mensagem MIME (texto + HTML) usada por todos os drivers SMTP."""
+
+    msg = MIMEMultipart("alternative")
+
+    msg["Subject"] = subject
+
+    msg["From"] = from_header
+
+    msg["To"] = to_header
+
+    if reply_to:
+
+        msg["Reply-To"] = reply_to
+
+    if body_text:
+
+        msg.attach(MIMEText(body_text, "plain"))
+
+    if body_html:
+
+        msg.attach(MIMEText(body_html, "html"))
+
+    return msg
+
+
+
+
+
 def _check_password(hashed_password, provided_password):
 
     """Verifica a senha fornecida contra o hash."""
@@ -518,47 +550,45 @@ def send_email(subject, body_html, recipients, smtp_settings, plain_password, fr
 
 
 
-    msg = MIMEMultipart("alternative")
-
-    msg["Subject"] = subject
-
-    msg["From"] = f"{from_name} <{user}>" if from_name else user
+    msg = _build_message(
 
-    msg["To"] = ", ".join(recipients)
+        subject,
 
-    if reply_to:
+        f"{from_name} <{user}>" if from_name else user,
 
-        msg["Reply-To"] = reply_to
+        ", ".join(recipients),
 
+        reply_to=reply_to,
 
+        body_html=body_html,
 
-    msg.attach(MIMEText(body_html, "html"))
+    )
 
 
 
     try:
 
-        if use_ssl:
-
-            context = smtplib.ssl.create_default_context() # type: ignore[attr-defined]
+        smtp_pool.sendmail(
 
-            server = smtplib.SMTP_SSL(host, port, context=context)
+            host,
 
-        else:
+            port,
 
-            server = smtplib.SMTP(host, port, timeout=10) # type: ignore[assignment]
+            user,
 
-            if use_tls:
+            plain_password,
 
-                server.starttls()
+            user,
 
+            recipients,
 
+            msg.as_string(),
 
-        server.login(user, plain_password)
+            use_tls=use_tls,
 
-        server.sendmail(user, recipients, msg.as_string())
+            use_ssl=use_ssl,
 
-        server.quit()
+        )
 
         app_logger.info(f"E-mail enviado com sucesso por {user} para {recipients}")
 
@@ -618,53 +648,47 @@ def send_email_with_credentials(
 
     try:
 
-        msg = MIMEMultipart("alternative")
-
-        msg["Subject"] = subject
-
-        msg["From"] = f"{from_name} <{from_addr}>" if from_name else from_addr
-
-        msg["To"] = to_email
-
-        if reply_to:
-
-            msg["Reply-To"] = reply_to
+        msg = _build_message(
 
+            subject,
 
+            f"{from_name} <{from_addr}>" if from_name else from_addr,
 
-        if body_text:
+            to_email,
 
-            msg.attach(MIMEText(body_text, "plain"))
+            reply_to=reply_to,
 
-        if body_html:
+            body_text=body_text,
 
-            msg.attach(MIMEText(body_html, "html"))
+            body_html=body_html,
 
+        )
 
 
-        if use_ssl:
 
-            context = ssl.create_default_context()
+        smtp_pool.sendmail(
 
-            server = smtplib.SMTP_SSL(host, int(port), context=context, timeout=timeout)
+            host,
 
-        else:
+            int(port),
 
-            server = smtplib.SMTP(host, int(port), timeout=timeout) # type: ignore[assignment]
+            user,
 
-            if use_tls:
+            password,
 
-                server.starttls()
+            from_addr,
 
+            [to_email],
 
+            msg.as_string(),
 
-        if user and password:
+            use_tls=use_tls,
 
-            server.login(user, password)
+            use_ssl=use_ssl,
 
-        server.sendmail(from_addr, [to_email], msg.as_string())
+            timeout=timeout,
 
-        server.quit()
+        )
 
         app_logger.info(f"E-mail enviado com credenciais para {to_email}")
 
@@ -818,7 +842,7 @@ def send_email_global(subject, body_html, recipients, from_name=None, reply_to=N
 
             url = f"{base.rstrip('/')}/v3/mail/send"
 
-            resp = requests.post(
+            resp = get_http_client("sendgrid").post(
 
                 url,
 
@@ -884,53 +908,47 @@ def send_email_global(subject, body_html, recipients, from_name=None, reply_to=N
 
 
 
-    msg = MIMEMultipart("alternative")
-
-    msg["Subject"] = subject
+    msg = _build_message(
 
-    msg["From"] = f"{from_name} <{from_addr}>" if from_name else from_addr
+        subject,
 
-    msg["To"] = ", ".join(recipients)
+        f"{from_name} <{from_addr}>" if from_name else from_addr,
 
-    if reply_to:
-
-        msg["Reply-To"] = reply_to
+        ", ".join(recipients),
 
-    if body_text:
+        reply_to=reply_to,
 
-        msg.attach(MIMEText(body_text, "plain"))
+        body_text=body_text,
 
-    if body_html:
+        body_html=body_html,
 
-        msg.attach(MIMEText(body_html, "html"))
+    )
 
 
 
     try:
 
-        if use_ssl:
-
-            context = ssl.create_default_context()
+        smtp_pool.sendmail(
 
-            server = smtplib.SMTP_SSL(host, port, context=context, timeout=10)
+            host,
 
-        else:
-
-            server = smtplib.SMTP(host, port, timeout=10) # type: ignore[assignment]
+            port,
 
-            if use_tls:
+            user,
 
-                server.starttls()
+            password,
 
+            from_addr,
 
+            recipients,
 
-        if user and password:
+            msg.as_string(),
 
-            server.login(user, password)
+            use_tls=use_tls,
 
-        server.sendmail(from_addr, recipients, msg.as_string())
+            use_ssl=use_ssl,
 
-        server.quit()
+        )
 
         app_logger.info(f"E-mail global (SMTP) enviado para {recipients}")
 
@@ -958,6 +976,180 @@ def send_email_global(subject, body_html, recipients, from_name=None, reply_to=N
 
 
 
+def send_email_batch(messages, from_name=None, reply_to=None):
+
+    """
+
+    Envia vários e-mails usando a configuração global, reaproveitando UMA sessão SMTP.
+
+
+
+    Cada item de 'messages' é um dict com: recipients (lista), subject,
+
+    body_html e, opcionalmente, body_text / reply_to.
+
+    Com o driver 'sendgrid', cada mensagem é enviada via send_email_global.
+
+
+
+    Retorna dict: {"sent": int, "failed": [{"recipients", "error"}]}.
+
+    Falhas individuais (destinatário recusado etc.) não interrompem o lote.
+
+    """
+
+    cfg = current_app.config
+
+    driver = (cfg.get("EMAIL_DRIVER") or "smtp").lower()
+
+    result: dict[str, Any] = {"sent": 0, "failed": []}
+
+
+
+    if not messages:
+
+        return result
+
+
+
+    if driver != "smtp":
+
+        for item in messages:
+
+            try:
+
+                send_email_global(
+
+                    subject=item.get("subject"),
+
+                    body_html=item.get("body_html"),
+
+                    recipients=item["recipients"],
+
+                    from_name=from_name,
+
+                    reply_to=item.get("reply_to") or reply_to,
+
+                    body_text=item.get("body_text"),
+
+                )
+
+                result["sent"] += 1
+
+            except Exception as e:
+
+                result["failed"].append({"recipients": item.get("recipients"), "error": str(e)})
+
+        return result
+
+
+
+    from_addr = cfg.get("SMTP_FROM") or cfg.get("SMTP_USER")
+
+    host = cfg.get("SMTP_HOST")
+
+    if not from_addr or not host:
+
+        raise ValueError("SMTP global não configurado (host/remetente ausente).")
+
+
+
+    port = int(cfg.get("SMTP_PORT", 587))
+
+    user = cfg.get("SMTP_USER")
+
+    password = cfg.get("SMTP_PASSWORD")
+
+    from_header = f"{from_name} <{from_addr}>" if from_name else from_addr
+
+
+
+    pending = list(messages)
+
+    while pending:
+
+        try:
+
+            with smtp_pool.connection(
+
+                host,
+
+                port,
+
+                user,
+
+                password,
+
+                use_tls=cfg.get("SMTP_USE_TLS", True),
+
+                use_ssl=cfg.get("SMTP_USE_SSL", False),
+
+            ) as server:
+
+                while pending:
+
+                    item = pending[0]
+
+                    recipients = item["recipients"]
+
+                    msg = _build_message(
+
+                        item.get("subject"),
+
+                        from_header,
+
+                        ", ".join(recipients),
+
+                        reply_to=item.get("reply_to") or reply_to,
+
+                        body_text=item.get("body_text"),
+
+                        body_html=item.get("body_html"),
+
+                    )
+
+                    try:
+
+                        server.sendmail(from_addr, recipients, msg.as_string())
+
+                        result["sent"] += 1
+
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+
+                        # Erro da mensagem, não da sessão: segue o lote na mesma conexão
+
+                        result["failed"].append({"recipients": recipients, "error": str(e)})
+
+                    pending.pop(0)
+
+        except smtplib.SMTPServerDisconnected as e:
+
+            # A sessão caiu no meio do lote: a mensagem atual falha e o restante segue em nova sessão
+
+            app_logger.warning(f"Sessão SMTP caiu durante envio em lote ({host}:{port}): {e}", exc_info=True)
+
+            item = pending.pop(0)
+
+            result["failed"].append({"recipients": item.get("recipients"), "error": str(e)})
+
+        except Exception as e:
+
+            app_logger.error(f"Falha no envio de e-mails em lote (SMTP): {e}", exc_info=True)
+
+            result["failed"].extend({"recipients": item.get("recipients"), "error": str(e)} for item in pending)
+
+            pending = []
+
+
+
+    app_logger.info(f"Envio em lote (SMTP): {result['sent']} enviados, {len(result['failed'])} falhas")
+
+    return result
+
+
+
+
+
 def send_external_comment_notification(implantacao, comentario):
 
     """
@@ -0,0 +1,360 @@
+"""
+Pool de conexões SMTP persistentes.
+
+Evita abrir uma nova conexão + STARTTLS + LOGIN para cada e-mail enviado.
+As sessões autenticadas ficam ociosas no pool (por processo) e são
+reaproveitadas pelo próximo envio com as mesmas credenciais.
+
+Inclui:
+- Pool por chave (host, porta, usuário) — a senha entra apenas como fingerprint
+- Health check com NOOP para conexões ociosas há algum tempo
+- Descarte automático de conexões antigas ou com erro
+- Retry único quando uma conexão reaproveitada foi derrubada pelo servidor
+- Proteção contra fork (gunicorn --preload): sockets não são compartilhados entre workers
+  (os.register_at_fork zera o pool e o lock no filho)
+
+Uso:
+    from backend.project.mail.smtp_pool import smtp_pool
+
+    with smtp_pool.connection(host, port, user, password, use_tls=True) as server:
+        server.sendmail(from_addr, recipients, msg.as_string())
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import smtplib
+import ssl
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+logger = logging.getLogger("app")
+
+# Configurações do pool (podem ser sobrescritas via env vars)
+SMTP_POOL_MAX_IDLE_PER_KEY = int(os.environ.get("SMTP_POOL_MAX_IDLE_PER_KEY", "2"))
+SMTP_POOL_MAX_IDLE_SECONDS = float(os.environ.get("SMTP_POOL_MAX_IDLE_SECONDS", "120"))
+SMTP_POOL_MAX_LIFETIME_SECONDS = float(os.environ.get("SMTP_POOL_MAX_LIFETIME_SECONDS", "900"))
+SMTP_POOL_NOOP_AFTER_SECONDS = float(os.environ.get("SMTP_POOL_NOOP_AFTER_SECONDS", "15"))
+
+PoolKey = tuple[str, int, str, bool, bool, str]
+
+
+@dataclass
+class _PooledConnection:
+    """Sessão SMTP autenticada mantida pelo pool."""
+
+    server: smtplib.SMTP
+    key: PoolKey
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    reused: bool = False
+
+
+def _credential_fingerprint(password: str | None) -> str:
+    """Fingerprint da senha: sessões de senhas diferentes nunca se misturam."""
+    if not password:
+        return ""
+    return hashlib.sha256(password.encode("utf-8")).hexdigest()[:16]
+
+
+def _close_quietly(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception as e:
+            logger.debug(f"Falha ao fechar conexão SMTP: {e}")
+
+
+class SMTPConnectionPool:
+    """
+    Pool thread-safe de conexões SMTP autenticadas.
+
+    Features:
+    - Reuso de sessões por (host, porta, usuário)
+    - NOOP antes de reaproveitar conexões ociosas
+    - Limite de conexões ociosas por chave
+    - Estatísticas de criação/reuso/descarte
+    """
+
+    def __init__(
+        self,
+        max_idle_per_key: int = SMTP_POOL_MAX_IDLE_PER_KEY,
+        max_idle_seconds: float = SMTP_POOL_MAX_IDLE_SECONDS,
+        max_lifetime_seconds: float = SMTP_POOL_MAX_LIFETIME_SECONDS,
+        noop_after_seconds: float = SMTP_POOL_NOOP_AFTER_SECONDS,
+    ):
+        self.max_idle_per_key = max_idle_per_key
+        self.max_idle_seconds = max_idle_seconds
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self.noop_after_seconds = noop_after_seconds
+
+        self._idle: dict[PoolKey, list[_PooledConnection]] = {}
+        self._lock = Lock()
+        self._pid = os.getpid()
+
+        self._created = 0
+        self._reused = 0
+        self._discarded = 0
+        self._noop_failures = 0
+
+        # O filho do fork recebe um pool vazio e um lock novo antes de existir qualquer
+        # outra thread (o lock herdado pode ter sido copiado "adquirido" pelo pai)
+        if hasattr(os, "register_at_fork"):
+            ref = weakref.ref(self)
+
+            def _after_fork_in_child() -> None:
+                pool = ref()
+                if pool is not None:
+                    pool._reset_after_fork()
+
+            os.register_at_fork(after_in_child=_after_fork_in_child)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    # ──────────────────────────────────────────────
+    # Criação e validação de conexões
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def make_key(host: str, port: int, user: str | None, password: str | None, use_tls: bool, use_ssl: bool) -> PoolKey:
+        return (host, int(port), user or "", bool(use_tls), bool(use_ssl), _credential_fingerprint(password))
+
+    def _connect(
+        self,
+        host: str,
+        port: int,
+        user: str | None,
+        password: str | None,
+        use_tls: bool,
+        use_ssl: bool,
+        timeout: float,
+    ) -> smtplib.SMTP:
+        """Abre uma nova sessão SMTP (SSL ou STARTTLS) e autentica."""
+        server: smtplib.SMTP
+        if use_ssl:
+            context = ssl.create_default_context()
+            server = smtplib.SMTP_SSL(host, int(port), context=context, timeout=timeout)
+        else:
+            server = smtplib.SMTP(host, int(port), timeout=timeout)
+            if use_tls:
+                server.starttls(context=ssl.create_default_context())
+
+        try:
+            if user and password:
+                server.login(user, password)
+        except Exception:
+            _close_quietly(server)
+            raise
+
+        return server
+
+    def _is_expired(self, conn: _PooledConnection, now: float) -> bool:
+        if now - conn.last_used > self.max_idle_seconds:
+            return True
+        return now - conn.created_at > self.max_lifetime_seconds
+
+    def _is_alive(self, conn: _PooledConnection, now: float) -> bool:
+        """Envia NOOP se a conexão está ociosa há algum tempo."""
+        if now - conn.last_used < self.noop_after_seconds:
+            return True
+        try:
+            code, _ = conn.server.noop()
+            if code == 250:
+                return True
+        except Exception as e:
+            logger.debug(f"NOOP SMTP falhou para {conn.key[0]}:{conn.key[1]}: {e}")
+        self._count("_noop_failures")
+        return False
+
+    def _reset_after_fork(self) -> None:
+        """
+        Sockets herdados do processo pai não podem ser usados pelo worker.
+
+        Chamado no filho logo após o fork (os.register_at_fork), com uma única
+        thread: trocar o lock aqui não disputa com ninguém.
+        """
+        self._lock = Lock()
+        with self._lock:
+            self._idle = {}
+            self._pid = os.getpid()
+
+    # ──────────────────────────────────────────────
+    # Checkout / checkin
+    # ──────────────────────────────────────────────
+
+    def acquire(
+        self,
+        host: str,
+        port: int,
+        user: str | None,
+        password: str | None,
+        use_tls: bool = True,
+        use_ssl: bool = False,
+        timeout: float = 10,
+    ) -> _PooledConnection:
+        """Retorna uma sessão autenticada (reaproveitada ou nova)."""
+        key = self.make_key(host, port, user, password, use_tls, use_ssl)
+
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                conn = idle.pop() if idle else None
+            if conn is None:
+                break
+
+            now = time.monotonic()
+            if self._is_expired(conn, now) or not self._is_alive(conn, now):
+                self._discard(conn)
+                continue
+
+            conn.reused = True
+            self._count("_reused")
+            return conn
+
+        server = self._connect(host, port, user, password, use_tls, use_ssl, timeout)
+        self._count("_created")
+        return _PooledConnection(server=server, key=key)
+
+    def release(self, conn: _PooledConnection, discard: bool = False) -> None:
+        """Devolve a sessão ao pool (ou fecha, se houver erro ou excesso)."""
+        if discard:
+            self._discard(conn)
+            return
+
+        conn.last_used = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(conn.key, [])
+            if len(idle) < self.max_idle_per_key:
+                idle.append(conn)
+                return
+        self._discard(conn)
+
+    def _discard(self, conn: _PooledConnection) -> None:
+        self._count("_discarded")
+        _close_quietly(conn.server)
+
+    @contextmanager
+    def connection(
+        self,
+        host: str,
+        port: int,
+        user: str | None,
+        password: str | None,
+        use_tls: bool = True,
+        use_ssl: bool = False,
+        timeout: float = 10,
+    ) -> Iterator[smtplib.SMTP]:
+        """
+        Context manager que empresta uma sessão SMTP do pool.
+
+        Qualquer exceção descarta a conexão (o estado da sessão é desconhecido).
+        """
+        conn = self.acquire(host, port, user, password, use_tls=use_tls, use_ssl=use_ssl, timeout=timeout)
+        try:
+            yield conn.server
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        else:
+            self.release(conn)
+
+    def sendmail(
+        self,
+        host: str,
+        port: int,
+        user: str | None,
+        password: str | None,
+        from_addr: str,
+        to_addrs: list[str],
+        message: str,
+        use_tls: bool = True,
+        use_ssl: bool = False,
+        timeout: float = 10,
+    ) -> dict[str, Any]:
+        """
+        Envia uma mensagem usando uma sessão do pool.
+
+        Se uma conexão reaproveitada foi derrubada pelo servidor entre o NOOP e o
+        envio, tenta novamente uma única vez com uma conexão nova.
+        """
+        conn = self.acquire(host, port, user, password, use_tls=use_tls, use_ssl=use_ssl, timeout=timeout)
+        try:
+            refused = conn.server.sendmail(from_addr, to_addrs, message)
+        except smtplib.SMTPServerDisconnected:
+            self.release(conn, discard=True)
+            if not conn.reused:
+                raise
+            logger.info(f"Conexão SMTP reaproveitada caiu ({host}:{port}); reenviando com nova sessão")
+            with self.connection(
+                host, port, user, password, use_tls=use_tls, use_ssl=use_ssl, timeout=timeout
+            ) as server:
+                return server.sendmail(from_addr, to_addrs, message)
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+
+        self.release(conn)
+        return refused
+
+    # ──────────────────────────────────────────────
+    # Manutenção e métricas
+    # ──────────────────────────────────────────────
+
+    def prune(self) -> int:
+        """Fecha conexões ociosas expiradas. Retorna quantas foram fechadas."""
+        now = time.monotonic()
+        expired: list[_PooledConnection] = []
+        with self._lock:
+            for key, idle in list(self._idle.items()):
+                keep = [c for c in idle if not self._is_expired(c, now)]
+                expired.extend(c for c in idle if self._is_expired(c, now))
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+        for conn in expired:
+            self._discard(conn)
+        return len(expired)
+
+    def close_all(self) -> None:
+        """Fecha todas as conexões ociosas (shutdown ou troca de credenciais)."""
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle = {}
+        for conn in conns:
+            self._discard(conn)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Estatísticas do pool (úteis para /health e debugging)."""
+        with self._lock:
+            idle_total = sum(len(v) for v in self._idle.values())
+            keys = len(self._idle)
+            created, reused = self._created, self._reused
+            discarded, noop_failures = self._discarded, self._noop_failures
+        total = created + reused
+        return {
+            "idle_connections": idle_total,
+            "pool_keys": keys,
+            "created": created,
+            "reused": reused,
+            "discarded": discarded,
+            "noop_failures": noop_failures,
+            "reuse_rate": round(reused / total * 100, 1) if total else 0,
+        }
+
+
+# Instância global (por processo)
+smtp_pool = SMTPConnectionPool()
@@ -2,7 +2,7 @@ from datetime import datetime
 
 
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Float, ForeignKey, Integer, Numeric, String, Text
 from sqlalchemy.orm import relationship
 
 
@@ -494,6 +494,10 @@ class ChecklistItem(Base):
 
     contexto = Column(String(50), default="onboarding")
 
+    # Mantida pelo trigger da migration 006 (revisão do checklist da implantação)
+
+    revision = Column(BigInteger, nullable=False, server_default="0")
+
 
 
     # Relacionamentos
@@ -1,7 +1,8 @@
 """
 Tags analytics for the management dashboard.
 
-This module aggregates comment tags (`comentarios_h.tag`) by user.
+This module aggregates comment tags (`comentarios_h.tag`) by user, reading
+the daily rollup table `comentarios_tags_diario`.
 """
 
 from datetime import date, datetime
@@ -20,7 +21,9 @@ def get_tags_by_user_chart_data(
     Returns comment-tag statistics grouped by user.
     Only comments with a non-empty tag are counted.
     """
+    from ....config.config_registry import get_config_registry
     from ....db import query_db
+    from ..infra.comment_rollups import consultar_rollup_tags
 
     def parse_date(date_str: str | date | datetime | None) -> str | None:
         if not date_str:
@@ -37,71 +40,16 @@ def get_tags_by_user_chart_data(
     end_date = parse_date(end_date)
     ctx = resolve_context(context)
 
-    def date_col_expr(col: str) -> str:
-        return f"CAST({col} AS DATE)"
-
-    query = """
-        WITH base AS (
-            SELECT
-                COALESCE(p.nome, ch.usuario_cs) AS user_name,
-                BTRIM(ch.tag, E' \\t\\n\\r') AS tag,
-                LOWER(BTRIM(ch.visibilidade, E' \\t\\n\\r')) AS visibilidade,
-                ch.usuario_cs,
-                ch.data_criacao,
-                i.contexto
-            FROM comentarios_h ch
-            LEFT JOIN perfil_usuario p ON ch.usuario_cs = p.usuario
-            LEFT JOIN checklist_items ci ON ch.checklist_item_id = ci.id
-            JOIN implantacoes i ON i.id = COALESCE(ci.implantacao_id, ch.implantacao_id)
-            LEFT JOIN perfil_usuario_contexto puc ON ch.usuario_cs = puc.usuario AND puc.contexto = COALESCE(i.contexto, 'onboarding')
-            WHERE ch.usuario_cs IS NOT NULL
-    """
-    args: list[Any] = []
-
-    if cs_email:
-        query += " AND ch.usuario_cs = %s"
-        args.append(cs_email)
-
-    if start_date:
-        query += f" AND {date_col_expr('ch.data_criacao')} >= %s"
-        args.append(start_date)
-
-    if end_date:
-        query += f" AND {date_col_expr('ch.data_criacao')} <= %s"
-        args.append(end_date)
-
-    if ctx == "onboarding":
-        query += " AND (i.contexto IS NULL OR i.contexto = 'onboarding') "
-    else:
-        query += " AND i.contexto = %s "
-        args.append(ctx)
-
-    query += """
-        )
-        SELECT
-            user_name,
-            tag_label AS tag,
-            COUNT(*) AS comment_count
-        FROM (
-            SELECT user_name, tag AS tag_label
-            FROM base
-            WHERE tag IS NOT NULL AND tag <> ''
-            UNION ALL
-            SELECT user_name,
-                   CASE
-                       WHEN visibilidade = 'interno' THEN 'Interno'
-                       WHEN visibilidade = 'externo' THEN 'Externo'
-                       ELSE NULL
-                   END AS tag_label
-            FROM base
-            WHERE visibilidade IN ('interno', 'externo')
-        ) t
-        WHERE tag_label IS NOT NULL AND tag_label <> ''
-        GROUP BY user_name, tag_label
-        ORDER BY user_name, tag_label
-    """
-
-    rows = query_db(query, tuple(args)) or []
+    # Counts come from the trigger-maintained daily rollup; interno/externo visibility is reported as a pseudo-tag
+    visibilidade_labels = {"interno": "Interno", "externo": "Externo"}
+    rows: list[dict[str, Any]] = []
+    for r in consultar_rollup_tags(contexto=ctx, inicio=start_date, fim=end_date, usuario_cs=cs_email):
+        user_name = r.get("user_name") or r.get("usuario_cs")
+        if r.get("tag"):
+            rows.append({"user_name": user_name, "tag": r["tag"], "comment_count": r["qtd"]})
+        label = visibilidade_labels.get(r.get("visibilidade"))
+        if label:
+            rows.append({"user_name": user_name, "tag": label, "comment_count": r["qtd"]})
 
     # Base users list for zero-filled visualization
     users_base: list[str] = []
@@ -173,19 +121,10 @@ def get_tags_by_user_chart_data(
         users_data[user_name][tag] = users_data[user_name].get(tag, 0) + count
 
     # Prefer configured comment tags order, then append any custom tags found.
-    tags_config_rows = query_db(
-        """
-        SELECT nome
-        FROM tags_sistema
-        WHERE tipo IN ('comentario', 'ambos')
-        ORDER BY ordem ASC, nome ASC
-        """,
-        (),
-    ) or []
+    # Registro de configurações: tags já ordenadas por ordem/nome, incluindo as inativas
+    tags_config_rows = [r for r in get_config_registry().get("tags") if r["tipo"] in ("comentario", "ambos")]
     configured_tags: list[str] = []
     for r in tags_config_rows:
-        if not isinstance(r, dict):
-            continue
         tag_name = normalize_tag(r.get("nome"))
         if tag_name:
             configured_tags.append(tag_name)
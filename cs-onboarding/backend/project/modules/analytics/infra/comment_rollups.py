@@ -0,0 +1,130 @@
+"""
+Rollup diário de comentários (`comentarios_tags_diario`, migration 008).
+
+A tabela é mantida por trigger em toda escrita de `comentarios_h`; aqui
+ficam a leitura usada pelos gráficos de tags e a reconciliação diária, que
+reatribui o contexto dos comentários (ex.: implantação que mudou de
+contexto) e reconstrói as contagens de uma janela de dias a partir da
+tabela de comentários.
+
+Uso:
+    # Reconciliação (cron diário / scheduler)
+    flask --app run reconcile-comment-rollups --dias 90
+
+    rows = consultar_rollup_tags(contexto="onboarding", inicio="2026-01-01", fim="2026-01-31")
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from datetime import date, timedelta
+from typing import Any
+
+from ....db import db_transaction_with_lock, query_db
+
+logger = logging.getLogger(__name__)
+
+# Janela padrão da reconciliação diária (0 = histórico completo)
+ROLLUP_RECONCILE_DAYS = int(os.environ.get("ROLLUP_RECONCILE_DAYS", "90"))
+
+_RESTAMP_SQL = """
+    UPDATE comentarios_h ch
+    SET rollup_via_item = src.via_item, rollup_contexto = src.contexto
+    FROM (
+        SELECT
+            c.id,
+            ci.implantacao_id IS NOT NULL AS via_item,
+            CASE WHEN i.id IS NULL THEN NULL ELSE COALESCE(i.contexto, 'onboarding') END AS contexto
+        FROM comentarios_h c
+        LEFT JOIN checklist_items ci ON ci.id = c.checklist_item_id
+        LEFT JOIN implantacoes i ON i.id = COALESCE(ci.implantacao_id, c.implantacao_id)
+        WHERE c.data_criacao >= %s
+    ) src
+    WHERE ch.id = src.id
+      AND (ch.rollup_contexto IS DISTINCT FROM src.contexto OR ch.rollup_via_item IS DISTINCT FROM src.via_item)
+"""
+
+_REBUILD_SQL = """
+    INSERT INTO comentarios_tags_diario (dia, usuario_cs, contexto, tag, visibilidade, via_item, qtd)
+    SELECT
+        CAST(data_criacao AS DATE),
+        usuario_cs,
+        rollup_contexto,
+        COALESCE(BTRIM(tag, E' \\t\\n\\r'), ''),
+        COALESCE(LOWER(BTRIM(visibilidade, E' \\t\\n\\r')), ''),
+        COALESCE(rollup_via_item, FALSE),
+        COUNT(*)
+    FROM comentarios_h
+    WHERE usuario_cs IS NOT NULL AND rollup_contexto IS NOT NULL AND data_criacao >= %s
+    GROUP BY 1, 2, 3, 4, 5, 6
+"""
+
+
+def reconciliar_rollup_comentarios(dias: int | None = None) -> dict[str, Any]:
+    """
+    Reconstrói o rollup dos últimos `dias` dias (0 = tudo) a partir de `comentarios_h`.
+
+    Bloqueia escritas concorrentes no rollup durante a reconstrução (o trigger
+    de comentários espera), para que nenhum incremento se perca entre o
+    DELETE e o INSERT da janela.
+    """
+    dias = ROLLUP_RECONCILE_DAYS if dias is None else dias
+    desde = date.today() - timedelta(days=dias) if dias > 0 else date(1900, 1, 1)
+    started = time.perf_counter()
+
+    with db_transaction_with_lock() as (_conn, cursor, _db_type):
+        cursor.execute("LOCK TABLE comentarios_tags_diario IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute(_RESTAMP_SQL, (desde,))
+        reatribuidos = cursor.rowcount
+        cursor.execute("DELETE FROM comentarios_tags_diario WHERE dia >= %s OR qtd = 0", (desde,))
+        cursor.execute(_REBUILD_SQL, (desde,))
+        linhas = cursor.rowcount
+
+    result = {
+        "desde": desde.isoformat(),
+        "linhas": linhas,
+        "comentarios_reatribuidos": reatribuidos,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    logger.info(f"Rollup de comentários reconciliado: {result}")
+    return result
+
+
+def consultar_rollup_tags(
+    contexto: str | None = None,
+    inicio: str | None = None,
+    fim: str | None = None,
+    usuario_cs: str | None = None,
+    somente_itens: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Contagens agregadas no período por usuário, tag e visibilidade.
+
+    `somente_itens` restringe a comentários de tarefas do checklist (critério
+    do relatório de tags do dashboard).
+    """
+    sql = """
+        SELECT r.usuario_cs, p.nome AS user_name, r.tag, r.visibilidade, SUM(r.qtd) AS qtd
+        FROM comentarios_tags_diario r
+        LEFT JOIN perfil_usuario p ON p.usuario = r.usuario_cs
+        WHERE 1=1
+    """
+    args: list[Any] = []
+    if contexto:
+        sql += " AND r.contexto = %s"
+        args.append(contexto)
+    if inicio:
+        sql += " AND r.dia >= %s"
+        args.append(inicio)
+    if fim:
+        sql += " AND r.dia <= %s"
+        args.append(fim)
+    if usuario_cs:
+        sql += " AND r.usuario_cs = %s"
+        args.append(usuario_cs)
+    if somente_itens:
+        sql += " AND r.via_item"
+    sql += " GROUP BY r.usuario_cs, p.nome, r.tag, r.visibilidade HAVING SUM(r.qtd) > 0"
+    return query_db(sql, tuple(args), raise_on_error=True) or []  # nosec B608
@@ -9,6 +9,7 @@ from typing import Any
 
 from flask import current_app, has_request_context, request
 
+from ....database.unit_of_work import buffer_row
 from ....db import db_connection
 
 __all__ = [
@@ -24,10 +25,15 @@ def log_action(
     changes: dict[str, Any] | None = None,
     metadata: dict[str, Any] | None = None,
     user_email: str | None = None,
+    background: bool = False,
 ) -> bool:
     """
     Registra uma ação no log de auditoria.
 
+    Dentro de um unit of work (`database.unit_of_work`), a linha é enfileirada e
+    gravada junto com as demais no fim do bloco. Com `background=True`, a gravação
+    é feita fora da requisição (fire-and-forget), em conexão própria.
+
     Args:
         action:      Ação realizada (ex: 'UPDATE', 'CREATE', 'DELETE')
         target_type: Tipo do objeto afetado (ex: 'implantacao', 'usuario') — mapeado para `tabela`
@@ -35,6 +41,7 @@ def log_action(
         changes:     Dicionário {before: ..., after: ...} — mapeado para `dados_anteriores`/`dados_novos`
         metadata:    Dados extras (sem coluna correspondente nesta versão)
         user_email:  Email do usuário — mapeado para `usuario`
+        background:  Grava em background, sem esperar nem participar da transação atual
     """
     try:
         ip_address = None
@@ -47,29 +54,18 @@ def log_action(
 
         changes_json = json.dumps(changes, default=str) if changes else None
         metadata_json = json.dumps(metadata, default=str) if metadata else None
+        row = (user_email, action, target_type, str(target_id), changes_json, metadata_json, ip_address)
+
+        if background:
+            from ....tasks.async_tasks import BackgroundTask
 
-        with db_connection() as (conn, db_type):
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                INSERT INTO audit_logs
-                    (user_email, action, target_type, target_id, changes, metadata, ip_address)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    user_email,
-                    action,
-                    target_type,
-                    str(target_id),
-                    changes_json,
-                    metadata_json,
-                    ip_address,
-                ),
-            )
-
-            conn.commit()
+            BackgroundTask.submit_with_app_context(current_app._get_current_object(), _insert_audit_row, row)
+            return True
 
+        if buffer_row("audit_logs", row):
+            return True
+
+        _insert_audit_row(row)
         return True
 
     except Exception as e:
@@ -78,6 +74,22 @@ def log_action(
         return False
 
 
+def _insert_audit_row(row: tuple) -> None:
+    with db_connection() as (conn, db_type):
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            INSERT INTO audit_logs
+                (user_email, action, target_type, target_id, changes, metadata, ip_address)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """,
+            row,
+        )
+
+        conn.commit()
+
+
 def get_diff(old_obj: dict, new_obj: dict, ignore_keys: list | None = None) -> dict | None:
     """
     Gera um diff entre dois dicionários (antes e depois).
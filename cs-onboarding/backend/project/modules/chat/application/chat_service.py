@@ -4,6 +4,7 @@ from datetime import datetime, timezone
 from threading import Lock
 from typing import Any
 
+from ....common.dataloader import BatchLoader, get_loader, user_profiles
 from ....db import db_connection, query_db
 
 _schema_ready = False
@@ -39,21 +40,31 @@ def _ensure_chat_schema_once() -> None:
         _schema_ready = True
 
 
+def _other_participants_loader(user_email: str) -> BatchLoader:
+    """conversation_id → e-mail do outro participante (uma query para todas as conversas)."""
+
+    def _load(conversation_ids: list[int]) -> dict[int, str]:
+        rows = query_db(
+            """
+            SELECT DISTINCT ON (conversation_id) conversation_id, user_email
+            FROM chat_participants
+            WHERE conversation_id = ANY(%s) AND user_email <> %s
+            ORDER BY conversation_id, user_email
+            """,
+            (list(conversation_ids), user_email),
+            raise_on_error=True,
+        ) or []
+        return {r["conversation_id"]: r["user_email"] for r in rows}
+
+    return get_loader(f"chat_outros_participantes:{user_email}", _load)
+
+
 def _resolve_other_participant(conversation_id: int, user_email: str) -> dict[str, Any] | None:
-    return query_db(
-        """
-        SELECT
-            p.user_email,
-            COALESCE(u.nome, p.user_email) AS nome,
-            u.foto_url
-        FROM chat_participants p
-        LEFT JOIN perfil_usuario u ON u.usuario = p.user_email
-        WHERE p.conversation_id = %s AND p.user_email <> %s
-        LIMIT 1
-        """,
-        (conversation_id, user_email),
-        one=True,
-    )
+    other_email = _other_participants_loader(user_email).load(conversation_id)
+    if not other_email:
+        return None
+    perfil = user_profiles().load(other_email) or {}
+    return {"user_email": other_email, "nome": perfil.get("nome") or other_email, "foto_url": perfil.get("foto_url")}
 
 
 def list_conversations(user_email: str, context: str) -> list[dict[str, Any]]:
@@ -105,6 +116,10 @@ def list_conversations(user_email: str, context: str) -> list[dict[str, Any]]:
         (user_email, context),
     ) or []
 
+    # Participantes e perfis de todas as conversas em duas queries (em vez de uma por conversa)
+    participantes = _other_participants_loader(user_email).load_many(int(row["id"]) for row in rows)
+    user_profiles().prime(email for email in participantes.values() if email)
+
     for row in rows:
         other = _resolve_other_participant(int(row["id"]), user_email)
         row["other_user_email"] = other.get("user_email") if other else None
@@ -17,9 +17,13 @@ from ..domain import (
     add_comment_to_item,
     atualizar_prazo_item,
     build_nested_tree,
+    build_sync_token,
+    build_tree_delta,
     delete_checklist_item,
     excluir_comentario_service,
+    get_checklist_revision,
     get_checklist_tree,
+    get_deleted_items_since,
     get_item_progress_stats,
     listar_comentarios_implantacao,
     listar_comentarios_item,
@@ -29,6 +33,7 @@ from ..domain import (
     obter_historico_prazos,
     obter_historico_responsavel,
     obter_progresso_global_service,
+    parse_sync_token,
     plano_permite_excluir_tarefas,
     registrar_envio_email_comentario,
     set_item_dispensa,
@@ -43,9 +48,13 @@ __all__ = [
     "add_comment_to_item",
     "atualizar_prazo_item",
     "build_nested_tree",
+    "build_sync_token",
+    "build_tree_delta",
     "delete_checklist_item",
     "excluir_comentario_service",
+    "get_checklist_revision",
     "get_checklist_tree",
+    "get_deleted_items_since",
     "get_item_progress_stats",
     "listar_comentarios_implantacao",
     "listar_comentarios_item",
@@ -55,6 +64,7 @@ __all__ = [
     "obter_historico_prazos",
     "obter_historico_responsavel",
     "obter_progresso_global_service",
+    "parse_sync_token",
     "plano_permite_excluir_tarefas",
     "registrar_envio_email_comentario",
     "set_item_dispensa",
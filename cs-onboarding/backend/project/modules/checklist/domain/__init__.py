@@ -6,6 +6,7 @@ Estrutura:
 - items.py      -> Operações em itens (toggle, delete, responsável, prazo)
 - comments.py   -> Gerenciamento de comentários
 - tree.py       -> Árvore e progresso
+- sync.py       -> Revisão e delta da árvore (ETag / ?since=)
 - history.py    -> Histórico de alterações
 - utils.py      -> Funções auxiliares
 """
@@ -36,12 +37,22 @@ from .items import (
     update_item_responsavel,
 )
 
+# Importações de sync.py
+from .sync import (
+    build_sync_token,
+    build_tree_delta,
+    get_checklist_revision,
+    get_deleted_items_since,
+    parse_sync_token,
+)
+
 # Importações de tree.py
 from .tree import (
     build_nested_tree,
     get_checklist_tree,
     get_item_progress_stats,
     obter_progresso_global_service,
+    rollup_progress,
 )
 from .utils import (
     _format_datetime,
@@ -56,9 +67,13 @@ __all__ = [
     "add_comment_to_item",
     "atualizar_prazo_item",
     "build_nested_tree",
+    "build_sync_token",
+    "build_tree_delta",
     "delete_checklist_item",
     "excluir_comentario_service",
+    "get_checklist_revision",
     "get_checklist_tree",
+    "get_deleted_items_since",
     "get_item_progress_stats",
     "listar_comentarios_implantacao",
     "listar_comentarios_item",
@@ -68,8 +83,10 @@ __all__ = [
     "obter_historico_prazos",
     "obter_historico_responsavel",
     "obter_progresso_global_service",
+    "parse_sync_token",
     "plano_permite_excluir_tarefas",
     "registrar_envio_email_comentario",
+    "rollup_progress",
     "set_item_dispensa",
     "toggle_item_status",
     "update_comment_service",
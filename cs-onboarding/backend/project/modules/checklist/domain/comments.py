@@ -11,8 +11,6 @@ Princípio SOLID: Single Responsibility
 
 
 import contextlib
-import logging
-logger = logging.getLogger(__name__)
 
 import logging
 
@@ -24,6 +22,8 @@ from flask import g
 
 
 
+from ....common.dataloader import user_display_names
+
 from ....common.validation import sanitize_string
 
 from ....config.cache_config import clear_dashboard_cache, clear_implantacao_cache
@@ -34,6 +34,7 @@ from .utils import _format_datetime
 
 
 
+logger = logging.getLogger(__name__)
 
 
 
@@ -311,6 +312,18 @@ def add_comment_to_item(
 
 
 
+        # 6. Digest de comentários da implantação (contexto do resumo de IA)
+
+        if db_type == "postgres" and new_id:
+
+            from ....modules.implantacao.infra.comment_digest import registrar_comentario_no_digest
+
+
+
+            registrar_comentario_no_digest(implantacao_id, new_id, tag, usuario_email, cursor=cursor)
+
+
+
         conn.commit()
 
 
@@ -433,20 +446,12 @@ def listar_comentarios_implantacao(impl_id, page=1, per_page=20):
 
             c.id, c.texto, c.usuario_cs, c.data_criacao, c.visibilidade, c.noshow, c.imagem_url, c.tag,
 
-            ci.id as item_id, ci.title as item_title,
-
-            COALESCE(p.nome, c.usuario_cs) as usuario_nome
+            ci.id as item_id, ci.title as item_title
 
         FROM comentarios_h c
 
         LEFT JOIN checklist_items ci ON c.checklist_item_id = ci.id
 
-        LEFT JOIN implantacoes i ON COALESCE(ci.implantacao_id, c.implantacao_id) = i.id
-
-        LEFT JOIN perfil_usuario p ON c.usuario_cs = p.usuario
-
-        LEFT JOIN perfil_usuario_contexto puc ON c.usuario_cs = puc.usuario AND puc.contexto = COALESCE(i.contexto, 'onboarding')
-
         WHERE
 
             -- Robustez máxima: considera vinculado se o item pertencer à implantação
@@ -471,12 +476,20 @@ def listar_comentarios_implantacao(impl_id, page=1, per_page=20):
 
 
 
+    # Nomes dos autores pelo loader da requisição (uma query para todos os autores)
+
+    nomes = user_display_names({c["usuario_cs"] for c in comments if c.get("usuario_cs")})
+
+
+
     formatted_comments = []
 
     for c in comments:
 
         c_dict = dict(c)
 
+        c_dict["usuario_nome"] = nomes.get(c_dict.get("usuario_cs"), c_dict.get("usuario_cs"))
+
         # Store ISO BEFORE formatting for display
 
         raw_date = c_dict.get("data_criacao")
@@ -517,20 +530,10 @@ def listar_comentarios_item(item_id):
 
             """
 
-        SELECT c.id, c.texto, c.usuario_cs, c.data_criacao, c.visibilidade, c.imagem_url, c.noshow, c.tag,
-
-                COALESCE(p.nome, c.usuario_cs) as usuario_nome
+        SELECT c.id, c.texto, c.usuario_cs, c.data_criacao, c.visibilidade, c.imagem_url, c.noshow, c.tag
 
         FROM comentarios_h c
 
-        LEFT JOIN checklist_items ci ON c.checklist_item_id = ci.id
-
-        LEFT JOIN implantacoes i ON ci.implantacao_id = i.id
-
-        LEFT JOIN perfil_usuario p ON c.usuario_cs = p.usuario
-
-        LEFT JOIN perfil_usuario_contexto puc ON c.usuario_cs = puc.usuario AND puc.contexto = COALESCE(i.contexto, 'onboarding')
-
         WHERE c.checklist_item_id = %s
 
         ORDER BY c.data_criacao DESC
@@ -571,12 +574,20 @@ def listar_comentarios_item(item_id):
 
 
 
+    # Nomes dos autores pelo loader da requisição (uma query para todos os autores)
+
+    nomes = user_display_names({c["usuario_cs"] for c in comentarios if c.get("usuario_cs")})
+
+
+
     comentarios_formatados = []
 
     for c in comentarios:
 
         c_dict = dict(c)
 
+        c_dict["usuario_nome"] = nomes.get(c_dict.get("usuario_cs"), c_dict.get("usuario_cs"))
+
         raw_date = c_dict.get("data_criacao")
 
         if raw_date and hasattr(raw_date, "isoformat"):
@@ -881,7 +892,7 @@ def excluir_comentario_service(comentario_id, usuario_email, is_manager):
 
     comentario = query_db(
 
-        "SELECT id, usuario_cs, data_criacao, checklist_item_id FROM comentarios_h WHERE id = %s",
+        "SELECT id, usuario_cs, data_criacao, checklist_item_id, implantacao_id FROM comentarios_h WHERE id = %s",
 
         (comentario_id,),
 
@@ -929,6 +940,16 @@ def excluir_comentario_service(comentario_id, usuario_email, is_manager):
 
     execute_db("DELETE FROM comentarios_h WHERE id = %s", (comentario_id,))
 
+    digest_impl_id = (item_info or {}).get("implantacao_id") or comentario.get("implantacao_id")
+
+    if digest_impl_id:
+
+        from ....modules.implantacao.infra.comment_digest import invalidar_digest_comentarios
+
+
+
+        invalidar_digest_comentarios(digest_impl_id)
+
 
 
     # Verificar se ainda há comentários para este item e atualizar campo legado
@@ -1057,6 +1057,11 @@ def delete_checklist_item(item_id, usuario_email=None, is_manager=False):
 
                 cursor.execute(f"DELETE FROM checklist_items WHERE id IN ({placeholders})", ids_to_delete)
                 items_deleted = cursor.rowcount
+                # Os comentários dos itens saem em cascata: o digest da implantação fica obsoleto
+                if db_type == "postgres" and implantacao_id:
+                    from ....modules.implantacao.infra.comment_digest import invalidar_digest_comentarios
+
+                    invalidar_digest_comentarios(implantacao_id, cursor=cursor)
             else:
                 items_deleted = 0
 
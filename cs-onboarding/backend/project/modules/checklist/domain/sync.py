@@ -0,0 +1,108 @@
+"""
+Sincronização incremental da árvore do checklist.
+
+Cada implantação tem uma revisão (checklist_revisions) incrementada por
+trigger em toda escrita de checklist_items; a linha escrita recebe a
+revisão da transação e exclusões viram tombstones (migration 006).
+
+Com isso a API da árvore:
+- responde 304 quando a revisão não mudou (ETag forte);
+- com `?since=<sync_token>`, devolve só os itens alterados depois da revisão
+  do token (mais os ancestores, cujo progresso X/Y depende deles) e os ids
+  removidos.
+
+O token devolvido ao cliente (`sync_token`) carrega a revisão E o dia em que
+foi emitido: "atrasada" muda na virada do dia sem nenhuma escrita, então um
+token de outro dia não vale para delta e o cliente recebe a árvore completa.
+
+Uso:
+    rev = get_checklist_revision(implantacao_id)
+    since = parse_sync_token(request.args.get("since"), today)  # None → árvore completa
+    items = get_checklist_tree(implantacao_id=implantacao_id)
+    delta = build_tree_delta(items, since, get_deleted_items_since(implantacao_id, since))
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from ....db import query_db
+
+logger = logging.getLogger(__name__)
+
+
+def build_sync_token(revision: int, day: str) -> str:
+    """Token de sincronização: revisão + dia (AAAAMMDD) em que foi emitido."""
+    return f"{revision}.{day}"
+
+
+def parse_sync_token(token: str | None, day: str) -> int | None:
+    """Revisão do token se ele foi emitido em `day`; None (árvore completa) caso contrário."""
+    if not token:
+        return None
+    revision, sep, token_day = token.partition(".")
+    if not sep or token_day != day or not revision.isdigit():
+        return None
+    return int(revision)
+
+
+def get_checklist_revision(implantacao_id: int) -> int:
+    """Revisão atual do checklist da implantação (0 se nunca foi escrito)."""
+    row = query_db(
+        "SELECT revision FROM checklist_revisions WHERE implantacao_id = %s",
+        (implantacao_id,),
+        one=True,
+        raise_on_error=True,
+    )
+    return int(row["revision"]) if row else 0
+
+
+def get_deleted_items_since(implantacao_id: int, since: int) -> list[dict[str, Any]]:
+    """Itens que saíram da implantação depois da revisão `since` (excluídos ou arquivados)."""
+    return (
+        query_db(
+            """
+            SELECT item_id, parent_id, MAX(revision) AS revision
+            FROM checklist_item_tombstones
+            WHERE implantacao_id = %s AND revision > %s
+            GROUP BY item_id, parent_id
+            """,
+            (implantacao_id, since),
+            raise_on_error=True,
+        )
+        or []
+    )
+
+
+def build_tree_delta(flat_items: list[dict[str, Any]], since: int, deleted: list[dict[str, Any]]) -> dict[str, list]:
+    """
+    Monta o delta a partir da árvore plana atual (já com progresso calculado).
+
+    Entram os itens com revisão > `since` e seus ancestores, e os ancestores
+    dos itens removidos (o progresso deles mudou). Ids removidos que voltaram
+    a existir na árvore não são reportados como excluídos.
+    """
+    by_id = {item["id"]: item for item in flat_items}
+    changed_ids: set[int] = set()
+
+    def mark_with_ancestors(item_id):
+        while item_id is not None and item_id in by_id and item_id not in changed_ids:
+            changed_ids.add(item_id)
+            item_id = by_id[item_id].get("parent_id")
+
+    for item in flat_items:
+        if (item.get("revision") or 0) > since:
+            mark_with_ancestors(item["id"])
+
+    deleted_ids = []
+    for row in deleted:
+        if row["item_id"] in by_id:
+            continue
+        deleted_ids.append(row["item_id"])
+        mark_with_ancestors(row["parent_id"])
+
+    return {
+        "changed": [item for item in flat_items if item["id"] in changed_ids],
+        "deleted": sorted(set(deleted_ids)),
+    }
@@ -21,7 +21,7 @@ from flask import current_app
 
 
 
-from ....common.context_profiles import resolve_context
+from ....common.dataloader import user_profiles
 
 from ....common.exceptions import DatabaseError
 
@@ -76,7 +76,7 @@ def get_checklist_tree(implantacao_id=None, root_item_id=None, plano_id=None, in
                         level, ordem, implantacao_id, plano_id, tipo_item, obrigatoria, tag,
                         responsavel, previsao_original, nova_previsao, data_conclusao,
                         dispensada, motivo_dispensa, dispensada_por, dispensada_em,
-                        created_at, updated_at
+                        created_at, updated_at, revision
                     FROM checklist_items
                     WHERE implantacao_id = %s
                     ORDER BY ordem ASC, id ASC
@@ -166,91 +166,33 @@ def get_checklist_tree(implantacao_id=None, root_item_id=None, plano_id=None, in
 
 
 
-            # Buscar todos os nomes em uma única query
+            # Buscar todos os nomes em uma única query (memoizada por requisição)
 
             responsaveis_map = {}
 
             if responsaveis_emails:
-                ctx = resolve_context()
-                placeholder = ",".join(["%s"] * len(responsaveis_emails))
-                resp_query = f"""
-                    SELECT u.usuario AS usuario, u.nome
-                    FROM perfil_usuario u
-                    WHERE u.usuario IN ({placeholder})
-                """
-                cursor.execute(resp_query, tuple(responsaveis_emails))
-                for resp_row in cursor.fetchall():
-
-                    if isinstance(resp_row, dict):
 
-                        responsaveis_map[resp_row["usuario"]] = resp_row["nome"]
+                # Loader da requisição: nomes já buscados (outra árvore, comentários, chat) não voltam ao banco
 
-                    else:
+                perfis = user_profiles().load_many(responsaveis_emails)
 
-                        responsaveis_map[resp_row[0]] = resp_row[1]
+                responsaveis_map = {email: perfil["nome"] for email, perfil in perfis.items() if perfil}
 
 
 
-            # OTIMIZAÇÃO: Calcular progresso de todos os itens de uma vez (evita N+1)
+            # Progresso de todos os itens em uma passada pós-ordem sobre as linhas já carregadas
 
             progress_map = {}
 
             if include_progress and rows:
 
-                # Coletar todos os IDs
-
-                all_ids = [
-
-                    row["id"] if isinstance(row, dict) else dict(zip(col_names, row, strict=False))["id"]
-
-                    for row in rows
+                progress_map = rollup_progress(
 
-                ]
+                    [row if isinstance(row, dict) else dict(zip(col_names, row, strict=False)) for row in rows]
 
+                )
 
 
-                # Calcular progresso em batch
-
-                progress_query = """
-                    WITH RECURSIVE all_children AS (
-                        SELECT parent_id, id, completed
-                        FROM checklist_items
-                        WHERE parent_id = ANY(%s)
-                          AND COALESCE(dispensada, FALSE) = FALSE
-
-                        UNION ALL
-
-                        SELECT ci.parent_id, ci.id, ci.completed
-                        FROM checklist_items ci
-                        INNER JOIN all_children ac ON ci.parent_id = ac.id
-                        WHERE COALESCE(ci.dispensada, FALSE) = FALSE
-                    )
-                    SELECT
-                        parent_id,
-                        COUNT(*) as total,
-                        COUNT(CASE WHEN completed = true THEN 1 END) as completed
-                    FROM all_children
-                    WHERE parent_id IS NOT NULL
-                    GROUP BY parent_id
-                """
-                cursor.execute(progress_query, (all_ids,))
-
-                for prog_row in cursor.fetchall():
-                    if isinstance(prog_row, dict):
-                        item_id = prog_row["parent_id"]
-                        progress_map[item_id] = {
-                            "total": prog_row["total"] or 0,
-                            "completed": prog_row["completed"] or 0,
-                            "has_children": (prog_row["total"] or 0) > 0,
-                        }
-                    else:
-                        item_id = prog_row[0]
-                        progress_map[item_id] = {
-                            "total": prog_row[1] or 0,
-                            "completed": prog_row[2] or 0,
-                            "has_children": (prog_row[1] or 0) > 0,
-                        }
-
 
             for row in rows:
 
@@ -336,6 +278,8 @@ def get_checklist_tree(implantacao_id=None, root_item_id=None, plano_id=None, in
 
                     ),
 
+                    "revision": item.get("revision") or 0,
+
                 }
 
 
@@ -362,17 +306,9 @@ def get_checklist_tree(implantacao_id=None, root_item_id=None, plano_id=None, in
 
                 if include_progress:
 
-                    # Usar mapa de progresso (já calculado) ou calcular individualmente
+                    # Itens sem filhos ativos ficam com 0/0 (sem consulta extra por item)
 
-                    if item_dict["id"] in progress_map:
-
-                        stats = progress_map[item_dict["id"]]
-
-                    else:
-
-                        # Fallback para SQLite ou itens sem filhos
-
-                        stats = get_item_progress_stats(item_dict["id"], cursor=cursor)
+                    stats = progress_map.get(item_dict["id"], _NO_PROGRESS)
 
 
                     item_dict["progress"] = {
@@ -411,61 +347,157 @@ def get_checklist_tree(implantacao_id=None, root_item_id=None, plano_id=None, in
 
 
 
-def build_nested_tree(flat_items):
+def _children_index(flat_items):
 
     """
 
-    Converte lista plana em árvore aninhada (JSON).
+    Índice pai → filhos ordenados (ordem, id) e lista de raízes.
+
+    Itens cujo pai não está na lista ficam fora da árvore.
 
     """
 
-    items_map = {item["id"]: {**item, "children": []} for item in flat_items}
+    ids = {item["id"] for item in flat_items}
+
+    children = {}
 
-    root_items = []
+    roots = []
 
 
 
     for item in flat_items:
 
+        parent_id = item["parent_id"]
+
+        if parent_id is None:
+
+            roots.append(item)
+
+        elif parent_id in ids:
+
+            children.setdefault(parent_id, []).append(item)
+
+
+
+    def sort_key(x):
+
+        return (x.get("ordem") or 0, x.get("id") or 0)
+
+
+
+    roots.sort(key=sort_key)
+
+    for siblings in children.values():
+
+        siblings.sort(key=sort_key)
+
+
+
+    return roots, children
+
+
+
+
+
+_NO_PROGRESS = {"total": 0, "completed": 0, "has_children": False}
+
+
+
+
+
+def rollup_progress(flat_items):
+
+    """
+
+    Progresso de cada item (descendentes ativos e concluídos) em uma passada pós-ordem.
+
+    Itens dispensados não contam, nem seus descendentes. Itens sem filhos ativos ficam fora do mapa.
+
+    Mesma semântica de `get_item_progress_stats` (toda a subárvore, não só os filhos diretos).
+
+    """
+
+    _roots, children = _children_index(flat_items)
+
+    ids = {item["id"] for item in flat_items}
+
+    totals = {}
+
+    progress = {}
+
+
+
+    # Pós-ordem iterativa a partir de todo item sem pai carregado (inclui a raiz de uma subárvore)
+
+    stack = [(item, False) for item in flat_items if item["parent_id"] not in ids]
+
+    while stack:
+
+        item, visited = stack.pop()
+
         item_id = item["id"]
 
-        parent_id = item["parent_id"]
+        if not visited:
 
+            stack.append((item, True))
 
+            stack.extend((child, False) for child in reversed(children.get(item_id, ())))
 
-        if parent_id is None:
+            continue
 
-            root_items.append(items_map[item_id])
 
-        else:
 
-            if parent_id in items_map:
+        total = completed = 0
+
+        for child in children.get(item_id, ()):
+
+            if child.get("dispensada"):
+
+                continue
+
+            child_total, child_completed = totals[child["id"]]
+
+            total += 1 + child_total
+
+            completed += (1 if child.get("completed") else 0) + child_completed
+
+
 
-                items_map[parent_id]["children"].append(items_map[item_id])
+        totals[item_id] = (total, completed)
 
+        if total:
 
+            progress[item_id] = {"total": total, "completed": completed, "has_children": True}
 
-    def sort_children(item):
 
-        item["children"].sort(key=lambda x: (x.get("ordem", 0), x.get("id", 0)))
 
-        for child in item["children"]:
+    return progress
 
-            sort_children(child)
 
 
 
-    for root in root_items:
 
-        sort_children(root)
+def build_nested_tree(flat_items):
+
+    """
+
+    Converte lista plana em árvore aninhada (JSON).
+
+    """
+
+    roots, children = _children_index(flat_items)
+
+    items_map = {item["id"]: {**item, "children": []} for item in flat_items}
+
 
 
+    for parent_id, siblings in children.items():
 
-    root_items.sort(key=lambda x: (x.get("ordem", 0), x.get("id", 0)))
+        items_map[parent_id]["children"] = [items_map[child["id"]] for child in siblings]
 
 
 
-    return root_items
+    return [items_map[root["id"]] for root in roots]
 
 
 
@@ -1,4 +1,4 @@
-from typing import Any
+from ....config.config_registry import get_config_registry
 from ....db import query_db
 
 __all__ = [
@@ -11,37 +11,73 @@ __all__ = [
 ]
 
 
+# Leitores: servidos pelo registro de configurações (snapshot em memória, ver config_registry)
+
+
 def listar_tags(tipo: str = "ambos") -> list[dict]:
+    return [
+        {
+            "id": r["id"],
+            "nome": r["nome"],
+            "ordem": r["ordem"],
+            "tipo": r["tipo"],
+        }
+        for r in get_config_registry().get("tags")
+        if r["ativo"] and (tipo == "ambos" or r["tipo"] in (tipo, "ambos"))
+    ]
+
+
+def listar_status_implantacao() -> list[dict]:
+    return get_config_registry().rows("status_implantacao")
+
+
+def listar_niveis_atendimento() -> list[dict]:
+    return get_config_registry().rows("niveis_atendimento")
+
+
+def listar_tipos_evento() -> list[dict]:
+    return get_config_registry().rows("tipos_evento")
+
+
+def listar_motivos_parada() -> list[dict]:
+    return get_config_registry().rows("motivos_parada")
+
+
+def listar_motivos_cancelamento() -> list[dict]:
+    return get_config_registry().rows("motivos_cancelamento")
+
+
+# Consultas ao banco usadas pelo registro na carga do snapshot
+
+
+def _consultar_tags() -> list[dict]:
+    # Inclui inativas: analytics ordena as tags de comentário configuradas mesmo desativadas
     sql = """
-        SELECT id, nome, ordem, tipo
+        SELECT id, nome, ordem, tipo, ativo
         FROM tags_sistema
-        WHERE ativo = %s
+        ORDER BY ordem ASC, nome ASC
     """
-    params: list[Any] = [True]
-    if tipo != "ambos":
-        sql += " AND (tipo = %s OR tipo = 'ambos')"
-        params.append(tipo)
-    sql += " ORDER BY ordem ASC"
-    rows = query_db(sql, params)
+    rows = query_db(sql, (), raise_on_error=True) or []
     return [
         {
             "id": r["id"],
             "nome": r["nome"],
             "ordem": r["ordem"],
             "tipo": r["tipo"],
+            "ativo": bool(r["ativo"]),
         }
         for r in rows
     ]
 
 
-def listar_status_implantacao() -> list[dict]:
+def _consultar_status_implantacao() -> list[dict]:
     sql = """
         SELECT id, codigo, nome, cor, ordem
         FROM status_implantacao
         WHERE ativo = %s
         ORDER BY ordem ASC
     """
-    rows = query_db(sql, [True])
+    rows = query_db(sql, [True], raise_on_error=True) or []
     return [
         {
             "id": r["id"],
@@ -54,14 +90,14 @@ def listar_status_implantacao() -> list[dict]:
     ]
 
 
-def listar_niveis_atendimento() -> list[dict]:
+def _consultar_niveis_atendimento() -> list[dict]:
     sql = """
         SELECT id, codigo, descricao, ordem
         FROM niveis_atendimento
         WHERE ativo = %s
         ORDER BY ordem ASC
     """
-    rows = query_db(sql, [True])
+    rows = query_db(sql, [True], raise_on_error=True) or []
     return [
         {
             "id": r["id"],
@@ -73,14 +109,14 @@ def listar_niveis_atendimento() -> list[dict]:
     ]
 
 
-def listar_tipos_evento() -> list[dict]:
+def _consultar_tipos_evento() -> list[dict]:
     sql = """
         SELECT id, codigo, nome, icone, cor
         FROM tipos_evento
         WHERE ativo = %s
         ORDER BY id ASC
     """
-    rows = query_db(sql, [True])
+    rows = query_db(sql, [True], raise_on_error=True) or []
     return [
         {
             "id": r["id"],
@@ -93,14 +129,14 @@ def listar_tipos_evento() -> list[dict]:
     ]
 
 
-def listar_motivos_parada() -> list[dict]:
+def _consultar_motivos_parada() -> list[dict]:
     sql = """
         SELECT id, descricao
         FROM motivos_parada
         WHERE ativo = %s
         ORDER BY id ASC
     """
-    rows = query_db(sql, [True])
+    rows = query_db(sql, [True], raise_on_error=True) or []
     return [
         {
             "id": r["id"],
@@ -110,14 +146,14 @@ def listar_motivos_parada() -> list[dict]:
     ]
 
 
-def listar_motivos_cancelamento() -> list[dict]:
+def _consultar_motivos_cancelamento() -> list[dict]:
     sql = """
         SELECT id, descricao
         FROM motivos_cancelamento
         WHERE ativo = %s
         ORDER BY id ASC
     """
-    rows = query_db(sql, [True])
+    rows = query_db(sql, [True], raise_on_error=True) or []
     return [
         {
             "id": r["id"],
@@ -4,13 +4,13 @@ from datetime import date, datetime, timedelta, timezone
 import logging
 logger = logging.getLogger(__name__)
 
-import requests
 from typing import Any, cast
 from flask import Blueprint, current_app, flash, g, jsonify, redirect, render_template, request, session, url_for
 
 from ....blueprints.auth import login_required
 from ....config.logging_config import get_logger
 from ....core.extensions import oauth
+from ....core.http_client import get_http_client
 
 agenda_bp = Blueprint("agenda", __name__)
 agenda_logger = get_logger("agenda")
@@ -78,7 +78,7 @@ def _call_google_calendar_api(method: str, url: str, access_token: str, json_bod
     if json_body is not None:
         headers["Content-Type"] = "application/json"
     try:
-        resp = requests.request(method, url, headers=headers, json=json_body, params=params, timeout=10)
+        resp = get_http_client("google_calendar").request(method, url, headers=headers, json=json_body, params=params, timeout=10)
         if resp.status_code == 401:
             return jsonify({"ok": False, "error": "Token expirado. Refaça a conexão com o Google."}), 401
         if resp.status_code >= 400:
@@ -156,7 +156,7 @@ def agenda_home():
 
     try:
         agenda_logger.info(f"Buscando eventos no Google Calendar para {g.user_email}")
-        resp = requests.get(
+        resp = get_http_client("google_calendar").get(
             google_events_endpoint(calendar_id),
             headers={"Authorization": f"Bearer {access_token}"},
             params=cast(dict[str, Any], params),
@@ -252,7 +252,7 @@ def agenda_list_calendars():
     if not access_token:
         return jsonify({"ok": False, "error": "Sessão do Google ausente"}), 401
     try:
-        resp = requests.get(
+        resp = get_http_client("google_calendar").get(
             "https://www.googleapis.com/calendar/v3/users/me/calendarList",
             headers={"Authorization": f"Bearer {access_token}"},
             timeout=10,
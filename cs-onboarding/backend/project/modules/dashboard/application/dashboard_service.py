@@ -600,29 +600,13 @@ def get_dashboard_data(
 
         elif status == "andamento" or status == "atrasada":
 
-            # Migrar status 'atrasada' para 'andamento'
+            # 'atrasada' é legado: a manutenção agendada grava 'andamento' (tasks/maintenance.py)
 
             if status == "atrasada":
 
-                try:
+                status = "andamento"
 
-                    from ....db import execute_db
-
-
-
-                    execute_db(
-
-                        "UPDATE implantacoes SET status = 'andamento' WHERE id = %s AND status = 'atrasada'", (impl_id,)
-
-                    )
-
-                    status = "andamento"
-
-                    impl["status"] = "andamento"
-
-                except Exception as e:
-
-                    _logger.warning(f"Falha ao migrar status 'atrasada' para 'andamento' na implantação {impl_id}: {e}", exc_info=True)
+                impl["status"] = "andamento"
 
 
 
@@ -742,87 +726,19 @@ def get_tags_metrics(start_date=None, end_date=None, user_email=None, context=No
 
     """
 
-    from ....db import query_db
-
-
-
-    ctx = resolve_context(context)
-
-    query_sql = """
+    from ...analytics.infra.comment_rollups import consultar_rollup_tags
 
-        SELECT
-
-            ch.usuario_cs,
-
-            p.nome as user_name,
-
-            ch.visibilidade,
-
-            ch.tag,
-
-            COUNT(*) as qtd
-
-        FROM comentarios_h ch
-
-        LEFT JOIN perfil_usuario p ON ch.usuario_cs = p.usuario
-
-        LEFT JOIN perfil_usuario_contexto puc ON ch.usuario_cs = puc.usuario AND puc.contexto = %s
-
-        LEFT JOIN checklist_items ci ON ch.checklist_item_id = ci.id
-
-        JOIN implantacoes i ON ci.implantacao_id = i.id
-
-        WHERE 1=1
-
-    """
 
-    args = [ctx]
 
+    # Rollup diário mantido por trigger; só comentários de tarefas do checklist, como antes
 
+    rows = consultar_rollup_tags(
 
-    if context:
-
-        if context == "onboarding":
-
-            query_sql += " AND (i.contexto IS NULL OR i.contexto = 'onboarding') "
-
-        else:
-
-            query_sql += " AND i.contexto = %s "
-
-            args.append(context)
-
-
-
-    if start_date:
-
-        query_sql += " AND date(ch.data_criacao) >= %s"
-
-        args.append(start_date)
-
-
-
-    if end_date:
-
-        query_sql += " AND date(ch.data_criacao) <= %s"
-
-        args.append(end_date)
-
-
-
-    if user_email:
-
-        query_sql += " AND ch.usuario_cs = %s"
-
-        args.append(user_email)
-
-
-
-    query_sql += " GROUP BY ch.usuario_cs, p.nome, ch.visibilidade, ch.tag ORDER BY p.nome"
-
+        contexto=context or None, inicio=start_date, fim=end_date, usuario_cs=user_email, somente_itens=True
 
+    )
 
-    rows = query_db(query_sql, tuple(args))
+    rows.sort(key=lambda r: (r["user_name"] is None, r["user_name"] or ""))
 
     if not rows:
 
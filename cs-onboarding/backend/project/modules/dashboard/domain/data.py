@@ -1,11 +1,10 @@
-import logging
-logger = logging.getLogger(__name__)
 """
 Módulo de Dados do Dashboard
 Buscar e processar dados para o dashboard.
 Princípio SOLID: Single Responsibility
 """
 
+import logging
 from datetime import date, datetime, timezone
 
 from flask import current_app, g
@@ -14,11 +13,14 @@ from ....common.context_profiles import resolve_context
 from ....common.utils import format_date_br, format_date_iso_for_json
 from ....constants import PERFIL_ADMIN, PERFIL_COORDENADOR, PERFIL_GERENTE
 from ....config.cache_config import cache, get_dashboard_cache_version
-from ....db import execute_db, query_db
+from ....db import query_db
+from ....monitoring.performance_monitoring import track_cache_hit, track_cache_miss
 from ....modules.implantacao.domain import _get_progress
 from ....modules.time.application.time_calculator import calculate_days_parada, calculate_days_passed
 from .utils import format_relative_time
 
+logger = logging.getLogger(__name__)
+
 
 def get_dashboard_data(user_email, filtered_cs_email=None, page=None, per_page=None, use_cache=True):
     """
@@ -45,7 +47,9 @@ def get_dashboard_data(user_email, filtered_cs_email=None, page=None, per_page=N
         cache_key = f"dashboard_data_{user_email}_v{version}_{filtered_cs_email or 'all'}_p{page}_pp{per_page}"
         cached_data = cache.get(cache_key)
         if cached_data:
+            track_cache_hit("dashboard")
             return cached_data
+        track_cache_miss("dashboard")
 
     perfil_acesso = g.perfil.get("perfil_acesso") if g.get("perfil") else None
     manager_profiles = [PERFIL_ADMIN, PERFIL_GERENTE, PERFIL_COORDENADOR]
@@ -322,17 +326,10 @@ def get_dashboard_data(user_email, filtered_cs_email=None, page=None, per_page=N
             metrics["total_valor_sem_previsao"] += impl_valor
 
         elif status == "andamento" or status == "atrasada":
+            # 'atrasada' é legado: a manutenção agendada grava 'andamento' (tasks/maintenance.py)
             if status == "atrasada":
-                try:
-                    execute_db(
-                        "UPDATE implantacoes SET status = 'andamento' WHERE id = %s AND status = 'atrasada'", (impl_id,)
-                    )
-                    status = "andamento"
-                    impl["status"] = "andamento"
-                except Exception as e:
-                    current_app.logger.warning(
-                        f"Error updating status from atrasada to andamento for impl {impl_id}: {e}"
-                    )
+                status = "andamento"
+                impl["status"] = "andamento"
             dashboard_data["andamento"].append(impl)
             metrics["impl_andamento_total"] += 1
             metrics["total_valor_andamento"] += impl_valor
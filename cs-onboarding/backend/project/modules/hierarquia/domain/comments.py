@@ -15,7 +15,9 @@ def adicionar_comentario_tarefa(tarefa_h_id, usuario_cs, texto, visibilidade="in
         dict: Dados do comentário criado ou erro
     """
 
-    tarefa = query_db("SELECT id FROM checklist_items WHERE id = %s AND tipo_item = 'tarefa'", (tarefa_h_id,), one=True)
+    tarefa = query_db(
+        "SELECT id, implantacao_id FROM checklist_items WHERE id = %s AND tipo_item = 'tarefa'", (tarefa_h_id,), one=True
+    )
 
     if not tarefa:
         return {"ok": False, "error": "Tarefa não encontrada"}
@@ -47,6 +49,11 @@ def adicionar_comentario_tarefa(tarefa_h_id, usuario_cs, texto, visibilidade="in
     if not comentario_id:
         return {"ok": False, "error": "Erro ao criar comentário"}
 
+    if tarefa.get("implantacao_id"):
+        from ....modules.implantacao.infra.comment_digest import registrar_comentario_no_digest
+
+        registrar_comentario_no_digest(tarefa["implantacao_id"], comentario_id, None, usuario_cs)
+
     comentario = query_db(
         """
         SELECT id, checklist_item_id, usuario_cs, texto, visibilidade, imagem_url, data_criacao
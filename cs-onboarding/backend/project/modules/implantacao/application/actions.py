@@ -1018,7 +1018,7 @@ def handle_get_jira_issues(implantacao_id: int, *, log_label: str = "") -> objec
 
         from ..domain.access import _get_implantacao_and_validate_access
 
-        from ..infra.jira_service import get_linked_jira_keys, search_issues_by_context
+        from ..infra.jira_service import get_linked_jira_keys, search_issues_for_implantacao
 
 
 
@@ -1026,7 +1026,7 @@ def handle_get_jira_issues(implantacao_id: int, *, log_label: str = "") -> objec
 
         extra_keys = get_linked_jira_keys(implantacao_id)
 
-        result = search_issues_by_context(implantacao, extra_keys=extra_keys)
+        result = search_issues_for_implantacao(implantacao_id, implantacao, extra_keys=extra_keys)
 
 
 
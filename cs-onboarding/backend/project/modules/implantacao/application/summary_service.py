@@ -1,23 +1,34 @@
 from __future__ import annotations
 
 import logging
-logger = logging.getLogger(__name__)
-
 import re
+import time
 import unicodedata
 from collections import Counter
 from datetime import date, datetime, timedelta, timezone
 from html import unescape
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from ....common.dataloader import ChecklistDataLoader
 from ....common.utils import format_date_br
 from ....constants import PERFIS_COM_GESTAO
 from ....db import query_db
-from ....modules.checklist.domain.comments import listar_comentarios_implantacao
 from ....modules.implantacao.domain.progress import _get_progress
 from ....modules.timeline.application.timeline_service import get_timeline_logs
+from ....monitoring.performance_monitoring import track_cache_hit, track_cache_miss
+from ..infra.comment_digest import get_comment_digest, listar_comentarios_recentes, resolver_nomes_autores
 from ..infra.gemini_client import GeminiClientError, generate_text
+from ..infra.summary_store import (
+    compute_summary_fingerprint,
+    get_cached_summary,
+    save_summary,
+    summary_cache_stats,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
 
 
 def _strip_html(text: str) -> str:
@@ -269,27 +280,23 @@ def _enforce_comments_section(structured: dict[str, Any], context: dict[str, Any
     structured["sections"] = sections
     return structured
 
-def _load_comments_for_summary(impl_id: int, *, per_page: int = 100, max_pages: int = 50) -> dict[str, Any]:
+def _load_comments_for_summary(impl_id: int) -> dict[str, Any]:
     """
-    Carrega comentarios paginados para evitar resumo raso quando ha muito historico.
-    Limita paginas para manter latencia previsivel.
+    Comentarios recentes (uma query keyset) + digest da implantacao (totais, tags, autores).
+    O custo nao cresce com o historico de comentarios.
     """
-    page = 1
-    all_comments: list[dict[str, Any]] = []
-    total = 0
-
-    while page <= max_pages:
-        data = listar_comentarios_implantacao(impl_id, page=page, per_page=per_page)
-        batch = data.get("comments", []) or []
-        total = int(data.get("total", total) or total)
-        if not batch:
-            break
-        all_comments.extend(batch)
-        if len(all_comments) >= total:
-            break
-        page += 1
-
-    return {"comments": all_comments, "total": total or len(all_comments)}
+    recent = listar_comentarios_recentes(impl_id)
+    try:
+        digest = get_comment_digest(impl_id)
+    except Exception as e:
+        # Sem digest (ex.: migracao pendente): totais calculados so sobre os recentes
+        logger.warning(f"Digest de comentarios indisponivel (implantacao {impl_id}): {e}")
+        digest = {
+            "total": len(recent),
+            "tags": dict(Counter(c.get("tag") for c in recent if c.get("tag"))),
+            "autores": dict(Counter(c.get("usuario_cs") for c in recent if c.get("usuario_cs"))),
+        }
+    return {"comments": recent, "total": digest["total"], "tags": digest["tags"], "autores": digest["autores"]}
 
 
 def _build_context(impl_id: int, user_email: str | None, is_manager: bool) -> dict[str, Any]:
@@ -374,7 +381,7 @@ def _build_context(impl_id: int, user_email: str | None, is_manager: bool) -> di
         elif prazo_fim and now.date() <= prazo_fim.date() <= upcoming_limit.date():
             upcoming_items.append(entry)
 
-    comments_data = _load_comments_for_summary(impl_id, per_page=100, max_pages=50)
+    comments_data = _load_comments_for_summary(impl_id)
     all_comments = comments_data.get("comments", [])
     comments_total = comments_data.get("total", len(all_comments))
 
@@ -393,6 +400,8 @@ def _build_context(impl_id: int, user_email: str | None, is_manager: bool) -> di
         for c in comments_chrono
         if (c.get("texto") or "").strip()
     ]
+    # Os 30 mais recentes com texto, em ordem cronologica
+    comments_for_summary = comments_for_summary[-30:]
 
     attachments = [
         {
@@ -404,13 +413,14 @@ def _build_context(impl_id: int, user_email: str | None, is_manager: bool) -> di
         if c.get("imagem_url")
     ]
 
-    tag_counts = Counter([c.get("tag") for c in all_comments if c.get("tag")])
+    tag_counts = Counter(comments_data.get("tags") or {})
     top_tags = [tag for tag, _ in tag_counts.most_common(6)]
-    author_counts = Counter(
-        [c.get("usuario_nome") or c.get("usuario_cs") for c in all_comments
-         if c.get("usuario_nome") or c.get("usuario_cs")]
-    )
-    top_authors = [f"{a} ({n}x)" for a, n in author_counts.most_common(5)]
+    author_counts = Counter(comments_data.get("autores") or {}).most_common(5)
+    author_names = {c.get("usuario_cs"): c.get("usuario_nome") for c in all_comments if c.get("usuario_nome")}
+    missing_names = [a for a, _ in author_counts if a not in author_names]
+    if missing_names:
+        author_names.update(resolver_nomes_autores(missing_names))
+    top_authors = [f"{author_names.get(a) or a} ({n}x)" for a, n in author_counts]
 
     # Timeline: get_timeline_logs retorna data_criacao ja formatada e em ordem DESC
     timeline = get_timeline_logs(impl_id=impl_id, page=1, per_page=50)
@@ -974,22 +984,83 @@ def _build_kpi_header(context: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _summary_fingerprint(impl_id: int) -> str | None:
+    started = time.perf_counter()
+    fingerprint = compute_summary_fingerprint(impl_id)
+    summary_cache_stats.fingerprint_latency.observe(time.perf_counter() - started)
+    return fingerprint
+
+
+def _lookup_saved_summary(impl_id: int, fingerprint: str) -> dict[str, Any] | None:
+    cached = get_cached_summary(impl_id, fingerprint)
+    if not cached:
+        return None
+    summary_cache_stats.hits += 1
+    track_cache_hit("resumo_ia")
+    return {
+        "summary": cached["summary"],
+        "summary_structured": cached["summary_structured"],
+        "source": cached["source"],
+        "cached": True,
+    }
+
+
+def buscar_resumo_salvo(impl_id: int) -> dict[str, Any] | None:
+    """Retorna o resumo salvo se as entradas nao mudaram (sem gerar). Usado pelo modo assincrono."""
+    fingerprint = _summary_fingerprint(impl_id)
+    if not fingerprint:
+        return None
+    return _lookup_saved_summary(impl_id, fingerprint)
+
+
 def gerar_resumo_implantacao_service(
     impl_id: int,
     user_email: str | None = None,
     perfil_acesso: str | None = None,
+    force: bool = False,
+    progress: Callable[[str], None] | None = None,
 ) -> dict[str, Any]:
+    """
+    Gera (ou reaproveita) o resumo da implantacao.
+
+    O resumo gerado pelo Gemini fica salvo por fingerprint das entradas; enquanto
+    nada mudar, e devolvido sem montar o contexto nem chamar o modelo.
+    `force=True` ignora o resumo salvo. `progress` recebe o estagio atual
+    (usado pelos jobs assincronos).
+    """
+    report = progress or (lambda _stage: None)
+    started = time.perf_counter()
+    report("verificando")
+    fingerprint = _summary_fingerprint(impl_id)
+
+    if fingerprint and not force:
+        cached = _lookup_saved_summary(impl_id, fingerprint)
+        if cached:
+            return cached
+    summary_cache_stats.misses += 1
+    track_cache_miss("resumo_ia")
+
     is_manager = bool(perfil_acesso in PERFIS_COM_GESTAO) if perfil_acesso else False
+    report("montando_contexto")
+    context_started = time.perf_counter()
     try:
         context = _build_context(impl_id, user_email, is_manager)
     except Exception:
         logger.exception("Unhandled exception", exc_info=True)
         context = _build_minimal_context(impl_id, user_email, is_manager)
+    context_elapsed = time.perf_counter() - context_started
+    summary_cache_stats.context_latency.observe(context_elapsed)
+    logger.debug(
+        f"Contexto do resumo (implantacao {impl_id}) montado em {context_elapsed * 1000:.0f}ms "
+        f"({context.get('comentarios_total', 0)} comentarios)"
+    )
 
     prompt = _build_prompt(context)
     narrative: str | None = None
     source = "gemini"
 
+    report("gerando")
+    gemini_started = time.perf_counter()
     try:
         raw = generate_text(prompt).strip()
         # Remove blocos de codigo markdown, se o modelo insistir
@@ -1003,6 +1074,8 @@ def gerar_resumo_implantacao_service(
         pass
     except Exception:
         logger.exception("Unhandled exception", exc_info=True)
+    finally:
+        summary_cache_stats.gemini_latency.observe(time.perf_counter() - gemini_started)
 
     if not narrative:
         narrative = _narrative_fallback(context)
@@ -1010,8 +1083,16 @@ def gerar_resumo_implantacao_service(
 
     kpi_header = _build_kpi_header(context)
 
-    return {
+    result = {
         "summary": narrative,
         "summary_structured": {"header": kpi_header, "narrative": narrative},
         "source": source,
-    }
\ No newline at end of file
+    }
+
+    # Fallback nao e salvo: a proxima solicitacao tenta o Gemini novamente
+    if fingerprint and source == "gemini":
+        report("salvando")
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        save_summary(impl_id, fingerprint, result, user_email, duration_ms)
+
+    return {**result, "cached": False}
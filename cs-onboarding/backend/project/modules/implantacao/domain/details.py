@@ -1,5 +1,3 @@
-import logging
-logger = logging.getLogger(__name__)
 """
 
 Módulo de Detalhes de Implantação
@@ -12,7 +10,7 @@ Princípio SOLID: Single Responsibility
 
 
 
-import contextlib
+import logging
 
 from collections import OrderedDict
 
@@ -28,6 +26,8 @@ from flask import current_app, g
 
 from ....common.context_profiles import resolve_context
 
+from ....common.dataloader import planos_sucesso
+
 from ....common.date_helpers import add_business_days, adjust_to_business_day
 
 from ....common.utils import format_date_br, format_date_iso_for_json
@@ -64,18 +64,26 @@ from ....constants import (
 
 )
 
+from ....database.parallel import run_parallel, unwrap
+
 from ....db import query_db
 
 from ....modules.hierarquia.domain import get_hierarquia_implantacao
 
 from ....modules.tasks.application.task_definitions import MODULO_OBRIGATORIO, MODULO_PENDENCIAS, TASK_TIPS
 
+from ..infra.detail_cache import cached_part, get_cs_directory, get_detail_state
+
 from .access import _get_implantacao_and_validate_access
 
 from .progress import _get_progress
 
 
 
+logger = logging.getLogger(__name__)
+
+
+
 
 
 def _format_implantacao_dates(implantacao):
@@ -475,564 +483,537 @@ def _get_tarefas_and_comentarios(
 
 
 
-def get_implantacao_details(
+def _get_cs_users(ctx: str) -> list[dict[str, Any]]:
 
-    impl_id: int,
+    """Usuários com perfil no contexto (select de responsável da página de detalhes)."""
 
-    usuario_cs_email: str,
+    rows = query_db(
 
-    user_perfil: dict | None = None,
+        """
 
-    plano_historico_id: int | None = None,
+        SELECT u.usuario as usuario, u.nome
 
-) -> dict[str, Any]:
+        FROM perfil_usuario u
 
-    """
+        LEFT JOIN perfil_usuario_contexto puc ON u.usuario = puc.usuario AND puc.contexto = %s
 
-    Busca, processa e valida todos os dados para a página de detalhes da implantação.
+        WHERE COALESCE(puc.perfil_acesso, 'Sem Acesso') IS NOT NULL
 
-    """
+            AND COALESCE(puc.perfil_acesso, 'Sem Acesso') != ''
 
-    from ....config.logging_config import get_logger
+        ORDER BY u.nome
 
+        """,
 
+        (ctx,),
 
-    logger = get_logger("implantacao")
+    )
 
+    return rows if rows is not None else []
 
 
-    if user_perfil is None:
 
-        user_perfil = {}
 
 
+def _carregar_planos(impl_id: int, implantacao: dict, plano_historico_id: int | None) -> dict[str, Any]:
 
-    try:
+    """
 
-        from ....config.cache_config import clear_implantacao_cache
+    Planos da implantação para a página de detalhes: plano exibido, lista,
 
+    concluídos (mais recentes primeiro) e instância ativa.
 
+    """
 
-        clear_implantacao_cache(impl_id)
+    success_plan_id = plano_historico_id or implantacao.get("plano_sucesso_id")
 
-    except Exception as e:
+    # Plano exibido, histórico e ativo em uma única query (loader da requisição; copiar antes de alterar)
 
-        logger.warning(f"Falha ao limpar cache da implantação {impl_id} antes de carregar detalhes: {e}", exc_info=True)
+    planos = planos_sucesso()
 
+    planos.prime([success_plan_id, plano_historico_id, implantacao.get("plano_sucesso_id")])
 
+    plano_sucesso_info = None
 
     try:
 
-        implantacao, is_manager = _get_implantacao_and_validate_access(impl_id, usuario_cs_email, user_perfil)
-
-    except ValueError as e:
+        if success_plan_id:
 
-        logger.warning(f"Acesso negado à implantação {impl_id}: {e!s}", exc_info=True)
+            plano_sucesso_info = dict(planos.load(success_plan_id) or {}) or None
 
-        raise
+            if plano_sucesso_info:
 
-    except Exception as e:
+                plano_sucesso_info["data_criacao_fmt"] = format_date_br(plano_sucesso_info.get("data_criacao"), False)
 
-        logger.error(f"Erro ao validar acesso à implantação {impl_id}: {e}", exc_info=True)
+                plano_sucesso_info["data_atualizacao_fmt"] = format_date_br(
 
-        raise
+                    plano_sucesso_info.get("data_atualizacao"), plano_sucesso_info.get("status") != "concluido"
 
+                )
 
+                plano_sucesso_info["data_conclusao_fmt"] = format_date_br(
 
-    try:
+                    plano_sucesso_info.get("data_atualizacao"), False
 
-        implantacao = _format_implantacao_dates(implantacao)
+                )
 
     except Exception as e:
 
-        logger.error(f"Erro ao formatar datas da implantação {impl_id}: {e}", exc_info=True)
-
-        raise
-
-
-
-    try:
+        logger.warning(f"Erro ao buscar plano de sucesso {success_plan_id}: {e}", exc_info=True)
 
-        progresso, _, _ = _get_progress(impl_id)
 
-    except Exception as e:
 
-        logger.error(f"Erro ao calcular progresso da implantação {impl_id}: {e}", exc_info=True)
-
-        raise
+    planos_lista: list[dict[str, Any]] = []
 
+    planos_concluidos_ordenados = []
 
+    plano_ativo_instancia = None
 
     try:
 
-        is_owner = implantacao.get("usuario_cs") == usuario_cs_email
-
-        ctx = resolve_context(implantacao.get("contexto") or getattr(g, "modulo_atual", None))
-
-        tarefas_agrupadas_obrigatorio, ordered_treinamento, tarefas_agrupadas_pendencias, todos_modulos_lista = (
-
-            _get_tarefas_and_comentarios(impl_id, is_owner=is_owner, is_manager=is_manager, context=ctx)
+        planos_lista = (
 
-        )
+            query_db(
 
-    except Exception as e:
+                "SELECT * FROM planos_sucesso WHERE processo_id = %s ORDER BY data_criacao DESC", (impl_id,)
 
-        logger.error(f"Erro ao carregar tarefas da implantação {impl_id}: {e}", exc_info=True)
+            )
 
-        raise
+            or []
 
+        )
 
 
-    try:
 
-        hierarquia = get_hierarquia_implantacao(impl_id)
+        if plano_historico_id:
 
-    except Exception as e:
-        logger.exception("Unhandled exception", exc_info=True)
+            plano_ativo_instancia = dict(planos.load(plano_historico_id) or {}) or None
 
-        import traceback
+        else:
 
+            # Fonte de verdade principal: implantação apontando para plano ativo.
 
+            if implantacao.get("plano_sucesso_id"):
 
-        error_trace = traceback.format_exc()
+                temp_p = dict(planos.load(implantacao["plano_sucesso_id"]) or {}) or None
 
-        logger.warning(
+                if temp_p and temp_p.get("status") == "em_andamento" and temp_p.get("processo_id") == impl_id:
 
-            f"Erro ao carregar hierarquia da implantação {impl_id}: {e}\n{error_trace}. Usando estrutura vazia."
+                    plano_ativo_instancia = temp_p
 
-        )
 
-        hierarquia = {"fases": []}
 
+            # Fallback legado: só considerar "em_andamento" se ainda existir checklist na implantação.
 
+            if not plano_ativo_instancia:
 
-    try:
+                checklist_count = query_db(
 
-        logs_timeline = _get_timeline_logs(impl_id)
+                    "SELECT COUNT(*) as total FROM checklist_items WHERE implantacao_id = %s",
 
-    except Exception as e:
+                    (impl_id,),
 
-        logger.error(f"Erro ao carregar timeline da implantação {impl_id}: {e}", exc_info=True)
+                    one=True,
 
-        raise
+                ) or {"total": 0}
 
+                if int(checklist_count.get("total", 0) or 0) > 0:
 
+                    plano_ativo_instancia = next((p for p in planos_lista if p.get("status") == "em_andamento"), None)
 
-    nome_usuario_logado = user_perfil.get("nome", usuario_cs_email) if user_perfil else usuario_cs_email
 
 
+        for p in planos_lista:
 
-    all_cs_users = []
+            p["data_criacao_fmt"] = format_date_br(p.get("data_criacao"), False)
 
-    try:
+            p["data_atualizacao_fmt"] = format_date_br(p.get("data_atualizacao"), p.get("status") != "concluido")
 
-        ctx = resolve_context(implantacao.get("contexto") or getattr(g, "modulo_atual", None))
+            p["data_conclusao_fmt"] = format_date_br(p.get("data_atualizacao"), False)
 
-        all_cs_users = query_db(
 
-            """
 
-            SELECT u.usuario as usuario, u.nome
+        # Histórico de concluídos: ordenar do mais recente para o mais antigo
 
-            FROM perfil_usuario u
+        planos_concluidos_ordenados = [p for p in planos_lista if p.get("status") == "concluido"]
 
-            LEFT JOIN perfil_usuario_contexto puc ON u.usuario = puc.usuario AND puc.contexto = %s
+        planos_concluidos_ordenados.sort(
 
-            WHERE COALESCE(puc.perfil_acesso, 'Sem Acesso') IS NOT NULL
+            key=lambda p: (
 
-                AND COALESCE(puc.perfil_acesso, 'Sem Acesso') != ''
+                p.get("data_atualizacao") or p.get("data_criacao"),
 
-            ORDER BY u.nome
+                p.get("id") or 0,
 
-            """,
+            ),
 
-            (ctx,),
+            reverse=True,
 
         )
 
-        all_cs_users = all_cs_users if all_cs_users is not None else []
 
-    except Exception as e:
 
-        logger.error(f"Erro ao carregar lista de CS users: {e}", exc_info=True)
+        if plano_ativo_instancia:
 
-        all_cs_users = []
+            plano_ativo_instancia["data_criacao_fmt"] = format_date_br(plano_ativo_instancia.get("data_criacao"), False)
 
+            plano_ativo_instancia["data_atualizacao_fmt"] = format_date_br(
 
+                plano_ativo_instancia.get("data_atualizacao"), plano_ativo_instancia.get("status") != "concluido"
 
-    # Tentativa de auto-relink: somente quando havia vínculo de plano registrado.
+            )
 
-    # Evita reanexar plano após remoção intencional (quando data_atribuicao_plano foi limpa).
+    except Exception as e:
 
-    if (
+        logger.warning(f"Erro ao buscar lista de planos da implantação {impl_id}: {e}", exc_info=True)
 
-        not plano_historico_id
 
-        and not implantacao.get("plano_sucesso_id")
 
-        and implantacao.get("data_atribuicao_plano")
+    return {
 
-    ):
+        "plano_sucesso": plano_sucesso_info,
 
-        try:
+        "planos_lista": planos_lista,
 
-            plano_atual = query_db(
+        "planos_concluidos_ordenados": planos_concluidos_ordenados,
 
-                """
+        "plano_ativo_instancia": plano_ativo_instancia,
 
-                SELECT id FROM planos_sucesso
+    }
 
-                WHERE processo_id = %s AND status = 'em_andamento'
 
-                ORDER BY data_criacao DESC, id DESC
 
-                LIMIT 1
 
-                """,
 
-                (impl_id,),
+def get_implantacao_details(
 
-                one=True,
+    impl_id: int,
 
-            )
+    usuario_cs_email: str,
 
-            plano_atual_id = plano_atual.get("id") if plano_atual else None
+    user_perfil: dict | None = None,
 
-            if not plano_atual_id and plano_atual:
+    plano_historico_id: int | None = None,
 
-                plano_atual_id = plano_atual.get("codigo")
+) -> dict[str, Any]:
 
-            if plano_atual_id:
+    """
 
-                from ....db import db_connection
+    Busca, processa e valida todos os dados para a página de detalhes da implantação.
 
+    """
 
+    from ....config.logging_config import get_logger
 
-                with db_connection() as (conn, db_type):
 
-                    cursor = conn.cursor()
 
-                    sql_update = "UPDATE implantacoes SET plano_sucesso_id = %s WHERE id = %s"
+    logger = get_logger("implantacao")
 
-                    if db_type == "sqlite":
 
-                        sql_update = sql_update.replace("%s", "?")
 
-                    cursor.execute(sql_update, (plano_atual_id, impl_id))
+    if user_perfil is None:
 
-                    conn.commit()
+        user_perfil = {}
 
-                implantacao["plano_sucesso_id"] = plano_atual_id
 
-                logger.warning(
 
-                    f"Implantação {impl_id} estava sem plano_sucesso_id. Relink automático para plano {plano_atual_id}."
+    try:
 
-                )
+        implantacao, is_manager = _get_implantacao_and_validate_access(impl_id, usuario_cs_email, user_perfil)
 
-        except Exception as e:
+    except ValueError as e:
 
-            logger.warning(f"Falha ao tentar relink automático do plano da implantação {impl_id}: {e}", exc_info=True)
+        logger.warning(f"Acesso negado à implantação {impl_id}: {e!s}", exc_info=True)
 
+        raise
 
+    except Exception as e:
 
-    # Auto-correção: se implantação aponta para template (processo_id NULL),
+        logger.error(f"Erro ao validar acesso à implantação {impl_id}: {e}", exc_info=True)
 
-    # criar/relincar instância de plano em andamento.
+        raise
 
-    if not plano_historico_id and implantacao.get("plano_sucesso_id"):
 
-        try:
 
-            plano_atual = query_db(
+    try:
 
-                "SELECT id, processo_id, status FROM planos_sucesso WHERE id = %s",
+        implantacao = _format_implantacao_dates(implantacao)
 
-                (implantacao["plano_sucesso_id"],),
+    except Exception as e:
 
-                one=True,
+        logger.error(f"Erro ao formatar datas da implantação {impl_id}: {e}", exc_info=True)
 
-            )
+        raise
 
-            if plano_atual and plano_atual.get("processo_id") is None:
 
-                # procurar instância existente
 
-                instancia = query_db(
 
-                    """
 
-                    SELECT id FROM planos_sucesso
+    # Partes cacheadas (infra/detail_cache): sem o carimbo de estado, carrega tudo do banco
 
-                    WHERE processo_id = %s AND status = 'em_andamento'
+    try:
 
-                    ORDER BY data_criacao DESC, id DESC
+        detail_state = get_detail_state(impl_id)
 
-                    LIMIT 1
+    except Exception as e:
 
-                    """,
+        logger.warning(f"Falha ao ler estado da implantação {impl_id} para o cache de detalhes: {e}", exc_info=True)
 
-                    (impl_id,),
+        detail_state = None
 
-                    one=True,
 
-                )
 
-                if not instancia:
+    def _cacheado(part, variant, stamp_name, loader):
 
-                    from ....modules.planos.domain.aplicar import criar_instancia_plano_para_implantacao
+        if detail_state is None:
 
+            return loader()
 
+        return cached_part(part, impl_id, variant, detail_state[stamp_name], loader)
 
-                    plano_atual_id = plano_atual.get("id") or plano_atual.get("codigo")
 
-                    novo_id = criar_instancia_plano_para_implantacao(
 
-                        plano_id=plano_atual_id,
+    is_owner = implantacao.get("usuario_cs") == usuario_cs_email
 
-                        implantacao_id=impl_id,
+    ctx = resolve_context(implantacao.get("contexto") or getattr(g, "modulo_atual", None))
 
-                        usuario=usuario_cs_email or "sistema",
+    timeline_ctx = resolve_context(getattr(g, "modulo_atual", None))
 
-                    )
+    visao = "completo" if is_owner or is_manager else "publico"
 
-                    instancia = {"id": novo_id}
 
-                instancia_id = instancia.get("id") or instancia.get("codigo")
 
+    def _carregar_arvore():
 
+        from ....modules.checklist.application.checklist_service import get_checklist_tree
 
-                from ....db import db_connection
 
 
+        return get_checklist_tree(implantacao_id=impl_id, include_progress=True)
 
-                with db_connection() as (conn, db_type):
 
-                    cursor = conn.cursor()
 
-                    sql_update = "UPDATE implantacoes SET plano_sucesso_id = %s WHERE id = %s"
+    # Partes independentes em paralelo, cada uma na sua conexão do pool (database/parallel.py).
 
-                    if db_type == "sqlite":
+    # As falhas voltam como resultado e são tratadas abaixo, parte a parte.
 
-                        sql_update = sql_update.replace("%s", "?")
+    leituras = {
 
-                    cursor.execute(sql_update, (instancia_id, impl_id))
+        "tarefas": lambda: _cacheado(
 
-                    conn.commit()
+            "tasks",
 
-                implantacao["plano_sucesso_id"] = instancia_id
+            f"tarefas:{visao}:{ctx}",
 
-                logger.warning(
+            "checklist",
 
-                    f"Implantação {impl_id} apontava para template. Relink automático para plano {instancia_id}."
+            lambda: _get_tarefas_and_comentarios(impl_id, is_owner=is_owner, is_manager=is_manager, context=ctx),
 
-                )
+        ),
 
-        except Exception as e:
+        "progresso": lambda: _get_progress(impl_id),
 
-            logger.warning(f"Falha ao auto-corrigir plano da implantação {impl_id}: {e}", exc_info=True)
+        "hierarquia": lambda: _cacheado("tasks", "hierarquia", "checklist", lambda: get_hierarquia_implantacao(impl_id)),
 
+        "timeline": lambda: _cacheado("timeline", timeline_ctx, "timeline", lambda: _get_timeline_logs(impl_id)),
 
+        "cs_users": lambda: get_cs_directory(ctx, lambda: _get_cs_users(ctx)),
 
-    success_plan_id = plano_historico_id or implantacao.get("plano_sucesso_id")
+        # Relink de plano e correção de plano template: manutenção agendada (tasks/maintenance.py)
 
+        "planos": lambda: _cacheado(
 
+            "plans",
 
-    plano_sucesso_info = None
+            f"{plano_historico_id or ''}:{implantacao.get('plano_sucesso_id') or ''}",
 
-    try:
+            "planos",
 
-        if success_plan_id:
+            lambda: _carregar_planos(impl_id, implantacao, plano_historico_id),
 
-            plano_sucesso_info = query_db("SELECT * FROM planos_sucesso WHERE id = %s", (success_plan_id,), one=True)
+        ),
 
-            if plano_sucesso_info:
+    }
 
-                plano_sucesso_info["data_criacao_fmt"] = format_date_br(plano_sucesso_info.get("data_criacao"), False)
+    if not plano_historico_id:
 
-                plano_sucesso_info["data_atualizacao_fmt"] = format_date_br(
+        leituras["arvore"] = lambda: _cacheado("tasks", "arvore", "checklist", _carregar_arvore)
 
-                    plano_sucesso_info.get("data_atualizacao"), plano_sucesso_info.get("status") != "concluido"
+    resultados = run_parallel(leituras, return_exceptions=True)
 
-                )
 
-                plano_sucesso_info["data_conclusao_fmt"] = format_date_br(
 
-                    plano_sucesso_info.get("data_atualizacao"), False
+    try:
 
-                )
+        progresso, _, _ = unwrap(resultados["progresso"])
 
     except Exception as e:
 
-        logger.warning(f"Erro ao buscar plano de sucesso {success_plan_id}: {e}", exc_info=True)
-
+        logger.error(f"Erro ao calcular progresso da implantação {impl_id}: {e}", exc_info=True)
 
+        raise
 
-    checklist_nested = None
 
-    historico_sem_execucao = False
 
     try:
 
-        from ....modules.checklist.application.checklist_service import build_nested_tree, get_checklist_tree
-
-
-
-        if plano_historico_id:
+        tarefas_agrupadas_obrigatorio, ordered_treinamento, tarefas_agrupadas_pendencias, todos_modulos_lista = (
 
-            checklist_flat = get_checklist_tree(plano_id=plano_historico_id, include_progress=True)
+            unwrap(resultados["tarefas"])
 
+        )
 
+    except Exception as e:
 
-            # Historico deve exibir apenas execucao real (fase/grupo/tarefa/subtarefa).
+        logger.error(f"Erro ao carregar tarefas da implantação {impl_id}: {e}", exc_info=True)
 
-            # Nunca exibir snapshot do template (tipo_item=plano_*) como se fosse execucao.
+        raise
 
-            checklist_execucao = [
 
-                item
 
-                for item in (checklist_flat or [])
+    try:
 
-                if not str((item or {}).get("tipo_item") or "").startswith("plano_")
+        hierarquia = unwrap(resultados["hierarquia"])
 
-            ]
+    except Exception as e:
 
-            if checklist_execucao:
+        logger.exception("Unhandled exception", exc_info=True)
 
-                checklist_flat = checklist_execucao
+        import traceback
 
-            elif checklist_flat:
 
-                historico_sem_execucao = True
 
-                checklist_flat = []
+        error_trace = traceback.format_exc()
 
+        logger.warning(
 
+            f"Erro ao carregar hierarquia da implantação {impl_id}: {e}\n{error_trace}. Usando estrutura vazia."
 
-            # Fallback legado: quando o plano solicitado e o plano ativo atual da implantacao,
+        )
 
-            # ainda podemos montar pela visao de implantacao.
+        hierarquia = {"fases": []}
 
-            plano_atual_implantacao = implantacao.get("plano_sucesso_id")
 
-            precisa_fallback_implantacao = not checklist_flat
 
-            if precisa_fallback_implantacao and plano_atual_implantacao == plano_historico_id:
+    try:
 
-                checklist_flat_impl = get_checklist_tree(implantacao_id=impl_id, include_progress=True)
+        logs_timeline = unwrap(resultados["timeline"])
 
-                if checklist_flat_impl:
+    except Exception as e:
 
-                    checklist_flat = checklist_flat_impl
+        logger.error(f"Erro ao carregar timeline da implantação {impl_id}: {e}", exc_info=True)
 
-                    historico_sem_execucao = False
+        raise
 
-        else:
 
-            checklist_flat = get_checklist_tree(implantacao_id=impl_id, include_progress=True)
 
+    nome_usuario_logado = user_perfil.get("nome", usuario_cs_email) if user_perfil else usuario_cs_email
 
 
-        if not checklist_flat and implantacao.get("plano_sucesso_id") and plano_sucesso_info and not plano_historico_id:
 
-            logger.warning(
+    all_cs_users = []
 
-                f"Implantação {impl_id} tem plano {implantacao['plano_sucesso_id']} mas checklist vazio. Tentando auto-reparar..."
+    try:
 
-            )
+        all_cs_users = unwrap(resultados["cs_users"])
 
-            try:
+    except Exception as e:
 
-                from datetime import date as datetime_date
-                from datetime import datetime as datetime_dt
-                from datetime import timezone
+        logger.error(f"Erro ao carregar lista de CS users: {e}", exc_info=True)
 
+        all_cs_users = []
 
 
-                from ....db import db_connection
 
-                from ....modules.planos.domain.aplicar import _clonar_plano_para_implantacao_checklist
+    planos = unwrap(resultados["planos"])
 
+    plano_sucesso_info = planos["plano_sucesso"]
 
+    planos_lista = planos["planos_lista"]
 
-                plano_id = implantacao["plano_sucesso_id"]
+    planos_concluidos_ordenados = planos["planos_concluidos_ordenados"]
 
-                dias_duracao = plano_sucesso_info.get("dias_duracao") or 0
+    plano_ativo_instancia = planos["plano_ativo_instancia"]
 
+    plano_historico_invalido = False
 
 
-                data_base = implantacao.get("data_inicio_efetivo") or implantacao.get("data_criacao")
 
-                base_dt = datetime_dt.now(timezone.utc)
+    checklist_nested = None
 
+    historico_sem_execucao = False
 
+    try:
 
-                if data_base:
+        from ....modules.checklist.application.checklist_service import build_nested_tree, get_checklist_tree
 
-                    if isinstance(data_base, str):
 
-                        with contextlib.suppress(ValueError, TypeError):
 
-                            base_dt = datetime_dt.strptime(data_base[:10], "%Y-%m-%d")
+        if plano_historico_id:
 
-                    elif isinstance(data_base, datetime_dt):
+            checklist_flat = get_checklist_tree(plano_id=plano_historico_id, include_progress=True)
 
-                        base_dt = data_base
 
-                    elif isinstance(data_base, datetime_date):
 
-                        base_dt = datetime_dt.combine(data_base, datetime_dt.min.time())
+            # Historico deve exibir apenas execucao real (fase/grupo/tarefa/subtarefa).
 
+            # Nunca exibir snapshot do template (tipo_item=plano_*) como se fosse execucao.
 
+            checklist_execucao = [
 
-                base_dia_util = adjust_to_business_day(base_dt.date())
+                item
 
-                data_previsao = add_business_days(base_dia_util, int(dias_duracao))
+                for item in (checklist_flat or [])
 
-                data_previsao = adjust_to_business_day(data_previsao)
+                if not str((item or {}).get("tipo_item") or "").startswith("plano_")
 
+            ]
 
+            if checklist_execucao:
 
-                with db_connection() as (conn, db_type):
+                checklist_flat = checklist_execucao
 
-                    cursor = conn.cursor()
+            elif checklist_flat:
 
-                    responsavel = "sistema"
+                historico_sem_execucao = True
 
+                checklist_flat = []
 
 
-                    _clonar_plano_para_implantacao_checklist(
 
-                        cursor, db_type, plano_id, impl_id, responsavel, base_dt, int(dias_duracao), data_previsao
+            # Fallback legado: quando o plano solicitado e o plano ativo atual da implantacao,
 
-                    )
+            # ainda podemos montar pela visao de implantacao.
 
-                    conn.commit()
+            plano_atual_implantacao = implantacao.get("plano_sucesso_id")
 
+            precisa_fallback_implantacao = not checklist_flat
 
+            if precisa_fallback_implantacao and plano_atual_implantacao == plano_historico_id:
 
-                logger.info("Auto-reparo concluído. Recarregando checklist...")
+                checklist_flat_impl = get_checklist_tree(implantacao_id=impl_id, include_progress=True)
 
-                try:
+                if checklist_flat_impl:
 
-                    from ....config.cache_config import clear_implantacao_cache
+                    checklist_flat = checklist_flat_impl
 
+                    historico_sem_execucao = False
 
+        else:
 
-                    clear_implantacao_cache(impl_id)
+            checklist_flat = unwrap(resultados["arvore"])
 
-                except Exception as e:
 
-                    logger.warning(f"Falha ao limpar cache da implantação {impl_id} após auto-reparo do checklist: {e}", exc_info=True)
 
+        if not checklist_flat and implantacao.get("plano_sucesso_id") and plano_sucesso_info and not plano_historico_id:
 
+            # O reparo (clonar o plano) roda na manutenção agendada, não neste GET
 
-                checklist_flat = get_checklist_tree(implantacao_id=impl_id, include_progress=True)
+            logger.warning(
 
-            except Exception as e:
+                f"Implantação {impl_id} tem plano {implantacao['plano_sucesso_id']} mas checklist vazio (aguardando reparo agendado)."
 
-                logger.error(f"Falha no auto-reparo do checklist: {e}", exc_info=True)
+            )
 
 
 
@@ -1085,124 +1066,6 @@ def get_implantacao_details(
 
 
 
-    from typing import Any
-
-    planos_lista: list[dict[str, Any]] = []
-
-    planos_concluidos_ordenados = []
-
-    plano_ativo_instancia = None
-
-    plano_historico_invalido = False
-
-    try:
-
-        planos_lista = (
-
-            query_db(
-
-                "SELECT * FROM planos_sucesso WHERE processo_id = %s ORDER BY data_criacao DESC", (impl_id,)
-
-            )
-
-            or []
-
-        )
-
-
-
-        if plano_historico_id:
-
-            plano_ativo_instancia = query_db("SELECT * FROM planos_sucesso WHERE id = %s", (plano_historico_id,), one=True)
-
-        else:
-
-            plano_ativo_instancia = None
-
-
-
-            # Fonte de verdade principal: implantação apontando para plano ativo.
-
-            if implantacao.get("plano_sucesso_id"):
-
-                temp_p = query_db(
-
-                    "SELECT * FROM planos_sucesso WHERE id = %s", (implantacao["plano_sucesso_id"],), one=True
-
-                )
-
-                if temp_p and temp_p.get("status") == "em_andamento" and temp_p.get("processo_id") == impl_id:
-
-                    plano_ativo_instancia = temp_p
-
-
-
-            # Fallback legado: só considerar "em_andamento" se ainda existir checklist na implantação.
-
-            if not plano_ativo_instancia:
-
-                checklist_count = query_db(
-
-                    "SELECT COUNT(*) as total FROM checklist_items WHERE implantacao_id = %s",
-
-                    (impl_id,),
-
-                    one=True,
-
-                ) or {"total": 0}
-
-                if int(checklist_count.get("total", 0) or 0) > 0:
-
-                    plano_ativo_instancia = next((p for p in planos_lista if p.get("status") == "em_andamento"), None)
-
-
-
-        for p in planos_lista:
-
-            p["data_criacao_fmt"] = format_date_br(p.get("data_criacao"), False)
-
-            p["data_atualizacao_fmt"] = format_date_br(p.get("data_atualizacao"), p.get("status") != "concluido")
-
-            p["data_conclusao_fmt"] = format_date_br(p.get("data_atualizacao"), False)
-
-
-
-        # Histórico de concluídos: ordenar do mais recente para o mais antigo
-
-        planos_concluidos_ordenados = [p for p in planos_lista if p.get("status") == "concluido"]
-
-        planos_concluidos_ordenados.sort(
-
-            key=lambda p: (
-
-                p.get("data_atualizacao") or p.get("data_criacao"),
-
-                p.get("id") or 0,
-
-            ),
-
-            reverse=True,
-
-        )
-
-
-
-        if plano_ativo_instancia:
-
-            plano_ativo_instancia["data_criacao_fmt"] = format_date_br(plano_ativo_instancia.get("data_criacao"), False)
-
-            plano_ativo_instancia["data_atualizacao_fmt"] = format_date_br(
-
-                plano_ativo_instancia.get("data_atualizacao"), plano_ativo_instancia.get("status") != "concluido"
-
-            )
-
-    except Exception as e:
-
-        logger.warning(f"Erro ao buscar lista de planos da implantação {impl_id}: {e}", exc_info=True)
-
-
-
     can_delete_tasks = bool(is_manager)
 
     can_dispense_tasks = bool(is_manager)
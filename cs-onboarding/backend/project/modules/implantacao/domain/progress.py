@@ -1,22 +1,24 @@
-import logging
-logger = logging.getLogger(__name__)
 """
 Módulo de Progresso de Implantação
 Responsável pelo cálculo de progresso e gerenciamento de cache.
 Princípio SOLID: Single Responsibility
 """
 
+import logging
 from functools import wraps
 
 from flask import current_app
 
 from ....db import query_db
+from ....monitoring.performance_monitoring import track_cache_hit, track_cache_miss
 
 try:
     from ....config.cache_config import cache
 except ImportError:
     cache = None
 
+logger = logging.getLogger(__name__)
+
 
 def cached_progress(ttl=30):
     """
@@ -42,8 +44,10 @@ def cached_progress(ttl=30):
                 cached_result = cache.get(cache_key)
 
                 if cached_result is not None:
+                    track_cache_hit("progresso")
                     return cached_result
 
+                track_cache_miss("progresso")
                 result = func(impl_id, *args, **kwargs)
                 cache.set(cache_key, result, timeout=ttl)
 
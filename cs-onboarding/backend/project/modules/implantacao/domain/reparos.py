@@ -0,0 +1,221 @@
+"""
+Módulo de Reparos de Implantação
+Correções de consistência executadas pela manutenção agendada (tasks/maintenance.py).
+
+Antes essas correções rodavam dentro das leituras: o dashboard gravava
+`status = 'andamento'` nas implantações 'atrasada' enquanto montava a tela e
+a página de detalhes religava planos, recriava checklists vazios e limpava
+caches a cada GET. Aqui elas rodam em lote, fora do caminho das requisições.
+
+Os reparos em lote percorrem as implantações por keyset (`id > apos_id`) e
+devolvem o cursor da próxima execução (0 quando a varredura chegou ao fim):
+uma implantação cujo reparo falha sempre é tentada de novo só na volta
+seguinte, sem ocupar o início de todo lote e impedir o reparo das demais.
+"""
+
+import logging
+from datetime import UTC, date, datetime
+
+from ....common.date_helpers import add_business_days, adjust_to_business_day
+from ....db import db_connection, db_transaction_with_lock, query_db
+
+logger = logging.getLogger(__name__)
+
+
+def _proximo_cursor(rows: list[dict], limite: int) -> int:
+    """Último id do lote se ele veio cheio; 0 (recomeça do início) se a varredura acabou."""
+    return rows[-1]["id"] if rows and len(rows) >= limite else 0
+
+
+def _limpar_caches(implantacoes: list[dict]) -> None:
+    try:
+        from ....config.cache_config import bump_dashboard_cache_version, clear_implantacao_cache
+
+        for impl in implantacoes:
+            clear_implantacao_cache(impl["id"])
+        for usuario in {impl.get("usuario_cs") for impl in implantacoes if impl.get("usuario_cs")}:
+            bump_dashboard_cache_version(usuario)
+    except Exception as e:
+        logger.warning(f"Falha ao limpar caches após reparo de implantações: {e}", exc_info=True)
+
+
+def normalizar_status_atrasada() -> int:
+    """Status legado 'atrasada' vira 'andamento' (o atraso é calculado pelas datas)."""
+    with db_transaction_with_lock() as (_conn, cursor, _db_type):
+        cursor.execute(
+            "UPDATE implantacoes SET status = 'andamento' WHERE status = 'atrasada' RETURNING id, usuario_cs"
+        )
+        alteradas = [{"id": r[0], "usuario_cs": r[1]} for r in cursor.fetchall()]
+
+    if alteradas:
+        _limpar_caches(alteradas)
+        logger.info(f"{len(alteradas)} implantações 'atrasada' normalizadas para 'andamento'")
+    return len(alteradas)
+
+
+def relinkar_planos_sem_vinculo() -> int:
+    """
+    Religa ao plano em andamento as implantações que perderam o `plano_sucesso_id`.
+
+    Só quando havia vínculo registrado (`data_atribuicao_plano`): a remoção
+    intencional do plano limpa essa data e não deve ser desfeita.
+    """
+    with db_transaction_with_lock() as (_conn, cursor, _db_type):
+        cursor.execute(
+            """
+            UPDATE implantacoes i
+            SET plano_sucesso_id = p.id
+            FROM (
+                SELECT DISTINCT ON (processo_id) processo_id, id
+                FROM planos_sucesso
+                WHERE processo_id IS NOT NULL AND status = 'em_andamento'
+                ORDER BY processo_id, data_criacao DESC, id DESC
+            ) p
+            WHERE p.processo_id = i.id
+              AND i.plano_sucesso_id IS NULL
+              AND i.data_atribuicao_plano IS NOT NULL
+            RETURNING i.id, i.usuario_cs, i.plano_sucesso_id
+            """
+        )
+        religadas = [{"id": r[0], "usuario_cs": r[1], "plano_sucesso_id": r[2]} for r in cursor.fetchall()]
+
+    for impl in religadas:
+        logger.warning(
+            f"Implantação {impl['id']} estava sem plano_sucesso_id. Relink automático para plano {impl['plano_sucesso_id']}."
+        )
+    if religadas:
+        _limpar_caches(religadas)
+    return len(religadas)
+
+
+def corrigir_planos_template(limite: int = 50, apos_id: int = 0) -> tuple[int, int]:
+    """
+    Implantações apontando para um template (processo_id NULL) passam a apontar para uma instância.
+
+    Retorna (corrigidas, cursor da próxima execução).
+    """
+    from ....modules.planos.domain.aplicar import criar_instancia_plano_para_implantacao
+
+    rows = (
+        query_db(
+            """
+        SELECT i.id, i.usuario_cs, i.plano_sucesso_id
+        FROM implantacoes i
+        JOIN planos_sucesso p ON p.id = i.plano_sucesso_id
+        WHERE p.processo_id IS NULL AND i.id > %s
+        ORDER BY i.id
+        LIMIT %s
+        """,
+            (apos_id, limite),
+        )
+        or []
+    )
+
+    corrigidas = []
+    for impl in rows:
+        impl_id = impl["id"]
+        try:
+            instancia = query_db(
+                """
+                SELECT id FROM planos_sucesso
+                WHERE processo_id = %s AND status = 'em_andamento'
+                ORDER BY data_criacao DESC, id DESC
+                LIMIT 1
+                """,
+                (impl_id,),
+                one=True,
+            )
+            if instancia:
+                instancia_id = instancia["id"]
+            else:
+                instancia_id = criar_instancia_plano_para_implantacao(
+                    plano_id=impl["plano_sucesso_id"],
+                    implantacao_id=impl_id,
+                    usuario="sistema",
+                )
+
+            with db_connection() as (conn, _db_type):
+                cursor = conn.cursor()
+                cursor.execute("UPDATE implantacoes SET plano_sucesso_id = %s WHERE id = %s", (instancia_id, impl_id))
+                conn.commit()
+            corrigidas.append(impl)
+            logger.warning(
+                f"Implantação {impl_id} apontava para template. Relink automático para plano {instancia_id}."
+            )
+        except Exception as e:
+            logger.warning(f"Falha ao auto-corrigir plano da implantação {impl_id}: {e}", exc_info=True)
+
+    if corrigidas:
+        _limpar_caches(corrigidas)
+    return len(corrigidas), _proximo_cursor(rows, limite)
+
+
+def _data_base(impl: dict) -> datetime:
+    data_base = impl.get("data_inicio_efetivo") or impl.get("data_criacao")
+    if isinstance(data_base, str):
+        try:
+            return datetime.strptime(data_base[:10], "%Y-%m-%d")
+        except (ValueError, TypeError):
+            pass
+    elif isinstance(data_base, datetime):
+        return data_base
+    elif isinstance(data_base, date):
+        return datetime.combine(data_base, datetime.min.time())
+    return datetime.now(UTC)
+
+
+def reparar_checklists_vazios(limite: int = 50, apos_id: int = 0) -> tuple[int, int]:
+    """
+    Clona o plano para implantações que têm plano mas nenhum item de checklist.
+
+    Só considera planos com itens, para não tentar de novo a cada execução um
+    plano vazio. Retorna (reparadas, cursor da próxima execução).
+    """
+    from ....modules.planos.domain.aplicar import _clonar_plano_para_implantacao_checklist
+
+    rows = (
+        query_db(
+            """
+        SELECT i.id, i.usuario_cs, i.plano_sucesso_id, i.data_inicio_efetivo, i.data_criacao, p.dias_duracao
+        FROM implantacoes i
+        JOIN planos_sucesso p ON p.id = i.plano_sucesso_id
+        WHERE NOT EXISTS (SELECT 1 FROM checklist_items ci WHERE ci.implantacao_id = i.id)
+          AND EXISTS (
+              SELECT 1 FROM checklist_items pi
+              WHERE pi.plano_id = i.plano_sucesso_id AND pi.implantacao_id IS NULL
+          )
+          AND i.id > %s
+        ORDER BY i.id
+        LIMIT %s
+        """,
+            (apos_id, limite),
+        )
+        or []
+    )
+
+    reparadas = []
+    for impl in rows:
+        impl_id = impl["id"]
+        try:
+            dias_duracao = int(impl.get("dias_duracao") or 0)
+            base_dt = _data_base(impl)
+            data_previsao = adjust_to_business_day(
+                add_business_days(adjust_to_business_day(base_dt.date()), dias_duracao)
+            )
+
+            with db_connection() as (conn, db_type):
+                cursor = conn.cursor()
+                _clonar_plano_para_implantacao_checklist(
+                    cursor, db_type, impl["plano_sucesso_id"], impl_id, "sistema", base_dt, dias_duracao, data_previsao
+                )
+                conn.commit()
+            reparadas.append(impl)
+            logger.info(
+                f"Checklist vazio da implantação {impl_id} reparado a partir do plano {impl['plano_sucesso_id']}"
+            )
+        except Exception as e:
+            logger.error(f"Falha no auto-reparo do checklist da implantação {impl_id}: {e}", exc_info=True)
+
+    if reparadas:
+        _limpar_caches(reparadas)
+    return len(reparadas), _proximo_cursor(rows, limite)
@@ -19,6 +19,8 @@ from ....constants import PERFIS_COM_GESTAO
 
 from ....common.exceptions import ValidationError, BusinessRuleError, DatabaseError, AuthorizationError
 
+from ....database.unit_of_work import after_commit, unit_of_work
+
 from ....db import execute_db, logar_timeline, query_db
 
 
@@ -47,6 +49,8 @@ def _clear_implantacao_related_caches(implantacao_id: int, usuario_cs_email: str
 
 
 
+@unit_of_work()
+
 def iniciar_implantacao_service(implantacao_id, usuario_cs_email):
 
     """
@@ -125,7 +129,7 @@ def iniciar_implantacao_service(implantacao_id, usuario_cs_email):
 
 
 
-    _clear_implantacao_related_caches(implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
+    after_commit(_clear_implantacao_related_caches, implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
 
 
 
@@ -137,7 +141,7 @@ def iniciar_implantacao_service(implantacao_id, usuario_cs_email):
 
 
 
-        event_bus.emit(ImplantacaoIniciada(
+        after_commit(event_bus.emit, ImplantacaoIniciada(
 
             implantacao_id=implantacao_id,
 
@@ -159,6 +163,8 @@ def iniciar_implantacao_service(implantacao_id, usuario_cs_email):
 
 
 
+@unit_of_work()
+
 def desfazer_inicio_implantacao_service(implantacao_id, usuario_cs_email):
 
     """
@@ -233,7 +239,7 @@ def desfazer_inicio_implantacao_service(implantacao_id, usuario_cs_email):
 
 
 
-    _clear_implantacao_related_caches(implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
+    after_commit(_clear_implantacao_related_caches, implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
 
 
 
@@ -243,6 +249,8 @@ def desfazer_inicio_implantacao_service(implantacao_id, usuario_cs_email):
 
 
 
+@unit_of_work()
+
 def agendar_implantacao_service(implantacao_id, usuario_cs_email, data_prevista_iso):
 
     """
@@ -327,7 +335,7 @@ def agendar_implantacao_service(implantacao_id, usuario_cs_email, data_prevista_
 
 
 
-    _clear_implantacao_related_caches(implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
+    after_commit(_clear_implantacao_related_caches, implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
 
 
 
@@ -337,6 +345,8 @@ def agendar_implantacao_service(implantacao_id, usuario_cs_email, data_prevista_
 
 
 
+@unit_of_work()
+
 def marcar_sem_previsao_service(implantacao_id, usuario_cs_email):
 
     """
@@ -397,7 +407,7 @@ def marcar_sem_previsao_service(implantacao_id, usuario_cs_email):
 
 
 
-    _clear_implantacao_related_caches(implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
+    after_commit(_clear_implantacao_related_caches, implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
 
 
 
@@ -407,6 +417,8 @@ def marcar_sem_previsao_service(implantacao_id, usuario_cs_email):
 
 
 
+@unit_of_work()
+
 def finalizar_implantacao_service(implantacao_id, usuario_cs_email, data_final_iso):
 
     """
@@ -659,7 +671,7 @@ def finalizar_implantacao_service(implantacao_id, usuario_cs_email, data_final_i
 
 
 
-    _clear_implantacao_related_caches(implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
+    after_commit(_clear_implantacao_related_caches, implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
 
 
 
@@ -671,7 +683,7 @@ def finalizar_implantacao_service(implantacao_id, usuario_cs_email, data_final_i
 
 
 
-        event_bus.emit(ImplantacaoFinalizada(
+        after_commit(event_bus.emit, ImplantacaoFinalizada(
 
             implantacao_id=implantacao_id,
 
@@ -695,6 +707,8 @@ def finalizar_implantacao_service(implantacao_id, usuario_cs_email, data_final_i
 
 
 
+@unit_of_work()
+
 def parar_implantacao_service(implantacao_id, usuario_cs_email, user_perfil_acesso, data_parada_iso, motivo):
 
     """
@@ -761,7 +775,7 @@ def parar_implantacao_service(implantacao_id, usuario_cs_email, user_perfil_aces
 
 
 
-    _clear_implantacao_related_caches(implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
+    after_commit(_clear_implantacao_related_caches, implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
 
 
 
@@ -771,6 +785,8 @@ def parar_implantacao_service(implantacao_id, usuario_cs_email, user_perfil_aces
 
 
 
+@unit_of_work()
+
 def retomar_implantacao_service(implantacao_id, usuario_cs_email, user_perfil_acesso):
 
     """
@@ -835,7 +851,7 @@ def retomar_implantacao_service(implantacao_id, usuario_cs_email, user_perfil_ac
 
 
 
-    _clear_implantacao_related_caches(implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
+    after_commit(_clear_implantacao_related_caches, implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
 
 
 
@@ -845,6 +861,8 @@ def retomar_implantacao_service(implantacao_id, usuario_cs_email, user_perfil_ac
 
 
 
+@unit_of_work()
+
 def reabrir_implantacao_service(implantacao_id, usuario_cs_email):
 
     """
@@ -895,7 +913,7 @@ def reabrir_implantacao_service(implantacao_id, usuario_cs_email):
 
 
 
-    _clear_implantacao_related_caches(implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
+    after_commit(_clear_implantacao_related_caches, implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
 
 
 
@@ -905,6 +923,8 @@ def reabrir_implantacao_service(implantacao_id, usuario_cs_email):
 
 
 
+@unit_of_work()
+
 def desfazer_cancelamento_implantacao_service(implantacao_id, usuario_cs_email, user_perfil_acesso):
 
     """
@@ -981,7 +1001,7 @@ def desfazer_cancelamento_implantacao_service(implantacao_id, usuario_cs_email,
 
 
 
-    _clear_implantacao_related_caches(implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
+    after_commit(_clear_implantacao_related_caches, implantacao_id, usuario_cs_email, impl.get("usuario_cs"))
 
 
 
@@ -0,0 +1,277 @@
+"""
+Comentários para o contexto do resumo de IA.
+
+O resumo usava `listar_comentarios_implantacao` página a página (até 5.000
+comentários, com um COUNT por página) só para extrair ~30 trechos, as tags e
+os autores mais frequentes. Aqui:
+
+- Trechos: UMA query keyset (`ORDER BY id DESC LIMIT N`) com os N comentários
+  mais recentes, opcionalmente continuando de `before_id`
+- Totais, tags e autores: digest por implantação (`implantacao_comentarios_digest`),
+  incrementado na inserção do comentário e reconstruído sob demanda quando
+  ausente (exclusões apenas invalidam a linha)
+
+O digest guarda o último id contabilizado; na leitura, comentários com id
+maior (inseridos por caminhos que não atualizam o digest) são agregados e
+incorporados.
+
+Uso:
+    from ..infra.comment_digest import get_comment_digest, listar_comentarios_recentes
+
+    recentes = listar_comentarios_recentes(impl_id, limit=60)
+    digest = get_comment_digest(impl_id)  # {"total": ..., "tags": {...}, "autores": {...}}
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any
+
+from ....db import execute_db, query_db
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de comentários recentes lidos para o contexto do resumo
+SUMMARY_RECENT_COMMENTS = int(os.environ.get("SUMMARY_RECENT_COMMENTS", "60"))
+
+_RECENT_COMMENTS_QUERY = """
+    SELECT
+        c.id, c.texto, c.usuario_cs, c.data_criacao, c.imagem_url, c.tag,
+        ci.id AS item_id, ci.title AS item_title,
+        COALESCE(p.nome, c.usuario_cs) AS usuario_nome
+    FROM comentarios_h c
+    LEFT JOIN checklist_items ci ON c.checklist_item_id = ci.id
+    LEFT JOIN perfil_usuario p ON c.usuario_cs = p.usuario
+    WHERE c.id IN (
+        (
+            SELECT cv.id
+            FROM comentarios_h cv
+            JOIN checklist_items civ ON cv.checklist_item_id = civ.id
+            WHERE civ.implantacao_id = %s {before_item}
+            ORDER BY cv.id DESC
+            LIMIT %s
+        )
+        UNION
+        (
+            SELECT co.id
+            FROM comentarios_h co
+            WHERE co.implantacao_id = %s {before_orfao}
+            ORDER BY co.id DESC
+            LIMIT %s
+        )
+    )
+    ORDER BY c.id DESC
+    LIMIT %s
+"""
+
+# Agregação (total, último id, contagem por tag e por autor) dos comentários com id > %s
+_AGGREGATE_QUERY = """
+    WITH escopo AS (
+        SELECT c.id, c.tag, c.usuario_cs
+        FROM comentarios_h c
+        LEFT JOIN checklist_items ci ON c.checklist_item_id = ci.id
+        WHERE (ci.implantacao_id = %s OR c.implantacao_id = %s) AND c.id > %s
+    )
+    SELECT
+        (SELECT COUNT(*) FROM escopo) AS total,
+        (SELECT COALESCE(MAX(id), 0) FROM escopo) AS ultimo_id,
+        (
+            SELECT COALESCE(jsonb_object_agg(tag, n), '{}'::jsonb)
+            FROM (SELECT tag, COUNT(*) AS n FROM escopo WHERE COALESCE(tag, '') <> '' GROUP BY tag) t
+        ) AS tags,
+        (
+            SELECT COALESCE(jsonb_object_agg(usuario_cs, n), '{}'::jsonb)
+            FROM (SELECT usuario_cs, COUNT(*) AS n FROM escopo WHERE usuario_cs IS NOT NULL GROUP BY usuario_cs) a
+        ) AS autores
+"""
+
+_INCREMENT_SQL = """
+    UPDATE implantacao_comentarios_digest SET
+        total_comentarios = total_comentarios + 1,
+        ultimo_comentario_id = GREATEST(ultimo_comentario_id, %s),
+        tags = CASE WHEN %s::text IS NULL THEN tags
+                    ELSE jsonb_set(tags, ARRAY[%s::text], to_jsonb(COALESCE((tags->>%s::text)::int, 0) + 1))
+               END,
+        autores = CASE WHEN %s::text IS NULL THEN autores
+                       ELSE jsonb_set(autores, ARRAY[%s::text], to_jsonb(COALESCE((autores->>%s::text)::int, 0) + 1))
+                  END,
+        atualizado_em = NOW()
+    WHERE implantacao_id = %s
+"""
+
+
+def listar_comentarios_recentes(
+    impl_id: int, limit: int = SUMMARY_RECENT_COMMENTS, before_id: int | None = None
+) -> list[dict[str, Any]]:
+    """
+    Comentários mais recentes da implantação (mais recente primeiro), sem COUNT.
+
+    `before_id` continua a partir do último id já lido (keyset), para paginação.
+    """
+    query = _RECENT_COMMENTS_QUERY.format(
+        before_item="AND cv.id < %s" if before_id else "",
+        before_orfao="AND co.id < %s" if before_id else "",
+    )
+
+    args: list[Any] = [impl_id]
+    if before_id:
+        args.append(before_id)
+    args += [limit, impl_id]
+    if before_id:
+        args.append(before_id)
+    args += [limit, limit]
+    return [dict(c) for c in query_db(query, tuple(args)) or []]
+
+
+# ──────────────────────────────────────────────
+# Digest
+# ──────────────────────────────────────────────
+
+
+def _as_counts(value: Any) -> dict[str, int]:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return {}
+    return {str(k): int(v) for k, v in (value or {}).items()}
+
+
+def _aggregate(impl_id: int, after_id: int) -> dict[str, Any]:
+    row = query_db(_AGGREGATE_QUERY, (impl_id, impl_id, after_id), one=True, raise_on_error=True) or {}
+    return {
+        "total": int(row.get("total") or 0),
+        "ultimo_id": int(row.get("ultimo_id") or 0),
+        "tags": _as_counts(row.get("tags")),
+        "autores": _as_counts(row.get("autores")),
+    }
+
+
+def _save_digest(impl_id: int, digest: dict[str, Any], expected_last_id: int | None) -> None:
+    """Upsert do digest; com `expected_last_id`, só sobrescreve se ninguém o atualizou nesse meio tempo."""
+    guard = "WHERE implantacao_comentarios_digest.ultimo_comentario_id = %s" if expected_last_id is not None else ""
+    args: list[Any] = [
+        impl_id,
+        digest["total"],
+        digest["ultimo_id"],
+        json.dumps(digest["tags"]),
+        json.dumps(digest["autores"]),
+    ]
+    if expected_last_id is not None:
+        args.append(expected_last_id)
+    execute_db(
+        f"""
+        INSERT INTO implantacao_comentarios_digest
+            (implantacao_id, total_comentarios, ultimo_comentario_id, tags, autores, atualizado_em)
+        VALUES (%s, %s, %s, %s::jsonb, %s::jsonb, NOW())
+        ON CONFLICT (implantacao_id) DO UPDATE SET
+            total_comentarios = EXCLUDED.total_comentarios,
+            ultimo_comentario_id = EXCLUDED.ultimo_comentario_id,
+            tags = EXCLUDED.tags,
+            autores = EXCLUDED.autores,
+            atualizado_em = EXCLUDED.atualizado_em
+        {guard}
+        """,
+        tuple(args),
+        raise_on_error=True,
+    )
+
+
+def get_comment_digest(impl_id: int) -> dict[str, Any]:
+    """
+    Totais de comentários da implantação: {"total", "ultimo_id", "tags", "autores"}.
+
+    Sem linha de digest: reconstrói com uma agregação completa e grava.
+    Com linha: agrega apenas os comentários com id acima do último contabilizado.
+    """
+    row = query_db(
+        """
+        SELECT total_comentarios, ultimo_comentario_id, tags, autores
+        FROM implantacao_comentarios_digest
+        WHERE implantacao_id = %s
+        """,
+        (impl_id,),
+        one=True,
+        raise_on_error=True,
+    )
+    if not row:
+        digest = _aggregate(impl_id, 0)
+        _save_digest(impl_id, digest, expected_last_id=None)
+        return digest
+
+    last_id = int(row.get("ultimo_comentario_id") or 0)
+    digest = {
+        "total": int(row.get("total_comentarios") or 0),
+        "ultimo_id": last_id,
+        "tags": _as_counts(row.get("tags")),
+        "autores": _as_counts(row.get("autores")),
+    }
+    delta = _aggregate(impl_id, last_id)
+    if delta["total"]:
+        digest = {
+            "total": digest["total"] + delta["total"],
+            "ultimo_id": max(last_id, delta["ultimo_id"]),
+            "tags": dict(Counter(digest["tags"]) + Counter(delta["tags"])),
+            "autores": dict(Counter(digest["autores"]) + Counter(delta["autores"])),
+        }
+        _save_digest(impl_id, digest, expected_last_id=last_id)
+    return digest
+
+
+def registrar_comentario_no_digest(
+    impl_id: int,
+    comentario_id: int,
+    tag: str | None,
+    usuario_cs: str | None,
+    cursor: Any = None,
+) -> None:
+    """
+    Incrementa o digest com um comentário recém-inserido.
+
+    Com `cursor`, roda na transação da inserção (dentro de um SAVEPOINT, para
+    que uma falha aqui não aborte o comentário). Sem linha de digest não faz
+    nada: ela é construída na primeira leitura.
+    """
+    tag = tag or None
+    args = (comentario_id, tag, tag, tag, usuario_cs, usuario_cs, usuario_cs, impl_id)
+    if cursor is None:
+        try:
+            execute_db(_INCREMENT_SQL, args, raise_on_error=True)
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar digest de comentarios (implantacao {impl_id}): {e}")
+        return
+
+    try:
+        cursor.execute("SAVEPOINT comentario_digest")
+        cursor.execute(_INCREMENT_SQL, args)
+        cursor.execute("RELEASE SAVEPOINT comentario_digest")
+    except Exception as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT comentario_digest")
+        logger.warning(f"Falha ao atualizar digest de comentarios (implantacao {impl_id}): {e}")
+
+
+def invalidar_digest_comentarios(impl_id: int, cursor: Any = None) -> None:
+    """Descarta o digest (após exclusões); a próxima leitura o reconstrói."""
+    sql = "DELETE FROM implantacao_comentarios_digest WHERE implantacao_id = %s"
+    try:
+        if cursor is None:
+            execute_db(sql, (impl_id,), raise_on_error=True)
+        else:
+            cursor.execute("SAVEPOINT comentario_digest")
+            cursor.execute(sql, (impl_id,))
+            cursor.execute("RELEASE SAVEPOINT comentario_digest")
+    except Exception as e:
+        if cursor is not None:
+            cursor.execute("ROLLBACK TO SAVEPOINT comentario_digest")
+        logger.warning(f"Falha ao invalidar digest de comentarios (implantacao {impl_id}): {e}")
+
+
+def resolver_nomes_autores(emails: list[str]) -> dict[str, str]:
+    """Nome de exibição (perfil_usuario) dos autores informados, em uma query."""
+    if not emails:
+        return {}
+    rows = query_db("SELECT usuario, nome FROM perfil_usuario WHERE usuario = ANY(%s)", (list(emails),)) or []
+    return {r["usuario"]: r["nome"] for r in rows if r.get("nome")}
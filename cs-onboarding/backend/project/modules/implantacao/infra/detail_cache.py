@@ -0,0 +1,177 @@
+"""
+Cache das partes da página de detalhes da implantação.
+
+`get_implantacao_details` monta a página a partir de partes cacheadas
+independentemente: tarefas/comentários, hierarquia, árvore do checklist,
+planos, timeline e o diretório de CS do contexto. O cabeçalho (linha da
+implantação) continua sendo lido a cada request, porque é ele que valida o
+acesso.
+
+Invalidação:
+- por eventos: as partes de uma implantação vivem nas chaves que
+  `clear_implantacao_cache` já remove (implantacao_details_/tasks_/timeline_),
+  chamada pelos serviços de escrita e pelos handlers de cache do EventBus;
+- por carimbo: cada parte guarda o estado de que foi derivada (revisão do
+  checklist, último comentário, último evento da timeline, hash dos planos)
+  e UMA query de agregação confere esse estado antes de servir o cache, o
+  que cobre escritas que não passam pelos serviços (triggers, manutenção,
+  SQL direto);
+- o diretório de CS expira em CS_DIRECTORY_TTL e é limpo nas mudanças de perfil.
+
+Uso:
+    state = get_detail_state(impl_id)
+    tarefas = cached_part("tasks", impl_id, "publico:onboarding", state["checklist"], carregar)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import date
+from typing import TYPE_CHECKING, Any
+
+from ....db import query_db
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+DETAIL_CACHE_TTL = int(os.environ.get("DETAIL_CACHE_TTL", "600"))
+CS_DIRECTORY_TTL = int(os.environ.get("CS_DIRECTORY_TTL", "300"))
+
+# Mesmas chaves removidas por clear_implantacao_cache
+_PART_KEYS = {
+    "plans": "implantacao_details_{}",
+    "tasks": "implantacao_tasks_{}",
+    "timeline": "implantacao_timeline_{}",
+}
+
+_STATE_QUERY = """
+    SELECT
+        COALESCE((SELECT r.revision FROM checklist_revisions r WHERE r.implantacao_id = %s), 0) AS checklist_rev,
+        (
+            SELECT COUNT(*) || ':' || COALESCE(MAX(c.id), 0)
+            FROM comentarios_h c
+            JOIN checklist_items ci ON ci.id = c.checklist_item_id
+            WHERE ci.implantacao_id = %s
+        ) AS comentarios,
+        (SELECT COALESCE(MAX(t.id), 0) FROM timeline_log t WHERE t.implantacao_id = %s) AS timeline,
+        (
+            SELECT md5(COALESCE(string_agg(concat_ws(':', p.id, p.status, p.data_atualizacao), ',' ORDER BY p.id), ''))
+            FROM planos_sucesso p
+            WHERE p.processo_id = %s
+        ) AS planos,
+        EXISTS (SELECT 1 FROM checklist_items ci WHERE ci.implantacao_id = %s) AS tem_checklist
+"""
+
+
+class DetailCacheStats:
+    """Contadores de hit/miss por parte (para /health/metrics)."""
+
+    def __init__(self):
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+
+    def record(self, part: str, hit: bool) -> None:
+        counter = self.hits if hit else self.misses
+        counter[part] = counter.get(part, 0) + 1
+
+    def snapshot(self) -> dict[str, Any]:
+        parts = sorted(set(self.hits) | set(self.misses))
+        result: dict[str, Any] = {}
+        for part in parts:
+            hits, misses = self.hits.get(part, 0), self.misses.get(part, 0)
+            result[part] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            }
+        return result
+
+
+_stats = DetailCacheStats()
+
+
+def get_detail_cache_stats() -> dict[str, Any]:
+    return _stats.snapshot()
+
+
+def _get_cache():
+    from ....config import cache_config
+
+    return cache_config.cache
+
+
+def get_detail_state(impl_id: int) -> dict[str, str]:
+    """
+    Carimbos de estado de cada parte, em uma única query.
+
+    As partes do checklist incluem a data: atraso e progresso dependem do dia.
+    """
+    row = query_db(_STATE_QUERY, (impl_id,) * 5, one=True, raise_on_error=True) or {}
+    hoje = date.today().isoformat()
+    return {
+        "checklist": f"{row.get('checklist_rev', 0)}|{row.get('comentarios') or '0:0'}|{hoje}",
+        "timeline": str(row.get("timeline", 0)),
+        "planos": f"{row.get('planos') or ''}|{bool(row.get('tem_checklist'))}|{hoje}",
+    }
+
+
+def cached_part(part: str, impl_id: int, variant: str, stamp: str, loader: Callable[[], Any]) -> Any:
+    """
+    Devolve a parte cacheada se o carimbo confere; senão carrega e grava.
+
+    Cada chave guarda um dict {variante: {"stamp", "data"}} (ex.: visão do
+    dono/gestor e visão pública das tarefas), para que `clear_implantacao_cache`
+    remova todas as variantes de uma vez.
+    """
+    cache = _get_cache()
+    key = _PART_KEYS[part].format(impl_id)
+    entries: dict[str, Any] = {}
+    if cache:
+        try:
+            entries = cache.get(key) or {}
+        except Exception as e:
+            logger.debug(f"Falha ao ler cache {key}: {e}")
+        entry = entries.get(variant)
+        if entry is not None and entry.get("stamp") == stamp:
+            _stats.record(part, hit=True)
+            return entry["data"]
+
+    _stats.record(part, hit=False)
+    data = loader()
+    if cache:
+        try:
+            # Relê antes de gravar: as variantes da mesma chave podem ser carregadas
+            # em paralelo (database/parallel.py) e uma não deve apagar a outra
+            entries = cache.get(key) or {}
+            entries[variant] = {"stamp": stamp, "data": data}
+            cache.set(key, entries, timeout=DETAIL_CACHE_TTL)
+        except Exception as e:
+            logger.debug(f"Falha ao gravar cache {key}: {e}")
+    return data
+
+
+def get_cs_directory(ctx: str, loader: Callable[[], list[dict]]) -> list[dict]:
+    """Lista de CS do contexto (select de responsável), compartilhada entre implantações."""
+    cache = _get_cache()
+    key = f"implantacao_cs_directory_{ctx}"
+    if cache:
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            logger.debug(f"Falha ao ler cache {key}: {e}")
+            cached = None
+        if cached is not None:
+            _stats.record("cs_directory", hit=True)
+            return cached
+
+    _stats.record("cs_directory", hit=False)
+    data = loader()
+    if cache:
+        try:
+            cache.set(key, data, timeout=CS_DIRECTORY_TTL)
+        except Exception as e:
+            logger.debug(f"Falha ao gravar cache {key}: {e}")
+    return data
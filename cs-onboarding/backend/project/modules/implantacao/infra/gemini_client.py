@@ -3,6 +3,8 @@ from typing import Any
 
 import requests
 
+from ....core.http_client import get_http_client
+
 
 class GeminiClientError(RuntimeError):
     pass
@@ -21,10 +23,9 @@ def generate_text(
         raise GeminiClientError("GEMINI_API_KEY nao configurada.")
 
     model_name = (model or os.getenv("GEMINI_MODEL") or "gemini-2.5-flash").strip()
-    url = (
-        "https://generativelanguage.googleapis.com/v1beta/models/"
-        f"{model_name}:generateContent?key={api_key}"
-    )
+    # GEMINI_API_BASE_URL permite apontar para um endpoint local (ex.: fake em testes)
+    base_url = (os.getenv("GEMINI_API_BASE_URL") or "https://generativelanguage.googleapis.com").rstrip("/")
+    url = f"{base_url}/v1beta/models/{model_name}:generateContent?key={api_key}"
 
     payload: dict[str, Any] = {
         "contents": [
@@ -46,7 +47,7 @@ def generate_text(
     }
 
     try:
-        response = requests.post(url, json=payload, timeout=timeout_seconds)
+        response = get_http_client("gemini").post(url, json=payload, timeout=timeout_seconds)
     except requests.RequestException as exc:
         raise GeminiClientError(f"Falha ao chamar Gemini: {exc}") from exc
 
@@ -0,0 +1,321 @@
+"""
+Cache de resultados do Jira por implantação.
+
+Abrir a aba Jira de uma implantação disparava uma ou duas buscas JQL ao Jira
+Cloud a cada acesso. Este cache guarda, por implantação, as issues do contexto
+(JQL da empresa) e as issues vinculadas manualmente (implantacao_jira_links).
+
+Comportamento:
+- A entrada é identificada pela JQL de contexto + chaves vinculadas
+- Hit dentro do TTL: servido direto da memória, sem chamada ao Jira
+- Hit expirado: servido do cache e atualizado em background com uma busca
+  delta (`updated >= -Nm`), que traz apenas as issues alteradas desde o último sync
+- Chaves vinculadas novas: buscadas em lote (`key in (...)`), sem refazer o contexto
+- Sync completo periódico, para refletir issues que saíram do filtro de contexto
+
+Uso:
+    from .jira_cache import JiraIssueCache
+
+    cache = JiraIssueCache(search=minha_funcao_de_busca)
+    issues = cache.get(implantacao_id, context_jql, linked_keys, max_results=50)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from ....monitoring.performance_monitoring import track_cache_hit, track_cache_miss
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+logger = logging.getLogger("jira_integration")
+
+# Configurações do cache (podem ser sobrescritas via env vars)
+JIRA_CACHE_TTL_SECONDS = float(os.environ.get("JIRA_CACHE_TTL_SECONDS", "60"))
+JIRA_CACHE_FULL_SYNC_SECONDS = float(os.environ.get("JIRA_CACHE_FULL_SYNC_SECONDS", "900"))
+JIRA_CACHE_MAX_ENTRIES = int(os.environ.get("JIRA_CACHE_MAX_ENTRIES", "500"))
+JIRA_KEYS_BATCH_SIZE = int(os.environ.get("JIRA_KEYS_BATCH_SIZE", "50"))
+# Limite da busca delta; se atingido, o resultado pode estar truncado e é feito sync completo
+JIRA_DELTA_MAX_RESULTS = 100
+
+
+class JiraSearchError(Exception):
+    """Falha ao executar uma busca JQL (resposta não-200 ou erro de rede)."""
+
+
+@dataclass
+class _CacheEntry:
+    """Issues em cache de uma implantação."""
+
+    context_jql: str | None
+    linked_keys: frozenset[str]
+    context_issues: dict[str, dict[str, Any]] = field(default_factory=dict)
+    linked_issues: dict[str, dict[str, Any]] = field(default_factory=dict)
+    synced_at: float = 0.0
+    full_synced_at: float = 0.0
+
+
+def _chunks(items: list[str], size: int) -> Iterable[list[str]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _created(issue: dict[str, Any]) -> str:
+    return (issue.get("fields") or {}).get("created") or ""
+
+
+class JiraIssueCache:
+    """
+    Cache thread-safe (por processo) de issues do Jira por implantação.
+
+    O `search` recebe (jql, max_results) e devolve a lista de issues brutas,
+    permitindo trocar o transporte HTTP.
+    """
+
+    def __init__(
+        self,
+        search: Callable[[str, int], list[dict[str, Any]]],
+        ttl: float = JIRA_CACHE_TTL_SECONDS,
+        full_sync_interval: float = JIRA_CACHE_FULL_SYNC_SECONDS,
+        max_entries: int = JIRA_CACHE_MAX_ENTRIES,
+        batch_size: int = JIRA_KEYS_BATCH_SIZE,
+    ):
+        self._search = search
+        self.ttl = ttl
+        self.full_sync_interval = full_sync_interval
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._refreshing: set[int] = set()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._full_syncs = 0
+        self._delta_syncs = 0
+        self._batch_fetches = 0
+        self._errors = 0
+
+    # ──────────────────────────────────────────────
+    # Buscas no Jira
+    # ──────────────────────────────────────────────
+
+    def _fetch_keys(self, keys: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Busca issues por chave em lotes de `key in (...)`."""
+        found: dict[str, dict[str, Any]] = {}
+        for batch in _chunks(sorted(keys), self.batch_size):
+            self._batch_fetches += 1
+            jql = f"key in ({','.join(batch)}) ORDER BY created DESC"
+            for issue in self._search(jql, len(batch)):
+                if issue.get("key"):
+                    found[str(issue["key"]).upper()] = issue
+        return found
+
+    def _full_sync(
+        self, context_jql: str | None, linked_keys: frozenset[str], max_results: int
+    ) -> tuple[_CacheEntry, bool]:
+        """Busca completa. Retorna (entrada, completa); entradas incompletas não são armazenadas."""
+        self._full_syncs += 1
+        started = time.monotonic()
+        entry = _CacheEntry(context_jql=context_jql, linked_keys=linked_keys)
+        complete = True
+
+        if linked_keys:
+            try:
+                entry.linked_issues = self._fetch_keys(linked_keys)
+            except Exception as e:
+                complete = False
+                self._errors += 1
+                logger.error(f"Erro ao buscar tickets vinculados: {e}", exc_info=True)
+
+        if context_jql:
+            jql = context_jql
+            if entry.linked_issues:
+                jql += f" AND key not in ({','.join(sorted(entry.linked_issues))})"
+            try:
+                for issue in self._search(f"{jql} ORDER BY created DESC", max_results):
+                    if issue.get("key"):
+                        entry.context_issues[str(issue["key"]).upper()] = issue
+            except Exception as e:
+                complete = False
+                self._errors += 1
+                logger.error(f"Erro ao buscar contexto da empresa: {e}", exc_info=True)
+
+        entry.synced_at = entry.full_synced_at = started
+        return entry, complete
+
+    def _delta_sync(self, implantacao_id: int, entry: _CacheEntry, max_results: int) -> None:
+        """Aplica à entrada as issues alteradas desde o último sync."""
+        self._delta_syncs += 1
+        started = time.monotonic()
+        # Margem de 1 minuto: a JQL relativa tem resolução de minutos
+        minutes = math.ceil((started - entry.synced_at) / 60) + 1
+
+        filters = []
+        if entry.context_jql:
+            filters.append(f"({entry.context_jql})")
+        if entry.linked_keys:
+            filters.append(f"key in ({','.join(sorted(entry.linked_keys))})")
+        if not filters:
+            entry.synced_at = started
+            return
+
+        jql = f"({' OR '.join(filters)}) AND updated >= -{minutes}m ORDER BY updated DESC"
+        changed = self._search(jql, JIRA_DELTA_MAX_RESULTS)
+        if len(changed) >= JIRA_DELTA_MAX_RESULTS:
+            logger.info(f"Delta Jira truncado (implantação {implantacao_id}); fazendo sync completo")
+            fresh, complete = self._full_sync(entry.context_jql, entry.linked_keys, max_results)
+            if complete:
+                self._store(implantacao_id, fresh)
+            return
+
+        with self._lock:
+            for issue in changed:
+                key = str(issue.get("key") or "").upper()
+                if not key:
+                    continue
+                if key in entry.linked_keys:
+                    entry.linked_issues[key] = issue
+                else:
+                    entry.context_issues[key] = issue
+            if len(entry.context_issues) > max_results:
+                newest = sorted(entry.context_issues.values(), key=_created, reverse=True)[:max_results]
+                entry.context_issues = {str(i["key"]).upper(): i for i in newest}
+            entry.synced_at = started
+
+        logger.debug(f"Delta Jira implantação {implantacao_id}: {len(changed)} issue(s) alterada(s)")
+
+    def _refresh_in_background(self, implantacao_id: int, entry: _CacheEntry, max_results: int) -> None:
+        with self._lock:
+            if implantacao_id in self._refreshing:
+                return
+            self._refreshing.add(implantacao_id)
+
+        def _run():
+            try:
+                self._delta_sync(implantacao_id, entry, max_results)
+            except Exception as e:
+                self._errors += 1
+                logger.warning(f"Falha na atualização em background do Jira (implantação {implantacao_id}): {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(implantacao_id)
+
+        threading.Thread(target=_run, name=f"jira-refresh-{implantacao_id}", daemon=True).start()
+
+    def _store(self, implantacao_id: int, entry: _CacheEntry) -> None:
+        with self._lock:
+            self._entries[implantacao_id] = entry
+            self._entries.move_to_end(implantacao_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ──────────────────────────────────────────────
+    # API pública
+    # ──────────────────────────────────────────────
+
+    def get(
+        self,
+        implantacao_id: int,
+        context_jql: str | None,
+        linked_keys: Iterable[str] | None,
+        max_results: int = 50,
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """
+        Retorna (issues_vinculadas, issues_do_contexto) brutas.
+
+        - Sem entrada, JQL de contexto diferente ou sync completo vencido: busca síncrona
+        - Chaves vinculadas alteradas: busca em lote apenas das chaves novas
+        - Entrada expirada: devolve o cache e dispara delta em background
+        """
+        keys = frozenset(str(k).strip().upper() for k in (linked_keys or []) if str(k).strip())
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(implantacao_id)
+            if entry is not None:
+                self._entries.move_to_end(implantacao_id)
+
+        if entry is None or entry.context_jql != context_jql or now - entry.full_synced_at > self.full_sync_interval:
+            self._misses += 1
+            track_cache_miss("jira_issues")
+            entry, complete = self._full_sync(context_jql, keys, max_results)
+            if complete:
+                self._store(implantacao_id, entry)
+            return self._snapshot(entry)
+
+        if entry.linked_keys != keys:
+            entry = self._apply_linked_keys(implantacao_id, entry, keys)
+
+        self._hits += 1
+        track_cache_hit("jira_issues")
+        if now - entry.synced_at > self.ttl:
+            self._refresh_in_background(implantacao_id, entry, max_results)
+        return self._snapshot(entry)
+
+    def _apply_linked_keys(self, implantacao_id: int, entry: _CacheEntry, keys: frozenset[str]) -> _CacheEntry:
+        """Atualiza a entrada para um novo conjunto de chaves vinculadas."""
+        missing = keys - entry.linked_issues.keys()
+        # Issues já presentes no contexto não precisam ser buscadas novamente
+        promoted = {k: entry.context_issues[k] for k in missing if k in entry.context_issues}
+        to_fetch = missing - promoted.keys()
+
+        fetched: dict[str, dict[str, Any]] = {}
+        if to_fetch:
+            try:
+                fetched = self._fetch_keys(to_fetch)
+            except Exception as e:
+                self._errors += 1
+                logger.error(f"Erro ao buscar tickets vinculados: {e}", exc_info=True)
+
+        with self._lock:
+            linked = {k: v for k, v in entry.linked_issues.items() if k in keys}
+            linked.update(promoted)
+            linked.update(fetched)
+            context = {k: v for k, v in entry.context_issues.items() if k not in linked}
+            updated = _CacheEntry(
+                context_jql=entry.context_jql,
+                linked_keys=keys,
+                context_issues=context,
+                linked_issues=linked,
+                synced_at=entry.synced_at,
+                full_synced_at=entry.full_synced_at,
+            )
+        if not (to_fetch - fetched.keys()):
+            self._store(implantacao_id, updated)
+        return updated
+
+    def _snapshot(self, entry: _CacheEntry) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        with self._lock:
+            return list(entry.linked_issues.values()), list(entry.context_issues.values())
+
+    def invalidate(self, implantacao_id: int) -> None:
+        """Remove a entrada da implantação (próximo acesso faz sync completo)."""
+        with self._lock:
+            self._entries.pop(implantacao_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        total = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total * 100, 1) if total else 0,
+            "full_syncs": self._full_syncs,
+            "delta_syncs": self._delta_syncs,
+            "batch_fetches": self._batch_fetches,
+            "errors": self._errors,
+        }
@@ -1,21 +1,39 @@
 import os
 
+import threading
 
 
-import requests
+
+from cachetools import TTLCache
 
 from requests.auth import HTTPBasicAuth
 
 
 
+from ....common.dataloader import clear_loader
+
 from ....config.logging_config import get_logger
 
+from ....core.http_client import get_http_client
+
+from .jira_cache import JIRA_KEYS_BATCH_SIZE, JiraIssueCache, JiraSearchError
+
 
 
 logger = get_logger("jira_integration")
 
 
 
+JIRA_ISSUE_DETAILS_TTL = int(os.getenv("JIRA_ISSUE_DETAILS_TTL", "60"))
+
+
+
+_issue_details_cache = TTLCache(maxsize=500, ttl=JIRA_ISSUE_DETAILS_TTL)
+
+_issue_details_lock = threading.Lock()
+
+
+
 
 
 def get_jira_credentials():
@@ -48,249 +66,275 @@ def get_jira_credentials():
 
 
 
-def search_issues_by_context(implantacao_data, max_results=50, extra_keys=None):
+ISSUE_FIELDS = ["summary", "status", "created", "updated", "priority", "issuetype", "reporter", "assignee"]
+
 
-    """
 
-    Searches Jira issues based on implantation data using the new Jira Cloud v3 API.
 
-    Refactored to ensure 'extra_keys' are always returned, even if they would be excluded by pagination in a combined query.
+
+def _format_issue(issue, url, linked_keys=None):
 
     """
 
-    url, user, token = get_jira_credentials()
+    Converte uma issue bruta da API v3 no formato consumido pela aba Jira.
 
+    """
 
+    fields = issue.get("fields", {})
 
-    if not all([url, user, token]):
+    key = issue.get("key")
 
-        logger.warning("Credenciais do Jira (JIRA_URL, JIRA_USER, JIRA_API_TOKEN) não configuradas.")
+    issue_obj = {
 
-        return {"error": "Jira não configurado", "issues": []}
+        "key": key,
 
+        "summary": fields.get("summary"),
 
+        "status": fields.get("status", {}).get("name"),
 
-    # Ensure URL formatting
+        "status_color": fields.get("status", {}).get("statusCategory", {}).get("colorName", "blue-gray"),
 
-    if url.endswith("/"):
+        "created": fields.get("created"),
 
-        url = url[:-1]
+        "updated": fields.get("updated"),
 
+        "link": f"{url}/browse/{key}",
 
+        "priority": fields.get("priority", {}).get("name", "N/A"),
 
-    api_endpoint = f"{url}/rest/api/3/search/jql"
+        "priority_icon": fields.get("priority", {}).get("iconUrl"),
 
-    auth = HTTPBasicAuth(user, token)
+        "type": fields.get("issuetype", {}).get("name"),
 
-    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        "type_icon": fields.get("issuetype", {}).get("iconUrl"),
 
+        "reporter": fields.get("reporter", {}).get("displayName", "Desconhecido"),
 
+    }
 
-    found_issues_map = {}  # Key -> Issue Data
+    if linked_keys is not None:
 
+        issue_obj["is_linked"] = (str(key).upper() if key else "") in linked_keys
 
+    return issue_obj
 
-    # 1. Fetch Extra Keys (Strategic Priority)
 
-    if extra_keys and isinstance(extra_keys, list) and len(extra_keys) > 0:
 
-        safe_keys = [k.strip() for k in extra_keys if k.strip()]
 
-        if safe_keys:
 
-            keys_str = ",".join(safe_keys)
+def _context_jql(implantacao_data):
 
-            jql_keys = f"key in ({keys_str}) ORDER BY created DESC"
+    """
 
-            logger.info(f"DEBUG: Fetching extra keys JQL: {jql_keys}")
+    JQL de contexto da empresa (sem ORDER BY), ou None se a implantação não tem nome de empresa.
 
+    """
 
+    company_name = implantacao_data.get("nome_empresa", "")
 
-            try:
+    if not company_name:
 
-                payload = {
+        return None
 
-                    "jql": jql_keys,
+    safe_company_name = company_name.replace('"', '\\"')
 
-                    "maxResults": len(safe_keys),
+    return f'cf[10046] ~ "{safe_company_name}"'
 
-                    "fields": [
 
-                        "summary",
 
-                        "status",
 
-                        "created",
 
-                        "updated",
+def _search_jql(jql, max_results):
 
-                        "priority",
+    """
 
-                        "issuetype",
+    Executa uma busca JQL e retorna as issues brutas.
 
-                        "reporter",
+    Levanta JiraSearchError em caso de resposta diferente de 200.
 
-                        "assignee",
+    """
 
-                    ],
+    url, user, token = get_jira_credentials()
 
-                }
+    if not all([url, user, token]):
 
-                response = requests.post(api_endpoint, json=payload, auth=auth, headers=headers, timeout=15)
+        raise JiraSearchError("Jira não configurado")
 
-                if response.status_code == 200:
 
-                    data = response.json()
 
-                    for issue in data.get("issues", []):
+    logger.debug(f"Jira JQL: {jql}")
 
-                        found_issues_map[issue.get("key")] = issue
+    response = get_http_client("jira").post(
 
-            except Exception as e:
+        f"{url}/rest/api/3/search/jql",
 
-                logger.error(f"Erro ao buscar extra keys: {e}", exc_info=True)
+        json={"jql": jql, "maxResults": max_results, "fields": ISSUE_FIELDS},
 
+        auth=HTTPBasicAuth(user, token),
 
+        headers={"Content-Type": "application/json", "Accept": "application/json"},
 
-    # 2. Fetch Company Context
+        timeout=15,
 
-    company_name = implantacao_data.get("nome_empresa", "")
+    )
 
-    if company_name:
+    if response.status_code != 200:
 
-        safe_company_name = company_name.replace('"', '\\"')
+        raise JiraSearchError(f"Erro JQL ({response.status_code}): {response.text}")
 
-        jql_context = f'cf[10046] ~ "{safe_company_name}"'
+    return response.json().get("issues", [])
 
 
 
-        # Exclude already found keys to avoid duplicates in this batch (optional, but cleaner)
 
-        if found_issues_map:
 
-            keys_to_exclude = ",".join(found_issues_map.keys())
+jira_issue_cache = JiraIssueCache(search=_search_jql)
 
-            jql_context += f" AND key not in ({keys_to_exclude})"
 
 
 
-        jql_context += " ORDER BY created DESC"
 
+def _build_issues_result(url, raw_issues, extra_keys):
 
+    # Normalizar chaves para uppercase para is_linked check
 
-        logger.info(f"DEBUG: Fetching context JQL: {jql_context}")
+    extra_keys_set = {str(k).strip().upper() for k in extra_keys} if extra_keys else set()
 
 
 
-        try:
+    # Sort in Python (created is ISO string, so string sort works for ISO8601)
 
-            payload = {
+    raw_issues = sorted(raw_issues, key=lambda x: x.get("fields", {}).get("created", ""), reverse=True)
 
-                "jql": jql_context,
 
-                "maxResults": max_results,
 
-                "fields": ["summary", "status", "created", "updated", "priority", "issuetype", "reporter", "assignee"],
+    return {"issues": [_format_issue(issue, url, extra_keys_set) for issue in raw_issues]}
+
+
+
+
+
+def search_issues_by_context(implantacao_data, max_results=50, extra_keys=None):
+
+    """
+
+    Searches Jira issues based on implantation data using the new Jira Cloud v3 API.
+
+    Refactored to ensure 'extra_keys' are always returned, even if they would be excluded by pagination in a combined query.
+
+    Sempre consulta o Jira; para a aba Jira use search_issues_for_implantacao (cacheado).
+
+    """
+
+    url, user, token = get_jira_credentials()
+
 
-            }
 
-            response = requests.post(api_endpoint, json=payload, auth=auth, headers=headers, timeout=15)
+    if not all([url, user, token]):
+
+        logger.warning("Credenciais do Jira (JIRA_URL, JIRA_USER, JIRA_API_TOKEN) não configuradas.")
+
+        return {"error": "Jira não configurado", "issues": []}
 
 
 
-            if response.status_code == 200:
+    found_issues_map = {}  # Key -> Issue Data
+
 
-                data = response.json()
 
-                for issue in data.get("issues", []):
+    # 1. Fetch Extra Keys (Strategic Priority) - em lotes de key in (...)
 
-                    found_issues_map[issue.get("key")] = issue
+    safe_keys = [k.strip() for k in extra_keys if k.strip()] if isinstance(extra_keys, list) else []
 
-            elif response.status_code == 400:
+    for i in range(0, len(safe_keys), JIRA_KEYS_BATCH_SIZE):
 
-                logger.warning(f"Erro JQL Contexto: {response.text}")
+        batch = safe_keys[i : i + JIRA_KEYS_BATCH_SIZE]
 
-                # Não falha tudo, apenas retorna o que já temos localmente (extra keys)
+        try:
 
+            for issue in _search_jql(f"key in ({','.join(batch)}) ORDER BY created DESC", len(batch)):
 
+                found_issues_map[issue.get("key")] = issue
 
         except Exception as e:
 
-            logger.error(f"Erro ao buscar contexto da empresa: {e}", exc_info=True)
+            logger.error(f"Erro ao buscar extra keys: {e}", exc_info=True)
 
 
 
-    # 3. Process Result
+    # 2. Fetch Company Context
 
-    final_issues = []
+    jql_context = _context_jql(implantacao_data)
 
-    # Normalizar chaves para uppercase para is_linked check
+    if jql_context:
 
-    extra_keys_set = {str(k).strip().upper() for k in extra_keys} if extra_keys else set()
+        # Exclude already found keys to avoid duplicates in this batch (optional, but cleaner)
 
+        if found_issues_map:
 
+            jql_context += f" AND key not in ({','.join(found_issues_map.keys())})"
 
-    # Sort distinct values by created date descending?
 
-    # Converting map values to list
 
-    all_raw_issues = list(found_issues_map.values())
+        try:
 
+            for issue in _search_jql(f"{jql_context} ORDER BY created DESC", max_results):
 
+                found_issues_map[issue.get("key")] = issue
 
-    # Sort in Python (created is ISO string, so string sort works for ISO8601)
+        except JiraSearchError as e:
 
-    all_raw_issues.sort(key=lambda x: x.get("fields", {}).get("created", ""), reverse=True)
+            # Não falha tudo, apenas retorna o que já temos localmente (extra keys)
 
+            logger.warning(f"Erro JQL Contexto: {e}")
 
+        except Exception as e:
 
-    for issue in all_raw_issues:
+            logger.error(f"Erro ao buscar contexto da empresa: {e}", exc_info=True)
 
-        fields = issue.get("fields", {})
 
-        key = issue.get("key")
 
-        key_upper = str(key).upper() if key else ""
+    # 3. Process Result
 
+    return _build_issues_result(url, list(found_issues_map.values()), extra_keys)
 
 
-        final_issues.append(
 
-            {
 
-                "key": key,
 
-                "summary": fields.get("summary"),
+def search_issues_for_implantacao(implantacao_id, implantacao_data, max_results=50, extra_keys=None):
 
-                "status": fields.get("status", {}).get("name"),
+    """
 
-                "status_color": fields.get("status", {}).get("statusCategory", {}).get("colorName", "blue-gray"),
+    Versão cacheada de search_issues_by_context para a aba Jira de uma implantação.
 
-                "created": fields.get("created"),
 
-                "updated": fields.get("updated"),
 
-                "link": f"{url}/browse/{key}",
+    Servida do jira_issue_cache (por implantação); issues alteradas são trazidas
 
-                "priority": fields.get("priority", {}).get("name", "N/A"),
+    em background via busca delta e chaves vinculadas novas são buscadas em lote.
 
-                "priority_icon": fields.get("priority", {}).get("iconUrl"),
+    """
+
+    url, user, token = get_jira_credentials()
 
-                "type": fields.get("issuetype", {}).get("name"),
 
-                "type_icon": fields.get("issuetype", {}).get("iconUrl"),
 
-                "reporter": fields.get("reporter", {}).get("displayName", "Desconhecido"),
+    if not all([url, user, token]):
 
-                "is_linked": key_upper in extra_keys_set,
+        logger.warning("Credenciais do Jira (JIRA_URL, JIRA_USER, JIRA_API_TOKEN) não configuradas.")
 
-            }
+        return {"error": "Jira não configurado", "issues": []}
 
-        )
 
 
+    linked, context = jira_issue_cache.get(
 
-    return {"issues": final_issues}
+        implantacao_id, _context_jql(implantacao_data), extra_keys, max_results=max_results
+
+    )
+
+    return _build_issues_result(url, linked + context, extra_keys)
 
 
 
@@ -472,7 +516,7 @@ def create_jira_issue(implantacao_data, issue_data, files=None):
 
 
 
-        response = requests.post(
+        response = get_http_client("jira").post(
 
             api_endpoint,
 
@@ -588,7 +632,7 @@ def attach_file_to_issue(issue_key, file_storage):
 
 
 
-        response = requests.post(endpoint, files=files, auth=HTTPBasicAuth(user, token), headers=headers, timeout=30)
+        response = get_http_client("jira").post(endpoint, files=files, auth=HTTPBasicAuth(user, token), headers=headers, timeout=30)
 
 
 
@@ -620,6 +664,8 @@ def get_issue_details(issue_key):
 
     Busca detalhes de um ticket específico pela chave (ex: M1-1234).
 
+    Respostas de sucesso ficam em cache por JIRA_ISSUE_DETAILS_TTL segundos.
+
     """
 
     url, user, token = get_jira_credentials()
@@ -630,11 +676,15 @@ def get_issue_details(issue_key):
 
 
 
-    # Ensure URL formatting
+    cache_key = str(issue_key).upper()
 
-    if url.endswith("/"):
+    with _issue_details_lock:
 
-        url = url[:-1]
+        cached = _issue_details_cache.get(cache_key)
+
+    if cached is not None:
+
+        return {"issue": dict(cached)}
 
 
 
@@ -644,9 +694,17 @@ def get_issue_details(issue_key):
 
     try:
 
-        response = requests.get(
+        response = get_http_client("jira").get(
+
+            endpoint,
+
+            auth=HTTPBasicAuth(user, token),
+
+            headers={"Accept": "application/json"},
+
+            params={"fields": ",".join(ISSUE_FIELDS)},
 
-            endpoint, auth=HTTPBasicAuth(user, token), headers={"Accept": "application/json"}, timeout=10
+            timeout=10,
 
         )
 
@@ -668,41 +726,13 @@ def get_issue_details(issue_key):
 
 
 
-        data = response.json()
-
-        fields = data.get("fields", {})
-
-
-
-        issue_obj = {
-
-            "key": data.get("key"),
-
-            "summary": fields.get("summary"),
-
-            "status": fields.get("status", {}).get("name"),
+        issue_obj = _format_issue(response.json(), url)
 
-            "status_color": fields.get("status", {}).get("statusCategory", {}).get("colorName", "blue-gray"),
+        with _issue_details_lock:
 
-            "created": fields.get("created"),
+            _issue_details_cache[cache_key] = issue_obj
 
-            "updated": fields.get("updated"),
-
-            "link": f"{url}/browse/{data.get('key')}",
-
-            "priority": fields.get("priority", {}).get("name", "N/A"),
-
-            "priority_icon": fields.get("priority", {}).get("iconUrl"),
-
-            "type": fields.get("issuetype", {}).get("name"),
-
-            "type_icon": fields.get("issuetype", {}).get("iconUrl"),
-
-            "reporter": fields.get("reporter", {}).get("displayName", "Desconhecido"),
-
-        }
-
-        return {"issue": issue_obj}
+        return {"issue": dict(issue_obj)}
 
 
 
@@ -836,6 +866,8 @@ def save_jira_link(implantacao_id, jira_key, user_email):
 
             conn.commit()
 
+            clear_loader("jira_links", implantacao_id)
+
         except Exception as e_pg:
 
             # Se for erro de integridade (23505 = unique_violation), ignoramos como DO NOTHING
@@ -904,6 +936,8 @@ def remove_jira_link(implantacao_id, jira_key):
 
         conn.commit()
 
+        clear_loader("jira_links", implantacao_id)
+
         return True  # Always success (idempotent)
 
 
@@ -926,19 +960,15 @@ def remove_jira_link(implantacao_id, jira_key):
 
 
 
-def get_linked_jira_keys(implantacao_id):
-
-    """
-
-    Retorna lista de chaves Jira vinculadas manualmente a uma implantação.
+def _load_jira_links(implantacao_ids):
 
-    """
+    """Batch do loader `jira_links`: {implantacao_id: [chaves]} em uma query."""
 
     conn, db_type = _get_db_conn()
 
     if not conn:
 
-        return []
+        return {}
 
 
 
@@ -950,22 +980,54 @@ def get_linked_jira_keys(implantacao_id):
 
 
 
-        cur.execute("SELECT jira_key FROM implantacao_jira_links WHERE implantacao_id = %s", (implantacao_id,))
+        cur.execute(
 
+            "SELECT implantacao_id, jira_key FROM implantacao_jira_links WHERE implantacao_id = ANY(%s) ORDER BY id",
 
+            (list(implantacao_ids),),
 
-        rows = cur.fetchall()
+        )
 
-        return [r[0] for r in rows]
 
 
+        links = {}
 
-    except Exception as e:
+        for row in cur.fetchall():
 
-        logger.warning(f"Erro ao buscar links Jira (DB): {e}", exc_info=True)
+            links.setdefault(row[0], []).append(row[1])
 
-        return []
+        return links
 
     finally:
 
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+
+
+
+def get_linked_jira_keys(implantacao_id):
+
+    """
+
+    Retorna lista de chaves Jira vinculadas manualmente a uma implantação.
+
+
+
+    Memoizado por requisição (common/dataloader.get_loader).
+
+    """
+
+    from ....common.dataloader import get_loader
+
+
+
+    try:
+
+        return list(get_loader("jira_links", _load_jira_links, default=()).load(implantacao_id))
+
+    except Exception as e:
+
+        logger.warning(f"Erro ao buscar links Jira (DB): {e}", exc_info=True)
+
+        return []
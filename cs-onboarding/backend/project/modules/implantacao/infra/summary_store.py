@@ -0,0 +1,195 @@
+"""
+Persistência de resumos de IA por fingerprint do contexto.
+
+O resumo de uma implantação só muda quando muda alguma das entradas do prompt.
+O fingerprint é calculado com UMA query de agregação (campos da implantação,
+estado do checklist, texto dos comentários e último evento da timeline) — bem mais
+barato que montar o contexto completo e chamar o Gemini.
+
+Uso:
+    from ..infra.summary_store import compute_summary_fingerprint, get_cached_summary, save_summary
+
+    fingerprint = compute_summary_fingerprint(impl_id)
+    cached = get_cached_summary(impl_id, fingerprint)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from datetime import date
+from typing import Any
+
+from ....core.http_client import LatencyHistogram
+from ....db import execute_db, query_db
+
+logger = logging.getLogger(__name__)
+
+# Incrementar ao alterar o prompt ou o formato do resumo (invalida os resumos salvos)
+SUMMARY_PROMPT_VERSION = 1
+
+_FINGERPRINT_QUERY = """
+    SELECT
+        md5(concat_ws('|',
+            i.nome_empresa, i.status, i.tipo, i.usuario_cs,
+            i.data_inicio_efetivo, i.data_previsao_termino, i.data_finalizacao,
+            i.data_parada, i.data_cancelamento, i.motivo_parada, i.motivo_cancelamento
+        )) AS impl_hash,
+        (
+            SELECT md5(COALESCE(string_agg(
+                concat_ws(':', ci.id, ci.parent_id, ci.title, ci.tipo_item, ci.completed,
+                          ci.responsavel, ci.prazo_fim),
+                ',' ORDER BY ci.id
+            ), ''))
+            FROM checklist_items ci
+            WHERE ci.implantacao_id = i.id
+        ) AS checklist_hash,
+        (
+            SELECT COUNT(*) || ':' || COALESCE(MAX(c.id), 0) || ':'
+                || md5(COALESCE(string_agg(c.id || ':' || COALESCE(c.texto, ''), ',' ORDER BY c.id), ''))
+            FROM comentarios_h c
+            LEFT JOIN checklist_items ci ON c.checklist_item_id = ci.id
+            WHERE ci.implantacao_id = i.id OR c.implantacao_id = i.id
+        ) AS comments_state,
+        (
+            SELECT COALESCE(MAX(t.id), 0)
+            FROM timeline_log t
+            WHERE t.implantacao_id = i.id
+        ) AS timeline_state
+    FROM implantacoes i
+    WHERE i.id = %s
+"""
+
+
+class SummaryCacheStats:
+    """Contadores de hit/miss e latência de geração (para /health/metrics)."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.gemini_latency = LatencyHistogram()
+        self.fingerprint_latency = LatencyHistogram()
+        self.context_latency = LatencyHistogram()
+
+    def snapshot(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total * 100, 1) if total else 0,
+            "gemini_latency": self.gemini_latency.snapshot(),
+            "fingerprint_latency": self.fingerprint_latency.snapshot(),
+            "context_latency": self.context_latency.snapshot(),
+        }
+
+
+summary_cache_stats = SummaryCacheStats()
+
+
+def compute_summary_fingerprint(impl_id: int) -> str | None:
+    """
+    Fingerprint das entradas do resumo. Retorna None se não for possível calcular
+    (implantação inexistente ou erro de banco) — nesse caso o resumo não é cacheado.
+
+    Inclui a data atual: prazos vencidos e dias em andamento mudam a cada dia.
+    """
+    try:
+        row = query_db(_FINGERPRINT_QUERY, (impl_id,), one=True, raise_on_error=True)
+    except Exception as e:
+        summary_cache_stats.errors += 1
+        logger.warning(f"Falha ao calcular fingerprint do resumo (implantacao {impl_id}): {e}")
+        return None
+    if not row:
+        return None
+
+    payload = [
+        SUMMARY_PROMPT_VERSION,
+        os.getenv("GEMINI_MODEL") or "",
+        date.today().isoformat(),
+        row.get("impl_hash"),
+        row.get("checklist_hash"),
+        row.get("comments_state"),
+        row.get("timeline_state"),
+    ]
+    return hashlib.sha256(json.dumps(payload, default=str).encode("utf-8")).hexdigest()
+
+
+def get_cached_summary(impl_id: int, fingerprint: str) -> dict[str, Any] | None:
+    """Retorna o resumo salvo se o fingerprint ainda for o mesmo."""
+    try:
+        row = query_db(
+            """
+            SELECT summary, summary_structured, source, gerado_em
+            FROM implantacao_resumos
+            WHERE implantacao_id = %s AND fingerprint = %s
+            """,
+            (impl_id, fingerprint),
+            one=True,
+            raise_on_error=True,
+        )
+    except Exception as e:
+        summary_cache_stats.errors += 1
+        logger.warning(f"Falha ao ler resumo salvo (implantacao {impl_id}): {e}")
+        return None
+    if not row:
+        return None
+
+    structured = None
+    if row.get("summary_structured"):
+        try:
+            structured = json.loads(row["summary_structured"])
+        except ValueError:
+            structured = None
+    return {
+        "summary": row.get("summary"),
+        "summary_structured": structured,
+        "source": row.get("source"),
+        "generated_at": row.get("gerado_em"),
+    }
+
+
+def save_summary(
+    impl_id: int,
+    fingerprint: str,
+    result: dict[str, Any],
+    user_email: str | None,
+    duration_ms: int | None,
+) -> None:
+    """Grava (upsert) o resumo da implantação; falhas não interrompem a resposta."""
+    try:
+        execute_db(
+            """
+            INSERT INTO implantacao_resumos
+                (implantacao_id, fingerprint, summary, summary_structured, source, gerado_por, gerado_em, duracao_ms)
+            VALUES (%s, %s, %s, %s, %s, %s, NOW(), %s)
+            ON CONFLICT (implantacao_id) DO UPDATE SET
+                fingerprint = EXCLUDED.fingerprint,
+                summary = EXCLUDED.summary,
+                summary_structured = EXCLUDED.summary_structured,
+                source = EXCLUDED.source,
+                gerado_por = EXCLUDED.gerado_por,
+                gerado_em = EXCLUDED.gerado_em,
+                duracao_ms = EXCLUDED.duracao_ms
+            """,
+            (
+                impl_id,
+                fingerprint,
+                result.get("summary") or "",
+                json.dumps(result.get("summary_structured"), default=str),
+                result.get("source") or "gemini",
+                user_email,
+                duration_ms,
+            ),
+            raise_on_error=True,
+        )
+    except Exception as e:
+        summary_cache_stats.errors += 1
+        logger.warning(f"Falha ao salvar resumo (implantacao {impl_id}): {e}")
+
+
+def get_summary_cache_stats() -> dict[str, Any]:
+    return summary_cache_stats.snapshot()
@@ -20,6 +20,8 @@ from ....config.logging_config import management_logger, security_logger
 
 from ....constants import ADMIN_EMAIL, MASTER_ADMIN_EMAIL, PERFIL_ADMIN
 
+from ....database.bulk_delete import BULK_DELETE_SYNC_LIMIT, delete_implantacoes
+
 from ....db import execute_db, query_db
 
 from .users import obter_perfil_usuario, verificar_usuario_existe
@@ -126,7 +128,7 @@ def atualizar_perfil_usuario_service(usuario_alvo, novo_perfil, usuario_admin, c
 
     try:
 
-        from ....config.cache_config import cache
+        from ....config.cache_config import cache, clear_cs_directory_cache
 
 
 
@@ -136,6 +138,8 @@ def atualizar_perfil_usuario_service(usuario_alvo, novo_perfil, usuario_admin, c
 
             cache.delete(cache_key)
 
+            clear_cs_directory_cache()
+
             management_logger.debug(f"Cache de perfil invalidado para {usuario_alvo}")
 
     except Exception as e:
@@ -168,9 +172,15 @@ def excluir_usuario_service(usuario_alvo, usuario_admin):
 
 
 
+    Acima de BULK_DELETE_SYNC_LIMIT implantações, a remoção delas (em lotes)
+
+    vai para a fila de manutenção e o resultado traz o `job_id`.
+
+
+
     Returns:
 
-        int: Número de implantações excluídas junto com o usuário
+        dict: implantacoes_excluidas, foto_url e job_id (None se concluído na hora)
 
 
 
@@ -206,15 +216,49 @@ def excluir_usuario_service(usuario_alvo, usuario_admin):
 
     # Buscar implantações vinculadas
 
-    implantacoes_ids = query_db("SELECT id FROM implantacoes WHERE usuario_cs = %s", (usuario_alvo,)) or []
+    rows = query_db("SELECT id FROM implantacoes WHERE usuario_cs = %s ORDER BY id", (usuario_alvo,)) or []
+
+    implantacoes_ids = [r["id"] for r in rows]
+
+
+
+    # Excluir implantações em lotes (em background quando são muitas)
+
+    job_id = None
+
+    if len(implantacoes_ids) > BULK_DELETE_SYNC_LIMIT:
+
+        from ....tasks.job_queue import JobRejectedError, maintenance_jobs
+
 
 
+        try:
 
-    # Excluir implantações
+            job = maintenance_jobs.submit(
 
-    for impl in implantacoes_ids:
+                "excluir_usuario",
 
-        execute_db("DELETE FROM implantacoes WHERE id = %s", (impl["id"],))
+                delete_implantacoes,
+
+                implantacoes_ids,
+
+                owner=usuario_admin,
+
+                dedupe_key=f"excluir_usuario:{usuario_alvo}",
+
+                meta={"usuario": usuario_alvo, "implantacoes": len(implantacoes_ids)},
+
+            )
+
+        except JobRejectedError as e:
+
+            raise ValueError(str(e)) from e
+
+        job_id = job.id
+
+    elif implantacoes_ids:
+
+        delete_implantacoes(implantacoes_ids)
 
 
 
@@ -232,7 +276,7 @@ def excluir_usuario_service(usuario_alvo, usuario_admin):
 
     try:
 
-        from ....config.cache_config import cache
+        from ....config.cache_config import cache, clear_cs_directory_cache
 
 
 
@@ -242,6 +286,8 @@ def excluir_usuario_service(usuario_alvo, usuario_admin):
 
             cache.delete(cache_key)
 
+            clear_cs_directory_cache()
+
     except Exception as e:
 
         management_logger.warning(f"Falha ao limpar cache do perfil do usuário {usuario_alvo} após exclusão: {e}", exc_info=True)
@@ -252,13 +298,15 @@ def excluir_usuario_service(usuario_alvo, usuario_admin):
 
         f"Usuário {usuario_alvo} excluído por {usuario_admin} "
 
-        f"(implantações vinculadas removidas: {len(implantacoes_ids)})"
+        f"(implantações vinculadas removidas: {len(implantacoes_ids)}"
+
+        f"{f', em background no job {job_id}' if job_id else ''})"
 
     )
 
 
 
-    return {"implantacoes_excluidas": len(implantacoes_ids), "foto_url": foto_url}
+    return {"implantacoes_excluidas": len(implantacoes_ids), "foto_url": foto_url, "job_id": job_id}
 
 
 
@@ -284,17 +332,15 @@ def limpar_implantacoes_orfas_service(usuario_admin):
 
     """
 
-    stats = query_db("SELECT COUNT(*) as c FROM implantacoes WHERE usuario_cs IS NULL", (), one=True) or {"c": 0}
-
-
+    rows = query_db("SELECT id FROM implantacoes WHERE usuario_cs IS NULL ORDER BY id", ()) or []
 
-    count = stats.get("c", 0)
+    count = len(rows)
 
 
 
     if count > 0:
 
-        execute_db("DELETE FROM implantacoes WHERE usuario_cs IS NULL")
+        delete_implantacoes([r["id"] for r in rows])
 
         management_logger.info(f"Admin {usuario_admin} removeu {count} implantações órfãs")
 
@@ -1,15 +1,18 @@
-import logging
-logger = logging.getLogger(__name__)
 """
 Módulo de Usuários do Gerenciamento
 Listagem e consulta de usuários.
 Princípio SOLID: Single Responsibility
 """
 
+import logging
+
 from flask import current_app, g
 
 from ....common.context_navigation import normalize_context
 from ....db import query_db
+from ....monitoring.performance_monitoring import track_cache_hit, track_cache_miss
+
+logger = logging.getLogger(__name__)
 
 
 def _resolve_context(context=None):
@@ -113,7 +116,9 @@ def listar_todos_cs_com_cache(context=None):
         cache_key = f"all_customer_success_{ctx}"
         cached_result = cache.get(cache_key)
         if cached_result:
+            track_cache_hit("usuarios_cs")
             return cached_result
+        track_cache_miss("usuarios_cs")
 
     result = query_db(
         """
@@ -1,6 +1,4 @@
 import logging
-logger = logging.getLogger(__name__)
-
 
 from flask import current_app, flash, g, redirect, render_template, request, session, url_for
 
@@ -40,12 +38,18 @@ from ....constants import (
 
 )
 
+from ....database.parallel import run_parallel, unwrap
+
 from ..application.dashboard_service import get_dashboard_data, get_tags_metrics
 
 from ..application.management_service import listar_todos_cs_com_cache
 
 
 
+logger = logging.getLogger(__name__)
+
+
+
 
 
 @onboarding_bp.route("/dashboard")
@@ -212,45 +216,63 @@ def dashboard():
 
 
 
-    tags_report = {}
+    # Dados do dashboard, métricas de tags e lista de CS são independentes:
 
-    try:
+    # em paralelo, cada um na sua conexão do pool (database/parallel.py)
 
-        tags_report = get_tags_metrics(start_date, end_date, tags_report_email, context="onboarding")
+    leituras = run_parallel(
 
-    except Exception as e:
+        {
 
-        current_app.logger.error(f"Erro ao buscar tags metrics: {e}", exc_info=True)
+            # Usar versão otimizada do dashboard (consolidada)
 
+            "dashboard": lambda: get_dashboard_data(
 
+                user_email,
 
-    try:
+                filtered_cs_email=current_cs_filter,
 
-        # Usar versão otimizada do dashboard (consolidada)
+                context="onboarding",
 
+                search_term=search_term,
 
+                tipo=tipo_filter,
 
+                start_date=start_date,
 
+                end_date=end_date,
 
-        dashboard_data, metrics = get_dashboard_data(
+                date_type=date_type or None,
 
-            user_email,
+            ),
 
-            filtered_cs_email=current_cs_filter,
+            "tags": lambda: get_tags_metrics(start_date, end_date, tags_report_email, context="onboarding"),
 
-            context="onboarding",
+            "cs_users": listar_todos_cs_com_cache,
 
-            search_term=search_term,
+        },
 
-            tipo=tipo_filter,
+        return_exceptions=True,
 
-            start_date=start_date,
+    )
 
-            end_date=end_date,
 
-            date_type=date_type or None,
 
-        )
+    tags_report = {}
+
+    try:
+
+        tags_report = unwrap(leituras["tags"])
+
+    except Exception as e:
+
+        current_app.logger.error(f"Erro ao buscar tags metrics: {e}", exc_info=True)
+
+
+
+    try:
+
+        dashboard_data, metrics = unwrap(leituras["dashboard"])
 
 
 
@@ -306,7 +328,7 @@ def dashboard():
 
 
 
-        all_cs_users = listar_todos_cs_com_cache()
+        all_cs_users = unwrap(leituras["cs_users"])
 
 
 
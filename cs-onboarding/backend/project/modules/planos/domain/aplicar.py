@@ -74,6 +74,10 @@ def aplicar_plano_a_implantacao(implantacao_id: int, plano_id: int, usuario: str
             if db_type == "sqlite":
                 sql_limpar_comentarios = sql_limpar_comentarios.replace("%s", "?")
             cursor.execute(sql_limpar_comentarios, (implantacao_id,))
+            if db_type == "postgres":
+                from ....modules.implantacao.infra.comment_digest import invalidar_digest_comentarios
+
+                invalidar_digest_comentarios(implantacao_id, cursor=cursor)
 
             # Agora deletar os itens do checklist
             sql_limpar = "DELETE FROM checklist_items WHERE implantacao_id = %s"
@@ -454,6 +458,10 @@ def remover_plano_de_implantacao(implantacao_id: int, usuario: str, excluir_come
                 if db_type == "sqlite":
                     sql_excluir_comentarios = sql_excluir_comentarios.replace("%s", "?")
                 cursor.execute(sql_excluir_comentarios, (implantacao_id, implantacao_id))
+                if db_type == "postgres":
+                    from ....modules.implantacao.infra.comment_digest import invalidar_digest_comentarios
+
+                    invalidar_digest_comentarios(implantacao_id, cursor=cursor)
                 current_app.logger.info(f"Comentários da implantação {implantacao_id} excluídos por {usuario}")
             else:
                 # Preservar comentários: desvincular dos itens antes de deletar
@@ -64,32 +64,22 @@ def _normalizar_contexto_csv(raw_contexto, default: str = "onboarding") -> str:
     return ",".join(normalizados)
 
 
-def _contexto_contem(raw_contexto, contexto_busca: str | None) -> bool:
+def _filtro_contexto_sql(contexto_busca: str | None) -> tuple[str, list]:
     """
-    Verifica se um contexto está presente em um valor contexto legado/canônico.
+    Cláusula SQL do filtro por contexto sobre `planos_sucesso.contextos`.
+
+    `contextos` é a versão normalizada (TEXT[] com índice GIN) do CSV legado
+    em `contexto`, mantida por trigger (migration 007). Contexto inválido ou
+    vazio não filtra.
     """
     if not contexto_busca:
-        return True
+        return "", []
     from ....common.context_navigation import normalize_context
 
     ctx = normalize_context(contexto_busca)
     if not ctx:
-        return True
-
-    tokens = _coletar_contextos_brutos(raw_contexto)
-    if not tokens:
-        return False
-
-    normalizados: set[str] = set()
-    for token in tokens:
-        n = normalize_context(token)
-        if n:
-            normalizados.add(n)
-
-    if not normalizados:
-        return False
-
-    return ctx in normalizados
+        return "", []
+    return " AND contextos @> ARRAY[%s]::text[]", [ctx]
 
 
 # O sistema utiliza exclusivamente criar_plano_sucesso_checklist para novos planos.
@@ -339,8 +329,6 @@ def listar_planos_sucesso(
     from typing import Any
     params: list[Any] = []
 
-    contexto_busca = context
-
     if ativo is not None:
         base_sql += " AND ativo = %s"
         params.append(ativo)
@@ -362,36 +350,44 @@ def listar_planos_sucesso(
     elif somente_templates:
         base_sql += " AND processo_id IS NULL"
 
+    filtro_contexto, params_contexto = _filtro_contexto_sql(context)
+    base_sql += filtro_contexto
+    params.extend(params_contexto)
+
     if busca:
+        # ILIKE usa os índices trigram (migration 007); o plano_id IS NOT NULL casa com os índices parciais
         base_sql += """ AND (
-            LOWER(nome) LIKE LOWER(%s) 
-            OR LOWER(descricao) LIKE LOWER(%s)
+            nome ILIKE %s
+            OR descricao ILIKE %s
             OR id IN (
                 SELECT plano_id FROM checklist_items
-                WHERE LOWER(title) LIKE LOWER(%s)
-                   OR LOWER(descricao) LIKE LOWER(%s)
-                   OR LOWER(comment) LIKE LOWER(%s)
+                WHERE plano_id IS NOT NULL
+                  AND (title ILIKE %s OR descricao ILIKE %s OR comment ILIKE %s)
             )
         )"""
         busca_pattern = f"%{busca}%"
         params.extend([busca_pattern] * 5)
 
-    # Busca sem filtro SQL de contexto e filtra em Python para suportar formatos legados.
     sql = "SELECT *" + base_sql + " ORDER BY data_criacao DESC, nome ASC"
-    planos_raw = query_db(sql, tuple(params) if params else ()) or []  # nosec B608
-
-    planos_filtrados = [p for p in planos_raw if _contexto_contem(p.get("contexto"), contexto_busca)]
-
-    total_count = len(planos_filtrados)
-    if offset is not None:
-        planos_filtrados = planos_filtrados[offset:]
+    page_params = list(params)
     if limit is not None:
-        planos_filtrados = planos_filtrados[:limit]
+        sql += " LIMIT %s"
+        page_params.append(limit)
+    if offset:
+        sql += " OFFSET %s"
+        page_params.append(offset)
+    planos = query_db(sql, tuple(page_params)) or []  # nosec B608
 
     from typing import cast, Any
     if retornar_tupla:
-        return cast(tuple[list[dict[str, Any]], int], (planos_filtrados, total_count))
-    return cast(list[dict[str, Any]], planos_filtrados)
+        # Só conta no banco quando a página não revela o total sozinha
+        if limit is None or (len(planos) < limit and (planos or not offset)):
+            total_count = (offset or 0) + len(planos)
+        else:
+            row = query_db("SELECT COUNT(*) AS count" + base_sql, tuple(params), one=True)  # nosec B608
+            total_count = int(row["count"]) if row else 0
+        return cast(tuple[list[dict[str, Any]], int], (planos, total_count))
+    return cast(list[dict[str, Any]], planos)
 
 
 def concluir_plano_sucesso(plano_id: int) -> bool:
@@ -465,19 +461,17 @@ def contar_planos_por_status(
     if somente_templates:
         sql += " AND processo_id IS NULL"
 
-    results = query_db(
-        "SELECT status, contexto " + sql[sql.find(" FROM "):],  # mantém filtros já montados sem GROUP BY
-        tuple(params),
-    )
+    filtro_contexto, params_contexto = _filtro_contexto_sql(context)
+    sql += filtro_contexto
+    params.extend(params_contexto)
+
+    results = query_db(sql + " GROUP BY status", tuple(params))  # nosec B608
 
     counts = {"em_andamento": 0, "concluido": 0}
-    if results:
-        for row in results:
-            if not _contexto_contem(row.get("contexto"), context):
-                continue
-            status_row = row.get("status")
-            if status_row in counts:
-                counts[status_row] += 1
+    for row in results or []:
+        status_row = row.get("status")
+        if status_row in counts:
+            counts[status_row] = int(row["count"])
 
     return counts
 
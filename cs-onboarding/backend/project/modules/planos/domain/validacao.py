@@ -7,7 +7,7 @@ Princípio SOLID: Single Responsibility
 """
 
 from ....common.exceptions import ValidationError
-from ....db import query_db
+from ....config.config_registry import get_config_registry
 
 
 def get_valid_tags():
@@ -16,12 +16,9 @@ def get_valid_tags():
     Fallback para tags hardcoded se tabela não existir.
     """
     try:
-        tags = query_db("""
-            SELECT nome FROM tags_sistema
-            WHERE ativo = true
-        """)
+        tags = get_config_registry().get("tags")
         if tags:
-            return {tag["nome"] for tag in tags}
+            return {tag["nome"] for tag in tags if tag["ativo"]}
     except Exception as exc:
         logger.exception("Unhandled exception", exc_info=True)
         # Fallback para tags hardcoded se tabela não existir ainda
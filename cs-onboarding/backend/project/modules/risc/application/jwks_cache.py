@@ -0,0 +1,216 @@
+"""
+Cache de JWKS (JSON Web Key Set) para validação de tokens RISC.
+
+Evita um GET bloqueante ao Google para cada Security Event Token recebido.
+
+Comportamento:
+- Respeita o Cache-Control max-age devolvido pelo endpoint de certificados
+- Indexa as chaves por `kid` (já convertidas em chave pública, sem re-parse)
+- Renova em background quando o cache está perto de expirar (stale-while-revalidate)
+- Só busca de forma síncrona quando aparece um `kid` desconhecido, com rate limit
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+import jwt
+
+from ....core.http_client import get_http_client
+from ....monitoring.performance_monitoring import track_cache_hit, track_cache_miss
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger("risc")
+
+_MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+# Fallback quando o servidor não envia Cache-Control
+DEFAULT_JWKS_TTL = 3600
+# Intervalo mínimo entre buscas disparadas por `kid` desconhecido
+MIN_REFETCH_INTERVAL = 60
+# Renovação em background quando faltar menos que isso para expirar
+REFRESH_AHEAD_SECONDS = 300
+# Por quanto tempo chaves expiradas ainda são aceitas se o Google estiver inacessível
+MAX_STALE_SECONDS = 86400
+
+
+def parse_max_age(cache_control: str | None, default: int = DEFAULT_JWKS_TTL) -> int:
+    """Extrai o max-age (segundos) de um header Cache-Control."""
+    if not cache_control:
+        return default
+    if "no-store" in cache_control.lower() or "no-cache" in cache_control.lower():
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else default
+
+
+def fetch_jwks(url: str, timeout: int = 10) -> tuple[dict[str, Any], int]:
+    """Busca o JWKS e retorna (jwks, max_age)."""
+    response = get_http_client("google_certs").get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json(), parse_max_age(response.headers.get("Cache-Control"))
+
+
+class JWKSCache:
+    """
+    Cache thread-safe de chaves públicas indexadas por `kid`.
+
+    O `fetcher` recebe a URL e devolve (jwks, max_age), permitindo trocar o
+    transporte HTTP (ou usar um servidor local em testes).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        fetcher: Callable[[str], tuple[dict[str, Any], int]] = fetch_jwks,
+        min_refetch_interval: float = MIN_REFETCH_INTERVAL,
+        refresh_ahead: float = REFRESH_AHEAD_SECONDS,
+        max_stale: float = MAX_STALE_SECONDS,
+    ):
+        self.url = url
+        self._fetcher = fetcher
+        self.min_refetch_interval = min_refetch_interval
+        self.refresh_ahead = refresh_ahead
+        self.max_stale = max_stale
+
+        self._jwks: dict[str, Any] | None = None
+        self._keys: dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._last_fetch: float | None = None
+
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+        self._hits = 0
+        self._misses = 0
+        self._fetches = 0
+        self._fetch_errors = 0
+
+    # ──────────────────────────────────────────────
+    # Busca e indexação
+    # ──────────────────────────────────────────────
+
+    def _index(self, jwks: dict[str, Any]) -> dict[str, Any]:
+        keys: dict[str, Any] = {}
+        for jwk in jwks.get("keys", []):
+            kid = jwk.get("kid")
+            if not kid:
+                continue
+            try:
+                keys[kid] = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(jwk))
+            except Exception as e:
+                logger.warning(f"JWK ignorada (kid={kid}): {e}")
+        return keys
+
+    def refresh(self) -> bool:
+        """Busca o JWKS de forma síncrona. Retorna True em caso de sucesso."""
+        self._last_fetch = time.monotonic()
+        self._fetches += 1
+        try:
+            jwks, max_age = self._fetcher(self.url)
+        except Exception as e:
+            self._fetch_errors += 1
+            logger.error(f"Erro ao obter chaves públicas do Google: {e}", exc_info=True)
+            return False
+
+        keys = self._index(jwks)
+        with self._lock:
+            self._jwks = jwks
+            self._keys = keys
+            self._expires_at = time.monotonic() + max_age
+        logger.info(f"JWKS atualizado: {len(keys)} chave(s), válido por {max_age}s")
+        return True
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name="jwks-refresh", daemon=True).start()
+
+    def _can_refetch(self) -> bool:
+        if self._last_fetch is None:
+            return True
+        return time.monotonic() - self._last_fetch >= self.min_refetch_interval
+
+    # ──────────────────────────────────────────────
+    # API pública
+    # ──────────────────────────────────────────────
+
+    def get_jwks(self) -> dict[str, Any] | None:
+        """Retorna o JWKS bruto (buscando de forma síncrona apenas sem cache utilizável)."""
+        if self._jwks is None or self._is_too_stale(time.monotonic()):
+            if self._can_refetch():
+                self.refresh()
+        else:
+            self._maybe_refresh_ahead()
+        return self._jwks
+
+    def _is_too_stale(self, now: float) -> bool:
+        return now - self._expires_at > self.max_stale
+
+    def _maybe_refresh_ahead(self) -> None:
+        remaining = self._expires_at - time.monotonic()
+        if remaining <= self.refresh_ahead and self._can_refetch():
+            self._refresh_in_background()
+
+    def get_key(self, kid: str | None) -> Any | None:
+        """
+        Retorna a chave pública para o `kid`.
+
+        - Hit: retorna a chave do cache (renova em background se perto de expirar)
+        - Cache vazio, `kid` desconhecido ou cache expirado há mais de max_stale:
+          busca síncrona, limitada por min_refetch_interval
+        """
+        if not kid:
+            return None
+
+        now = time.monotonic()
+        if kid in self._keys and not self._is_too_stale(now):
+            self._hits += 1
+            track_cache_hit("risc_jwks")
+            self._maybe_refresh_ahead()
+            return self._keys[kid]
+
+        self._misses += 1
+        track_cache_miss("risc_jwks")
+        if self._can_refetch():
+            self.refresh()
+        else:
+            logger.warning(f"kid desconhecido ({kid}); nova busca de JWKS bloqueada pelo rate limit")
+            return None
+
+        if self._is_too_stale(time.monotonic()):
+            return None
+        return self._keys.get(kid)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jwks = None
+            self._keys = {}
+            self._expires_at = 0.0
+            self._last_fetch = None
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "keys": sorted(self._keys),
+            "expires_in": max(0, round(self._expires_at - time.monotonic())),
+            "hits": self._hits,
+            "misses": self._misses,
+            "fetches": self._fetches,
+            "fetch_errors": self._fetch_errors,
+        }
@@ -28,8 +28,6 @@ from typing import Any, cast
 
 import jwt
 
-import requests
-
 from flask import current_app
 
 
@@ -40,6 +38,8 @@ from ....config.logging_config import get_logger
 
 from ....db import execute_db, query_db
 
+from .jwks_cache import JWKSCache
+
 
 
 logger = get_logger("risc")
@@ -91,31 +91,19 @@ EVENT_VERIFICATION = "https://schemas.openid.net/secevent/risc/event-type/verifi
 
 
 
-def get_google_jwks() -> dict[str, Any] | None:
-
-    """Obtém as chaves públicas do Google para validação de JWT."""
-
-    try:
-
-        response = requests.get(GOOGLE_JWKS_URL, timeout=10)
-
-        response.raise_for_status()
+# Cache por processo das chaves públicas do Google (indexadas por kid)
 
-        if response.status_code == 200:
+google_jwks_cache = JWKSCache(GOOGLE_JWKS_URL)
 
-            return cast(dict[Any, Any], response.json())
 
-        else:
 
-            logger.error(f"Erro ao obter chaves RISC do Google: {response.status_code} - {response.text}")
 
-            return None
 
-    except Exception as e:
+def get_google_jwks() -> dict[str, Any] | None:
 
-        logger.error(f"Erro ao obter chaves públicas do Google: {e}", exc_info=True)
+    """Obtém as chaves públicas do Google para validação de JWT (via cache)."""
 
-        return None
+    return google_jwks_cache.get_jwks()
 
 
 
@@ -143,18 +131,6 @@ def validate_security_event_token(token: str) -> dict[str, Any] | None:
 
     try:
 
-        # Obter chaves públicas do Google para o kid
-
-        jwks = get_google_jwks()
-
-        if not jwks:
-
-            logger.error("Não foi possível obter chaves públicas do Google")
-
-            return None
-
-
-
         # Decodificar header para obter kid (key ID)
 
         unverified_header = jwt.get_unverified_header(token)
@@ -163,25 +139,19 @@ def validate_security_event_token(token: str) -> dict[str, Any] | None:
 
 
 
-        # Encontrar a chave pública correspondente
-
-        public_key = None
+        # Chave pública do cache (busca no Google apenas para kid desconhecido)
 
-        for key in jwks.get("keys", []):
+        public_key = google_jwks_cache.get_key(kid)
 
-            if key.get("kid") == kid:
-
-                public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-
-                break
+        if not public_key:
 
+            logger.error(f"Chave pública não encontrada para kid: {kid}")
 
+            return None
 
-        if not public_key:
 
-            logger.error(f"Chave pública não encontrada para kid: {kid}")
 
-            # Validar e decodificar token
+        # Validar e decodificar token
 
         payload = jwt.decode(
 
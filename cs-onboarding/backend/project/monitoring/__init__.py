@@ -1,3 +1,4 @@
+from .metrics import init_metrics, observe_query, record_cache
 from .performance_monitoring import (
     PerformanceMonitor,
     monitor_function,
@@ -9,8 +10,11 @@ from .performance_monitoring import (
 
 __all__ = [
     "PerformanceMonitor",
+    "init_metrics",
     "monitor_function",
+    "observe_query",
     "performance_monitor",
+    "record_cache",
     "track_cache_hit",
     "track_cache_miss",
     "track_query",
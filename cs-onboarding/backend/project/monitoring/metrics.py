@@ -0,0 +1,297 @@
+"""
+Registro de métricas no formato Prometheus, agregado entre os workers do gunicorn.
+
+`PerformanceMonitor` e `QueryProfiler` guardam listas por processo e o
+`/health/metrics` só enxerga o worker que atendeu a requisição. Aqui as
+métricas ficam em histogramas de buckets fixos (`prometheus_client`), que em
+modo multiprocesso gravam em arquivos mmap por PID no diretório
+`PROMETHEUS_MULTIPROC_DIR`; o `/metrics` soma todos os workers na leitura.
+
+Métricas:
+- csapp_http_request_duration_seconds{endpoint, method, status}
+- csapp_db_query_duration_seconds{fingerprint, statement}
+- csapp_cache_requests_total{resource, result}
+- csapp_event_handler_duration_seconds{event, handler}
+- csapp_event_handler_errors_total{event, handler}
+- csapp_db_pool_wait_seconds / csapp_db_pool_timeouts_total
+
+Modo multiprocesso: o `gunicorn.conf.py` define `PROMETHEUS_MULTIPROC_DIR`
+(antes de a app ser importada) e limpa os arquivos de workers encerrados.
+Sem a variável, o registro é o padrão do processo (dev / `flask run`).
+
+`prometheus_client` é opcional: sem ele as funções de observação não fazem
+nada e o `/metrics` responde 503.
+
+Uso:
+    from ..monitoring.metrics import observe_query, record_cache
+
+    observe_query(sql, elapsed_seconds)
+    record_cache("dashboard", hit=True)
+
+    # Exposição (registrado por init_metrics no create_app)
+    GET /metrics   (Authorization: Bearer $METRICS_TOKEN; sem token, só aberto em development)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from flask import Response, g, request
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger("performance")
+
+# Token exigido no /metrics. Sem token o endpoint só fica aberto em development:
+# nos demais ambientes responde 401 (fail closed)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Limite de fingerprints distintos por processo (o excedente vira "other")
+MAX_QUERY_FINGERPRINTS = int(os.environ.get("METRICS_MAX_QUERY_FINGERPRINTS", "500"))
+
+# Buckets fixos (segundos)
+REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+HANDLER_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# ──────────────────────────────────────────────
+# Definição das métricas
+# ──────────────────────────────────────────────
+
+if PROMETHEUS_AVAILABLE:
+    REQUEST_LATENCY = Histogram(
+        "csapp_http_request_duration_seconds",
+        "Latência das requisições HTTP por rota",
+        ("endpoint", "method", "status"),
+        buckets=REQUEST_BUCKETS,
+    )
+    QUERY_LATENCY = Histogram(
+        "csapp_db_query_duration_seconds",
+        "Latência das queries por fingerprint (SQL normalizado)",
+        ("fingerprint", "statement"),
+        buckets=QUERY_BUCKETS,
+    )
+    CACHE_REQUESTS = Counter(
+        "csapp_cache_requests",
+        "Leituras de cache por recurso e resultado (hit/miss)",
+        ("resource", "result"),
+    )
+    EVENT_HANDLER_LATENCY = Histogram(
+        "csapp_event_handler_duration_seconds",
+        "Tempo de execução dos handlers do EventBus",
+        ("event", "handler"),
+        buckets=HANDLER_BUCKETS,
+    )
+    EVENT_HANDLER_ERRORS = Counter(
+        "csapp_event_handler_errors",
+        "Handlers do EventBus que levantaram exceção",
+        ("event", "handler"),
+    )
+    POOL_WAIT = Histogram(
+        "csapp_db_pool_wait_seconds",
+        "Espera por uma conexão do pool (psycopg2 e SQLAlchemy)",
+        buckets=POOL_WAIT_BUCKETS,
+    )
+    POOL_TIMEOUTS = Counter(
+        "csapp_db_pool_timeouts",
+        "Checkouts do pool que estouraram DB_POOL_TIMEOUT",
+    )
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+# ──────────────────────────────────────────────
+# Fingerprint de queries
+# ──────────────────────────────────────────────
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_STATEMENT = re.compile(r"^\s*(WITH|SELECT|INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+([\w.\"]+)?", re.IGNORECASE)
+_FROM_TABLE = re.compile(r"\bFROM\s+([\w.\"]+)", re.IGNORECASE)
+
+_fingerprints: set[str] = set()
+_fingerprints_lock = threading.Lock()
+
+
+def _statement_label(normalized: str) -> str:
+    """Rótulo legível do fingerprint: verbo + tabela principal (ex.: "select implantacoes")."""
+    match = _STATEMENT.match(normalized)
+    if not match:
+        return normalized.split(" ", 1)[0].lower() or "unknown"
+    verb = match.group(1).split()[0].lower()
+    table = match.group(2) or ""
+    if verb in ("select", "with"):
+        from_match = _FROM_TABLE.search(normalized)
+        table = from_match.group(1) if from_match else ""
+    table = table.strip('"').lower()
+    return f"{verb} {table}".strip()
+
+
+@lru_cache(maxsize=2048)
+def query_fingerprint(query: str) -> tuple[str, str]:
+    """
+    (fingerprint, statement) de uma query: hash curto do SQL sem literais,
+    com espaços colapsados e listas de placeholders `IN (%s, %s, ...)` unificadas.
+    """
+    normalized = _STRING_LITERAL.sub("?", query)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    normalized = _PLACEHOLDER_LIST.sub("(?+)", normalized)
+    digest = hashlib.sha1(normalized.encode("utf-8"), usedforsecurity=False).hexdigest()[:12]
+    return digest, _statement_label(normalized)
+
+
+def _bounded_fingerprint(query: Any) -> tuple[str, str]:
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    if not isinstance(query, str):
+        return "dynamic", "dynamic"
+
+    fingerprint, statement = query_fingerprint(query)
+    if fingerprint in _fingerprints:
+        return fingerprint, statement
+    with _fingerprints_lock:
+        if len(_fingerprints) >= MAX_QUERY_FINGERPRINTS:
+            return "other", "other"
+        _fingerprints.add(fingerprint)
+    return fingerprint, statement
+
+
+# ──────────────────────────────────────────────
+# Observação
+# ──────────────────────────────────────────────
+
+
+def observe_query(query: Any, seconds: float) -> None:
+    """Registra a latência de uma query executada."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    try:
+        QUERY_LATENCY.labels(*_bounded_fingerprint(query)).observe(seconds)
+    except Exception as e:
+        logger.debug(f"Falha ao registrar latência de query: {e}")
+
+
+def record_cache(resource: str, hit: bool) -> None:
+    """Registra uma leitura de cache (hit ou miss) do recurso."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    CACHE_REQUESTS.labels(resource, "hit" if hit else "miss").inc()
+
+
+def observe_event_handler(event: str, handler: str, seconds: float, failed: bool = False) -> None:
+    """Registra o tempo de um handler do EventBus (e a falha, se houver)."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    EVENT_HANDLER_LATENCY.labels(event, handler).observe(seconds)
+    if failed:
+        EVENT_HANDLER_ERRORS.labels(event, handler).inc()
+
+
+def observe_pool_checkout(seconds: float, timed_out: bool = False) -> None:
+    """Registra a espera por uma conexão do pool (e o timeout, se houver)."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    POOL_WAIT.observe(seconds)
+    if timed_out:
+        POOL_TIMEOUTS.inc()
+
+
+def _status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Texto de exposição Prometheus (somando os workers em modo multiprocesso)."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# ──────────────────────────────────────────────
+# Integração com o Flask
+# ──────────────────────────────────────────────
+
+
+def _open_without_token() -> bool:
+    return os.environ.get("FLASK_ENV", "production") == "development"
+
+
+def _authorized() -> bool:
+    if not METRICS_TOKEN:
+        return _open_without_token()
+    header = request.headers.get("Authorization", "")
+    return hmac.compare_digest(header, f"Bearer {METRICS_TOKEN}")
+
+
+def init_metrics(app: Flask) -> None:
+    """Registra os hooks de latência por rota e o endpoint `/metrics`."""
+    if not PROMETHEUS_AVAILABLE:
+        app.logger.info("prometheus_client não instalado: /metrics desabilitado")
+
+    @app.before_request
+    def _metrics_start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _metrics_observe_request(response):
+        started = g.pop("_metrics_started", None)
+        if started is None or not PROMETHEUS_AVAILABLE:
+            return response
+        endpoint = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        if endpoint == "/metrics":
+            return response
+        REQUEST_LATENCY.labels(endpoint, request.method, _status_class(response.status_code)).observe(
+            time.perf_counter() - started
+        )
+        return response
+
+    if "prometheus_metrics" in app.view_functions:
+        return
+
+    @app.route("/metrics", methods=["GET"])
+    def prometheus_metrics():
+        if not PROMETHEUS_AVAILABLE:
+            return Response("prometheus_client não instalado\n", status=503, mimetype="text/plain")
+        if not _authorized():
+            return Response("Não autorizado\n", status=401, mimetype="text/plain")
+        payload, content_type = render_metrics()
+        return Response(payload, status=200, headers={"Content-Type": content_type})
+
+    if not METRICS_TOKEN and not _open_without_token():
+        app.logger.warning("METRICS_TOKEN não configurado: /metrics responderá 401")
+    if multiprocess_enabled():
+        app.logger.info("Métricas Prometheus em modo multiprocesso")
@@ -0,0 +1,271 @@
+"""
+Detector de N+1 por requisição (desenvolvimento / staging / testes).
+
+Com `N_PLUS_ONE_DETECTION` ligado, o pool entrega conexões cujo cursor
+registra cada statement executado (via `query_db`, `execute_db` ou cursores
+de `db_transaction_with_lock`). Cada statement é normalizado no mesmo
+fingerprint das métricas (`query_fingerprint`) e contado por requisição;
+fingerprints repetidos `N_PLUS_ONE_THRESHOLD` vezes ou mais são reportados
+como N+1, com a pilha de chamadas do código da aplicação no momento em que
+o limite foi atingido (ex.: o loop por ancestral do toggle de item).
+
+Modos (`N_PLUS_ONE_DETECTION`):
+- off:   desligado (padrão em produção; cursor comum, custo zero)
+- log:   loga um WARNING por requisição com N+1 (padrão em desenvolvimento)
+- raise: levanta NPlusOneError no fim da requisição (padrão em testes)
+
+O relatório acumulado por endpoint fica em `get_n_plus_one_report()`
+(exposto em /health/metrics).
+
+Uso:
+    # Requisições: automático (init_n_plus_one_detection no create_app)
+
+    # Código fora de requisição (jobs, testes de serviço)
+    from backend.project.monitoring.n_plus_one import n_plus_one_scope
+
+    with app.app_context(), n_plus_one_scope("clonar_plano", mode="raise") as scope:
+        clonar_plano_service(...)
+    scope.total  # statements executados no bloco
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from flask import current_app, g, has_app_context, request
+
+from .metrics import query_fingerprint
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from flask import Flask
+
+logger = logging.getLogger("performance")
+
+MODE_OFF = "off"
+MODE_LOG = "log"
+MODE_RAISE = "raise"
+MODES = (MODE_OFF, MODE_LOG, MODE_RAISE)
+
+# Repetições do mesmo fingerprint na requisição a partir das quais é N+1
+DEFAULT_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", "5"))
+
+# Frames do código da aplicação guardados por ocorrência
+STACK_DEPTH = 8
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+_IGNORED_FRAMES = (
+    str(_PROJECT_ROOT / "monitoring"),
+    str(_PROJECT_ROOT / "database"),
+    str(_PROJECT_ROOT / "db.py"),
+)
+
+
+class NPlusOneError(RuntimeError):
+    """Statement repetido acima do limite em uma requisição (modo raise)."""
+
+    def __init__(self, scope: str, findings: list[dict[str, Any]]):
+        self.scope = scope
+        self.findings = findings
+        details = "; ".join(
+            f"{f['count']}x {f['statement']} em {f['stack'][0] if f['stack'] else '?'}" for f in findings
+        )
+        super().__init__(f"N+1 detectado em {scope}: {details}")
+
+
+@dataclass
+class _Statement:
+    statement: str
+    sample: str
+    count: int = 0
+    stack: list[str] = field(default_factory=list)
+
+
+@dataclass
+class _Scope:
+    name: str
+    mode: str
+    threshold: int
+    statements: dict[str, _Statement] = field(default_factory=dict)
+    total: int = 0
+
+    def findings(self) -> list[dict[str, Any]]:
+        return sorted(
+            (
+                {
+                    "fingerprint": fingerprint,
+                    "statement": s.statement,
+                    "count": s.count,
+                    "sample": s.sample,
+                    "stack": s.stack,
+                }
+                for fingerprint, s in self.statements.items()
+                if s.count >= self.threshold
+            ),
+            key=lambda f: f["count"],
+            reverse=True,
+        )
+
+
+# ──────────────────────────────────────────────
+# Relatório acumulado por endpoint (por processo)
+# ──────────────────────────────────────────────
+
+_report: dict[str, dict[str, dict[str, Any]]] = {}
+_report_lock = threading.Lock()
+
+
+def _accumulate(scope: str, findings: list[dict[str, Any]]) -> None:
+    with _report_lock:
+        entries = _report.setdefault(scope, {})
+        for f in findings:
+            entry = entries.setdefault(
+                f["fingerprint"],
+                {"statement": f["statement"], "sample": f["sample"], "occurrences": 0, "max_count": 0},
+            )
+            entry["occurrences"] += 1
+            entry["max_count"] = max(entry["max_count"], f["count"])
+            entry["stack"] = f["stack"]
+
+
+def get_n_plus_one_report() -> dict[str, Any]:
+    """N+1 detectados por endpoint desde o início do processo."""
+    mode = current_app.config.get("N_PLUS_ONE_DETECTION", MODE_OFF) if has_app_context() else MODE_OFF
+    with _report_lock:
+        endpoints = {name: dict(entries) for name, entries in _report.items()}
+    return {"mode": mode, "threshold": DEFAULT_THRESHOLD, "endpoints": endpoints}
+
+
+def reset_n_plus_one_report() -> None:
+    with _report_lock:
+        _report.clear()
+
+
+# ──────────────────────────────────────────────
+# Coleta
+# ──────────────────────────────────────────────
+
+
+def _call_site_stack() -> list[str]:
+    """Frames do código da aplicação (mais interno primeiro), sem db/pool/monitoramento."""
+    frames = []
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if not filename.startswith(str(_PROJECT_ROOT)) or filename.startswith(_IGNORED_FRAMES):
+            continue
+        frames.append(f"{Path(filename).relative_to(_PROJECT_ROOT)}:{frame.lineno} in {frame.name}")
+        if len(frames) >= STACK_DEPTH:
+            break
+    return frames
+
+
+def record_statement(query: Any) -> None:
+    """Conta o statement no escopo ativo (chamado pelo cursor instrumentado)."""
+    if not has_app_context():
+        return
+    scope: _Scope | None = g.get("_n_plus_one_scope")
+    if scope is None:
+        return
+
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    if not isinstance(query, str):
+        return
+
+    fingerprint, statement = query_fingerprint(query)
+    entry = scope.statements.get(fingerprint)
+    if entry is None:
+        entry = scope.statements[fingerprint] = _Statement(statement=statement, sample=" ".join(query.split())[:200])
+    entry.count += 1
+    scope.total += 1
+    if entry.count == scope.threshold:
+        entry.stack = _call_site_stack()
+
+
+def _start(name: str, mode: str, threshold: int) -> _Scope | None:
+    previous = g.get("_n_plus_one_scope")
+    g._n_plus_one_scope = _Scope(name=name, mode=mode, threshold=threshold)
+    return previous
+
+
+def _finish(previous: _Scope | None) -> None:
+    scope: _Scope | None = g.pop("_n_plus_one_scope", None)
+    if previous is not None:
+        g._n_plus_one_scope = previous
+    if scope is None:
+        return
+
+    findings = scope.findings()
+    if not findings:
+        return
+
+    _accumulate(scope.name, findings)
+    for f in findings:
+        logger.warning(
+            f"N+1 em {scope.name}: {f['count']}x [{f['statement']}] {f['sample']} | "
+            f"origem: {' <- '.join(f['stack']) or '?'}"
+        )
+    if scope.mode == MODE_RAISE:
+        raise NPlusOneError(scope.name, findings)
+
+
+@contextmanager
+def n_plus_one_scope(name: str, mode: str | None = None, threshold: int | None = None) -> Iterator[_Scope | None]:
+    """
+    Detecta N+1 em um bloco de código (app context necessário; o cursor precisa estar instrumentado).
+
+    Entrega o escopo (`total` de statements e `findings()`), ou None com a detecção desligada.
+    """
+    mode = mode or current_app.config.get("N_PLUS_ONE_DETECTION", MODE_OFF)
+    if mode == MODE_OFF:
+        yield None
+        return
+
+    previous = _start(name, mode, threshold or DEFAULT_THRESHOLD)
+    try:
+        yield g._n_plus_one_scope
+    except BaseException:
+        g.pop("_n_plus_one_scope", None)
+        if previous is not None:
+            g._n_plus_one_scope = previous
+        raise
+    _finish(previous)
+
+
+def detection_enabled(app: Flask) -> bool:
+    return app.config.get("N_PLUS_ONE_DETECTION", MODE_OFF) != MODE_OFF
+
+
+def init_n_plus_one_detection(app: Flask) -> None:
+    """Abre um escopo de detecção por requisição quando `N_PLUS_ONE_DETECTION` != off."""
+    mode = app.config.get("N_PLUS_ONE_DETECTION", MODE_OFF)
+    if mode not in MODES:
+        app.logger.warning(f"N_PLUS_ONE_DETECTION inválido ({mode!r}); detector desligado")
+        app.config["N_PLUS_ONE_DETECTION"] = MODE_OFF
+        return
+    if mode == MODE_OFF:
+        return
+
+    threshold = int(app.config.get("N_PLUS_ONE_THRESHOLD", DEFAULT_THRESHOLD))
+
+    @app.before_request
+    def _n_plus_one_start():
+        if request.path.startswith("/static/"):
+            return
+        endpoint = request.url_rule.rule if request.url_rule is not None else request.path
+        _start(f"{request.method} {endpoint}", mode, threshold)
+
+    @app.after_request
+    def _n_plus_one_finish(response):
+        _finish(None)
+        return response
+
+    app.logger.info(f"Detector de N+1 ativo (modo {mode}, limite {threshold})")
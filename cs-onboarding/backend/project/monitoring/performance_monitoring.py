@@ -1,8 +1,11 @@
 import time
+from collections import deque
 from datetime import datetime, timezone
 from functools import wraps
 
-from flask import current_app, g, request
+from flask import current_app, g, has_app_context, request
+
+from .metrics import record_cache
 
 
 class PerformanceMonitor:
@@ -17,8 +20,8 @@ class PerformanceMonitor:
     """
 
     def __init__(self, app=None):
-        self.metrics = []
         self.max_metrics = 1000
+        self.metrics = deque(maxlen=self.max_metrics)
 
         if app:
             self.init_app(app)
@@ -47,7 +50,7 @@ class PerformanceMonitor:
 
                 return {
                     "total_requests": len(self.metrics),
-                    "recent_metrics": self.metrics[-100:],
+                    "recent_metrics": list(self.metrics)[-100:],
                     "summary": self.get_summary(),
                 }
 
@@ -77,9 +80,6 @@ class PerformanceMonitor:
 
             self.metrics.append(metric)
 
-            if len(self.metrics) > self.max_metrics:
-                self.metrics = self.metrics[-self.max_metrics :]
-
             if elapsed > 1.0:
                 current_app.logger.warning(
                     f"Slow request: {request.method} {request.path} "
@@ -127,15 +127,17 @@ def track_query():
         g.query_count += 1
 
 
-def track_cache_hit():
-    """Incrementa contador de cache hits."""
-    if hasattr(g, "cache_hits"):
+def track_cache_hit(resource="default"):
+    """Incrementa contador de cache hits (request atual e métrica por recurso)."""
+    record_cache(resource, hit=True)
+    if has_app_context() and hasattr(g, "cache_hits"):
         g.cache_hits += 1
 
 
-def track_cache_miss():
-    """Incrementa contador de cache misses."""
-    if hasattr(g, "cache_misses"):
+def track_cache_miss(resource="default"):
+    """Incrementa contador de cache misses (request atual e métrica por recurso)."""
+    record_cache(resource, hit=False)
+    if has_app_context() and hasattr(g, "cache_misses"):
         g.cache_misses += 1
 
 
@@ -1,10 +1,27 @@
 import secrets
 from datetime import UTC
+from urllib.parse import urlparse
 
 from flask import g, request
 
 
+def _direct_upload_origins(app):
+    """Origens do storage (endpoint e virtual host do bucket) liberadas no connect-src."""
+    if not app.config.get("R2_DIRECT_UPLOAD", False):
+        return ""
+    endpoint = urlparse(app.config.get("R2_ENDPOINT_URL") or "")
+    if not endpoint.netloc:
+        return ""
+    origins = [f"{endpoint.scheme}://{endpoint.netloc}"]
+    bucket = app.config.get("CLOUDFLARE_BUCKET_NAME")
+    if bucket:
+        origins.append(f"{endpoint.scheme}://{bucket}.{endpoint.netloc}")
+    return " " + " ".join(origins)
+
+
 def init_security_headers(app):
+    upload_origins = _direct_upload_origins(app)
+
     @app.before_request
     def ensure_csp_nonce():
         if not getattr(g, "csp_nonce", None):
@@ -27,7 +44,7 @@ def init_security_headers(app):
             "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com https://fonts.googleapis.com",
             "font-src 'self' https://fonts.gstatic.com https://cdn.jsdelivr.net https://cdnjs.cloudflare.com",
             "img-src 'self' data: https: blob:",
-            "connect-src 'self' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com https://unpkg.com",
+            "connect-src 'self' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com https://unpkg.com" + upload_origins,
             "frame-ancestors 'self'",  # Permite iframes do mesmo domínio
             "base-uri 'self'",
             "form-action 'self'",
@@ -56,11 +73,15 @@ def init_security_headers(app):
         # Configurar Cache-Control baseado no tipo de conteúdo/rota
         if request.path.startswith("/static/"):
             # Arquivos estáticos: cache longo com revalidação (1 ano)
-            # O cache-busting é feito via query string (?v=timestamp)
+            # O cache-busting é feito pelo hash no nome (manifest) ou via query string (?v=timestamp)
             response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
         elif request.path.startswith("/api/") or request.path.startswith("/checklist/"):
-            # Rotas de API: NUNCA cachear
-            response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, private, max-age=0"
+            # Rotas de API: NUNCA cachear. Respostas com ETag (árvore do checklist) podem ficar
+            # no cache privado do navegador, mas são sempre revalidadas (304 se não mudaram)
+            if response.headers.get("ETag"):
+                response.headers["Cache-Control"] = "private, no-cache, must-revalidate, max-age=0"
+            else:
+                response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, private, max-age=0"
             response.headers["Pragma"] = "no-cache"
             response.headers["Expires"] = "0"
             # Adicionar timestamp para debugging de cache
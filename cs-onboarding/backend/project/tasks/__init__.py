@@ -3,9 +3,14 @@ from .async_tasks import (
     send_email_async,
     send_notification_async,
 )
+from .job_queue import JobQueue, JobRejectedError, maintenance_jobs, summary_jobs
 
 __all__ = [
     "BackgroundTask",
+    "JobQueue",
+    "JobRejectedError",
+    "maintenance_jobs",
     "send_email_async",
     "send_notification_async",
+    "summary_jobs",
 ]
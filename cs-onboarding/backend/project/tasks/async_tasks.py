@@ -1,11 +1,30 @@
+import os
 import threading
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 from flask import current_app
 
 from ..mail.email_utils import send_email_global
 
+# Threads do pool compartilhado de BackgroundTask.submit_with_app_context
+BACKGROUND_WORKERS = int(os.environ.get("BACKGROUND_WORKERS", "4"))
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool por processo (recriado após fork do gunicorn)."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="background")
+            _executor_pid = os.getpid()
+        return _executor
+
 
 class BackgroundTask:
     """
@@ -72,6 +91,27 @@ class BackgroundTask:
         thread.start()
         return thread
 
+    @staticmethod
+    def submit_with_app_context(app, func: Callable, *args, **kwargs) -> Future:
+        """
+        Como run_with_app_context, mas no pool limitado de threads (BACKGROUND_WORKERS),
+        sem criar uma thread por chamada. Indicado para tarefas curtas e frequentes.
+
+        Exemplo:
+            BackgroundTask.submit_with_app_context(
+                current_app._get_current_object(), log_action, action="VIEW", ...
+            )
+        """
+
+        def wrapper():
+            with app.app_context():
+                try:
+                    func(*args, **kwargs)
+                except Exception as e:
+                    app.logger.error(f"Background task error: {e}", exc_info=True)
+
+        return _get_executor().submit(wrapper)
+
 
 def send_email_async(
     subject: str,
@@ -0,0 +1,280 @@
+"""
+Fila de jobs em background com pool limitado de workers.
+
+Para operações lentas (ex.: resumo com Gemini) que não devem prender um worker
+sync do gunicorn (--timeout 60). A requisição enfileira o job e devolve um id;
+o cliente consulta o status até o job terminar.
+
+Inclui:
+- Pool de threads limitado (JOB_WORKERS) e limite de jobs pendentes (JOB_MAX_PENDING)
+- Limite de jobs simultâneos por usuário (JOB_PER_USER_LIMIT)
+- Deduplicação: o mesmo `dedupe_key` ativo devolve o job já existente
+- Estágio de progresso reportado pela própria função
+- Status espelhado no cache da app (Redis, quando configurado), para que o
+  polling funcione mesmo caindo em outro worker do gunicorn
+
+Uso:
+    from backend.project.tasks.job_queue import summary_jobs
+
+    job = summary_jobs.submit(
+        "resumo", gerar_resumo, impl_id, owner=g.user_email, dedupe_key=f"resumo:{impl_id}"
+    )
+    summary_jobs.get(job.id)  # {"id": ..., "status": "running", "stage": "gerando", ...}
+
+A função recebe o kwarg `progress` (callable que recebe o nome do estágio).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from flask import current_app, has_app_context
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from flask import Flask
+
+logger = logging.getLogger("app")
+
+# Configurações da fila (podem ser sobrescritas via env vars)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.environ.get("JOB_MAX_PENDING", "20"))
+JOB_PER_USER_LIMIT = int(os.environ.get("JOB_PER_USER_LIMIT", "2"))
+JOB_RESULT_TTL_SECONDS = int(os.environ.get("JOB_RESULT_TTL_SECONDS", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobRejectedError(Exception):
+    """Fila cheia ou limite de jobs simultâneos do usuário atingido."""
+
+
+@dataclass
+class Job:
+    """Estado de um job enfileirado."""
+
+    id: str
+    kind: str
+    owner: str | None = None
+    dedupe_key: str | None = None
+    meta: dict[str, Any] = field(default_factory=dict)
+    status: str = QUEUED
+    stage: str | None = None
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "meta": self.meta,
+            "created_at": self.created_at,
+        }
+        if self.started_at:
+            data["wait_ms"] = int((self.started_at - self.created_at) * 1000)
+        if self.finished_at and self.started_at:
+            data["duration_ms"] = int((self.finished_at - self.started_at) * 1000)
+        if self.status == DONE:
+            data["result"] = self.result
+        if self.status == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """
+    Fila de jobs por processo, executada em um ThreadPoolExecutor limitado.
+
+    O executor é recriado após fork (gunicorn --preload): threads não sobrevivem ao fork.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int = JOB_WORKERS,
+        max_pending: int = JOB_MAX_PENDING,
+        per_user_limit: int = JOB_PER_USER_LIMIT,
+        result_ttl: int = JOB_RESULT_TTL_SECONDS,
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.per_user_limit = per_user_limit
+        self.result_ttl = result_ttl
+
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_pid: int | None = None
+
+        self._submitted = 0
+        self._rejected = 0
+        self._deduplicated = 0
+        self._failed = 0
+
+    # ──────────────────────────────────────────────
+    # Execução
+    # ──────────────────────────────────────────────
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                # Checagem dupla: duas requisições concorrentes no processo novo não
+                # podem criar dois executores nem apagar o job que a outra acabou de registrar
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix=f"jobs-{self.name}"
+                    )
+                    self._jobs = {}
+                    self._executor_pid = pid
+        return self._executor
+
+    def _cache_key(self, job_id: str) -> str:
+        return f"job_{self.name}_{job_id}"
+
+    def _publish(self, job: Job) -> None:
+        """Espelha o status no cache compartilhado (melhor esforço)."""
+        if not has_app_context():
+            return
+        try:
+            from ..config import cache_config
+
+            if cache_config.cache:
+                cache_config.cache.set(self._cache_key(job.id), job.to_dict(), timeout=self.result_ttl)
+        except Exception as e:
+            logger.debug(f"Falha ao publicar status do job {job.id}: {e}")
+
+    def _run(self, app: Flask, job: Job, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        with app.app_context():
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._publish(job)
+
+            def progress(stage: str) -> None:
+                job.stage = stage
+                self._publish(job)
+
+            try:
+                job.result = func(*args, progress=progress, **kwargs)
+                job.status = DONE
+            except Exception as e:
+                with self._lock:
+                    self._failed += 1
+                job.error = str(e) or e.__class__.__name__
+                job.status = FAILED
+                logger.error(f"Job {self.name}/{job.kind} {job.id} falhou: {e}", exc_info=True)
+            finally:
+                job.finished_at = time.time()
+                self._publish(job)
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if not job.active and job.finished_at and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    # ──────────────────────────────────────────────
+    # API pública
+    # ──────────────────────────────────────────────
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Any],
+        *args: Any,
+        owner: str | None = None,
+        dedupe_key: str | None = None,
+        meta: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Job:
+        """
+        Enfileira `func(*args, progress=..., **kwargs)`.
+
+        Raises:
+            JobRejectedError: fila cheia ou usuário com jobs demais em andamento
+        """
+        app = current_app._get_current_object()  # type: ignore[attr-defined]
+        executor = self._get_executor()
+
+        with self._lock:
+            self._purge_expired(time.time())
+            active = [j for j in self._jobs.values() if j.active]
+
+            if dedupe_key:
+                existing = next((j for j in active if j.dedupe_key == dedupe_key), None)
+                if existing:
+                    self._deduplicated += 1
+                    return existing
+
+            if len(active) >= self.max_pending:
+                self._rejected += 1
+                raise JobRejectedError("Fila de processamento cheia. Tente novamente em instantes.")
+            if owner and sum(1 for j in active if j.owner == owner) >= self.per_user_limit:
+                self._rejected += 1
+                raise JobRejectedError("Voce ja possui solicitacoes em andamento. Aguarde a conclusao.")
+
+            job = Job(id=uuid.uuid4().hex, kind=kind, owner=owner, dedupe_key=dedupe_key, meta=meta or {})
+            self._jobs[job.id] = job
+            self._submitted += 1
+
+        self._publish(job)
+        executor.submit(self._run, app, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """Status do job (local ou, se executado em outro worker, via cache compartilhado)."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        try:
+            from ..config import cache_config
+
+            if cache_config.cache:
+                return cache_config.cache.get(self._cache_key(job_id))
+        except Exception as e:
+            logger.debug(f"Falha ao ler status do job {job_id}: {e}")
+        return None
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "workers": self.max_workers,
+            "queued": sum(1 for j in jobs if j.status == QUEUED),
+            "running": sum(1 for j in jobs if j.status == RUNNING),
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "deduplicated": self._deduplicated,
+            "failed": self._failed,
+        }
+
+
+# Fila dos resumos de IA (instância global, por processo)
+summary_jobs = JobQueue("summary")
+
+# Fila de manutenção (exclusões em lote): um worker, para não competir por locks consigo mesma
+maintenance_jobs = JobQueue("maintenance", max_workers=1)
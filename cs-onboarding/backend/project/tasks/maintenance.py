@@ -0,0 +1,114 @@
+"""
+Tarefas de manutenção periódicas executadas pelo scheduler (tasks/scheduler.py).
+
+- normalizar_status: 'atrasada' → 'andamento' (antes feito ao renderizar o dashboard)
+- reparar_implantacoes: relink de planos e checklists vazios (antes feito no GET dos detalhes)
+- limpar_excluidos: remove registros com soft delete antigo, em lotes
+- atualizar_configuracoes: recarrega o registro/cache de configurações
+- reconciliar_rollup_comentarios: reconstrói o rollup diário de tags de comentários
+
+Intervalos em segundos, ajustáveis por env (MAINTENANCE_<TAREFA>_INTERVAL).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .scheduler import Scheduler
+
+# Limite de implantações reparadas por execução (o restante fica para a próxima)
+MAINTENANCE_REPAIR_BATCH = int(os.environ.get("MAINTENANCE_REPAIR_BATCH", "50"))
+# Retenção dos registros com soft delete antes da remoção definitiva
+MAINTENANCE_SOFT_DELETE_DAYS = int(os.environ.get("MAINTENANCE_SOFT_DELETE_DAYS", "30"))
+
+
+def _interval(name: str, default: int) -> int:
+    return int(os.environ.get(f"MAINTENANCE_{name.upper()}_INTERVAL", str(default)))
+
+
+def normalizar_status() -> dict[str, Any]:
+    from ..modules.implantacao.domain.reparos import normalizar_status_atrasada
+
+    return {"normalizadas": normalizar_status_atrasada()}
+
+
+def _cursores_reparo() -> dict[str, int]:
+    """Cursores da varredura salvos no resultado da última execução (manutencao_execucoes)."""
+    from ..db import query_db
+
+    row = query_db("SELECT resultado FROM manutencao_execucoes WHERE tarefa = %s", ("reparar_implantacoes",), one=True)
+    try:
+        resultado = json.loads(row["resultado"]) if row and row.get("resultado") else {}
+    except ValueError:
+        resultado = {}
+    cursores = resultado.get("cursores") if isinstance(resultado, dict) else None
+    return cursores if isinstance(cursores, dict) else {}
+
+
+def reparar_implantacoes() -> dict[str, Any]:
+    from ..modules.implantacao.domain.reparos import (
+        corrigir_planos_template,
+        relinkar_planos_sem_vinculo,
+        reparar_checklists_vazios,
+    )
+
+    cursores = _cursores_reparo()
+    planos_corrigidos, cursor_planos = corrigir_planos_template(
+        MAINTENANCE_REPAIR_BATCH, int(cursores.get("planos_template") or 0)
+    )
+    checklists_reparados, cursor_checklists = reparar_checklists_vazios(
+        MAINTENANCE_REPAIR_BATCH, int(cursores.get("checklists") or 0)
+    )
+    return {
+        "planos_religados": relinkar_planos_sem_vinculo(),
+        "planos_template_corrigidos": planos_corrigidos,
+        "checklists_reparados": checklists_reparados,
+        # Lidos pela próxima execução: continua depois do último id visto
+        "cursores": {"planos_template": cursor_planos, "checklists": cursor_checklists},
+    }
+
+
+def limpar_excluidos() -> dict[str, Any]:
+    """Só as tabelas da whitelist do soft delete que de fato têm `deleted_at`."""
+    from ..database.soft_delete import ALLOWED_TABLES, cleanup_old_deleted_records
+    from ..db import query_db
+
+    rows = (
+        query_db(
+            """
+        SELECT table_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND column_name = 'deleted_at' AND table_name = ANY(%s)
+        """,
+            (list(ALLOWED_TABLES),),
+            raise_on_error=True,
+        )
+        or []
+    )
+    return {r["table_name"]: cleanup_old_deleted_records(r["table_name"], MAINTENANCE_SOFT_DELETE_DAYS) for r in rows}
+
+
+def atualizar_configuracoes() -> dict[str, Any]:
+    from ..config.cache_warming import refresh_config_cache
+
+    return refresh_config_cache()
+
+
+def reconciliar_rollup_comentarios() -> dict[str, Any]:
+    from ..modules.analytics.infra.comment_rollups import reconciliar_rollup_comentarios as reconciliar
+
+    return reconciliar()
+
+
+def register_tasks(scheduler: Scheduler) -> None:
+    scheduler.register("normalizar_status", _interval("normalizar_status", 300), normalizar_status)
+    scheduler.register("reparar_implantacoes", _interval("reparar_implantacoes", 600), reparar_implantacoes)
+    scheduler.register("limpar_excluidos", _interval("limpar_excluidos", 86400), limpar_excluidos)
+    scheduler.register("atualizar_configuracoes", _interval("atualizar_configuracoes", 3600), atualizar_configuracoes)
+    scheduler.register(
+        "reconciliar_rollup_comentarios",
+        _interval("reconciliar_rollup_comentarios", 86400),
+        reconciliar_rollup_comentarios,
+    )
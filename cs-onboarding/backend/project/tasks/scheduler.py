@@ -0,0 +1,212 @@
+"""
+Scheduler de manutenção com líder eleito por advisory lock do Postgres.
+
+Correções de dados, limpezas e recargas de cache rodam aqui, periodicamente,
+em vez de dentro das requisições GET (ver tasks/maintenance.py).
+
+Cada processo do gunicorn tem um timer (thread daemon iniciada na primeira
+requisição, já depois do fork) que acorda a cada SCHEDULER_TICK_SECONDS e
+tenta `pg_try_advisory_xact_lock`: só quem obtém o lock executa as tarefas
+vencidas; os demais seguem sem esperar. O lock é de transação (não de
+sessão), então funciona também com PgBouncer em modo transaction: a
+transação do líder fica aberta numa conexão dedicada enquanto as tarefas
+rodam e o lock é liberado no commit/rollback. Se o servidor tiver
+`idle_in_transaction_session_timeout` menor que a execução mais longa, o
+lock pode cair no meio da rodada.
+
+Quando cada tarefa rodou por último fica em `manutencao_execucoes`
+(migration 009), compartilhado entre processos e deploys.
+
+Uso:
+    # Cron externo (ou manual), mesmo lock do timer
+    flask --app run run-maintenance
+    flask --app run run-maintenance --tarefa normalizar_status --forcar
+
+    SCHEDULER_ENABLED=false desliga o timer em processo (ex.: quando há cron).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from flask import Flask
+
+logger = logging.getLogger("app")
+
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+SCHEDULER_TICK_SECONDS = int(os.environ.get("SCHEDULER_TICK_SECONDS", "60"))
+# Chave do advisory lock (arbitrária, fixa para todos os processos da app)
+SCHEDULER_LOCK_KEY = int(os.environ.get("SCHEDULER_LOCK_KEY", "7304211"))
+
+
+@dataclass
+class ScheduledTask:
+    """Tarefa periódica: `func()` roda quando a última execução tem mais de `interval` segundos."""
+
+    name: str
+    interval: int
+    func: Callable[[], Any]
+
+
+class Scheduler:
+    def __init__(self):
+        self._tasks: dict[str, ScheduledTask] = {}
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+        self._start_lock = threading.Lock()
+        self._runs = 0
+        self._leader_runs = 0
+        self._failed = 0
+        self._last_run: dict[str, Any] = {}
+
+    def register(self, name: str, interval: int, func: Callable[[], Any]) -> None:
+        self._tasks[name] = ScheduledTask(name=name, interval=interval, func=func)
+
+    @property
+    def tasks(self) -> list[str]:
+        return list(self._tasks)
+
+    # ──────────────────────────────────────────────
+    # Execução (dentro de app context)
+    # ──────────────────────────────────────────────
+
+    def run_due(self, force: bool = False, only: list[str] | None = None) -> dict[str, Any]:
+        """
+        Executa as tarefas vencidas se este processo for o líder da vez.
+
+        Returns:
+            {"leader": bool, "results": {tarefa: {...}}}
+        """
+        from ..database.db_pool import get_engine
+
+        unknown = [name for name in only or [] if name not in self._tasks]
+        if unknown:
+            raise ValueError(f"Tarefa(s) desconhecida(s): {', '.join(unknown)}")
+
+        engine = get_engine()
+        if engine is None:
+            return {"leader": False, "results": {}}
+
+        self._runs += 1
+        leader = engine.raw_connection()
+        try:
+            cursor = leader.cursor()
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (SCHEDULER_LOCK_KEY,))
+            if not cursor.fetchone()[0]:
+                leader.rollback()
+                return {"leader": False, "results": {}}
+
+            self._leader_runs += 1
+            results = self._run_tasks(force, only)
+            leader.commit()
+            return {"leader": True, "results": results}
+        finally:
+            leader.close()
+
+    def _run_tasks(self, force: bool, only: list[str] | None) -> dict[str, Any]:
+        from ..db import execute_db, query_db
+
+        rows = query_db("SELECT tarefa, ultima_execucao FROM manutencao_execucoes", (), raise_on_error=True) or []
+        last_runs = {r["tarefa"]: r["ultima_execucao"] for r in rows}
+        now = datetime.now(UTC)
+
+        results: dict[str, Any] = {}
+        for task in self._tasks.values():
+            if only and task.name not in only:
+                continue
+            last = last_runs.get(task.name)
+            if not force and last is not None and (now - last).total_seconds() < task.interval:
+                continue
+
+            started = time.perf_counter()
+            status, result, error = "ok", None, None
+            try:
+                result = task.func()
+            except Exception as e:
+                self._failed += 1
+                status, error = "erro", str(e) or e.__class__.__name__
+                logger.error(f"Tarefa de manutenção {task.name} falhou: {e}", exc_info=True)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+
+            execute_db(
+                """
+                INSERT INTO manutencao_execucoes (tarefa, ultima_execucao, status, duracao_ms, resultado, erro)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (tarefa) DO UPDATE SET
+                    ultima_execucao = EXCLUDED.ultima_execucao, status = EXCLUDED.status,
+                    duracao_ms = EXCLUDED.duracao_ms, resultado = EXCLUDED.resultado, erro = EXCLUDED.erro
+                """,
+                (task.name, now, status, duration_ms, json.dumps(result, default=str), error),
+            )
+            results[task.name] = {"status": status, "duration_ms": duration_ms, "result": result, "error": error}
+            logger.info(f"Tarefa de manutenção {task.name}: {status} em {duration_ms}ms ({result or error})")
+
+        self._last_run = {"at": now.isoformat(), "tasks": list(results)}
+        return results
+
+    # ──────────────────────────────────────────────
+    # Timer em processo
+    # ──────────────────────────────────────────────
+
+    def ensure_started(self, app: Flask) -> None:
+        """Inicia o timer deste processo (idempotente; recria após fork)."""
+        pid = os.getpid()
+        if self._thread_pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread_pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, args=(app,), name="maintenance-scheduler", daemon=True)
+            self._thread_pid = pid
+            self._thread.start()
+
+    def _loop(self, app: Flask) -> None:
+        # Espalha os processos para não disputarem o lock todos no mesmo instante
+        time.sleep(random.uniform(0, SCHEDULER_TICK_SECONDS))  # nosec B311
+        while True:
+            try:
+                with app.app_context():
+                    self.run_due()
+            except Exception as e:
+                logger.warning(f"Rodada do scheduler de manutenção falhou: {e}", exc_info=True)
+            time.sleep(SCHEDULER_TICK_SECONDS)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "enabled": SCHEDULER_ENABLED,
+            "tick_seconds": SCHEDULER_TICK_SECONDS,
+            "tasks": {name: task.interval for name, task in self._tasks.items()},
+            "runs": self._runs,
+            "leader_runs": self._leader_runs,
+            "failed": self._failed,
+            "last_run": self._last_run,
+        }
+
+
+# Instância global (por processo); as tarefas são registradas em tasks/maintenance.py
+scheduler = Scheduler()
+
+
+def init_scheduler(app: Flask) -> None:
+    """Registra as tarefas e liga o timer na primeira requisição de cada processo."""
+    from . import maintenance
+
+    maintenance.register_tasks(scheduler)
+
+    if not SCHEDULER_ENABLED or app.config.get("TESTING"):
+        return
+
+    @app.before_request
+    def _start_maintenance_scheduler():
+        scheduler.ensure_started(app)
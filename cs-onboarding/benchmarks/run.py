@@ -0,0 +1,178 @@
+"""
+Executa os cenários de benchmark e reporta latência (p50/p95) e queries por execução.
+
+As queries são contadas pelo cursor instrumentado do detector de N+1
+(`n_plus_one_scope`), que também aponta statements repetidos no cenário.
+
+Uso:
+    python -m benchmarks.run --iterations 20 --output bench-base.json
+    python -m benchmarks.run --scenarios dashboard,toggle_item --compare bench-base.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import statistics
+import subprocess
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from .common import ROOT, create_bench_app
+from .scenarios import SCENARIOS, Scenario, load_fixtures
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Percentil por nearest-rank (sem interpolação; estável com poucas amostras)."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_scenario(app, scenario: Scenario, fixtures: dict[str, Any], iterations: int, warmup: int, warm_cache: bool):
+    from flask import g
+
+    from project.config.cache_config import clear_all_cache
+    from project.monitoring.n_plus_one import n_plus_one_scope
+
+    timings: list[float] = []
+    queries: list[int] = []
+    findings: dict[str, dict[str, Any]] = {}
+
+    for i in range(warmup + iterations):
+        with app.test_request_context(f"/benchmark/{scenario.name}"):
+            g.user_email = fixtures["admin"]
+            g.user = {"email": fixtures["admin"], "name": "Benchmark"}
+            g.perfil = {"usuario": fixtures["admin"], "perfil_acesso": "Administrador", "contexto": "onboarding"}
+            g.modulo_atual = "onboarding"
+            if not warm_cache:
+                clear_all_cache()
+
+            with n_plus_one_scope(f"benchmark {scenario.name}", mode="log") as scope:
+                started = time.perf_counter()
+                scenario.run(fixtures)
+                elapsed = time.perf_counter() - started
+
+            if i < warmup:
+                continue
+            timings.append(elapsed * 1000)
+            queries.append(scope.total if scope else 0)
+            for f in scope.findings() if scope else []:
+                findings.setdefault(
+                    f["fingerprint"], {"statement": f["statement"], "count": f["count"], "stack": f["stack"]}
+                )
+
+    return {
+        "description": scenario.description,
+        "mutates": scenario.mutates,
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "queries": round(statistics.fmean(queries), 1),
+        "n_plus_one": list(findings.values()),
+    }
+
+
+def _delta(current: float, baseline: float | None) -> str:
+    if not baseline:
+        return ""
+    return f"{(current - baseline) / baseline * 100:+.0f}%"
+
+
+def print_report(results: dict[str, dict[str, Any]], baseline: dict[str, Any] | None) -> None:
+    base = (baseline or {}).get("scenarios", {})
+    header = f"{'cenário':<24}{'p50 ms':>10}{'p95 ms':>10}{'média':>10}{'máx':>10}{'queries':>9}{'N+1':>5}"
+    if baseline:
+        header += f"{'Δp50':>8}{'Δp95':>8}{'Δqueries':>10}"
+    print(header)
+    print("─" * len(header))
+    for name, r in results.items():
+        line = (
+            f"{name:<24}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['mean_ms']:>10.1f}"
+            f"{r['max_ms']:>10.1f}{r['queries']:>9.1f}{len(r['n_plus_one']):>5}"
+        )
+        if baseline:
+            b = base.get(name, {})
+            line += (
+                f"{_delta(r['p50_ms'], b.get('p50_ms')):>8}{_delta(r['p95_ms'], b.get('p95_ms')):>8}"
+                f"{_delta(r['queries'], b.get('queries')):>10}"
+            )
+        print(line)
+
+    for name, r in results.items():
+        for f in r["n_plus_one"]:
+            origem = f["stack"][0] if f["stack"] else "?"
+            print(f"  N+1 em {name}: {f['count']}x [{f['statement']}] ← {origem}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Executa os cenários de benchmark.")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2, help="execuções descartadas por cenário")
+    parser.add_argument("--scenarios", default="", help=f"subconjunto separado por vírgula ({', '.join(SCENARIOS)})")
+    parser.add_argument("--warm-cache", action="store_true", help="não limpa o cache entre execuções")
+    parser.add_argument("--output", help="grava o resultado em JSON")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args(argv)
+
+    selected = [s.strip() for s in args.scenarios.split(",") if s.strip()] or list(SCENARIOS)
+    unknown = [s for s in selected if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"cenários desconhecidos: {', '.join(unknown)}")
+
+    app = create_bench_app()
+    # Os achados de N+1 saem no relatório; o WARNING por execução só poluiria a saída
+    logging.getLogger("performance").setLevel(logging.ERROR)
+
+    with app.app_context():
+        fixtures = load_fixtures()
+    print(f"Implantação de referência: #{fixtures['implantacao_id']} ({fixtures['implantacao_itens']} itens)\n")
+
+    results = {}
+    for name in selected:
+        scenario = SCENARIOS[name]
+        if scenario.mutates and (fixtures["leaf_item_id"] is None or fixtures["plano_id"] is None):
+            print(f"{name}: fixtures ausentes na massa, ignorado")
+            continue
+        results[name] = run_scenario(app, scenario, fixtures, args.iterations, args.warmup, args.warm_cache)
+
+    baseline = None
+    if args.compare:
+        with Path(args.compare).open(encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    print_report(results, baseline)
+
+    if args.output:
+        payload = {
+            "meta": {
+                "timestamp": datetime.now(UTC).isoformat(),
+                "git_revision": _git_revision(),
+                "iterations": args.iterations,
+                "warmup": args.warmup,
+                "warm_cache": args.warm_cache,
+                "fixtures": {k: v for k, v in fixtures.items() if k != "toggle_state"},
+            },
+            "scenarios": results,
+        }
+        with Path(args.output).open("w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False, indent=2)
+        print(f"\nResultado gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
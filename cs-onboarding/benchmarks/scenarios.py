@@ -0,0 +1,149 @@
+"""
+Cenários de benchmark: cada um chama a função de serviço do fluxo real,
+dentro de um request context autenticado como o administrador da massa.
+
+As fixtures (implantação mais pesada, item folha, plano modelo...) são
+escolhidas na massa "[bench]" gerada por `benchmarks.seed`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .common import BENCH_CONTEXT, BENCH_PREFIX, bench_user
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    run: Callable[[dict[str, Any]], Any]
+    # Cenários que alteram dados (a massa cresce/alterna a cada execução)
+    mutates: bool = False
+
+
+def load_fixtures() -> dict[str, Any]:
+    """Seleciona na massa sintética os registros usados pelos cenários (app context necessário)."""
+    from project.db import query_db
+
+    like = f"{BENCH_PREFIX}%"
+    heaviest = query_db(
+        """
+        SELECT i.id, COUNT(ci.id) AS itens
+        FROM implantacoes i
+        JOIN checklist_items ci ON ci.implantacao_id = i.id
+        WHERE i.nome_empresa LIKE %s AND i.status = 'andamento'
+        GROUP BY i.id
+        ORDER BY itens DESC, i.id
+        LIMIT 1
+        """,
+        (like,),
+        one=True,
+    )
+    if not heaviest:
+        raise SystemExit("Massa de benchmark não encontrada. Rode `python -m benchmarks.seed` antes.")
+
+    leaf = query_db(
+        """
+        SELECT id FROM checklist_items
+        WHERE implantacao_id = %s AND NOT EXISTS (SELECT 1 FROM checklist_items c WHERE c.parent_id = checklist_items.id)
+        ORDER BY level DESC, id
+        LIMIT 1
+        """,
+        (heaviest["id"],),
+        one=True,
+    )
+    plano = query_db(
+        "SELECT id FROM planos_sucesso WHERE nome LIKE %s AND processo_id IS NULL ORDER BY id LIMIT 1",
+        (like,),
+        one=True,
+    )
+    rascunho = query_db(
+        "SELECT id FROM implantacoes WHERE nome_empresa = %s ORDER BY id LIMIT 1",
+        (f"{BENCH_PREFIX} Rascunho aplicação de plano",),
+        one=True,
+    )
+    return {
+        "admin": bench_user(1),
+        "cs": bench_user(2),
+        "implantacao_id": heaviest["id"],
+        "implantacao_itens": heaviest["itens"],
+        "leaf_item_id": leaf["id"] if leaf else None,
+        "plano_id": plano["id"] if plano else None,
+        "rascunho_id": rascunho["id"] if rascunho else None,
+        "toggle_state": {"completed": False},
+    }
+
+
+# ──────────────────────────────────────────────
+# Cenários
+# ──────────────────────────────────────────────
+
+
+def _dashboard(fx):
+    from project.modules.dashboard.application.dashboard_service import get_dashboard_data
+
+    return get_dashboard_data(fx["admin"], context=BENCH_CONTEXT, use_cache=False)
+
+
+def _analytics_v2(fx):
+    from project.modules.analytics.domain.dashboard_v2 import get_analytics_data_v2
+
+    return get_analytics_data_v2(context=BENCH_CONTEXT)
+
+
+def _checklist_tree(fx):
+    from project.modules.checklist.domain.tree import get_checklist_tree
+
+    return get_checklist_tree(implantacao_id=fx["implantacao_id"], include_progress=True)
+
+
+def _implantacao_dataloader(fx):
+    from project.common.dataloader import ImplantacaoDataLoader
+
+    return ImplantacaoDataLoader(fx["implantacao_id"]).load_all()
+
+
+def _toggle(fx):
+    from project.modules.checklist.domain.items import toggle_item_status
+
+    state = fx["toggle_state"]
+    state["completed"] = not state["completed"]
+    return toggle_item_status(fx["leaf_item_id"], state["completed"], fx["admin"])
+
+
+def _aplicar_plano(fx):
+    from project.modules.planos.domain.aplicar import aplicar_plano_a_implantacao_checklist
+
+    return aplicar_plano_a_implantacao_checklist(fx["rascunho_id"], fx["plano_id"], fx["admin"])
+
+
+def _notifications(fx):
+    from project.modules.notification.application.notification_service import get_user_notifications
+
+    return get_user_notifications(fx["cs"], context=BENCH_CONTEXT)
+
+
+def _timeline_export(fx):
+    from project.modules.timeline.application.timeline_service import export_timeline_csv
+
+    return export_timeline_csv(fx["implantacao_id"], types_param="", q="", dt_from="", dt_to="")
+
+
+SCENARIOS: dict[str, Scenario] = {
+    s.name: s
+    for s in (
+        Scenario("dashboard", "Dashboard (admin, sem cache)", _dashboard),
+        Scenario("analytics_v2", "Analytics v2 do contexto", _analytics_v2),
+        Scenario("checklist_tree", "Árvore do checklist com progresso (maior implantação)", _checklist_tree),
+        Scenario("implantacao_dataloader", "Detalhes da implantação via DataLoader", _implantacao_dataloader),
+        Scenario("toggle_item", "Marcar/desmarcar item folha (propaga aos ancestrais)", _toggle, mutates=True),
+        Scenario("aplicar_plano", "Aplicar plano modelo à implantação rascunho", _aplicar_plano, mutates=True),
+        Scenario("notifications", "Notificações de um CS", _notifications),
+        Scenario("timeline_export", "Exportar timeline CSV (maior implantação)", _timeline_export),
+    )
+}
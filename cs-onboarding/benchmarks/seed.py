@@ -0,0 +1,442 @@
+"""
+Gerador de massa sintética para os benchmarks.
+
+Semeia o banco de `BENCHMARK_DATABASE_URL` com volumes realistas:
+usuários CS → planos modelo (árvore fase > grupo > tarefa > subtarefa) →
+N implantações, cada uma com uma cópia da árvore de um plano, progresso
+coerente com o status, comentarios_h nas tarefas e timeline_log.
+
+A geração é determinística por `--seed`. Toda a massa é marcada (prefixo
+"[bench]" nos nomes, e-mails @bench.local) e `--reset` apaga a massa anterior
+sem tocar no restante do banco.
+
+Uso:
+    python -m benchmarks.seed --implantacoes 300 --tree 5,3,6,2 --comentarios 40 --timeline 60 --reset
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from .common import BENCH_CONTEXT, BENCH_DOMAIN, BENCH_PREFIX, bench_database_url, bench_user
+
+TIPOS_PLANO = ("plano_fase", "plano_grupo", "plano_tarefa", "plano_subtarefa")
+TIPOS_IMPLANTACAO = ("fase", "grupo", "tarefa", "subtarefa")
+TAGS = ("Ação interna", "Reunião", "No Show", "Cliente", "Simples registro")
+EVENTOS_TIMELINE = (
+    "tarefa_alterada",
+    "novo_comentario",
+    "status_alterado",
+    "responsavel_alterado",
+    "prazo_alterado",
+    "plano_aplicado",
+    "aviso_criado",
+)
+# Distribuição de status das implantações (peso relativo)
+STATUS_PESOS = {"andamento": 45, "nova": 8, "futura": 7, "parada": 10, "finalizada": 25, "cancelada": 5}
+
+_PALAVRAS = (
+    "cliente",
+    "solicitou",
+    "ajuste",
+    "na",
+    "configuração",
+    "do",
+    "módulo",
+    "financeiro",
+    "antes",
+    "da",
+    "virada",
+    "reunião",
+    "de",
+    "alinhamento",
+    "realizada",
+    "com",
+    "o",
+    "responsável",
+    "validar",
+    "importação",
+    "de",
+    "alunos",
+    "pendente",
+    "retorno",
+    "sobre",
+    "catraca",
+    "e",
+    "acesso",
+    "facial",
+    "treinamento",
+    "agendado",
+    "para",
+    "a",
+    "equipe",
+    "recepção",
+    "contratos",
+    "revisados",
+    "boletos",
+    "emitidos",
+    "integração",
+    "com",
+    "nota",
+    "fiscal",
+    "testada",
+)
+
+
+def _texto(rng: random.Random, min_palavras: int, max_palavras: int) -> str:
+    return " ".join(rng.choice(_PALAVRAS) for _ in range(rng.randint(min_palavras, max_palavras))).capitalize() + "."
+
+
+# ──────────────────────────────────────────────
+# Estrutura da árvore
+# ──────────────────────────────────────────────
+
+
+def build_tree(shape: tuple[int, ...], rng: random.Random) -> list[list[dict[str, Any]]]:
+    """
+    Árvore em níveis: `shape=(5, 3, 6, 2)` → 5 fases, 3 grupos por fase, 6 tarefas
+    por grupo e 2 subtarefas por tarefa. Cada nó guarda o índice do pai no nível anterior.
+    """
+    levels: list[list[dict[str, Any]]] = []
+    parents = [None]
+    for depth, fanout in enumerate(shape):
+        level = []
+        for parent_idx in range(len(parents)):
+            for ordem in range(1, fanout + 1):
+                level.append(
+                    {
+                        "parent": parent_idx if depth else None,
+                        "title": f"{TIPOS_IMPLANTACAO[min(depth, 3)].capitalize()} {len(level) + 1}",
+                        "ordem": ordem,
+                        "tag": rng.choice(TAGS) if depth >= 2 and rng.random() < 0.3 else None,
+                        "obrigatoria": rng.random() < 0.7,
+                        "dias_offset": rng.randint(1, 90) if depth >= 2 else None,
+                    }
+                )
+        levels.append(level)
+        parents = level
+    return levels
+
+
+def _completion(levels: list[list[dict[str, Any]]], fraction: float, rng: random.Random) -> list[list[bool]]:
+    """Folhas concluídas na fração pedida; pais concluídos quando todos os filhos estão."""
+    done = [[False] * len(level) for level in levels]
+    done[-1] = [rng.random() < fraction for _ in levels[-1]]
+    for depth in range(len(levels) - 1, 0, -1):
+        children: dict[int, list[bool]] = {}
+        for idx, node in enumerate(levels[depth]):
+            children.setdefault(node["parent"], []).append(done[depth][idx])
+        done[depth - 1] = [all(children.get(i, [False])) for i in range(len(levels[depth - 1]))]
+    return done
+
+
+# ──────────────────────────────────────────────
+# Limpeza
+# ──────────────────────────────────────────────
+
+
+def reset(cursor) -> None:
+    """Apaga a massa sintética anterior (cascata cobre comentários, timeline e itens)."""
+    like = f"{BENCH_PREFIX}%"
+    cursor.execute(
+        """
+        DELETE FROM checklist_items
+        WHERE plano_id IN (
+            SELECT id FROM planos_sucesso
+            WHERE nome LIKE %s
+               OR processo_id IN (SELECT id FROM implantacoes WHERE nome_empresa LIKE %s)
+        )
+        """,
+        (like, like),
+    )
+    cursor.execute("DELETE FROM implantacoes WHERE nome_empresa LIKE %s", (like,))
+    cursor.execute("DELETE FROM planos_sucesso WHERE nome LIKE %s", (like,))
+    cursor.execute("DELETE FROM perfil_usuario_contexto WHERE usuario LIKE %s", (f"%@{BENCH_DOMAIN}",))
+    cursor.execute("DELETE FROM perfil_usuario WHERE usuario LIKE %s", (f"%@{BENCH_DOMAIN}",))
+
+
+# ──────────────────────────────────────────────
+# Geração
+# ──────────────────────────────────────────────
+
+
+def seed_users(cursor, count: int) -> list[str]:
+    users = [bench_user(n) for n in range(1, count + 1)]
+    execute_values(
+        cursor,
+        "INSERT INTO perfil_usuario (usuario, nome) VALUES %s ON CONFLICT (usuario) DO NOTHING",
+        [(u, f"CS Benchmark {n:03d}") for n, u in enumerate(users, start=1)],
+    )
+    now = datetime.now(UTC)
+    execute_values(
+        cursor,
+        """
+        INSERT INTO perfil_usuario_contexto (usuario, contexto, perfil_acesso, atualizado_em, atualizado_por)
+        VALUES %s
+        """,
+        # O primeiro usuário é o administrador usado pelos cenários
+        [
+            (u, BENCH_CONTEXT, "Administrador" if n == 0 else "Implantador", now, "benchmark")
+            for n, u in enumerate(users)
+        ],
+    )
+    return users
+
+
+def _insert_levels(cursor, levels, row_for) -> list[list[int]]:
+    """Insere a árvore nível a nível (um INSERT multi-linha por nível); devolve os ids por nível."""
+    ids: list[list[int]] = []
+    for depth, level in enumerate(levels):
+        parent_ids = ids[depth - 1] if depth else None
+        rows = [
+            row_for(depth, idx, node, parent_ids[node["parent"]] if parent_ids else None)
+            for idx, node in enumerate(level)
+        ]
+        returned = execute_values(
+            cursor,
+            """
+            INSERT INTO checklist_items (
+                parent_id, title, completed, level, ordem, implantacao_id, plano_id, obrigatoria,
+                tipo_item, status, responsavel, tag, data_conclusao, previsao_original, dias_offset,
+                created_at, updated_at
+            ) VALUES %s RETURNING id
+            """,
+            rows,
+            page_size=len(rows) or 1,
+            fetch=True,
+        )
+        ids.append([r[0] for r in returned])
+    return ids
+
+
+def seed_planos(cursor, rng: random.Random, count: int, shape: tuple[int, ...]) -> list[tuple[int, Any]]:
+    now = datetime.now(UTC)
+    planos = []
+    for n in range(1, count + 1):
+        cursor.execute(
+            """
+            INSERT INTO planos_sucesso (
+                nome, descricao, criado_por, data_criacao, data_atualizacao,
+                dias_duracao, permite_excluir_tarefas, contexto, status, processo_id, ativo
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NULL, TRUE)
+            RETURNING id
+            """,
+            (
+                f"{BENCH_PREFIX} Plano {n}",
+                "Plano sintético",
+                bench_user(1),
+                now,
+                now,
+                90,
+                False,
+                BENCH_CONTEXT,
+                "ativo",
+            ),
+        )
+        plano_id = cursor.fetchone()[0]
+        levels = build_tree(shape, rng)
+
+        def template_row(depth, idx, node, parent_id, plano_id=plano_id):
+            return (
+                parent_id,
+                node["title"],
+                False,
+                depth,
+                node["ordem"],
+                None,
+                plano_id,
+                node["obrigatoria"],
+                TIPOS_PLANO[min(depth, 3)],
+                "pendente",
+                None,
+                node["tag"],
+                None,
+                None,
+                node["dias_offset"],
+                now,
+                now,
+            )
+
+        _insert_levels(cursor, levels, template_row)
+        planos.append((plano_id, levels))
+    return planos
+
+
+def seed_implantacoes(cursor, rng: random.Random, users: list[str], planos, args) -> dict[str, int]:
+    now = datetime.now(UTC)
+    status_choices = list(STATUS_PESOS)
+    status_weights = list(STATUS_PESOS.values())
+    totals = {"implantacoes": 0, "checklist_items": 0, "comentarios_h": 0, "timeline_log": 0}
+
+    for i in range(1, args.implantacoes + 1):
+        status = rng.choices(status_choices, status_weights)[0]
+        usuario_cs = rng.choice(users)
+        criado = now - timedelta(days=rng.randint(1, 365))
+        inicio = criado + timedelta(days=rng.randint(0, 10)) if status not in ("nova", "futura") else None
+        plano_id, levels = rng.choice(planos)
+        cursor.execute(
+            """
+            INSERT INTO implantacoes (
+                nome_empresa, usuario_cs, tipo, status, data_criacao, data_inicio_efetivo,
+                data_finalizacao, data_cancelamento, data_parada, plano_sucesso_id,
+                data_previsao_termino, valor_monetario, contexto
+            ) VALUES (%s, %s, 'completa', %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (
+                f"{BENCH_PREFIX} Empresa {i:05d}",
+                usuario_cs,
+                status,
+                criado,
+                inicio,
+                now if status == "finalizada" else None,
+                now if status == "cancelada" else None,
+                now - timedelta(days=rng.randint(1, 30)) if status == "parada" else None,
+                plano_id,
+                (inicio or criado) + timedelta(days=90),
+                round(rng.uniform(500, 20000), 2),
+                BENCH_CONTEXT,
+            ),
+        )
+        impl_id = cursor.fetchone()[0]
+
+        fraction = {"finalizada": 1.0, "nova": 0.0, "futura": 0.0}.get(status, rng.uniform(0.1, 0.9))
+        done = _completion(levels, fraction, rng)
+
+        def instance_row(
+            depth,
+            idx,
+            node,
+            parent_id,
+            impl_id=impl_id,
+            plano_id=plano_id,
+            done=done,
+            base=inicio or criado,
+            cs=usuario_cs,
+        ):
+            completed = done[depth][idx]
+            return (
+                parent_id,
+                node["title"],
+                completed,
+                depth,
+                node["ordem"],
+                impl_id,
+                plano_id,
+                node["obrigatoria"],
+                TIPOS_IMPLANTACAO[min(depth, 3)],
+                "concluida" if completed else "pendente",
+                cs,
+                node["tag"],
+                base + timedelta(days=rng.randint(1, 60)) if completed else None,
+                base + timedelta(days=node["dias_offset"]) if node["dias_offset"] else None,
+                node["dias_offset"],
+                base,
+                base,
+            )
+
+        item_ids = _insert_levels(cursor, levels, instance_row)
+        leaf_ids = item_ids[min(2, len(item_ids) - 1)] + (item_ids[3] if len(item_ids) > 3 else [])
+
+        n_comments = rng.randint(args.comentarios // 2, args.comentarios * 3 // 2) if args.comentarios else 0
+        if n_comments and leaf_ids:
+            execute_values(
+                cursor,
+                """
+                INSERT INTO comentarios_h
+                    (checklist_item_id, implantacao_id, usuario_cs, texto, data_criacao, visibilidade, noshow, tag)
+                VALUES %s
+                """,
+                [
+                    (
+                        rng.choice(leaf_ids),
+                        impl_id,
+                        rng.choice(users) if rng.random() < 0.3 else usuario_cs,
+                        _texto(rng, 8, 40),
+                        criado + timedelta(minutes=rng.randint(0, 60 * 24 * 120)),
+                        "externo" if rng.random() < 0.2 else "interno",
+                        False,
+                        rng.choice(TAGS) if rng.random() < 0.6 else None,
+                    )
+                    for _ in range(n_comments)
+                ],
+                page_size=1000,
+            )
+
+        n_events = rng.randint(args.timeline // 2, args.timeline * 3 // 2) if args.timeline else 0
+        if n_events:
+            execute_values(
+                cursor,
+                "INSERT INTO timeline_log (implantacao_id, usuario_cs, tipo_evento, detalhes, data_criacao) VALUES %s",
+                [
+                    (
+                        impl_id,
+                        usuario_cs,
+                        rng.choice(EVENTOS_TIMELINE),
+                        _texto(rng, 5, 20),
+                        criado + timedelta(minutes=rng.randint(0, 60 * 24 * 120)),
+                    )
+                    for _ in range(n_events)
+                ],
+                page_size=1000,
+            )
+
+        totals["implantacoes"] += 1
+        totals["checklist_items"] += sum(len(level) for level in item_ids)
+        totals["comentarios_h"] += n_comments
+        totals["timeline_log"] += n_events
+
+    # Implantação sem itens reservada para o cenário de aplicação de plano
+    cursor.execute(
+        """
+        INSERT INTO implantacoes (nome_empresa, usuario_cs, tipo, status, data_criacao, contexto)
+        VALUES (%s, %s, 'completa', 'nova', %s, %s)
+        """,
+        (f"{BENCH_PREFIX} Rascunho aplicação de plano", users[0], now, BENCH_CONTEXT),
+    )
+    return totals
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera a massa sintética dos benchmarks.")
+    parser.add_argument("--implantacoes", type=int, default=300)
+    parser.add_argument("--usuarios", type=int, default=15, help="usuários CS")
+    parser.add_argument("--planos", type=int, default=3, help="planos modelo")
+    parser.add_argument("--tree", default="5,3,6,2", help="fanout por nível: fases,grupos,tarefas,subtarefas")
+    parser.add_argument("--comentarios", type=int, default=40, help="média de comentários por implantação")
+    parser.add_argument("--timeline", type=int, default=60, help="média de eventos de timeline por implantação")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="apaga a massa [bench] anterior antes de gerar")
+    args = parser.parse_args(argv)
+
+    shape = tuple(int(n) for n in args.tree.split(",") if n.strip())
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+
+    conn = psycopg2.connect(bench_database_url())
+    try:
+        with conn, conn.cursor() as cursor:
+            if args.reset:
+                reset(cursor)
+            users = seed_users(cursor, args.usuarios)
+            planos = seed_planos(cursor, rng, args.planos, shape)
+            totals = seed_implantacoes(cursor, rng, users, planos, args)
+            cursor.execute("ANALYZE implantacoes, checklist_items, comentarios_h, timeline_log")
+    finally:
+        conn.close()
+
+    items_per_tree = sum(len(level) for level in build_tree(shape, random.Random(0)))
+    print(f"Massa gerada em {time.perf_counter() - started:.1f}s (árvore de {items_per_tree} itens por implantação):")
+    for table, count in totals.items():
+        print(f"  {table:<16} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark do cálculo de progresso da árvore do checklist.
+
+Compara, sobre a mesma árvore sintética (~3.000 itens por padrão), uma CTE
+recursiva que percorre a subárvore de cada item no banco com `rollup_progress`
+(uma passada pós-ordem sobre as linhas já carregadas), e confere que os dois
+produzem o mesmo mapa.
+
+A referência é a semântica de `get_item_progress_stats`: total e concluídos
+de TODOS os descendentes ativos de cada item. A CTE que `get_checklist_tree`
+usava antes agrupava pelo pai direto de cada linha da recursão (contava só
+os filhos, repetidos uma vez por nível abaixo deles), por isso não serve de
+referência: na árvore 1→{2→{3,4},5} ela dava {1: 2/1, 2: 4/2}, e o correto é
+{1: 4/2, 2: 2/1}.
+
+A árvore é inserida numa transação que é desfeita no fim: o banco de
+benchmark não é alterado.
+
+Uso:
+    python -m benchmarks.tree_rollup --tree 5,4,10,15 --iterations 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+import psycopg2
+from psycopg2.extras import DictCursor, execute_values
+
+from .common import BENCH_CONTEXT, BENCH_PREFIX, add_backend_to_path, bench_database_url, bench_user
+from .run import percentile
+from .seed import TIPOS_IMPLANTACAO, _completion, build_tree
+
+# get_item_progress_stats para todos os itens em uma query: a recursão carrega o
+# ancestral de origem, então cada item soma a subárvore inteira (referência)
+REFERENCE_PROGRESS_QUERY = """
+    WITH RECURSIVE descendants AS (
+        SELECT parent_id AS ancestor_id, id, completed
+        FROM checklist_items
+        WHERE parent_id = ANY(%s)
+          AND COALESCE(dispensada, FALSE) = FALSE
+
+        UNION ALL
+
+        SELECT d.ancestor_id, ci.id, ci.completed
+        FROM checklist_items ci
+        INNER JOIN descendants d ON ci.parent_id = d.id
+        WHERE COALESCE(ci.dispensada, FALSE) = FALSE
+    )
+    SELECT
+        ancestor_id,
+        COUNT(*) as total,
+        COUNT(CASE WHEN completed = true THEN 1 END) as completed
+    FROM descendants
+    GROUP BY ancestor_id
+"""
+
+
+def _insert_tree(cursor, shape: tuple[int, ...], rng: random.Random, dispensadas: float) -> int:
+    cursor.execute(
+        """
+        INSERT INTO implantacoes (nome_empresa, usuario_cs, tipo, status, data_criacao, contexto)
+        VALUES (%s, %s, 'completa', 'andamento', NOW(), %s)
+        RETURNING id
+        """,
+        (f"{BENCH_PREFIX} Árvore rollup", bench_user(1), BENCH_CONTEXT),
+    )
+    impl_id = cursor.fetchone()[0]
+
+    levels = build_tree(shape, rng)
+    done = _completion(levels, rng.uniform(0.3, 0.7), rng)
+    ids: list[list[int]] = []
+    for depth, level in enumerate(levels):
+        parent_ids = ids[depth - 1] if depth else None
+        rows = [
+            (
+                parent_ids[node["parent"]] if parent_ids else None,
+                node["title"],
+                done[depth][idx],
+                depth,
+                node["ordem"],
+                impl_id,
+                TIPOS_IMPLANTACAO[min(depth, 3)],
+                depth > 0 and rng.random() < dispensadas,
+            )
+            for idx, node in enumerate(level)
+        ]
+        returned = execute_values(
+            cursor,
+            """
+            INSERT INTO checklist_items (parent_id, title, completed, level, ordem, implantacao_id, tipo_item, dispensada)
+            VALUES %s RETURNING id
+            """,
+            rows,
+            page_size=len(rows),
+            fetch=True,
+        )
+        ids.append([r[0] for r in returned])
+    cursor.execute("ANALYZE checklist_items")
+    return impl_id
+
+
+def _reference_progress(cursor, all_ids: list[int]) -> dict[int, dict]:
+    cursor.execute(REFERENCE_PROGRESS_QUERY, (all_ids,))
+    return {
+        row["ancestor_id"]: {"total": row["total"], "completed": row["completed"], "has_children": row["total"] > 0}
+        for row in cursor.fetchall()
+    }
+
+
+def _summary(samples: list[float]) -> str:
+    return (
+        f"p50 {percentile(samples, 50):8.2f} ms   p95 {percentile(samples, 95):8.2f} ms   "
+        f"média {statistics.fmean(samples):8.2f} ms"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="CTE por subárvore x passada pós-ordem no progresso da árvore.")
+    parser.add_argument("--tree", default="5,4,10,15", help="fanout por nível (padrão: 3.225 itens)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--dispensadas", type=float, default=0.03, help="fração de itens dispensados")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    add_backend_to_path()
+    from project.modules.checklist.domain.tree import rollup_progress
+
+    shape = tuple(int(n) for n in args.tree.split(",") if n.strip())
+    rng = random.Random(args.seed)
+
+    conn = psycopg2.connect(bench_database_url())
+    try:
+        with conn.cursor(cursor_factory=DictCursor) as cursor:
+            impl_id = _insert_tree(cursor, shape, rng, args.dispensadas)
+
+            load_times, reference_times, rollup_times = [], [], []
+            reference = rollup = None
+            for _ in range(args.iterations):
+                started = time.perf_counter()
+                cursor.execute(
+                    "SELECT id, parent_id, completed, dispensada, ordem FROM checklist_items WHERE implantacao_id = %s",
+                    (impl_id,),
+                )
+                items = [dict(row) for row in cursor.fetchall()]
+                load_times.append((time.perf_counter() - started) * 1000)
+
+                started = time.perf_counter()
+                reference = _reference_progress(cursor, [item["id"] for item in items])
+                reference_times.append((time.perf_counter() - started) * 1000)
+
+                started = time.perf_counter()
+                rollup = rollup_progress(items)
+                rollup_times.append((time.perf_counter() - started) * 1000)
+    finally:
+        # Nada do benchmark fica no banco
+        conn.rollback()
+        conn.close()
+
+    print(f"Árvore: {len(items)} itens ({'x'.join(map(str, shape))}), {args.iterations} iterações")
+    print(f"  carga das linhas (comum)   {_summary(load_times)}")
+    print(f"  CTE por subárvore (ref.)   {_summary(reference_times)}")
+    print(f"  rollup pós-ordem (atual)   {_summary(rollup_times)}")
+    print(f"  ganho no p50: {percentile(reference_times, 50) / max(percentile(rollup_times, 50), 1e-6):.1f}x")
+    print(f"  resultados idênticos: {'sim' if reference == rollup else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
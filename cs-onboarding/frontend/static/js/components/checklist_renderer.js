@@ -17,6 +17,8 @@ class ChecklistRenderer {
         this.data = window.CHECKLIST_DATA || [];
         this.expandedItems = new Set();
         this.flatData = {};
+        // sync_token da última carga da árvore (habilita o delta em reloadChecklist)
+        this.syncToken = null;
         this.isLoading = false;
         this.isHistoricoView = window.IS_HISTORICO_VIEW || false;
         this.previsaoTermino = this.container?.dataset?.previsaoTermino || '';
@@ -1148,22 +1150,72 @@ class ChecklistRenderer {
         console.log('[ChecklistRenderer] reloadChecklist called');
         if (!this.service) return;
         try {
+            // Com um sync anterior, busca só o delta (itens alterados + ids removidos)
+            if (this.syncToken && this.service.getTreeChanges) {
+                const changes = await this.service.getTreeChanges(this.implantacaoId, this.syncToken);
+                if (!changes.error) {
+                    if (changes.format === 'delta') {
+                        this.applyTreeDelta(changes.changed, changes.deleted);
+                    } else {
+                        // Token não vale mais (ex.: virada do dia): veio a árvore plana completa
+                        this.flatData = {};
+                        changes.items.forEach(item => { this.flatData[item.id] = item; });
+                        this.rebuildTreeFromFlat();
+                    }
+                    this.syncToken = changes.syncToken;
+                    this.renderAfterReload();
+                    return;
+                }
+            }
+
             const result = await this.service.getTree(this.implantacaoId, 'nested');
             if (result && result.items) {
                 this.data = result.items;
                 this.flatData = {};
                 this.buildFlatData(this.data);
-                this.render(true);
-                // Opcional: manter estado expandido
-                this.expandedItems.forEach(id => this.updateExpandedState(id));
-                this.updateProgressFromLocalData();
-                this.updateAllItemsUI();
+                this.syncToken = result.syncToken || null;
+                this.renderAfterReload();
             }
         } catch (error) {
             console.error('[ReloadChecklist] Error:', error);
         }
     }
 
+    renderAfterReload() {
+        this.render(true);
+        // Opcional: manter estado expandido
+        this.expandedItems.forEach(id => this.updateExpandedState(id));
+        this.updateProgressFromLocalData();
+        this.updateAllItemsUI();
+    }
+
+    applyTreeDelta(changed, deleted) {
+        deleted.forEach(id => { delete this.flatData[id]; });
+        changed.forEach(item => {
+            this.flatData[item.id] = { ...(this.flatData[item.id] || {}), ...item };
+        });
+        this.rebuildTreeFromFlat();
+    }
+
+    // Remonta this.data (aninhado) a partir de this.flatData, na ordem do servidor (ordem, id)
+    rebuildTreeFromFlat() {
+        const nodes = {};
+        Object.values(this.flatData).forEach(entry => {
+            const { parentId, childrenIds, children, ...fields } = entry;
+            nodes[fields.id] = { ...fields, children: [] };
+        });
+        const roots = [];
+        Object.values(nodes)
+            .sort((a, b) => (a.ordem ?? 0) - (b.ordem ?? 0) || a.id - b.id)
+            .forEach(node => {
+                if (node.parent_id == null) roots.push(node);
+                else if (nodes[node.parent_id]) nodes[node.parent_id].children.push(node);
+            });
+        this.data = roots;
+        this.flatData = {};
+        this.buildFlatData(this.data);
+    }
+
     // Helpers
     showToast(msg, type = 'info') {
         if (window.showToast) window.showToast(msg, type);
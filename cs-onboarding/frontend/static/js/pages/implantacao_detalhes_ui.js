@@ -341,6 +341,35 @@
         </div>
       `;
     }
+    async function readResumoResponse(response) {
+      const contentType = response.headers.get('content-type') || '';
+      let data = null;
+      if (contentType.includes('application/json')) {
+        data = await response.json();
+      } else {
+        const raw = await response.text();
+        throw new Error(`Erro ${response.status}: ${raw.slice(0, 180)}`);
+      }
+
+      if (!response.ok || !data || !data.ok) {
+        throw new Error((data && data.error) ?data.error : `Erro ${response.status}`);
+      }
+      return data;
+    }
+
+    // Geracao em job assincrono: consulta o status ate concluir (max ~3 min)
+    async function aguardarJobResumo(pollUrl) {
+      const intervalMs = 1500;
+      const maxAttempts = 120;
+      for (let attempt = 0; attempt < maxAttempts; attempt++) {
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+        const response = await fetch(pollUrl, { headers: { 'Accept': 'application/json' }, cache: 'no-store' });
+        const data = await readResumoResponse(response);
+        if (data.status === 'done') return data;
+      }
+      throw new Error('Tempo esgotado aguardando o resumo');
+    }
+
     async function gerarResumoImplantacao() {
       if (resumoRequestInFlight) return;
       resumoRequestInFlight = true;
@@ -354,20 +383,12 @@
             'Content-Type': 'application/json',
             'X-CSRFToken': CONFIG.csrfToken || ''
           },
-          body: JSON.stringify({})
+          body: JSON.stringify({ async: true })
         });
 
-        const contentType = response.headers.get('content-type') || '';
-        let data = null;
-        if (contentType.includes('application/json')) {
-          data = await response.json();
-        } else {
-          const raw = await response.text();
-          throw new Error(`Erro ${response.status}: ${raw.slice(0, 180)}`);
-        }
-
-        if (!response.ok || !data || !data.ok) {
-          throw new Error((data && data.error) ?data.error : `Erro ${response.status}`);
+        let data = await readResumoResponse(response);
+        if (data.job_id && data.poll_url) {
+          data = await aguardarJobResumo(data.poll_url);
         }
 
         setResumoContent(data.summary || '', data.source || '', data.summary_structured || null, { isSaved: false });
@@ -34,6 +34,22 @@ class ChecklistAPI {
         return this.api.get(`/api/checklist/tree?${params}`);
     }
 
+    /**
+     * Carrega só o que mudou na árvore desde o último sync
+     * @param {number} implantacaoId - ID da implantação
+     * @param {string} syncToken - Campo `sync_token` da última resposta da árvore
+     * @returns {Promise<Object>} { format: 'delta', sync_token, changed: [...], deleted: [ids] },
+     *   ou a árvore plana completa (format 'flat') se o token não valer mais (ex.: virada do dia)
+     */
+    async getTreeChanges(implantacaoId, syncToken) {
+        const params = new URLSearchParams({
+            implantacao_id: implantacaoId,
+            format: 'flat',
+            since: syncToken
+        });
+        return this.api.get(`/api/checklist/tree?${params}`);
+    }
+
     // ========================================
     // ITEM OPERATIONS
     // ========================================
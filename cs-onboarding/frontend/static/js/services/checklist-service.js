@@ -269,13 +269,13 @@ class ChecklistService {
      * Carrega a árvore do checklist
      * @param {number} implantacaoId
      * @param {string} format
-     * @returns {Promise<{items?: Array, error?: string}>}
+     * @returns {Promise<{items?: Array, syncToken?: string, error?: string}>}
      */
     async getTree(implantacaoId, format = 'nested') {
         try {
             const data = await this.api.getTree(implantacaoId, format);
             if (data && (data.items || Array.isArray(data))) {
-                return { items: data.items || data };
+                return { items: data.items || data, syncToken: data.sync_token || null };
             }
             throw new Error(data?.error || 'Erro ao carregar árvore');
         } catch (error) {
@@ -283,6 +283,30 @@ class ChecklistService {
         }
     }
 
+    /**
+     * Carrega as mudanças da árvore desde o último sync
+     * @param {number} implantacaoId
+     * @param {string} syncToken - Token da última carga (getTree/getTreeChanges)
+     * @returns {Promise<{format?: string, items?: Array, changed?: Array, deleted?: Array, syncToken?: string, error?: string}>}
+     */
+    async getTreeChanges(implantacaoId, syncToken) {
+        try {
+            const data = await this.api.getTreeChanges(implantacaoId, syncToken);
+            if (data && data.ok) {
+                return {
+                    format: data.format,
+                    items: data.items || [],
+                    changed: data.changed || [],
+                    deleted: data.deleted || [],
+                    syncToken: data.sync_token || null
+                };
+            }
+            throw new Error(data?.error || 'Erro ao sincronizar árvore');
+        } catch (error) {
+            return { error: error.message };
+        }
+    }
+
     // ========================================
     // COMMENTS
     // ========================================
@@ -372,6 +396,10 @@ class ChecklistService {
             if (!window.apiFetch) {
                 throw new Error('API indisponivel');
             }
+            const direct = await this.uploadCommentAttachmentDirect(file);
+            if (direct) {
+                return direct;
+            }
             const formData = new FormData();
             formData.append('file', file);
             const data = await window.apiFetch('/api/upload/comment-attachment', {
@@ -395,6 +423,58 @@ class ChecklistService {
         }
     }
 
+    /**
+     * Upload direto ao storage via URL pre-assinada.
+     * Retorna null quando o upload direto esta indisponivel (usa-se o fallback via servidor).
+     * @param {File} file
+     * @returns {Promise<{success: boolean, url: string, filename: string, contentType: string}|null>}
+     */
+    async uploadCommentAttachmentDirect(file) {
+        let presign;
+        try {
+            presign = await window.apiFetch('/api/upload/comment-attachment/presign', {
+                method: 'POST',
+                body: JSON.stringify({ filename: file.name, size: file.size, method: 'PUT' }),
+                showErrorToast: false,
+                showProgress: false
+            });
+        } catch (error) {
+            return null;
+        }
+        if (!presign || !presign.ok || !presign.upload) {
+            return null;
+        }
+
+        let uploaded;
+        try {
+            uploaded = await fetch(presign.upload.url, {
+                method: 'PUT',
+                headers: presign.upload.headers || {},
+                body: file
+            });
+        } catch (error) {
+            // CORS do bucket ou rede: tenta pelo servidor
+            return null;
+        }
+        if (!uploaded.ok) {
+            return null;
+        }
+
+        const data = await window.apiFetch('/api/upload/comment-attachment/confirm', {
+            method: 'POST',
+            body: JSON.stringify({ key: presign.key, upload_token: presign.upload_token })
+        });
+        if (!data || !data.ok) {
+            throw new Error((data && data.error) ? data.error : 'Falha no upload');
+        }
+        return {
+            success: true,
+            url: data.attachment_url || data.image_url,
+            filename: data.filename,
+            contentType: data.content_type
+        };
+    }
+
     /**
      * Converte arquivo para base64
      * @param {File} file - Arquivo
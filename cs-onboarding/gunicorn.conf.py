@@ -0,0 +1,64 @@
+"""
+Configuração do gunicorn (carregada automaticamente a partir da raiz do projeto).
+
+Prepara o modo multiprocesso das métricas Prometheus (backend/project/monitoring/metrics.py):
+`PROMETHEUS_MULTIPROC_DIR` precisa existir no ambiente ANTES de a app (e o
+prometheus_client) ser importada pelo --preload, e os arquivos de um
+worker encerrado são marcados como mortos para não somar valores antigos.
+
+Sem `PROMETHEUS_MULTIPROC_DIR` no ambiente, cada start do master cria um
+diretório próprio e vazio (mkdtemp) e o remove no encerramento; nada é
+apagado fora dele. Um diretório informado pelo operador é usado como está:
+cabe ao deploy entregá-lo vazio.
+
+Gera também os assets estáticos com hash e variantes .br/.gz
+(backend/project/common/static_assets.py) antes do --preload, para que os
+workers sirvam arquivos pré-comprimidos em vez de comprimir a cada resposta.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# "<pid do master>:<diretório>" criado por este master. Sobrevive ao reload do config
+# (HUP, mesmo pid); um master novo herdando o ambiente (USR2) cria o seu próprio.
+_OWNED_DIR_ENV = "CSAPP_PROMETHEUS_OWNED_DIR"
+
+
+def _owned_multiproc_dir() -> str | None:
+    pid, _, path = os.environ.get(_OWNED_DIR_ENV, "").partition(":")
+    return path if pid == str(os.getpid()) and path else None
+
+
+_inherited_owned = os.environ.get(_OWNED_DIR_ENV) and not _owned_multiproc_dir()
+_multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if not _multiproc_dir or _inherited_owned:
+    # Diretório novo por start: arquivos de execuções anteriores não somam nos contadores
+    _multiproc_dir = tempfile.mkdtemp(prefix="csapp_prometheus_")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = _multiproc_dir
+    os.environ[_OWNED_DIR_ENV] = f"{os.getpid()}:{_multiproc_dir}"
+Path(_multiproc_dir).mkdir(parents=True, exist_ok=True)
+
+# Build incremental: só comprime arquivos cujo conteúdo mudou desde o último start
+if os.environ.get("STATIC_BUILD_ON_START", "true").lower() == "true":
+    sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+    from project.common.static_assets import build_static_assets
+
+    build_static_assets()
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    # Remove apenas o diretório que este master criou
+    owned = _owned_multiproc_dir()
+    if owned:
+        shutil.rmtree(owned, ignore_errors=True)
@@ -0,0 +1,37 @@
+"""Resumos de IA persistidos por fingerprint do contexto.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS implantacao_resumos (
+                implantacao_id     INT PRIMARY KEY REFERENCES implantacoes(id) ON DELETE CASCADE,
+                fingerprint        VARCHAR(64) NOT NULL,
+                summary            TEXT NOT NULL,
+                summary_structured TEXT,
+                source             TEXT NOT NULL DEFAULT 'gemini',
+                gerado_por         TEXT,
+                gerado_em          TIMESTAMP DEFAULT NOW(),
+                duracao_ms         INT
+            );
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(text("DROP TABLE IF EXISTS implantacao_resumos CASCADE;"))
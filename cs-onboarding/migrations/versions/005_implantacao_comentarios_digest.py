@@ -0,0 +1,54 @@
+"""Digest incremental de comentários por implantação (contexto do resumo de IA).
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS implantacao_comentarios_digest (
+                implantacao_id       INT PRIMARY KEY REFERENCES implantacoes(id) ON DELETE CASCADE,
+                total_comentarios    INT NOT NULL DEFAULT 0,
+                ultimo_comentario_id INT NOT NULL DEFAULT 0,
+                tags                 JSONB NOT NULL DEFAULT '{}'::jsonb,
+                autores              JSONB NOT NULL DEFAULT '{}'::jsonb,
+                atualizado_em        TIMESTAMP DEFAULT NOW()
+            );
+            """
+        )
+    )
+    # Keyset (ORDER BY id DESC LIMIT N) dos comentários recentes por implantação
+    op.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS idx_comentarios_h_implantacao_id_desc
+                ON comentarios_h (implantacao_id, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_comentarios_h_item_id_desc
+                ON comentarios_h (checklist_item_id, id DESC);
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        text(
+            """
+            DROP INDEX IF EXISTS idx_comentarios_h_item_id_desc;
+            DROP INDEX IF EXISTS idx_comentarios_h_implantacao_id_desc;
+            DROP TABLE IF EXISTS implantacao_comentarios_digest CASCADE;
+            """
+        )
+    )
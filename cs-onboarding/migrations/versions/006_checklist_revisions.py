@@ -0,0 +1,139 @@
+"""Revisão do checklist por implantação (ETag e sincronização incremental da árvore).
+
+Toda escrita em checklist_items (de qualquer caminho: toggle, aplicação de
+plano, move, exclusão...) passa pelo trigger, que incrementa a revisão da
+implantação uma vez por transação e carimba a linha com ela. Exclusões (e
+itens que saem da implantação, como no arquivamento ao trocar de plano)
+viram tombstones com a revisão em que saíram.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Sem FK para implantacoes: o trigger roda também durante o DELETE em cascata da implantação
+    op.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS checklist_revisions (
+                implantacao_id INT PRIMARY KEY,
+                revision       BIGINT NOT NULL DEFAULT 0,
+                atualizado_em  TIMESTAMP DEFAULT NOW()
+            );
+
+            CREATE TABLE IF NOT EXISTS checklist_item_tombstones (
+                id             BIGSERIAL PRIMARY KEY,
+                implantacao_id INT NOT NULL,
+                item_id        INT NOT NULL,
+                parent_id      INT,
+                revision       BIGINT NOT NULL,
+                removido_em    TIMESTAMP DEFAULT NOW()
+            );
+            CREATE INDEX IF NOT EXISTS idx_checklist_tombstones_impl_rev
+                ON checklist_item_tombstones (implantacao_id, revision);
+
+            ALTER TABLE checklist_items ADD COLUMN IF NOT EXISTS revision BIGINT NOT NULL DEFAULT 0;
+            """
+        )
+    )
+
+    # Uma revisão por transação e implantação: a primeira linha escrita faz o upsert
+    # (o lock da linha em checklist_revisions ordena as revisões pela ordem de commit);
+    # as demais reutilizam o valor guardado em uma configuração local da transação.
+    op.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION checklist_bump_revision(p_implantacao_id INT) RETURNS BIGINT AS $$
+            DECLARE
+                setting_key TEXT := 'csapp.checklist_rev_' || p_implantacao_id;
+                cached      TEXT := current_setting(setting_key, TRUE);
+                rev         BIGINT;
+            BEGIN
+                IF cached IS NOT NULL AND cached <> '' THEN
+                    RETURN cached::BIGINT;
+                END IF;
+
+                INSERT INTO checklist_revisions AS r (implantacao_id, revision, atualizado_em)
+                VALUES (p_implantacao_id, 1, NOW())
+                ON CONFLICT (implantacao_id) DO UPDATE
+                    SET revision = r.revision + 1, atualizado_em = NOW()
+                RETURNING r.revision INTO rev;
+
+                PERFORM set_config(setting_key, rev::TEXT, TRUE);
+                RETURN rev;
+            END;
+            $$ LANGUAGE plpgsql;
+            """
+        )
+    )
+
+    op.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION checklist_items_revision_trg() RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    IF OLD.implantacao_id IS NOT NULL THEN
+                        INSERT INTO checklist_item_tombstones (implantacao_id, item_id, parent_id, revision)
+                        VALUES (OLD.implantacao_id, OLD.id, OLD.parent_id, checklist_bump_revision(OLD.implantacao_id));
+                    END IF;
+                    RETURN OLD;
+                END IF;
+
+                IF TG_OP = 'UPDATE' THEN
+                    -- Item saiu da implantação (ex.: arquivamento na troca de plano)
+                    IF OLD.implantacao_id IS NOT NULL AND OLD.implantacao_id IS DISTINCT FROM NEW.implantacao_id THEN
+                        INSERT INTO checklist_item_tombstones (implantacao_id, item_id, parent_id, revision)
+                        VALUES (OLD.implantacao_id, OLD.id, OLD.parent_id, checklist_bump_revision(OLD.implantacao_id));
+                    END IF;
+                    -- Item movido: o progresso do pai antigo muda sem que a linha dele seja escrita
+                    IF OLD.parent_id IS NOT NULL AND OLD.parent_id IS DISTINCT FROM NEW.parent_id THEN
+                        UPDATE checklist_items SET revision = revision WHERE id = OLD.parent_id;
+                    END IF;
+                END IF;
+
+                IF NEW.implantacao_id IS NOT NULL THEN
+                    NEW.revision := checklist_bump_revision(NEW.implantacao_id);
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trg_checklist_items_revision ON checklist_items;
+            CREATE TRIGGER trg_checklist_items_revision
+                BEFORE INSERT OR UPDATE ON checklist_items
+                FOR EACH ROW EXECUTE FUNCTION checklist_items_revision_trg();
+
+            DROP TRIGGER IF EXISTS trg_checklist_items_revision_delete ON checklist_items;
+            CREATE TRIGGER trg_checklist_items_revision_delete
+                AFTER DELETE ON checklist_items
+                FOR EACH ROW EXECUTE FUNCTION checklist_items_revision_trg();
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        text(
+            """
+            DROP TRIGGER IF EXISTS trg_checklist_items_revision_delete ON checklist_items;
+            DROP TRIGGER IF EXISTS trg_checklist_items_revision ON checklist_items;
+            DROP FUNCTION IF EXISTS checklist_items_revision_trg();
+            DROP FUNCTION IF EXISTS checklist_bump_revision(INT);
+            ALTER TABLE checklist_items DROP COLUMN IF EXISTS revision;
+            DROP TABLE IF EXISTS checklist_item_tombstones;
+            DROP TABLE IF EXISTS checklist_revisions;
+            """
+        )
+    )
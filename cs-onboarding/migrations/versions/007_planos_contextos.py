@@ -0,0 +1,135 @@
+"""Contextos normalizados dos planos (TEXT[] indexado) e busca indexada no conteúdo.
+
+`planos_sucesso.contexto` continua sendo o CSV gravado pela aplicação; a
+coluna `contextos` é derivada dele por trigger (mesma normalização de
+`_normalizar_contexto_csv`: formatos legados "{a,b}"/"['a','b']", aliases e
+só contextos válidos), com índice GIN para `contextos @> ARRAY[...]`.
+
+A busca por texto (`ILIKE '%termo%'` em nome/descrição do plano e em
+título/descrição/comentário dos itens do plano) passa a usar índices
+trigram (pg_trgm).
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION planos_normalizar_contextos(raw TEXT) RETURNS TEXT[] AS $$
+                SELECT COALESCE(array_agg(ctx ORDER BY pos), '{}')
+                FROM (
+                    SELECT ctx, MIN(pos) AS pos
+                    FROM (
+                        SELECT
+                            CASE token
+                                WHEN 'grandes-contas' THEN 'grandes_contas'
+                                WHEN 'grandescontas' THEN 'grandes_contas'
+                                WHEN 'grandes contas' THEN 'grandes_contas'
+                                WHEN 'gc' THEN 'grandes_contas'
+                                WHEN 'on-boarding' THEN 'onboarding'
+                                WHEN 'onboard' THEN 'onboarding'
+                                ELSE token
+                            END AS ctx,
+                            pos
+                        FROM (
+                            SELECT lower(btrim(part, ' "''')) AS token, pos
+                            FROM unnest(string_to_array(btrim(raw, ' {}[]'), ',')) WITH ORDINALITY AS t(part, pos)
+                        ) tokens
+                    ) aliased
+                    WHERE ctx IN ('onboarding', 'grandes_contas', 'ongoing')
+                    GROUP BY ctx
+                ) valid
+            $$ LANGUAGE sql IMMUTABLE;
+
+            ALTER TABLE planos_sucesso ADD COLUMN IF NOT EXISTS contextos TEXT[] NOT NULL DEFAULT '{}';
+            UPDATE planos_sucesso SET contextos = planos_normalizar_contextos(contexto);
+            CREATE INDEX IF NOT EXISTS idx_planos_sucesso_contextos ON planos_sucesso USING GIN (contextos);
+
+            CREATE OR REPLACE FUNCTION planos_sucesso_contextos_trg() RETURNS TRIGGER AS $$
+            BEGIN
+                NEW.contextos := planos_normalizar_contextos(NEW.contexto);
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trg_planos_sucesso_contextos ON planos_sucesso;
+            CREATE TRIGGER trg_planos_sucesso_contextos
+                BEFORE INSERT OR UPDATE OF contexto ON planos_sucesso
+                FOR EACH ROW EXECUTE FUNCTION planos_sucesso_contextos_trg();
+
+            -- Listagem paginada: filtros de templates ativos + ordenação da tela
+            CREATE INDEX IF NOT EXISTS idx_planos_sucesso_templates_lista
+                ON planos_sucesso (data_criacao DESC, nome)
+                WHERE processo_id IS NULL;
+            """
+        )
+    )
+
+    # pg_trgm pode exigir privilégio de superusuário: sem ele a busca continua funcionando, só sem índice
+    op.execute(
+        text(
+            """
+            DO $$
+            BEGIN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            EXCEPTION WHEN insufficient_privilege THEN
+                RAISE NOTICE 'pg_trgm indisponível: busca de planos sem índice trigram';
+            END
+            $$;
+            """
+        )
+    )
+    op.execute(
+        text(
+            """
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                    CREATE INDEX IF NOT EXISTS idx_planos_sucesso_nome_trgm
+                        ON planos_sucesso USING GIN (nome gin_trgm_ops);
+                    CREATE INDEX IF NOT EXISTS idx_planos_sucesso_descricao_trgm
+                        ON planos_sucesso USING GIN (descricao gin_trgm_ops);
+                    CREATE INDEX IF NOT EXISTS idx_checklist_items_plano_title_trgm
+                        ON checklist_items USING GIN (title gin_trgm_ops) WHERE plano_id IS NOT NULL;
+                    CREATE INDEX IF NOT EXISTS idx_checklist_items_plano_descricao_trgm
+                        ON checklist_items USING GIN (descricao gin_trgm_ops) WHERE plano_id IS NOT NULL;
+                    CREATE INDEX IF NOT EXISTS idx_checklist_items_plano_comment_trgm
+                        ON checklist_items USING GIN (comment gin_trgm_ops) WHERE plano_id IS NOT NULL;
+                END IF;
+            END
+            $$;
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        text(
+            """
+            DROP INDEX IF EXISTS idx_checklist_items_plano_comment_trgm;
+            DROP INDEX IF EXISTS idx_checklist_items_plano_descricao_trgm;
+            DROP INDEX IF EXISTS idx_checklist_items_plano_title_trgm;
+            DROP INDEX IF EXISTS idx_planos_sucesso_descricao_trgm;
+            DROP INDEX IF EXISTS idx_planos_sucesso_nome_trgm;
+            DROP INDEX IF EXISTS idx_planos_sucesso_templates_lista;
+            DROP TRIGGER IF EXISTS trg_planos_sucesso_contextos ON planos_sucesso;
+            DROP FUNCTION IF EXISTS planos_sucesso_contextos_trg();
+            DROP INDEX IF EXISTS idx_planos_sucesso_contextos;
+            ALTER TABLE planos_sucesso DROP COLUMN IF EXISTS contextos;
+            DROP FUNCTION IF EXISTS planos_normalizar_contextos(TEXT);
+            """
+        )
+    )
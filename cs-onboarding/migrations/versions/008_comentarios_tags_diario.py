@@ -0,0 +1,175 @@
+"""Rollup diário de comentários por usuário, tag, visibilidade e contexto.
+
+Os gráficos de tags (analytics e dashboard) agregavam `comentarios_h` com
+JOIN em checklist_items/implantacoes e BTRIM/LOWER/CAST por linha a cada
+request. A tabela `comentarios_tags_diario` guarda as contagens já
+agregadas por dia e é mantida por trigger em toda inserção, edição e
+exclusão de comentário.
+
+Cada comentário carrega a chave com que foi contabilizado
+(`rollup_contexto`, `rollup_via_item`), calculada no BEFORE trigger enquanto
+o item/implantação existem: a exclusão (inclusive em cascata) decrementa
+exatamente a linha que foi incrementada, sem depender de JOINs com linhas
+que já podem ter sido removidas. Mudanças posteriores de contexto da
+implantação são corrigidas pela reconciliação diária
+(`flask reconcile-comment-rollups`).
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS comentarios_tags_diario (
+                dia          DATE    NOT NULL,
+                usuario_cs   TEXT    NOT NULL,
+                contexto     TEXT    NOT NULL,
+                tag          TEXT    NOT NULL DEFAULT '',
+                visibilidade TEXT    NOT NULL DEFAULT '',
+                via_item     BOOLEAN NOT NULL,
+                qtd          INT     NOT NULL DEFAULT 0,
+                PRIMARY KEY (dia, usuario_cs, contexto, tag, visibilidade, via_item)
+            );
+            CREATE INDEX IF NOT EXISTS idx_comentarios_tags_diario_ctx_dia
+                ON comentarios_tags_diario (contexto, dia);
+            CREATE INDEX IF NOT EXISTS idx_comentarios_tags_diario_usuario_dia
+                ON comentarios_tags_diario (usuario_cs, dia);
+
+            ALTER TABLE comentarios_h ADD COLUMN IF NOT EXISTS rollup_contexto TEXT;
+            ALTER TABLE comentarios_h ADD COLUMN IF NOT EXISTS rollup_via_item BOOLEAN;
+            """
+        )
+    )
+
+    # Backfill antes dos triggers: chave de cada comentário e contagens históricas
+    op.execute(
+        text(
+            """
+            UPDATE comentarios_h ch
+            SET rollup_via_item = ci.implantacao_id IS NOT NULL,
+                rollup_contexto = COALESCE(i.contexto, 'onboarding')
+            FROM comentarios_h c
+            LEFT JOIN checklist_items ci ON ci.id = c.checklist_item_id
+            LEFT JOIN implantacoes i ON i.id = COALESCE(ci.implantacao_id, c.implantacao_id)
+            WHERE ch.id = c.id AND i.id IS NOT NULL;
+
+            DELETE FROM comentarios_tags_diario;
+            INSERT INTO comentarios_tags_diario (dia, usuario_cs, contexto, tag, visibilidade, via_item, qtd)
+            SELECT
+                CAST(data_criacao AS DATE),
+                usuario_cs,
+                rollup_contexto,
+                COALESCE(BTRIM(tag, E' \\t\\n\\r'), ''),
+                COALESCE(LOWER(BTRIM(visibilidade, E' \\t\\n\\r')), ''),
+                COALESCE(rollup_via_item, FALSE),
+                COUNT(*)
+            FROM comentarios_h
+            WHERE usuario_cs IS NOT NULL AND data_criacao IS NOT NULL AND rollup_contexto IS NOT NULL
+            GROUP BY 1, 2, 3, 4, 5, 6;
+            """
+        )
+    )
+
+    op.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION comentarios_tags_diario_aplicar(
+                p_dia TIMESTAMP, p_usuario TEXT, p_contexto TEXT, p_tag TEXT,
+                p_visibilidade TEXT, p_via_item BOOLEAN, p_delta INT
+            ) RETURNS VOID AS $$
+            BEGIN
+                IF p_dia IS NULL OR p_usuario IS NULL OR p_contexto IS NULL THEN
+                    RETURN;
+                END IF;
+                INSERT INTO comentarios_tags_diario AS r
+                    (dia, usuario_cs, contexto, tag, visibilidade, via_item, qtd)
+                VALUES (
+                    CAST(p_dia AS DATE), p_usuario, p_contexto,
+                    COALESCE(BTRIM(p_tag, E' \\t\\n\\r'), ''),
+                    COALESCE(LOWER(BTRIM(p_visibilidade, E' \\t\\n\\r')), ''),
+                    p_via_item, p_delta
+                )
+                ON CONFLICT (dia, usuario_cs, contexto, tag, visibilidade, via_item)
+                DO UPDATE SET qtd = r.qtd + EXCLUDED.qtd;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION comentarios_h_rollup_trg() RETURNS TRIGGER AS $$
+            DECLARE
+                item_impl INT;
+            BEGIN
+                IF TG_WHEN = 'BEFORE' THEN
+                    -- Mesma atribuição das consultas de analytics: implantação do item, senão a do comentário
+                    SELECT ci.implantacao_id INTO item_impl FROM checklist_items ci WHERE ci.id = NEW.checklist_item_id;
+                    NEW.rollup_via_item := item_impl IS NOT NULL;
+                    SELECT COALESCE(i.contexto, 'onboarding') INTO NEW.rollup_contexto
+                    FROM implantacoes i WHERE i.id = COALESCE(item_impl, NEW.implantacao_id);
+                    RETURN NEW;
+                END IF;
+
+                IF TG_OP = 'UPDATE'
+                   AND OLD.tag IS NOT DISTINCT FROM NEW.tag
+                   AND OLD.visibilidade IS NOT DISTINCT FROM NEW.visibilidade
+                   AND OLD.usuario_cs IS NOT DISTINCT FROM NEW.usuario_cs
+                   AND OLD.data_criacao IS NOT DISTINCT FROM NEW.data_criacao
+                   AND OLD.rollup_contexto IS NOT DISTINCT FROM NEW.rollup_contexto
+                   AND OLD.rollup_via_item IS NOT DISTINCT FROM NEW.rollup_via_item THEN
+                    RETURN NULL;
+                END IF;
+
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    PERFORM comentarios_tags_diario_aplicar(
+                        OLD.data_criacao, OLD.usuario_cs, OLD.rollup_contexto, OLD.tag,
+                        OLD.visibilidade, COALESCE(OLD.rollup_via_item, FALSE), -1
+                    );
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    PERFORM comentarios_tags_diario_aplicar(
+                        NEW.data_criacao, NEW.usuario_cs, NEW.rollup_contexto, NEW.tag,
+                        NEW.visibilidade, COALESCE(NEW.rollup_via_item, FALSE), 1
+                    );
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trg_comentarios_h_rollup_chave ON comentarios_h;
+            CREATE TRIGGER trg_comentarios_h_rollup_chave
+                BEFORE INSERT OR UPDATE OF checklist_item_id, implantacao_id ON comentarios_h
+                FOR EACH ROW EXECUTE FUNCTION comentarios_h_rollup_trg();
+
+            DROP TRIGGER IF EXISTS trg_comentarios_h_rollup ON comentarios_h;
+            CREATE TRIGGER trg_comentarios_h_rollup
+                AFTER INSERT OR UPDATE OR DELETE ON comentarios_h
+                FOR EACH ROW EXECUTE FUNCTION comentarios_h_rollup_trg();
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        text(
+            """
+            DROP TRIGGER IF EXISTS trg_comentarios_h_rollup ON comentarios_h;
+            DROP TRIGGER IF EXISTS trg_comentarios_h_rollup_chave ON comentarios_h;
+            DROP FUNCTION IF EXISTS comentarios_h_rollup_trg();
+            DROP FUNCTION IF EXISTS comentarios_tags_diario_aplicar(TIMESTAMP, TEXT, TEXT, TEXT, TEXT, BOOLEAN, INT);
+            ALTER TABLE comentarios_h DROP COLUMN IF EXISTS rollup_via_item;
+            ALTER TABLE comentarios_h DROP COLUMN IF EXISTS rollup_contexto;
+            DROP TABLE IF EXISTS comentarios_tags_diario;
+            """
+        )
+    )
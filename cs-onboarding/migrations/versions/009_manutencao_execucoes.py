@@ -0,0 +1,39 @@
+"""Estado das tarefas de manutenção agendadas.
+
+Uma linha por tarefa do scheduler (tasks/scheduler.py) com a última
+execução, compartilhada entre processos: o líder da vez (advisory lock)
+decide o que está vencido a partir desta tabela, não da memória do processo.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS manutencao_execucoes (
+                tarefa           TEXT PRIMARY KEY,
+                ultima_execucao  TIMESTAMPTZ NOT NULL,
+                status           TEXT NOT NULL,
+                duracao_ms       INT,
+                resultado        TEXT,
+                erro             TEXT
+            );
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(text("DROP TABLE IF EXISTS manutencao_execucoes;"))
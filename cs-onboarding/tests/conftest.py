@@ -0,0 +1,12 @@
+"""Configuração comum dos testes: `project` importável a partir de backend/ e env mínimo."""
+
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("FLASK_ENV", "development")
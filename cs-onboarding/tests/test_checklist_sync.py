@@ -0,0 +1,32 @@
+"""Sync incremental da árvore: token com o dia de emissão e montagem do delta."""
+
+from project.modules.checklist.domain.sync import build_sync_token, build_tree_delta, parse_sync_token
+
+
+def test_token_do_mesmo_dia_devolve_a_revisao():
+    token = build_sync_token(42, "20261019")
+
+    assert parse_sync_token(token, "20261019") == 42
+
+
+def test_token_de_outro_dia_ou_invalido_pede_arvore_completa():
+    # Itens que viraram "atrasada" na virada do dia não têm revisão nova
+    assert parse_sync_token(build_sync_token(42, "20261018"), "20261019") is None
+    assert parse_sync_token("42", "20261019") is None
+    assert parse_sync_token("abc.20261019", "20261019") is None
+    assert parse_sync_token(None, "20261019") is None
+
+
+def test_delta_leva_alterados_com_ancestores_e_removidos():
+    items = [
+        {"id": 1, "parent_id": None, "revision": 3},
+        {"id": 2, "parent_id": 1, "revision": 3},
+        {"id": 3, "parent_id": 2, "revision": 7},
+        {"id": 4, "parent_id": 1, "revision": 3},
+    ]
+    deleted = [{"item_id": 9, "parent_id": 4, "revision": 8}, {"item_id": 2, "parent_id": 1, "revision": 6}]
+
+    delta = build_tree_delta(items, 5, deleted)
+
+    assert [item["id"] for item in delta["changed"]] == [1, 2, 3, 4]
+    assert delta["deleted"] == [9]
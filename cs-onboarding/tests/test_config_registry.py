@@ -0,0 +1,60 @@
+"""ConfigRegistry: recursos carregados de forma independente e versão compartilhada."""
+
+import pytest
+from flask import Flask
+from flask_caching import Cache
+
+from project.config import cache_config, config_registry
+from project.config.config_registry import ConfigRegistry, bump_config_registry_version
+
+
+@pytest.fixture
+def loaders(monkeypatch):
+    state = {"motivos_falham": True}
+
+    def motivos():
+        if state["motivos_falham"]:
+            raise RuntimeError('relation "motivos_cancelamento" does not exist')
+        return [{"id": 1, "descricao": "Desistência"}]
+
+    monkeypatch.setattr(
+        config_registry,
+        "_loaders",
+        lambda: {"tags": lambda: [{"id": 1, "nome": "Reunião"}], "motivos_cancelamento": motivos},
+    )
+    monkeypatch.setattr(cache_config, "cache", None)
+    return state
+
+
+def test_recurso_com_falha_nao_derruba_os_demais_na_carga_fria(loaders):
+    registry = ConfigRegistry()
+
+    assert registry.rows("tags") == [{"id": 1, "nome": "Reunião"}]
+    assert registry.rows("motivos_cancelamento") == []
+    assert registry.snapshot().failed == ("motivos_cancelamento",)
+
+
+def test_recurso_com_falha_mantem_linhas_anteriores_e_e_recarregado(loaders, monkeypatch):
+    monkeypatch.setattr(config_registry, "CONFIG_REGISTRY_CHECK_INTERVAL", 0)
+    loaders["motivos_falham"] = False
+    registry = ConfigRegistry()
+    registry.reload()
+
+    loaders["motivos_falham"] = True
+    registry.reload()
+    assert registry.rows("motivos_cancelamento") == [{"id": 1, "descricao": "Desistência"}]
+    assert registry.snapshot().failed == ("motivos_cancelamento",)
+
+    # Snapshot incompleto é recarregado na próxima checagem, mesmo sem versão nova
+    loaders["motivos_falham"] = False
+    assert registry.snapshot().failed == ()
+
+
+def test_bump_incrementa_a_versao_no_backend(monkeypatch):
+    app = Flask(__name__)
+    cache = Cache(app, config={"CACHE_TYPE": "SimpleCache"})
+    monkeypatch.setattr(cache_config, "cache", cache)
+
+    with app.app_context():
+        assert [bump_config_registry_version() for _ in range(3)] == [1, 2, 3]
+        assert config_registry.get_config_registry_version() == 3
@@ -0,0 +1,142 @@
+"""IntegrationClient contra um servidor HTTP de teste (em thread, no localhost)."""
+
+import json
+import threading
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from project.core.http_client import (
+    INTEGRATIONS,
+    CircuitBreaker,
+    CircuitOpenError,
+    IntegrationClient,
+    IntegrationConfig,
+)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Responde com os status enfileirados em `server.statuses` (200 quando vazia)."""
+
+    def _respond(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        with server.lock:
+            server.calls.append((self.command, self.path))
+            status = server.statuses.pop(0) if server.statuses else 200
+        body = json.dumps({"status": status}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.calls = []
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server, path="/"):
+    host, port = server.server_address
+    return f"http://{host}:{port}{path}"
+
+
+def _gemini_client(**overrides):
+    config = INTEGRATIONS["gemini"]
+    # Mesma política do Gemini, sem o backoff de produção para o teste não esperar
+    return IntegrationClient(replace(config, retry=replace(config.retry, backoff_factor=0), **overrides))
+
+
+def test_gemini_retenta_post_em_503(stub_server):
+    stub_server.statuses = [503, 200]
+    client = _gemini_client()
+
+    response = client.post(_url(stub_server, "/generate"), json={"q": 1})
+
+    assert response.status_code == 200
+    assert stub_server.calls == [("POST", "/generate"), ("POST", "/generate")]
+    client.close()
+
+
+def test_post_de_outras_integracoes_nao_e_retentado_por_status(stub_server):
+    stub_server.statuses = [503, 200]
+    client = IntegrationClient(IntegrationConfig(name="jira"))
+
+    response = client.post(_url(stub_server, "/issue"), json={})
+
+    assert response.status_code == 503
+    assert len(stub_server.calls) == 1
+    client.close()
+
+
+def test_reusa_conexao_keep_alive(stub_server):
+    client = IntegrationClient(IntegrationConfig(name="stub"))
+
+    for _ in range(3):
+        assert client.get(_url(stub_server)).status_code == 200
+
+    pool = next(iter(client.session.get_adapter(_url(stub_server)).poolmanager.pools._container.values()))
+    assert pool.num_connections == 1
+    client.close()
+
+
+def test_circuito_abre_e_rejeita_sem_chamar_o_servidor(stub_server):
+    stub_server.statuses = [500, 500]
+    client = IntegrationClient(
+        IntegrationConfig(
+            name="stub", failure_threshold=2, recovery_timeout=60, retry=replace(INTEGRATIONS["jira"].retry, total=0)
+        )
+    )
+
+    for _ in range(2):
+        assert client.get(_url(stub_server)).status_code == 500
+    with pytest.raises(CircuitOpenError):
+        client.get(_url(stub_server))
+
+    assert len(stub_server.calls) == 2
+    assert client.get_stats()["rejected_by_breaker"] == 1
+    client.close()
+
+
+def test_erro_fora_da_integracao_libera_teste_do_half_open(stub_server):
+    client = IntegrationClient(IntegrationConfig(name="stub", failure_threshold=1, recovery_timeout=0))
+    client.breaker.record_failure()
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+
+    with pytest.raises(TypeError):
+        client.get(_url(stub_server), argumento_invalido=True)
+
+    # O teste do half-open foi liberado: a próxima chamada passa e fecha o circuito
+    assert client.get(_url(stub_server)).status_code == 200
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    client.close()
+
+
+def test_erro_de_conexao_conta_como_falha():
+    client = IntegrationClient(IntegrationConfig(name="stub", failure_threshold=1, recovery_timeout=60))
+
+    with pytest.raises(requests.ConnectionError):
+        client.get("http://127.0.0.1:9/", timeout=1)
+
+    assert client.breaker.state == CircuitBreaker.OPEN
+    client.close()
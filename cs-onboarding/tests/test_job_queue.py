@@ -0,0 +1,147 @@
+"""JobQueue executando chamadas a um Gemini falso (servidor HTTP em thread, no localhost)."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from flask import Flask
+
+from project.modules.implantacao.infra.gemini_client import generate_text
+from project.tasks.job_queue import DONE, FAILED, JobQueue, JobRejectedError
+
+
+class _FakeGeminiHandler(BaseHTTPRequestHandler):
+    """generateContent falso: espera `server.release` e devolve o prompt em maiúsculas."""
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = payload["contents"][0]["parts"][0]["text"]
+        with server.lock:
+            server.calls += 1
+        server.release.wait(timeout=5)
+        if prompt == "erro":
+            status, body = 500, {"error": {"message": "falha"}}
+        else:
+            status, body = 200, {"candidates": [{"content": {"parts": [{"text": prompt.upper()}]}}]}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeGeminiHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.release = threading.Event()
+    server.calls = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    monkeypatch.setenv("GEMINI_API_KEY", "chave-teste")
+    monkeypatch.setenv("GEMINI_API_BASE_URL", f"http://{host}:{port}")
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+
+def _resumo(prompt, progress):
+    progress("gerando")
+    return {"texto": generate_text(prompt, timeout_seconds=5)}
+
+
+def _wait(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in (DONE, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} não terminou")
+
+
+def test_job_chama_gemini_fora_da_requisicao(app, fake_gemini):
+    queue = JobQueue("teste")
+
+    job = queue.submit("resumo", _resumo, "ola", owner="ana@example.com")
+    assert job.status in ("queued", "running")
+
+    fake_gemini.release.set()
+    result = _wait(queue, job.id)
+
+    assert result["status"] == DONE
+    assert result["stage"] == "gerando"
+    assert result["result"] == {"texto": "OLA"}
+
+
+def test_dedupe_devolve_job_ativo_e_chama_gemini_uma_vez(app, fake_gemini):
+    queue = JobQueue("teste")
+
+    first = queue.submit("resumo", _resumo, "a", owner="ana@example.com", dedupe_key="resumo:1")
+    second = queue.submit("resumo", _resumo, "a", owner="bruno@example.com", dedupe_key="resumo:1")
+    fake_gemini.release.set()
+    _wait(queue, first.id)
+
+    assert second.id == first.id
+    assert fake_gemini.calls == 1
+    assert queue.get_stats()["deduplicated"] == 1
+
+
+def test_limite_por_usuario_e_falha_do_gemini(app, fake_gemini):
+    queue = JobQueue("teste", per_user_limit=1)
+
+    job = queue.submit("resumo", _resumo, "erro", owner="ana@example.com")
+    with pytest.raises(JobRejectedError):
+        queue.submit("resumo", _resumo, "outro", owner="ana@example.com")
+
+    fake_gemini.release.set()
+    result = _wait(queue, job.id)
+
+    assert result["status"] == FAILED
+    assert "500" in result["error"]
+    stats = queue.get_stats()
+    assert stats["rejected"] == 1
+    assert stats["failed"] == 1
+
+
+def test_executor_recriado_uma_vez_por_processo_sob_concorrencia(app, fake_gemini):
+    queue = JobQueue("teste", per_user_limit=10)
+    queue._get_executor()
+    queue._executor_pid = -1  # simula o primeiro uso depois de um fork
+
+    barrier = threading.Barrier(8)
+    jobs = []
+
+    def submit(i):
+        with app.app_context():
+            barrier.wait()
+            jobs.append(queue.submit("resumo", _resumo, f"p{i}", owner="ana@example.com"))
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    fake_gemini.release.set()
+
+    # Nenhum job registrado por uma thread foi apagado pelo reset de outra
+    assert len(jobs) == 8
+    assert all(_wait(queue, job.id)["status"] == DONE for job in jobs)
+    assert queue.get_stats()["submitted"] == 8
@@ -0,0 +1,83 @@
+"""/metrics fechado sem token fora de development e diretório multiprocesso do gunicorn."""
+
+import os
+import runpy
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+from project.monitoring import metrics
+
+GUNICORN_CONF = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+@pytest.fixture
+def metrics_client():
+    app = Flask(__name__)
+    metrics.init_metrics(app)
+    return app.test_client()
+
+
+@pytest.mark.parametrize(("flask_env", "status"), [("production", 401), ("staging", 401), ("development", 200)])
+def test_sem_token_so_abre_em_development(metrics_client, monkeypatch, flask_env, status):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "")
+    monkeypatch.setenv("FLASK_ENV", flask_env)
+
+    assert metrics_client.get("/metrics").status_code == status
+
+
+def test_com_token_exige_bearer(metrics_client, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "scraper")
+    monkeypatch.setenv("FLASK_ENV", "development")
+
+    assert metrics_client.get("/metrics").status_code == 401
+    assert metrics_client.get("/metrics", headers={"Authorization": "Bearer scraper"}).status_code == 200
+
+
+@pytest.fixture
+def gunicorn_env(monkeypatch):
+    monkeypatch.setenv("STATIC_BUILD_ON_START", "false")
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.delenv("CSAPP_PROMETHEUS_OWNED_DIR", raising=False)
+    return monkeypatch
+
+
+def test_diretorio_do_operador_nao_e_apagado(gunicorn_env, tmp_path):
+    (tmp_path / "outro_arquivo.txt").write_text("não é do app")
+    gunicorn_env.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    conf = runpy.run_path(str(GUNICORN_CONF))
+    conf["on_exit"](None)
+
+    assert (tmp_path / "outro_arquivo.txt").exists()
+    assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == str(tmp_path)
+
+
+def test_diretorio_proprio_criado_por_start_e_removido_no_exit(gunicorn_env):
+    conf = runpy.run_path(str(GUNICORN_CONF))
+    owned = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    assert owned.is_dir()
+    assert not any(owned.iterdir())
+
+    # Reload do config (HUP) no mesmo master reaproveita o diretório
+    runpy.run_path(str(GUNICORN_CONF))
+    assert Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]) == owned
+
+    conf["on_exit"](None)
+    assert not owned.exists()
+
+
+def test_master_novo_herdando_ambiente_cria_o_proprio(gunicorn_env, tmp_path):
+    inherited = tmp_path / "do_master_antigo"
+    inherited.mkdir()
+    gunicorn_env.setenv("PROMETHEUS_MULTIPROC_DIR", str(inherited))
+    gunicorn_env.setenv("CSAPP_PROMETHEUS_OWNED_DIR", f"1:{inherited}")
+
+    conf = runpy.run_path(str(GUNICORN_CONF))
+    created = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    conf["on_exit"](None)
+
+    assert created != inherited
+    assert inherited.exists()
+    assert not created.exists()
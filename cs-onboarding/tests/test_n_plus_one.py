@@ -0,0 +1,112 @@
+"""Detector de N+1: statements repetidos no escopo e relatório por endpoint."""
+
+import pytest
+from flask import Flask
+
+from project import db
+from project.modules.implantacao.infra.comment_digest import resolver_nomes_autores
+from project.monitoring import n_plus_one
+from project.monitoring.n_plus_one import NPlusOneError, n_plus_one_scope
+
+
+class _TrackingCursor:
+    """Cursor falso que registra cada statement, como o NPlusOneTrackingCursor do pool."""
+
+    description = None
+    rowcount = 0
+
+    def execute(self, query, args=None):
+        n_plus_one.record_statement(query)
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+
+class _Connection:
+    def cursor(self):
+        return _TrackingCursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fake_db(monkeypatch):
+    monkeypatch.setattr(db, "get_db_connection", lambda: (_Connection(), "postgres"))
+    n_plus_one.reset_n_plus_one_report()
+    yield
+    n_plus_one.reset_n_plus_one_report()
+
+
+def _nomes_um_a_um(emails):
+    # Uma query por autor: o padrão N+1 que o detector deve apontar
+    return [resolver_nomes_autores([email]) for email in emails]
+
+
+def test_mesmo_fingerprint_no_limite_levanta_com_pilha_do_chamador():
+    app = Flask(__name__)
+    emails = [f"user{i}@example.com" for i in range(3)]
+
+    with (
+        app.app_context(),
+        pytest.raises(NPlusOneError) as exc_info,
+        n_plus_one_scope("resumo", mode="raise", threshold=3),
+    ):
+        _nomes_um_a_um(emails)
+
+    (finding,) = exc_info.value.findings
+    assert finding["count"] == 3
+    assert "perfil_usuario" in finding["sample"]
+    assert finding["stack"]
+    assert "comment_digest.py" in finding["stack"][0]
+    assert "resolver_nomes_autores" in finding["stack"][0]
+
+
+def test_statements_distintos_ou_abaixo_do_limite_passam():
+    app = Flask(__name__)
+
+    with app.app_context(), n_plus_one_scope("resumo", mode="raise", threshold=3) as scope:
+        _nomes_um_a_um(["a@example.com", "b@example.com"])
+        db.query_db("SELECT id FROM implantacoes WHERE id = %s", (1,))
+        db.query_db("SELECT id FROM checklist_items WHERE implantacao_id = %s", (1,))
+
+    assert scope.total == 4
+    assert scope.findings() == []
+
+
+def test_hooks_da_requisicao_acumulam_relatorio_por_endpoint():
+    app = Flask(__name__)
+    app.config["N_PLUS_ONE_DETECTION"] = "log"
+    app.config["N_PLUS_ONE_THRESHOLD"] = 3
+    n_plus_one.init_n_plus_one_detection(app)
+
+    @app.route("/autores/<int:n>")
+    def autores(n):
+        _nomes_um_a_um([f"user{i}@example.com" for i in range(n)])
+        return "ok"
+
+    @app.route("/implantacao")
+    def implantacao():
+        db.query_db("SELECT id FROM implantacoes WHERE id = %s", (1,))
+        return "ok"
+
+    client = app.test_client()
+    assert client.get("/autores/4").status_code == 200
+    assert client.get("/autores/6").status_code == 200
+    assert client.get("/implantacao").status_code == 200
+
+    with app.app_context():
+        report = n_plus_one.get_n_plus_one_report()
+
+    assert report["mode"] == "log"
+    assert list(report["endpoints"]) == ["GET /autores/<int:n>"]
+    (entry,) = report["endpoints"]["GET /autores/<int:n>"].values()
+    assert entry["occurrences"] == 2
+    assert entry["max_count"] == 6
+    assert any("resolver_nomes_autores" in frame for frame in entry["stack"])
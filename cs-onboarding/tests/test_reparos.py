@@ -0,0 +1,54 @@
+"""Reparos em lote: falhas persistentes não impedem o reparo das demais implantações."""
+
+from contextlib import contextmanager
+
+import pytest
+
+from project.modules.implantacao.domain import reparos
+from project.modules.planos.domain import aplicar
+
+
+class _Conn:
+    def cursor(self):
+        return None
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture
+def checklists_vazios(monkeypatch):
+    """Implantações 1..6 sem checklist; o clone das 1 e 2 sempre falha."""
+    pendentes = set(range(1, 7))
+    falham = {1, 2}
+
+    def query_db(sql, args=(), one=False, raise_on_error=False):
+        apos_id, limite = args
+        ids = sorted(i for i in pendentes if i > apos_id)[:limite]
+        return [{"id": i, "usuario_cs": None, "plano_sucesso_id": 10, "dias_duracao": 5} for i in ids]
+
+    def clonar(cursor, db_type, plano_id, impl_id, *args):
+        if impl_id in falham:
+            raise RuntimeError("plano com estrutura inválida")
+        pendentes.discard(impl_id)
+
+    @contextmanager
+    def db_connection():
+        yield _Conn(), "postgres"
+
+    monkeypatch.setattr(reparos, "query_db", query_db)
+    monkeypatch.setattr(reparos, "db_connection", db_connection)
+    monkeypatch.setattr(reparos, "_limpar_caches", lambda implantacoes: None)
+    monkeypatch.setattr(aplicar, "_clonar_plano_para_implantacao_checklist", clonar)
+    return pendentes
+
+
+def test_falhas_no_inicio_da_fila_nao_bloqueiam_o_restante(checklists_vazios):
+    cursor, execucoes = 0, []
+    for _ in range(5):
+        reparadas, cursor = reparos.reparar_checklists_vazios(limite=2, apos_id=cursor)
+        execucoes.append((reparadas, cursor))
+
+    assert checklists_vazios == {1, 2}
+    # Lote cheio avança o cursor; lote incompleto recomeça do início e retenta as falhas
+    assert execucoes == [(0, 2), (2, 4), (2, 6), (0, 0), (0, 2)]
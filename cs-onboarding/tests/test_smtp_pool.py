@@ -0,0 +1,138 @@
+"""Pool SMTP contra um servidor SMTP de teste (em thread, no localhost)."""
+
+import contextlib
+import socketserver
+import threading
+
+import pytest
+
+from project.mail.smtp_pool import SMTPConnectionPool
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Diálogo SMTP mínimo: EHLO/HELO, MAIL, RCPT, DATA, NOOP, RSET, QUIT."""
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.sockets.append(self.connection)
+        self._reply("220 stand-in ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip().upper()
+            if command.startswith("EHLO"):
+                self._reply("250-stand-in", "250 OK")
+            elif command.startswith(("HELO", "MAIL", "RCPT", "RSET", "NOOP")):
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                body = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    body.append(data_line)
+                with server.lock:
+                    server.messages.append(b"".join(body))
+                self._reply("250 OK queued")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+    def _reply(self, *lines):
+        self.wfile.write("".join(f"{line}\r\n" for line in lines).encode())
+
+
+class _StandInSMTPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages: list[bytes] = []
+        self.sockets = []
+
+    def drop_connections(self):
+        """Derruba as sessões abertas (como um servidor que fecha conexões ociosas)."""
+        with self.lock:
+            sockets, self.sockets = self.sockets, []
+        for sock in sockets:
+            with contextlib.suppress(OSError):
+                sock.shutdown(2)
+            sock.close()
+
+
+@pytest.fixture
+def smtp_server():
+    server = _StandInSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _send(pool, server, subject):
+    host, port = server.server_address
+    return pool.sendmail(
+        host,
+        port,
+        None,
+        None,
+        "from@example.com",
+        ["to@example.com"],
+        f"Subject: {subject}\r\n\r\ncorpo",
+        use_tls=False,
+    )
+
+
+def test_reaproveita_a_mesma_sessao(smtp_server):
+    pool = SMTPConnectionPool(noop_after_seconds=60)
+
+    for i in range(3):
+        _send(pool, smtp_server, f"msg {i}")
+
+    stats = pool.get_stats()
+    assert smtp_server.connections == 1
+    assert len(smtp_server.messages) == 3
+    assert stats["created"] == 1
+    assert stats["reused"] == 2
+    assert stats["idle_connections"] == 1
+    pool.close_all()
+
+
+def test_reconecta_quando_sessao_reaproveitada_caiu(smtp_server):
+    # NOOP desligado: a queda só é percebida no envio, que deve ser refeito uma vez
+    pool = SMTPConnectionPool(noop_after_seconds=60)
+    _send(pool, smtp_server, "primeira")
+
+    smtp_server.drop_connections()
+    _send(pool, smtp_server, "segunda")
+
+    stats = pool.get_stats()
+    assert smtp_server.connections == 2
+    assert len(smtp_server.messages) == 2
+    assert stats["created"] == 2
+    assert stats["discarded"] == 1
+    pool.close_all()
+
+
+def test_noop_descarta_sessao_ociosa_derrubada(smtp_server):
+    pool = SMTPConnectionPool(noop_after_seconds=0)
+    _send(pool, smtp_server, "primeira")
+
+    smtp_server.drop_connections()
+    _send(pool, smtp_server, "segunda")
+
+    stats = pool.get_stats()
+    assert stats["noop_failures"] == 1
+    assert stats["created"] == 2
+    assert len(smtp_server.messages) == 2
+    pool.close_all()
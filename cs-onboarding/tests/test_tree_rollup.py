@@ -0,0 +1,45 @@
+"""rollup_progress: total/concluídos de toda a subárvore (semântica de get_item_progress_stats)."""
+
+from project.modules.checklist.domain.tree import rollup_progress
+
+
+def _item(item_id, parent_id, completed=False, dispensada=False, ordem=0):
+    return {"id": item_id, "parent_id": parent_id, "completed": completed, "dispensada": dispensada, "ordem": ordem}
+
+
+def test_conta_todos_os_descendentes():
+    # 1 → {2 → {3, 4}, 5}
+    items = [
+        _item(1, None),
+        _item(2, 1, completed=True),
+        _item(3, 2, completed=True),
+        _item(4, 2),
+        _item(5, 1),
+    ]
+
+    progress = rollup_progress(items)
+
+    assert progress == {
+        1: {"total": 4, "completed": 2, "has_children": True},
+        2: {"total": 2, "completed": 1, "has_children": True},
+    }
+
+
+def test_dispensado_nao_conta_nem_seus_descendentes():
+    items = [
+        _item(1, None),
+        _item(2, 1, dispensada=True),
+        _item(3, 2, completed=True),
+        _item(4, 1, completed=True),
+    ]
+
+    progress = rollup_progress(items)
+
+    assert progress[1] == {"total": 1, "completed": 1, "has_children": True}
+    assert progress[2] == {"total": 1, "completed": 1, "has_children": True}
+
+
+def test_subarvore_carregada_sem_a_raiz():
+    items = [_item(7, 3), _item(8, 7, completed=True), _item(9, 7)]
+
+    assert rollup_progress(items) == {7: {"total": 2, "completed": 1, "has_children": True}}
@@ -0,0 +1,150 @@
+"""Unit of work: escrita de estado e timeline/auditoria confirmadas em UMA transação."""
+
+import pytest
+from flask import Flask
+
+from project import db
+from project.database import unit_of_work as uow
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.connection = conn
+        self.description = None
+        self.rowcount = 1
+
+    def execute(self, sql, args=None):
+        if isinstance(sql, bytes):
+            sql = sql.decode()
+        if self.connection.fail_on and self.connection.fail_on in sql:
+            raise RuntimeError(f"falha simulada em {self.connection.fail_on}")
+        self.connection.log.append(" ".join(sql.split()))
+
+    def mogrify(self, template, args):
+        return repr(tuple(args)).encode()
+
+
+class _FakeConnection:
+    """Conexão da requisição: registra statements, commits e rollbacks."""
+
+    encoding = "UTF8"
+
+    def __init__(self):
+        self.log = []
+        self.fail_on = None
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = _FakeConnection()
+    monkeypatch.setattr(db, "get_db_connection", lambda: (conn, "postgres"))
+    monkeypatch.setattr(uow, "get_db_connection", lambda: (conn, "postgres"))
+    app = Flask(__name__)
+    with app.app_context():
+        yield conn
+
+
+@uow.unit_of_work()
+def _finalizar(falhar=False):
+    db.execute_db("UPDATE implantacoes SET status = 'finalizada' WHERE id = %s", (1,))
+    db.logar_timeline(1, "ana@example.com", "status_alterado", "finalizada")
+    if falhar:
+        raise ValueError("regra de negócio")
+
+
+def test_estado_e_timeline_no_mesmo_commit(conn):
+    _finalizar()
+
+    assert [entry.split(" ")[0] for entry in conn.log] == ["UPDATE", "INSERT", "COMMIT"]
+    assert conn.log[1].startswith("INSERT INTO timeline_log")
+
+
+def test_excecao_desfaz_estado_e_descarta_timeline(conn):
+    with pytest.raises(ValueError):
+        _finalizar(falhar=True)
+
+    assert conn.log == ["UPDATE implantacoes SET status = 'finalizada' WHERE id = %s", "ROLLBACK"]
+
+
+def test_falha_ao_gravar_timeline_desfaz_estado_e_propaga(conn):
+    conn.fail_on = "INSERT INTO timeline_log"
+
+    with pytest.raises(RuntimeError):
+        _finalizar()
+
+    assert "COMMIT" not in conn.log
+    assert conn.log[-1] == "ROLLBACK"
+
+
+def test_rollback_no_meio_do_bloco_descarta_linhas_anteriores(conn):
+    conn.fail_on = "UPDATE planos_sucesso"
+
+    @uow.unit_of_work()
+    def _servico():
+        db.logar_timeline(1, "ana@example.com", "plano", "antes da falha")
+        db.execute_db("UPDATE planos_sucesso SET status = 'x'")  # erro tratado: devolve None
+        db.logar_timeline(1, "ana@example.com", "status_alterado", "depois da falha")
+
+    _servico()
+
+    inserts = [entry for entry in conn.log if entry.startswith("INSERT")]
+    assert len(inserts) == 1
+    assert "depois da falha" in inserts[0]
+    assert "antes da falha" not in inserts[0]
+
+
+def test_fora_do_unit_of_work_grava_na_hora(conn):
+    db.execute_db("UPDATE implantacoes SET status = 'andamento' WHERE id = %s", (1,))
+    db.logar_timeline(1, "ana@example.com", "status_alterado", "iniciada")
+
+    assert [entry.split(" ")[0] for entry in conn.log] == ["UPDATE", "COMMIT", "INSERT", "COMMIT"]
+
+
+def test_callbacks_pos_commit_rodam_depois_do_commit(conn):
+    @uow.unit_of_work()
+    def _servico():
+        db.execute_db("UPDATE implantacoes SET status = 'finalizada' WHERE id = %s", (1,))
+        uow.after_commit(lambda: conn.log.append("CACHE_CLEAR"))
+        uow.after_commit(conn.log.append, "EVENTO")
+
+    _servico()
+
+    assert conn.log[-3:] == ["COMMIT", "CACHE_CLEAR", "EVENTO"]
+
+
+@uow.unit_of_work()
+def _finalizar_com_evento():
+    _finalizar()
+    uow.after_commit(db.get_db_connection()[0].log.append, "EVENTO")
+
+
+def test_callbacks_descartados_quando_o_bloco_e_desfeito(conn):
+    @uow.unit_of_work()
+    def _servico():
+        db.execute_db("UPDATE implantacoes SET status = 'finalizada' WHERE id = %s", (1,))
+        uow.after_commit(conn.log.append, "EVENTO")
+        raise ValueError("regra de negócio")
+
+    with pytest.raises(ValueError):
+        _servico()
+    conn.fail_on = "INSERT INTO timeline_log"
+    with pytest.raises(RuntimeError):
+        _finalizar_com_evento()
+
+    assert "EVENTO" not in conn.log
+
+
+def test_callback_roda_na_hora_fora_do_unit_of_work_e_nao_propaga_erro(conn):
+    uow.after_commit(conn.log.append, "EVENTO")
+    uow.after_commit(lambda: 1 / 0)
+
+    assert conn.log == ["EVENTO"]
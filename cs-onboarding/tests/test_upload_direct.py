@@ -0,0 +1,113 @@
+"""Upload direto de anexos (presign → PUT no storage → confirm) contra um S3 do moto."""
+
+import boto3
+import pytest
+import requests
+from flask import g
+
+from project import create_app
+
+mock_aws = pytest.importorskip("moto").mock_aws
+
+BUCKET = "anexos-teste"
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = create_app()
+    app.config.update(
+        R2_DIRECT_UPLOAD=True,
+        CLOUDFLARE_BUCKET_NAME=BUCKET,
+        CLOUDFLARE_PUBLIC_URL="https://cdn.example.com",
+    )
+    return app
+
+
+@pytest.fixture
+def upload(monkeypatch):
+    from project.blueprints import upload as upload_module
+
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        monkeypatch.setattr(upload_module, "r2_client", client)
+        yield upload_module
+
+
+def _call(app, impl, user, payload):
+    with app.test_request_context(json=payload):
+        g.user_email = user
+        response = impl()
+    if isinstance(response, tuple):
+        return response[0].get_json(), response[1]
+    return response.get_json(), response.status_code
+
+
+def _presign_and_put(app, upload, user, content=b"%PDF-1.4 teste"):
+    data, status = _call(
+        app, upload._presign_comment_attachment_impl, user, {"filename": "contrato.pdf", "size": len(content)}
+    )
+    assert status == 200
+    put = requests.put(data["upload"]["url"], data=content, headers=data["upload"]["headers"], timeout=10)
+    assert put.status_code == 200
+    return data
+
+
+def test_confirm_aceita_chave_do_proprio_usuario(app, upload):
+    presign = _presign_and_put(app, upload, "ana@example.com")
+
+    data, status = _call(
+        app,
+        upload._confirm_comment_attachment_impl,
+        "ana@example.com",
+        {"key": presign["key"], "upload_token": presign["upload_token"]},
+    )
+
+    assert status == 200
+    assert data["ok"] is True
+    assert data["filename"] == "contrato.pdf"
+    assert data["attachment_url"] == f"https://cdn.example.com/{presign['key']}"
+
+
+def test_confirm_recusa_chave_emitida_para_outro_usuario(app, upload):
+    presign = _presign_and_put(app, upload, "ana@example.com")
+
+    data, status = _call(
+        app,
+        upload._confirm_comment_attachment_impl,
+        "bruno@example.com",
+        {"key": presign["key"], "upload_token": presign["upload_token"]},
+    )
+
+    assert status == 403
+    assert data["ok"] is False
+
+
+def test_confirm_recusa_chave_sem_token_ou_com_token_de_outra_chave(app, upload):
+    primeiro = _presign_and_put(app, upload, "ana@example.com")
+    segundo = _presign_and_put(app, upload, "ana@example.com")
+
+    _, sem_token = _call(app, upload._confirm_comment_attachment_impl, "ana@example.com", {"key": primeiro["key"]})
+    _, token_trocado = _call(
+        app,
+        upload._confirm_comment_attachment_impl,
+        "ana@example.com",
+        {"key": primeiro["key"], "upload_token": segundo["upload_token"]},
+    )
+
+    assert sem_token == 403
+    assert token_trocado == 403
+
+
+def test_confirm_recusa_token_expirado(app, upload, monkeypatch):
+    presign = _presign_and_put(app, upload, "ana@example.com")
+    monkeypatch.setattr(upload, "UPLOAD_TOKEN_MAX_AGE_SECONDS", -1)
+
+    _, status = _call(
+        app,
+        upload._confirm_comment_attachment_impl,
+        "ana@example.com",
+        {"key": presign["key"], "upload_token": presign["upload_token"]},
+    )
+
+    assert status == 403